@@ -39,7 +39,7 @@ import logging, os, re, codecs
 from MoinMoin import log
 logger = log.getLogger(__name__)
 
-from MoinMoin import config, caching, user, util, wikiutil
+from MoinMoin import config, caching, subscriptions, user, util, wikiutil
 from MoinMoin.logfile import eventlog
 
 def is_cache_exception(e):
@@ -54,12 +54,15 @@ class ItemCache:
         server object we have), because it might be too big for pickling it
         in and out.
     """
-    def __init__(self, name):
+    def __init__(self, name, max_items=None):
         """ Initialize ItemCache object.
             @param name: name of the object, used for display in logging and
                          influences behaviour of refresh().
+            @param max_items: max. amount of keys remembered per item name,
+                              None means unlimited
         """
         self.name = name
+        self.max_items = max_items
         self.cache = {}
         self.log_pos = None # TODO: initialize this to EOF pos of log
                             # to avoid reading in the whole log on first request
@@ -75,6 +78,9 @@ class ItemCache:
             @param data: the data item that should be remembered
         """
         d = self.cache.setdefault(name, {})
+        if self.max_items is not None and len(d) >= self.max_items and key not in d:
+            logger.log(self.loglevel, "%s cache: forgetting %d keys of %r" % (self.name, len(d), name))
+            d.clear()
         d[key] = data
 
     def getItem(self, request, name, key):
@@ -105,7 +111,7 @@ class ItemCache:
     def refresh(self, request):
         """ Refresh the cache - if anything has changed in the wiki, we see it
             in the edit-log and either delete cached data for the changed items
-            (for 'meta') or the complete cache ('pagelists').
+            (for 'meta') or the complete cache ('pagelists', 'fragments').
             @param request: the request object
         """
         from MoinMoin.logfile import editlog
@@ -120,8 +126,8 @@ class ItemCache:
                         del self.cache[item]
                     except:
                         pass
-            elif self.name == 'pagelists':
-                logger.log(self.loglevel, "cache: clearing pagelist cache")
+            elif self.name in ('pagelists', 'fragments', ):
+                logger.log(self.loglevel, "cache: clearing %s cache" % self.name)
                 self.cache = {}
         self.log_pos = new_pos # important to do this at the end -
                                # avoids threading race conditions
@@ -841,12 +847,12 @@ class Page(object):
         # get email addresses of the all wiki user which have a profile stored;
         # add the address only if the user has subscribed to the page and
         # the user is not the current editor
-        userlist = user.getUserList(request)
+        # users without email address are skipped below anyway, the user
+        # storage might be able to exclude them without loading their profile
         subscriber_list = {}
-        for uid in userlist:
-            if uid == request.user.id and not include_self:
+        for subscriber in user.get_users(request, has_email=True):
+            if subscriber.id == request.user.id and not include_self:
                 continue # no self notification
-            subscriber = user.User(request, uid)
 
             # The following tests should be ordered in order of
             # decreasing computation complexity, in particular
@@ -900,89 +906,45 @@ class Page(object):
         # add current page name for list matching
         pageList.append(self.page_name)
 
-        scope, arena, key = 'userdir', 'users', 'pagesubscriptions'
-
-        # get or create cache file
-        cache = caching.CacheEntry(request, arena, key, scope=scope, use_pickle=True)
-        if cache.exists():
-            page_sub = cache.content()
-        else:
-            # build a cache if it doesn't exist
-            cache = caching.CacheEntry(request, arena, key, scope=scope, use_pickle=True, do_locking=False)
-            # lock to stop anybody else interfering with the data while we're working
-            cache.lock('w')
-            userlist = user.getUserList(request)
-            page_sub = {}
-            for uid in userlist:
-                subscriber = user.User(request, uid)
-                # we don't care about storing entries for users without any page subscriptions
-                if subscriber.subscribed_pages:
-                    page_sub[subscriber.id] = {
-                        'name': subscriber.name,
-                        'email': subscriber.email,
-                        'subscribed_pages': subscriber.subscribed_pages,
-                    }
-            cache.update(page_sub)
-            cache.unlock()
-
         if self.cfg.SecurityPolicy:
             UserPerms = self.cfg.SecurityPolicy
         else:
             from MoinMoin.security import Default as UserPerms
 
-        # get email addresses of all wiki users which have a profile stored;
-        # add the address only if the user has subscribed to the page and
-        # the user is not the current editor
-        userlist = page_sub
-        subscriber_list = {}
-
         pages = pageList[:]
         if request.cfg.interwikiname:
             pages += ["%s:%s" % (request.cfg.interwikiname, pagename) for pagename in pageList]
-        # Create text for regular expression search
-        text = '\n'.join(pages)
 
-        for uid in userlist:
+        # the index only gives us the users subscribed to these pages
+        index = subscriptions.get_index(request)
+        uids = []
+        for uid in index.subscribers(pages):
             if uid == request.user.id and not include_self:
                 continue # no self notification
 
             # This is a bit wrong if return_users=1 (which implies that the caller will process
             # user attributes and may, for example choose to send an SMS)
             # So it _should_ be "not (subscriber.email and return_users)" but that breaks at the moment.
-            if not userlist[uid]['email']:
+            if not index.users[uid]['email']:
                 continue # skip empty email addresses
+            uids.append(uid)
 
-            # now check patterns for actual match
-            isSubscribed = False
-            for pattern in userlist[uid]['subscribed_pages']:
-                if pattern in pages:
-                    isSubscribed = True
-                    break
-                try:
-                    pattern = re.compile(r'^%s$' % pattern, re.M)
-                except re.error:
-                    continue
-                if pattern.search(text):
-                    isSubscribed = True
-                    break
-
-            # only if subscribed, create a User object from the profile
-            if isSubscribed:
-                subscriber = user.User(request, uid)
-
-                if not subscriber.valid:
-                    continue
+        subscriber_list = {}
+        # only for the subscribed users, create User objects from the profiles
+        for subscriber in user.get_users(request, uids):
+            if not subscriber.valid:
+                continue
 
-                if not UserPerms(subscriber).read(self.page_name):
-                    continue
+            if not UserPerms(subscriber).read(self.page_name):
+                continue
 
-                lang = subscriber.language or request.cfg.language_default
-                if not lang in subscriber_list:
-                    subscriber_list[lang] = []
-                if return_users:
-                    subscriber_list[lang].append(subscriber)
-                else:
-                    subscriber_list[lang].append(subscriber.email)
+            lang = subscriber.language or request.cfg.language_default
+            if not lang in subscriber_list:
+                subscriber_list[lang] = []
+            if return_users:
+                subscriber_list[lang].append(subscriber)
+            else:
+                subscriber_list[lang].append(subscriber.email)
 
         request.clock.stop('getSubscribers')
         return subscriber_list
@@ -1303,6 +1265,9 @@ class Page(object):
                                     allow_doubleclick=1, trail=trail,
                                     html_head=html_head,
                                     )
+                if emit_headers:
+                    # send the headers and the page header now (if streaming)
+                    request.flush()
 
         # special pages handling, including denying access
         special = None
@@ -1601,7 +1566,10 @@ class Page(object):
         @rtype: list
         @return: page names this page links to
         """
-        if self.exists():
+        if self.rev and self.rev != self.current_rev():
+            # the cache only knows the links of the current revision
+            links = self.parsePageLinks(request)
+        elif self.exists():
             cache = caching.CacheEntry(request, self, 'pagelinks', scope='item', do_locking=False, use_pickle=True)
             if cache.needsUpdate(self._text_filename()):
                 links = self.parsePageLinks(request)
@@ -1648,7 +1616,7 @@ class Page(object):
             try:
                 from MoinMoin.formatter.pagelinks import Formatter
                 formatter = Formatter(request, store_pagelinks=1)
-                page = Page(request, pagename, formatter=formatter)
+                page = Page(request, pagename, formatter=formatter, rev=self.rev)
                 page.send_page(content_only=1)
             except:
                 logger.exception("pagelinks formatter failed, traceback follows")
@@ -1664,10 +1632,21 @@ class Page(object):
     def getCategories(self, request):
         """ Get categories this page belongs to.
 
+        The categories of the current revision are looked up in the
+        category index of the link graph. If there is no link graph yet,
+        they are taken from the links of the page (building the link graph
+        of the whole wiki is too expensive for that), like the categories
+        of older revisions.
+
         @param request: the request object
         @rtype: list
         @return: categories this page belongs to
         """
+        if not self.rev or self.rev == self.current_rev():
+            from MoinMoin.linkgraph import get_linkgraph
+            linkgraph = get_linkgraph(request, create=False)
+            if linkgraph is not None:
+                return linkgraph.categories_of(self.page_name)
         return wikiutil.filterCategoryPages(request, self.getPageLinks(request))
 
     def getParentPage(self):
@@ -1885,7 +1864,7 @@ class RootPage(Page):
             for name in cachedlist:
                 # First, custom filter - exists and acl check are very
                 # expensive!
-                if filter and not list(filter(name)):
+                if filter and not filter(name):
                     continue
 
                 page = Page(request, name)
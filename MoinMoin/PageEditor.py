@@ -1042,6 +1042,9 @@ Try a different name.""", wiki=True) % (wikiutil.escape(newpagename), )
             if got_lock:
                 filesys.rename(clfn, cfn)
 
+        # the page (and so maybe its acl) changed, also for pages below it (acl_hierarchic)
+        request.page_acls.clear()
+
         # add event log entry
         elog = eventlog.EventLog(request)
         elog.add(request, 'SAVEPAGE', {'pagename': self.page_name}, 1, mtime_usecs)
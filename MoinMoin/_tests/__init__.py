@@ -55,11 +55,9 @@ def become_superuser(request):
 
 def nuke_user(request, username):
     """ completely delete a user """
-    user_dir = request.cfg.user_dir
     user_id = user.getUserId(request, username)
     # really get rid of the user
-    fpath = os.path.join(user_dir, user_id)
-    os.remove(fpath)
+    request.cfg.user_storage.remove(request, user_id)
     user.clearLookupCaches(request)
 
 # Creating and destroying test pages --------------------------------
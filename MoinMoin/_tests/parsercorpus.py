@@ -0,0 +1,173 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - wiki parser benchmark corpus
+
+    A reproducible set of pages for measuring (and testing) the moin wiki
+    parser: the HelpOn* pages of the wiki (usually from the underlay) and
+    synthetic pages of some given size, using all kinds of markup.
+
+    Used by the parser tests and by "moin maint benchparser", which also
+    measures complete page views (e.g. time to first byte, see view).
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import time
+
+from werkzeug.test import create_environ
+
+from MoinMoin import wikiutil
+from MoinMoin.Page import Page
+from MoinMoin.parser.text_moin_wiki import Parser as WikiParser
+from MoinMoin.formatter.text_html import Formatter as HtmlFormatter
+
+HELP_PAGE_PREFIX = 'HelpOn'
+
+# sizes of the synthetic pages [bytes]
+SYNTHETIC_SIZES = (20 * 1024, 200 * 1024, )
+
+# building blocks of the synthetic pages, %(n)d gets replaced by a counter
+SYNTHETIC_BLOCKS = [
+"""= Section %(n)d =
+Some ''italic'', '''bold''', '''''bold italic''''' and __underlined__ text
+with a WikiName%(n)d, a ../ParentPage, a /SubPage%(n)d and a !NoWikiName.
+Text with <html> & "quotes", 5 < 6 > 4 && entities like &auml; &#42; &#x42;.
+""",
+"""== Links %(n)d ==
+ * [[FrontPage]], [[FrontPage|the front page]] and [[FrontPage#anchor%(n)d|anchored]]
+ * [[http://moinmo.in/|MoinMoin]], http://example.org/page/%(n)d?a=b, mailto:joe@example.org
+ * joe%(n)d@example.org, MoinMoin:HelpContents, [[MoinMoin:RecentChanges|interwiki]]
+ * [[attachment:file%(n)d.txt]], {{attachment:image%(n)d.png|alt text|width=100}}
+  1. numbered
+  1. list
+   a. nested :) and :(
+ term%(n)d:: definition
+ . no bullet
+""",
+"""=== Markup %(n)d ===
+^super^ and ,,sub,, and {{{tt}}} and `backtick` and --(strike)-- and
+~+big+~ and ~-small-~ and /* a remark */ in one line.
+----
+||<tablewidth="80%%">'''Head'''||'''Head %(n)d'''||
+||cell & text||<style="color: red">red cell %(n)d||
+|| A ||<-2> spanning ||
+||<^|2> rows || WikiWord ||
+|| and || more ||
+
+{{{
+preformatted text %(n)d with ''markup'' <not> parsed
+}}}
+{{{#!python
+def f%(n)d(x):
+    return x < %(n)d
+}}}
+{{{{
+nested {{{ inner }}} %(n)d
+}}}}
+""",
+"""==== Macros %(n)d ====
+<<Anchor(a%(n)d)>> a line<<BR>>break and the date <<DateTime(2008-01-01T00:00:00Z)>>.
+## a comment line %(n)d
+{{{#!wiki comment
+hidden ''wiki'' text %(n)d
+}}}
+  indented text which is just some longer paragraph, long enough to fill some
+  lines of the page %(n)d, without any markup in it at all, just text and text
+  and even more text.
+
+""",
+]
+
+
+def synthetic_page(size):
+    """ Return a synthetic page of (at least) size bytes """
+    result = ["#format wiki\n#language en\n"]
+    length = len(result[0])
+    n = 0
+    while length < size:
+        block = SYNTHETIC_BLOCKS[n % len(SYNTHETIC_BLOCKS)] % {'n': n}
+        result.append(block)
+        length += len(block)
+        n += 1
+    return ''.join(result)
+
+
+def help_pages(request):
+    """ Return [(pagename, body), ...] of the HelpOn* pages of the wiki """
+    pagenames = request.rootpage.getPageList(user='', exists=1,
+                                             filter=lambda name: name.startswith(HELP_PAGE_PREFIX))
+    pagenames.sort()
+    return [(pagename, Page(request, pagename).get_raw_body()) for pagename in pagenames]
+
+
+def synthetic_pages(sizes=SYNTHETIC_SIZES):
+    """ Return [(pagename, body), ...] of synthetic pages of the sizes given """
+    return [('SyntheticPage%dK' % (size // 1024), synthetic_page(size)) for size in sizes]
+
+
+def corpus(request, sizes=SYNTHETIC_SIZES):
+    """ Return [(pagename, body), ...] of the benchmark corpus """
+    return help_pages(request) + synthetic_pages(sizes)
+
+
+def render(request, pagename, body):
+    """ Return the html of body, like rendered on page pagename (not cached) """
+    request.reset()
+    page = Page(request, pagename)
+    page.hilite_re = None
+    page.set_raw_body(body)
+    formatter = HtmlFormatter(request)
+    formatter.setPage(page)
+    page.formatter = formatter
+    request.formatter = formatter
+    parser = WikiParser(body, request, line_anchors=True)
+    formatter.startContent('') # needed for _include_stack init
+    output = request.redirectedOutput(parser.format, formatter)
+    formatter.endContent('')
+    return output
+
+
+def benchmark(request, pages, repeat=3):
+    """ Render each page repeat times
+
+    @return: [(pagename, size, best time [s]), ...]
+    """
+    result = []
+    for pagename, body in pages:
+        timings = []
+        for i in range(repeat):
+            t = time.time()
+            render(request, pagename, body)
+            timings.append(time.time() - t)
+        result.append((pagename, len(body), min(timings)))
+    return result
+
+
+def view(application, base_url, pagename):
+    """ View page pagename via the WSGI application
+
+    @return: (time to first byte [s], total time [s], size [bytes])
+    """
+    environ = create_environ(path='/' + wikiutil.quoteWikinameURL(pagename), base_url=base_url)
+    result = []
+
+    def start_response(status, headers, exc_info=None):
+        return result.append
+
+    t = time.time()
+    first_byte = None
+    size = 0
+    app_iter = application(environ, start_response)
+    try:
+        for data in app_iter:
+            if data and first_byte is None:
+                first_byte = time.time() - t
+            size += len(data)
+    finally:
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+    total = time.time() - t
+    if first_byte is None:
+        first_byte = total
+    return first_byte, total, size
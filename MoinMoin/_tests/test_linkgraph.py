@@ -0,0 +1,130 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.linkgraph Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin import linkgraph
+from MoinMoin.linkgraph import LinkGraph, get_linkgraph
+from MoinMoin.Page import Page
+from MoinMoin.PageEditor import PageEditor
+from MoinMoin._tests import become_trusted, create_page, nuke_page
+
+
+class TestLinkGraph(object):
+    """ linkgraph: queries on an in-memory graph """
+
+    def setup_method(self, method):
+        graph = LinkGraph()
+        graph.existing = set(['FrontPage', 'SandBox', 'LonelyPage', ])
+        graph._set_links('FrontPage', ['SandBox', 'MissingPage', ])
+        graph._set_links('SandBox', ['FrontPage', 'MissingPage', 'OtherMissingPage', 'CategoryTest', ],
+                         ['CategoryTest', ])
+        graph._set_links('LonelyPage', ['CategoryTest', ], ['CategoryTest', ])
+        self.graph = graph
+
+    def testBacklinks(self):
+        assert self.graph.links_to('MissingPage') == set(['FrontPage', 'SandBox', ])
+        assert self.graph.links_from('SandBox') == ['FrontPage', 'MissingPage', 'OtherMissingPage', 'CategoryTest', ]
+
+    def testCategories(self):
+        assert self.graph.categories_of('SandBox') == ['CategoryTest', ]
+        assert self.graph.categories_of('FrontPage') == []
+        assert self.graph.category_members('CategoryTest') == set(['SandBox', 'LonelyPage', ])
+        self.graph._set_links('SandBox', [])
+        assert self.graph.category_members('CategoryTest') == set(['LonelyPage', ])
+        self.graph._set_links('LonelyPage', [])
+        assert self.graph.all_categories() == []
+
+    def testOrphaned(self):
+        assert self.graph.orphaned(self.graph.pages()) == set(['LonelyPage', ])
+        # only links from the given pages count
+        assert self.graph.orphaned(['FrontPage', 'LonelyPage', ]) == set(['FrontPage', 'LonelyPage', ])
+
+    def testWanted(self):
+        wanted = self.graph.wanted(['FrontPage', ])
+        assert wanted == {'MissingPage': set(['FrontPage', ])}
+
+    def testUpdateLinks(self):
+        self.graph._set_links('SandBox', ['LonelyPage', ])
+        assert self.graph.links_to('MissingPage') == set(['FrontPage', ])
+        assert 'OtherMissingPage' not in self.graph.targets()
+        assert self.graph.orphaned(self.graph.pages()) == set(['FrontPage', ])
+
+    def testPickle(self):
+        import pickle
+        graph = pickle.loads(pickle.dumps(self.graph))
+        assert graph.backlinks == self.graph.backlinks
+        assert graph.existing == self.graph.existing
+        assert graph.members == self.graph.members
+
+
+class TestLinkGraphUpdates(object):
+    """ linkgraph: graph follows page changes """
+
+    pagename = 'LinkGraphTestPage'
+
+    def setup_class(self):
+        become_trusted(self.request)
+        linkgraph.rebuild(self.request)
+
+    def teardown_class(self):
+        nuke_page(self.request, self.pagename)
+        nuke_page(self.request, self.pagename + 'Renamed')
+        linkgraph.remove(self.request)
+
+    def testCategoriesWithoutGraph(self):
+        request = self.request
+        linkgraph.remove(request)
+        create_page(request, self.pagename, 'Some text.\n----\nCategoryLinkGraphTest\n')
+        assert Page(request, self.pagename).getCategories(request) == ['CategoryLinkGraphTest']
+        # not built just for that
+        assert get_linkgraph(request, create=False) is None
+        nuke_page(request, self.pagename)
+
+    def testCategoriesOfRevision(self):
+        request = self.request
+        create_page(request, self.pagename, 'Some text.\n----\nCategoryLinkGraphTest\n')
+        create_page(request, self.pagename, 'Some text.\n----\nCategoryLinkGraphOther\n')
+        get_linkgraph(request)
+        current = Page(request, self.pagename).getCategories(request)
+        first = Page(request, self.pagename, rev=1).getCategories(request)
+        nuke_page(request, self.pagename)
+        assert current == ['CategoryLinkGraphOther']
+        assert first == ['CategoryLinkGraphTest']
+
+    def testSaveRenameDelete(self):
+        request = self.request
+        create_page(request, self.pagename, 'LinkGraphTestTarget')
+        graph = get_linkgraph(request)
+        assert graph.exists(self.pagename)
+        assert graph.links_to('LinkGraphTestTarget') == set([self.pagename, ])
+
+        PageEditor(request, self.pagename).renamePage(self.pagename + 'Renamed')
+        graph = get_linkgraph(request)
+        assert not graph.exists(self.pagename)
+        assert graph.links_to('LinkGraphTestTarget') == set([self.pagename + 'Renamed', ])
+
+        PageEditor(request, self.pagename + 'Renamed').deletePage()
+        graph = get_linkgraph(request)
+        assert not graph.exists(self.pagename + 'Renamed')
+        assert graph.links_to('LinkGraphTestTarget') == set()
+
+    def testSaveInterval(self):
+        request = self.request
+        uid = linkgraph.rebuild(request).uid
+        save_interval = LinkGraph.save_interval
+        LinkGraph.save_interval = 3600
+        try:
+            create_page(request, self.pagename, 'LinkGraphTestTarget')
+            graph = get_linkgraph(request)
+        finally:
+            LinkGraph.save_interval = save_interval
+        nuke_page(request, self.pagename)
+        assert graph.exists(self.pagename)
+        # updated in memory, but not saved again that soon
+        assert graph.uid == uid
+
+coverage_modules = ['MoinMoin.linkgraph', 'MoinMoin.util.editlogindex']
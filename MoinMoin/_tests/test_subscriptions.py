@@ -0,0 +1,56 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.subscriptions Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin.subscriptions import SubscriptionIndex
+
+
+def info(*patterns):
+    return {'name': 'SomeUser', 'email': 'user@example.org', 'subscribed_pages': list(patterns), }
+
+
+class TestSubscriptionIndex(object):
+    """ subscriptions: test the subscription index """
+
+    def index(self, chunk_size=100):
+        index = SubscriptionIndex()
+        index.chunk_size = chunk_size
+        index.set_user('1', info('FrontPage', 'MyWiki:SandBox'))
+        index.set_user('2', info('Help.*', 'CategoryHelp'))
+        index.set_user('3', info('.*Box', r'(?:Front|Back)Page'))
+        index.set_user('4', info('Broken[', 'C++'))
+        return index
+
+    def test_literal(self):
+        index = self.index()
+        assert index.subscribers(['FrontPage']) == set(['1', '3'])
+        assert index.subscribers(['MyWiki:SandBox']) == set(['1', '3'])
+        assert index.subscribers(['C++']) == set(['4'])
+        assert index.subscribers(['OtherPage']) == set()
+
+    def test_regex(self):
+        for chunk_size in (1, 2, 100):
+            index = self.index(chunk_size)
+            assert index.subscribers(['HelpOnLinking']) == set(['2'])
+            assert index.subscribers(['SandBox']) == set(['3'])
+            # patterns matching different pages of the list
+            assert index.subscribers(['SandBox', 'HelpContents']) == set(['2', '3'])
+            assert index.subscribers(['HelpOnSandBox']) == set(['2', '3'])
+            # categories of the page count as well
+            assert index.subscribers(['SomePage', 'CategoryHelp']) == set(['2'])
+
+    def test_update(self):
+        index = self.index()
+        index.set_user('2', info('FrontPage'))
+        assert index.subscribers(['HelpOnLinking']) == set()
+        assert index.subscribers(['FrontPage']) == set(['1', '2', '3'])
+        index.set_user('3')
+        assert index.subscribers(['FrontPage']) == set(['1', '2'])
+        assert index.subscribers(['SandBox']) == set()
+        assert '3' not in index.users
+
+coverage_modules = ['MoinMoin.subscriptions']
@@ -8,7 +8,6 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-import os
 import py
 
 from MoinMoin import user, caching
@@ -64,11 +63,10 @@ class TestLoginWithPassword(object):
 
         Remove user and reset user listing cache.
         """
-        # Remove user file and user
+        # Remove user profile and user
         if self.user is not None:
             try:
-                path = self.user._User__filename()
-                os.remove(path)
+                self.user.remove()
             except OSError:
                 pass
             del self.user
@@ -0,0 +1,123 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.userstorage Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, shutil, tempfile
+
+import py
+
+from MoinMoin import userstorage
+
+
+class TestUserStorage(object):
+    """ userstorage: test the file and sqlite user profile storages """
+
+    profiles = [
+        ('1000.1', [('name', 'JoeDoe'), ('email', 'Joe@Example.org'), ('jid', ''),
+                    ('openids', ['http://joe.example.org/']), ('disabled', 0),
+                    ('subscribed_pages', ['FrontPage', 'Help.*']), ('bookmarks', {'Self': '123'}), ]),
+        ('1000.2', [('name', 'JaneDoe'), ('email', ''), ('jid', 'jane@jabber.example.org'),
+                    ('openids', []), ('disabled', 0), ('last_login', '2000.0'), ]),
+        ('1000.3', [('name', 'OldUser'), ('email', 'old@example.org'), ('jid', ''),
+                    ('openids', []), ('disabled', 1), ('last_login', '1000.0'), ]),
+    ]
+
+    def setup_method(self, method):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = userstorage.FileUserStorage(os.path.join(self.tmpdir, 'user'))
+        self.sqlite = userstorage.SQLiteUserStorage(os.path.join(self.tmpdir, 'users.sqlite'))
+        for uid, items in self.profiles:
+            self.files.save(self.request, uid, items)
+        self.sqlite.save_many(self.request, self.profiles)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmpdir, True)
+
+    def test_load(self):
+        for storage in (self.files, self.sqlite):
+            profile = storage.load(self.request, '1000.1')
+            assert profile['name'] == 'JoeDoe'
+            assert profile['subscribed_pages'] == ['FrontPage', 'Help.*']
+            assert profile['bookmarks'] == {'Self': '123'}
+            assert storage.load(self.request, '1000.9') is None
+            assert storage.exists(self.request, '1000.2')
+            assert not storage.exists(self.request, '1000.9')
+            assert sorted(storage.list_ids(self.request)) == ['1000.1', '1000.2', '1000.3']
+            assert float(storage.load(self.request, '1000.2')['last_login']) == 2000.0
+
+    def test_load_many(self):
+        for storage in (self.files, self.sqlite):
+            loaded = dict(storage.load_many(self.request, ['1000.1', '1000.3', '1000.9']))
+            assert sorted(loaded) == ['1000.1', '1000.3']
+            assert loaded['1000.3']['name'] == 'OldUser'
+
+    def test_search(self):
+        for storage in (self.files, self.sqlite):
+            search = lambda **kw: sorted(storage.search(self.request, **kw))
+            assert search(name='JaneDoe') == ['1000.2']
+            assert search(email='joe@example.ORG') == ['1000.1']
+            assert search(openid='http://joe.example.org/') == ['1000.1']
+            assert search(disabled=True) == ['1000.3']
+            assert search(disabled=False, has_email=True) == ['1000.1']
+            assert search(last_login_before=1500.0) == ['1000.3']
+            assert search(last_login_after=1500.0) == ['1000.2']
+            assert search(uids=['1000.2', '1000.3', '1000.9'], disabled=False) == ['1000.2']
+
+    def test_search_profiles(self):
+        for storage in (self.files, self.sqlite):
+            found = dict(storage.search_profiles(self.request, has_email=True))
+            assert sorted(found) == ['1000.1', '1000.3']
+            assert found['1000.3']['name'] == 'OldUser'
+            found = dict(storage.search_profiles(self.request, ['1000.2', '1000.3', '1000.9'], disabled=False))
+            assert sorted(found) == ['1000.2']
+            assert float(found['1000.2']['last_login']) == 2000.0
+
+    def test_get_id_by_key(self):
+        storage = self.sqlite
+        assert storage.get_id_by_key(self.request, 'name', 'JoeDoe') == '1000.1'
+        assert storage.get_id_by_key(self.request, 'name', 'joedoe') is None
+        assert storage.get_id_by_key(self.request, 'name', 'joedoe', case=False) == '1000.1'
+        assert storage.get_id_by_key(self.request, 'email', 'JOE@example.org', case=False) == '1000.1'
+        assert storage.get_id_by_key(self.request, 'jid', 'jane@jabber.example.org', case=False) == '1000.2'
+        assert storage.get_id_by_key(self.request, 'openids', 'http://joe.example.org/') == '1000.1'
+        # disabled users are not found
+        assert storage.get_id_by_key(self.request, 'name', 'OldUser') is None
+
+    def test_save_remove(self):
+        storage = self.sqlite
+        storage.save(self.request, '1000.1', [('name', 'JoeDoe'), ('email', 'joe@example.com'), ('openids', []), ])
+        assert storage.search(self.request, openid='http://joe.example.org/') == []
+        assert storage.search(self.request, email='joe@example.com') == ['1000.1']
+        storage.remove(self.request, '1000.1')
+        assert not storage.exists(self.request, '1000.1')
+        assert storage.get_id_by_key(self.request, 'name', 'JoeDoe') is None
+
+    def test_fork(self):
+        if not hasattr(os, 'fork'):
+            py.test.skip('needs os.fork')
+        storage = self.sqlite
+        conn = storage._connection(self.request)
+        pid = os.fork()
+        if not pid:
+            # child: use an own connection
+            ok = (storage._connection(self.request) is not conn and
+                  storage.load(self.request, '1000.1')['name'] == 'JoeDoe')
+            os._exit(not ok)
+        assert os.waitpid(pid, 0)[1] == 0
+        assert storage._connection(self.request) is conn
+
+    def test_migrate(self):
+        target = userstorage.SQLiteUserStorage(os.path.join(self.tmpdir, 'migrated.sqlite'))
+        uids = self.files.list_ids(self.request)
+        count = target.save_many(self.request,
+                                 ((uid, list(profile.items())) for uid, profile in self.files.load_many(self.request, uids)))
+        assert count == 3
+        for uid in uids:
+            assert target.load(self.request, uid) == self.files.load(self.request, uid)
+
+coverage_modules = ['MoinMoin.userstorage']
+
@@ -25,6 +25,7 @@
 
 from MoinMoin import wikiutil
 from MoinMoin.Page import Page
+from MoinMoin.linkgraph import get_linkgraph
 
 class MaxNodesReachedException(Exception):
     pass
@@ -84,6 +85,7 @@ class LocalSiteMap:
 class PageTreeBuilder:
     def __init__(self, request):
         self.request = request
+        self.graph = get_linkgraph(request)
         self.children = {}
         self.numnodes = 0
         self.maxnodes = 35
@@ -98,7 +100,7 @@ class PageTreeBuilder:
         if not self.child_marked(child):
             if not self.request.user.may.read(child):
                 return 0
-            if Page(self.request, child).exists():
+            if self.graph.exists(child):
                 self.mark_child(child)
                 return 1
         return 0
@@ -106,7 +108,7 @@ class PageTreeBuilder:
     def new_kids(self, name):
         # does not recurse
         kids = []
-        for child in Page(self.request, name).getPageLinks(self.request):
+        for child in self.graph.links_from(name):
             if self.is_ok(child):
                 kids.append(child)
         return kids
@@ -27,7 +27,7 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-import re
+import os, re
 
 from MoinMoin.util import pysupport
 from MoinMoin import config, wikiutil
@@ -247,7 +247,12 @@ def do_raw(pagename, request):
         mimetype = request.values.get('mimetype', None)
         if mimetype and not MIMETYPE_CRE.match(mimetype):
             mimetype = None
-        Page(request, pagename, rev=rev).send_raw(mimetype=mimetype)
+        page = Page(request, pagename, rev=rev)
+        if page.exists():
+            from MoinMoin.web import conditional
+            conditional.check(request, ('raw', pagename, page.get_real_rev(), ),
+                              last_modified=os.path.getmtime(page._text_filename()))
+        page.send_raw(mimetype=mimetype)
 
 def do_show(pagename, request, content_only=0, count_hit=1, cacheable=1, print_mode=0, mimetype='text/html'):
     """ show a page, either current revision or the revision given by "rev=" value.
@@ -261,7 +266,11 @@ def do_show(pagename, request, content_only=0, count_hit=1, cacheable=1, print_m
         rev = request.rev or 0
         if rev == 0:
             request.cacheable = cacheable
-        Page(request, pagename, rev=rev, formatter=mimetype).send_page(
+        page = Page(request, pagename, rev=rev, formatter=mimetype)
+        if cacheable:
+            from MoinMoin.web import conditional
+            conditional.check_page(request, page)
+        page.send_page(
             count_hit=count_hit,
             print_mode=print_mode,
             content_only=content_only,
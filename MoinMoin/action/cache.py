@@ -27,7 +27,6 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-from datetime import datetime
 import hmac, hashlib
 
 from MoinMoin import log
@@ -40,6 +39,7 @@ import mimetypes
 from MoinMoin import config, caching
 from MoinMoin.util import filesys
 from MoinMoin.action import AttachFile
+from MoinMoin.web import sendfile
 
 action_name = __name__.split('.')[-1]
 
@@ -223,7 +223,7 @@ def _get_headers(request, key):
 def _get_datafile(request, key):
     """ get an open data file for the data cached for key """
     data_cache = caching.CacheEntry(request, cache_arena, key+'.data', cache_scope, do_locking=do_locking)
-    data_cache.open(mode='r')
+    data_cache.open(mode='rb')
     return data_cache
 
 
@@ -231,13 +231,12 @@ def _do_get(request, key):
     """ send a complete http response with headers/data cached for key """
     try:
         last_modified, headers = _get_headers(request, key)
-        if datetime.utcfromtimestamp(int(last_modified)) == request.if_modified_since:
-            request.status_code = 304
-        else:
-            for k, v in headers:
+        for k, v in headers:
+            if k.lower() != 'content-length': # set by send_file, ranges have others
                 request.headers.add(k, v)
-            data_file = _get_datafile(request, key)
-            request.send_file(data_file)
+        data_file = _get_datafile(request, key)
+        # send data (or 304 Not Modified, 206 Partial Content)
+        request.send_file(data_file, etag=sendfile.uid_etag(data_file.uid()), last_modified=last_modified)
     except caching.CacheError:
         request.status_code = 404
 
@@ -8,6 +8,7 @@
     @license: GNU GPL, see COPYING for details.
 """
 from MoinMoin import config, wikiutil
+from MoinMoin.linkgraph import get_linkgraph
 
 def execute(pagename, request):
     _ = request.getText
@@ -23,13 +24,14 @@ def execute(pagename, request):
     pages = request.rootpage.getPageDict()
     pagelist = list(pages.keys())
     pagelist.sort()
+    graph = get_linkgraph(request)
 
     for name in pagelist:
         if mimetype == "text/html":
             request.write(pages[name].link_to(request))
         else:
             _emit(request, name)
-        for link in pages[name].getPageLinks(request):
+        for link in graph.links_from(name):
             request.write(" ")
             if mimetype == "text/html":
                 if link in pages:
@@ -15,6 +15,7 @@ from MoinMoin.util import timefuncs
 from MoinMoin.Page import Page
 from MoinMoin.wikixml.util import RssGenerator
 from MoinMoin.action import AttachFile
+from MoinMoin.web import conditional
 
 def full_url(request, page, querystr=None, anchor=None):
     url = page.url(request, anchor=anchor, querystr=querystr)
@@ -109,11 +110,17 @@ def execute(pagename, request):
     # of that page is much faster than the global one - esp. if the page was
     # NOT recently changed and the global edit-log is rather big.
     kw = dict(rootpagename=page_pattern) if is_single_page_match(page_pattern) else {}
+
+    # nothing to do if the client already has the current feed
+    position, mtime = conditional.wiki_state(request, kw.get('rootpagename'))
+    conditional.check(request, ('rss_rc', position, max_items, diffs, ddiffs, unique,
+                                max_lines, show_att, page_pattern, request.lang),
+                      last_modified=mtime, max_age=cfg.rss_cache)
+
     log = editlog.EditLog(request, **kw)
     logdata = []
     counter = 0
     pages = {}
-    lastmod = 0
     for line in log.reverse():
         if not request.user.may.read(line.pagename):
             continue
@@ -126,269 +133,245 @@ def execute(pagename, request):
         logdata.append(line)
         pages[line.pagename] = None
 
-        if not lastmod:
-            lastmod = wikiutil.version2timestamp(line.ed_time_usecs)
-
         counter += 1
         if counter >= max_items:
             break
     del log
 
-    timestamp = timefuncs.formathttpdate(lastmod)
-    etag = "%d-%d-%d-%d-%d-%d-%d" % (lastmod, max_items, diffs, ddiffs, unique,
-        max_lines, show_att)
-
-    # for 304, we look at if-modified-since and if-none-match headers,
-    # one of them must match and the other is either not there or must match.
-    if request.if_modified_since == timestamp:
-        if request.if_none_match:
-            if request.if_none_match == etag:
-                request.status_code = 304
-        else:
-            request.status_code = 304
-    elif request.if_none_match == etag:
-        if request.if_modified_since:
-            if request.if_modified_since == timestamp:
-                request.status_code = 304
-        else:
-            request.status_code = 304
-    else:
-        # generate an Expires header, using whatever setting the admin
-        # defined for suggested cache lifetime of the RecentChanges RSS doc
-        expires = time.time() + cfg.rss_cache
-
-        request.mimetype = 'application/rss+xml'
-        request.expires = expires
-        request.last_modified = lastmod
-        request.headers['Etag'] = etag
-
-        # send the generated XML document
-        baseurl = request.url_root
-
-        logo = re.search(r'src="([^"]*)"', cfg.logo_string)
-        if logo:
-            logo = request.getQualifiedURL(logo.group(1))
-
-        # prepare output
-        out = io.StringIO()
-        handler = RssGenerator(out)
-
-        # start SAX stream
-        handler.startDocument()
-        handler._write(
-            '<!--\n'
-            '    Add an "items=nnn" URL parameter to get more than the \n'
-            '    default %(def_max_items)d items. You cannot get more than \n'
-            '    %(items_limit)d items though.\n'
-            '    \n'
-            '    Add "unique=1" to get a list of changes where page names are unique,\n'
-            '    i.e. where only the latest change of each page is reflected.\n'
-            '    \n'
-            '    Add "diffs=1" to add change diffs to the description of each items.\n'
-            '    \n'
-            '    Add "ddiffs=1" to link directly to the diff (good for FeedReader).\n'
-            '    \n'
-            '    Add "lines=nnn" to change maximum number of diff/body lines \n'
-            '    to show. Cannot be more than %(lines_limit)d.\n'
-            '    \n'
-            '    Add "show_att=1" to show items related to attachments.\n'
-            '    \n'
-            '    Add "page=pattern" to show feed only for specific pages.\n'
-            '    Pattern can be empty (it would match to all pages), \n'
-            '    can start with circumflex (it would be interpreted as \n'
-            '    regular expression in this case), end with slash (for \n'
-            '    getting feed for page tree) or point to specific page (if \n'
-            '    none of the above can be applied).\n'
-            '    \n'
-            '    Current settings: items=%(max_items)i, unique=%(unique)i, \n'
-            '    diffs=%(diffs)i, ddiffs=%(ddiffs)i, lines=%(max_lines)i, \n'
-            '    show_att=%(show_att)i\n'
-            '-->\n' % locals()
-            )
-
-        # emit channel description
-        handler.startNode('channel', {
-            (handler.xmlns['rdf'], 'about'): request.url_root,
+    # generate an Expires header, using whatever setting the admin
+    # defined for suggested cache lifetime of the RecentChanges RSS doc
+    expires = time.time() + cfg.rss_cache
+
+    request.mimetype = 'application/rss+xml'
+    request.request.expires = expires
+
+    # send the generated XML document
+    baseurl = request.url_root
+
+    logo = re.search(r'src="([^"]*)"', cfg.logo_string)
+    if logo:
+        logo = request.getQualifiedURL(logo.group(1))
+
+    # prepare output
+    out = io.StringIO()
+    handler = RssGenerator(out)
+
+    # start SAX stream
+    handler.startDocument()
+    handler._write(
+        '<!--\n'
+        '    Add an "items=nnn" URL parameter to get more than the \n'
+        '    default %(def_max_items)d items. You cannot get more than \n'
+        '    %(items_limit)d items though.\n'
+        '    \n'
+        '    Add "unique=1" to get a list of changes where page names are unique,\n'
+        '    i.e. where only the latest change of each page is reflected.\n'
+        '    \n'
+        '    Add "diffs=1" to add change diffs to the description of each items.\n'
+        '    \n'
+        '    Add "ddiffs=1" to link directly to the diff (good for FeedReader).\n'
+        '    \n'
+        '    Add "lines=nnn" to change maximum number of diff/body lines \n'
+        '    to show. Cannot be more than %(lines_limit)d.\n'
+        '    \n'
+        '    Add "show_att=1" to show items related to attachments.\n'
+        '    \n'
+        '    Add "page=pattern" to show feed only for specific pages.\n'
+        '    Pattern can be empty (it would match to all pages), \n'
+        '    can start with circumflex (it would be interpreted as \n'
+        '    regular expression in this case), end with slash (for \n'
+        '    getting feed for page tree) or point to specific page (if \n'
+        '    none of the above can be applied).\n'
+        '    \n'
+        '    Current settings: items=%(max_items)i, unique=%(unique)i, \n'
+        '    diffs=%(diffs)i, ddiffs=%(ddiffs)i, lines=%(max_lines)i, \n'
+        '    show_att=%(show_att)i\n'
+        '-->\n' % locals()
+        )
+
+    # emit channel description
+    handler.startNode('channel', {
+        (handler.xmlns['rdf'], 'about'): request.url_root,
+        })
+    handler.simpleNode('title', cfg.sitename)
+    page = Page(request, pagename)
+    handler.simpleNode('link', full_url(request, page))
+    handler.simpleNode('description', 'RecentChanges at %s' % cfg.sitename)
+    if logo:
+        handler.simpleNode('image', None, {
+            (handler.xmlns['rdf'], 'resource'): logo,
+            })
+    if cfg.interwikiname:
+        handler.simpleNode(('wiki', 'interwiki'), cfg.interwikiname)
+
+    handler.startNode('items')
+    handler.startNode(('rdf', 'Seq'))
+    for item in logdata:
+        anchor = "%04d%02d%02d%02d%02d%02d" % item.time[:6]
+        page = Page(request, item.pagename)
+        link = full_url(request, page, anchor=anchor)
+        handler.simpleNode(('rdf', 'li'), None, attr={(handler.xmlns['rdf'], 'resource'): link, })
+    handler.endNode(('rdf', 'Seq'))
+    handler.endNode('items')
+    handler.endNode('channel')
+
+    # emit logo data
+    if logo:
+        handler.startNode('image', attr={
+            (handler.xmlns['rdf'], 'about'): logo,
             })
         handler.simpleNode('title', cfg.sitename)
-        page = Page(request, pagename)
-        handler.simpleNode('link', full_url(request, page))
-        handler.simpleNode('description', 'RecentChanges at %s' % cfg.sitename)
-        if logo:
-            handler.simpleNode('image', None, {
-                (handler.xmlns['rdf'], 'resource'): logo,
-                })
-        if cfg.interwikiname:
-            handler.simpleNode(('wiki', 'interwiki'), cfg.interwikiname)
-
-        handler.startNode('items')
-        handler.startNode(('rdf', 'Seq'))
-        for item in logdata:
-            anchor = "%04d%02d%02d%02d%02d%02d" % item.time[:6]
-            page = Page(request, item.pagename)
-            link = full_url(request, page, anchor=anchor)
-            handler.simpleNode(('rdf', 'li'), None, attr={(handler.xmlns['rdf'], 'resource'): link, })
-        handler.endNode(('rdf', 'Seq'))
-        handler.endNode('items')
-        handler.endNode('channel')
-
-        # emit logo data
-        if logo:
-            handler.startNode('image', attr={
-                (handler.xmlns['rdf'], 'about'): logo,
-                })
-            handler.simpleNode('title', cfg.sitename)
-            handler.simpleNode('link', baseurl)
-            handler.simpleNode('url', logo)
-            handler.endNode('image')
-
-        # Mapping { oldname: curname } for maintaining page renames
-        pagename_map = {}
-
-        # emit items
-        for item in logdata:
-            if item.pagename in pagename_map:
-                cur_pagename = pagename_map[item.pagename]
-            else:
-                cur_pagename = item.pagename
-            page = Page(request, cur_pagename)
-            action = item.action
-            comment = item.comment
-            anchor = "%04d%02d%02d%02d%02d%02d" % item.time[:6]
-            rdflink = full_url(request, page, anchor=anchor)
-            handler.startNode('item', attr={(handler.xmlns['rdf'], 'about'): rdflink, })
-
-            # general attributes
-            handler.simpleNode('title', item.pagename)
-            handler.simpleNode(('dc', 'date'), timefuncs.W3CDate(item.time))
-
-            show_diff = diffs
-
-            if action.startswith('ATT'): # Attachment
-                show_diff = 0
-                filename = wikiutil.url_unquote(item.extra)
-                att_exists = AttachFile.exists(request, cur_pagename, filename)
-
-                if action == 'ATTNEW':
-                    # Once attachment deleted this link becomes invalid but we
-                    # preserve it to prevent appearance of new RSS entries in
-                    # RSS readers.
-                    if ddiffs:
-                        handler.simpleNode('link', attach_url(request,
-                            cur_pagename, filename, do='view'))
-
-                    comment = _("Upload of attachment '%(filename)s'.") % {
-                        'filename': filename}
-
-                elif action == 'ATTDEL':
-                    if ddiffs:
-                        handler.simpleNode('link', full_url(request, page,
-                            querystr={'action': 'AttachFile'}))
-
-                    comment = _("Attachment '%(filename)s' deleted.") % {
-                        'filename': filename}
-
-                elif action == 'ATTDRW':
-                    if ddiffs:
-                        handler.simpleNode('link', attach_url(request,
-                            cur_pagename, filename, do='view'))
-
-                    comment = _("Drawing '%(filename)s' saved.") % {
-                        'filename': filename}
-
-            elif action.startswith('SAVE'):
-                if action == 'SAVE/REVERT':
-                    to_rev = int(item.extra)
-                    comment = (_("Revert to revision %(rev)d.") % {
-                        'rev': to_rev}) + "<br />" \
-                        + _("Comment:") + " " + comment
-
-                elif action == 'SAVE/RENAME':
-                    show_diff = 0
-                    comment = (_("Renamed from '%(oldpagename)s'.") % {
-                        'oldpagename': item.extra}) + "<br />" \
-                        + _("Comment:") + " " + comment
-                    if item.pagename in pagename_map:
-                        newpage = pagename_map[item.pagename]
-                        del pagename_map[item.pagename]
-                        pagename_map[item.extra] = newpage
-                    else:
-                        pagename_map[item.extra] = item.pagename
-
-                elif action == 'SAVENEW':
-                    comment = _("New page:\n") + comment
-
-                item_rev = int(item.rev)
-
-                # If we use diffs/ddiffs, we should calculate proper links and
-                # content
+        handler.simpleNode('link', baseurl)
+        handler.simpleNode('url', logo)
+        handler.endNode('image')
+
+    # Mapping { oldname: curname } for maintaining page renames
+    pagename_map = {}
+
+    # emit items
+    for item in logdata:
+        if item.pagename in pagename_map:
+            cur_pagename = pagename_map[item.pagename]
+        else:
+            cur_pagename = item.pagename
+        page = Page(request, cur_pagename)
+        action = item.action
+        comment = item.comment
+        anchor = "%04d%02d%02d%02d%02d%02d" % item.time[:6]
+        rdflink = full_url(request, page, anchor=anchor)
+        handler.startNode('item', attr={(handler.xmlns['rdf'], 'about'): rdflink, })
+
+        # general attributes
+        handler.simpleNode('title', item.pagename)
+        handler.simpleNode(('dc', 'date'), timefuncs.W3CDate(item.time))
+
+        show_diff = diffs
+
+        if action.startswith('ATT'): # Attachment
+            show_diff = 0
+            filename = wikiutil.url_unquote(item.extra)
+            att_exists = AttachFile.exists(request, cur_pagename, filename)
+
+            if action == 'ATTNEW':
+                # Once attachment deleted this link becomes invalid but we
+                # preserve it to prevent appearance of new RSS entries in
+                # RSS readers.
+                if ddiffs:
+                    handler.simpleNode('link', attach_url(request,
+                        cur_pagename, filename, do='view'))
+
+                comment = _("Upload of attachment '%(filename)s'.") % {
+                    'filename': filename}
+
+            elif action == 'ATTDEL':
                 if ddiffs:
-                    # first revision can't have older revisions to diff with
-                    if item_rev == 1:
-                        handler.simpleNode('link', full_url(request, page,
-                            querystr={'action': 'recall',
-                                      'rev': str(item_rev)}))
-                    else:
-                        handler.simpleNode('link', full_url(request, page,
-                            querystr={'action': 'diff',
-                                      'rev1': str(item_rev),
-                                      'rev2': str(item_rev - 1)}))
-
-                if show_diff:
-                    if item_rev == 1:
-                        lines = Page(request, cur_pagename,
-                            rev=item_rev).getlines()
-                    else:
-                        lines = wikiutil.pagediff(request, cur_pagename,
-                            item_rev - 1, cur_pagename, item_rev, ignorews=1)
-
-                    if len(lines) > max_lines:
-                        lines = lines[:max_lines] + ['...\n']
-
-                    lines = '\n'.join(lines)
-                    lines = wikiutil.escape(lines)
-
-                    comment = '%s\n<pre>\n%s\n</pre>\n' % (comment, lines)
-
-                if not ddiffs:
-                    handler.simpleNode('link', full_url(request, page))
-
-            if comment:
-                handler.simpleNode('description', comment)
-
-            # contributor
-            if cfg.show_names:
-                edattr = {}
-                if cfg.show_hosts:
-                    edattr[(handler.xmlns['wiki'], 'host')] = item.hostname
-                if item.editor[0] == 'interwiki':
-                    edname = "%s:%s" % item.editor[1]
-                    ##edattr[(None, 'link')] = baseurl + wikiutil.quoteWikiname(edname)
-                else: # 'ip'
-                    edname = item.editor[1]
-                    ##edattr[(None, 'link')] = link + "?action=info"
-
-                # this edattr stuff, esp. None as first tuple element breaks things (tracebacks)
-                # if you know how to do this right, please send us a patch
-
-                handler.startNode(('dc', 'contributor'))
-                handler.startNode(('rdf', 'Description'), attr=edattr)
-                handler.simpleNode(('rdf', 'value'), edname)
-                handler.endNode(('rdf', 'Description'))
-                handler.endNode(('dc', 'contributor'))
-
-            # wiki extensions
-            handler.simpleNode(('wiki', 'version'), "%i" % (item.ed_time_usecs))
-            handler.simpleNode(('wiki', 'status'), ('deleted', 'updated')[page.exists()])
-            handler.simpleNode(('wiki', 'diff'), full_url(request, page, querystr={'action': 'diff'}))
-            handler.simpleNode(('wiki', 'history'), full_url(request, page, querystr={'action': 'info'}))
-            # handler.simpleNode(('wiki', 'importance'), ) # ( major | minor )
-            # handler.simpleNode(('wiki', 'version'), ) # ( #PCDATA )
-
-            handler.endNode('item')
-
-        # end SAX stream
-        handler.endDocument()
-
-        request.write(out.getvalue())
+                    handler.simpleNode('link', full_url(request, page,
+                        querystr={'action': 'AttachFile'}))
+
+                comment = _("Attachment '%(filename)s' deleted.") % {
+                    'filename': filename}
+
+            elif action == 'ATTDRW':
+                if ddiffs:
+                    handler.simpleNode('link', attach_url(request,
+                        cur_pagename, filename, do='view'))
+
+                comment = _("Drawing '%(filename)s' saved.") % {
+                    'filename': filename}
+
+        elif action.startswith('SAVE'):
+            if action == 'SAVE/REVERT':
+                to_rev = int(item.extra)
+                comment = (_("Revert to revision %(rev)d.") % {
+                    'rev': to_rev}) + "<br />" \
+                    + _("Comment:") + " " + comment
+
+            elif action == 'SAVE/RENAME':
+                show_diff = 0
+                comment = (_("Renamed from '%(oldpagename)s'.") % {
+                    'oldpagename': item.extra}) + "<br />" \
+                    + _("Comment:") + " " + comment
+                if item.pagename in pagename_map:
+                    newpage = pagename_map[item.pagename]
+                    del pagename_map[item.pagename]
+                    pagename_map[item.extra] = newpage
+                else:
+                    pagename_map[item.extra] = item.pagename
+
+            elif action == 'SAVENEW':
+                comment = _("New page:\n") + comment
+
+            item_rev = int(item.rev)
+
+            # If we use diffs/ddiffs, we should calculate proper links and
+            # content
+            if ddiffs:
+                # first revision can't have older revisions to diff with
+                if item_rev == 1:
+                    handler.simpleNode('link', full_url(request, page,
+                        querystr={'action': 'recall',
+                                  'rev': str(item_rev)}))
+                else:
+                    handler.simpleNode('link', full_url(request, page,
+                        querystr={'action': 'diff',
+                                  'rev1': str(item_rev),
+                                  'rev2': str(item_rev - 1)}))
+
+            if show_diff:
+                if item_rev == 1:
+                    lines = Page(request, cur_pagename,
+                        rev=item_rev).getlines()
+                else:
+                    lines = wikiutil.pagediff(request, cur_pagename,
+                        item_rev - 1, cur_pagename, item_rev, ignorews=1)
+
+                if len(lines) > max_lines:
+                    lines = lines[:max_lines] + ['...\n']
+
+                lines = '\n'.join(lines)
+                lines = wikiutil.escape(lines)
+
+                comment = '%s\n<pre>\n%s\n</pre>\n' % (comment, lines)
+
+            if not ddiffs:
+                handler.simpleNode('link', full_url(request, page))
+
+        if comment:
+            handler.simpleNode('description', comment)
+
+        # contributor
+        if cfg.show_names:
+            edattr = {}
+            if cfg.show_hosts:
+                edattr[(handler.xmlns['wiki'], 'host')] = item.hostname
+            if item.editor[0] == 'interwiki':
+                edname = "%s:%s" % item.editor[1]
+                ##edattr[(None, 'link')] = baseurl + wikiutil.quoteWikiname(edname)
+            else: # 'ip'
+                edname = item.editor[1]
+                ##edattr[(None, 'link')] = link + "?action=info"
+
+            # this edattr stuff, esp. None as first tuple element breaks things (tracebacks)
+            # if you know how to do this right, please send us a patch
+
+            handler.startNode(('dc', 'contributor'))
+            handler.startNode(('rdf', 'Description'), attr=edattr)
+            handler.simpleNode(('rdf', 'value'), edname)
+            handler.endNode(('rdf', 'Description'))
+            handler.endNode(('dc', 'contributor'))
+
+        # wiki extensions
+        handler.simpleNode(('wiki', 'version'), "%i" % (item.ed_time_usecs))
+        handler.simpleNode(('wiki', 'status'), ('deleted', 'updated')[page.exists()])
+        handler.simpleNode(('wiki', 'diff'), full_url(request, page, querystr={'action': 'diff'}))
+        handler.simpleNode(('wiki', 'history'), full_url(request, page, querystr={'action': 'info'}))
+        # handler.simpleNode(('wiki', 'importance'), ) # ( major | minor )
+        # handler.simpleNode(('wiki', 'version'), ) # ( #PCDATA )
+
+        handler.endNode('item')
+
+    # end SAX stream
+    handler.endDocument()
+
+    request.write(out.getvalue())
 
@@ -9,6 +9,7 @@
 """
 import time
 from MoinMoin import wikiutil
+from MoinMoin.web import conditional
 
 datetime_fmt = "%Y-%m-%dT%H:%M:%S+00:00"
 
@@ -64,6 +65,15 @@ def execute(pagename, request):
     _ = request.getText
     request.user.datetime_fmt = datetime_fmt
 
+    try:
+        underlay = int(request.values.get('underlay', 1))
+    except ValueError:
+        underlay = 1
+
+    # the page list (and the user's read rights) only change with the edit-log
+    position, mtime = conditional.wiki_state(request)
+    conditional.check(request, ('sitemap', position, underlay, ), last_modified=mtime)
+
     request.mimetype = 'text/xml'
 
     # we emit a piece of data so other side doesn't get bored:
@@ -82,10 +92,6 @@ def execute(pagename, request):
     }))
 
     # Get page dict readable by current user
-    try:
-        underlay = int(request.values.get('underlay', 1))
-    except ValueError:
-        underlay = 1
     pages = request.rootpage.getPageDict(include_underlay=underlay)
     pagelist = list(pages.keys())
     pagelist.sort()
@@ -134,6 +134,8 @@
     @license: GNU GPL, see COPYING for details.
 """
 
+import time
+
 from MoinMoin import log
 logging = log.getLogger(__name__)
 
@@ -218,6 +220,15 @@ class BaseAuth:
         return user_obj, True
     def login_hint(self, request):
         return None
+    def may_be_anonymous(self, request):
+        """ May the request be of an anonymous user, as far as this auth
+            method is concerned? This is asked before the user is set up
+            (see MoinMoin.web.responsecache), so it must only look at the
+            request itself. Methods just using login() (and the session)
+            need not care, methods authenticating in request() must
+            override this.
+        """
+        return self.__class__.request is BaseAuth.request
 
 class MoinAuth(BaseAuth):
     """ handle login from moin login form """
@@ -350,6 +361,13 @@ class GivenAuth(BaseAuth):
 
         return name
 
+    def may_be_anonymous(self, request):
+        if self.user_name is not None:
+            return False
+        if self.env_var is None:
+            return not request.remote_user
+        return not request.environ.get(self.env_var)
+
     def request(self, request, user_obj, **kw):
         u = None
         _ = request.getText
@@ -398,6 +416,7 @@ def handle_login(request, userobj=None, username=None, password=None,
     methods in turn. The passable keyword arguments are explained in more
     detail at the top of this file.
     """
+    olduser = userobj
     params = {
         'username': username,
         'password': password,
@@ -434,6 +453,11 @@ def handle_login(request, userobj=None, username=None, password=None,
         if not cont:
             break
 
+    if userobj and userobj is not olduser and userobj.valid and userobj.exists():
+        # remember when the user logged in (e.g. to find inactive users)
+        userobj.last_login = str(time.time())
+        request.cfg.user_storage.record_login(request, userobj)
+
     return userobj
 
 def handle_logout(request, userobj):
@@ -66,6 +66,10 @@ class HTTPAuthMoin(BaseAuth):
         self.coding = coding
         BaseAuth.__init__(self)
 
+    def may_be_anonymous(self, request):
+        # anonymous users get 401 Unauthorized
+        return False
+
     def request(self, request, user_obj, **kw):
         u = None
         _ = request.getText
@@ -30,6 +30,9 @@ class AuthLog(BaseAuth):
         self.log(request, 'session', user_obj, kw)
         return user_obj, True
 
+    def may_be_anonymous(self, request):
+        return True
+
     def logout(self, request, user_obj, **kw):
         self.log(request, 'logout', user_obj, kw)
         return user_obj, True
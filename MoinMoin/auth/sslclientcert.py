@@ -31,6 +31,9 @@ class SSLClientCertAuth(BaseAuth):
         self.autocreate = autocreate
         BaseAuth.__init__(self)
 
+    def may_be_anonymous(self, request):
+        return request.environ.get('SSL_CLIENT_VERIFY', 'FAILURE') != 'SUCCESS'
+
     def request(self, request, user_obj, **kw):
         u = None
         changed = False
@@ -222,6 +222,18 @@ class CacheEntry:
         """
         return self._fileobj.read(size)
 
+    def seek(self, offset, whence=0):
+        """ change the position in the cache file (see file.seek) """
+        return self._fileobj.seek(offset, whence)
+
+    def tell(self):
+        """ return the position in the cache file """
+        return self._fileobj.tell()
+
+    def fileno(self):
+        """ return the file descriptor of the open cache file (e.g. for os.sendfile) """
+        return self._fileobj.fileno()
+
     def write(self, data):
         """ write data to cache file
 
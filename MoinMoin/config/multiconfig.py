@@ -18,7 +18,7 @@ from MoinMoin import log
 logging = log.getLogger(__name__)
 
 from MoinMoin import config, error, util, wikiutil, web
-from MoinMoin import datastruct
+from MoinMoin import datastruct, userstorage
 from MoinMoin.auth import MoinAuth
 import MoinMoin.auth as authmodule
 import MoinMoin.events as events
@@ -27,7 +27,7 @@ from MoinMoin.events import PageDeletedEvent, PageCopiedEvent
 from MoinMoin.events import PageRevertedEvent, FileAttachedEvent
 import MoinMoin.web.session
 from MoinMoin.packages import packLine
-from MoinMoin.security import AccessControlList
+from MoinMoin.security import AccessControlList, ACLResultCache
 
 _url_re_cache = None
 _farmconfig_mtime = None
@@ -186,7 +186,16 @@ def getConfig(url):
     @rtype: DefaultConfig subclass instance
     @return: config object for specific wiki
     """
-    cfgName = _getConfigName(url)
+    return getConfigByName(_getConfigName(url))
+
+
+def getConfigByName(cfgName):
+    """ Return cached config instance for config module name or create new one
+
+    @param cfgName: config module name, e.g. 'wikiconfig'
+    @rtype: DefaultConfig subclass instance
+    @return: config object for specific wiki
+    """
     try:
         cfg = _config_cache[cfgName]
     except KeyError:
@@ -195,6 +204,31 @@ def getConfig(url):
     return cfg
 
 
+def clearConfigCache():
+    """ Forget all wiki configs, so they (and the farmconfig) get imported
+    again when they are used next time (e.g. when a server reloads).
+    """
+    global _url_re_cache, _farmconfig_mtime
+    for name in ['farmconfig'] + list(_config_cache.keys()):
+        sys.modules.pop(name, None)
+    _config_cache.clear()
+    _url_re_cache = None
+    _farmconfig_mtime = None
+
+
+def getConfigNames():
+    """ Return the config module names of all wikis (of the farm)
+
+    @rtype: list of str
+    @return: config module names, just ['wikiconfig'] if there is no farmconfig
+    """
+    names = []
+    for name, regex in _url_re_list():
+        if name not in names:
+            names.append(name)
+    return names
+
+
 # This is a way to mark some text for the gettext tools so that they don't
 # get orphaned. See http://www.python.org/doc/current/lib/node278.html.
 def _(text):
@@ -239,6 +273,16 @@ class ConfigFunctionality(object):
         from MoinMoin.Page import ItemCache
         self.cache.meta = ItemCache('meta')
         self.cache.pagelists = ItemCache('pagelists')
+        # html fragments of the themes, see ThemeBase.fragment
+        self.cache.theme_fragments = ItemCache('fragments', max_items=1000)
+        # plugin manifests by kind, see MoinMoin.util.pluginmanifest
+        self.cache.plugin_manifests = {}
+        # (type, name, what) -> plugin, see wikiutil.searchAndImportPlugin
+        self.cache.plugin_search = {}
+        # created on first use, see MoinMoin.web.responsecache
+        self.cache.responses = None
+        # created on first use, see MoinMoin.filter.get_limits
+        self.cache.filter_limits = None
 
         if self.config_check_enabled:
             self._config_check()
@@ -392,6 +436,7 @@ class ConfigFunctionality(object):
         self.cache.acl_rights_before = AccessControlList(self, [self.acl_rights_before])
         self.cache.acl_rights_default = AccessControlList(self, [self.acl_rights_default])
         self.cache.acl_rights_after = AccessControlList(self, [self.acl_rights_after])
+        self.cache.acl_results = ACLResultCache()
 
         action_prefix = self.url_prefix_action
         if action_prefix is not None and action_prefix.endswith('/'): # make sure there is no trailing '/'
@@ -782,6 +827,8 @@ options_no_group_name = {
      'Path used in the session cookie (None = auto-detect). Please only set if you know exactly what you are doing.'),
     ('cookie_lifetime', (0, 12),
      'Session lifetime [h] of (anonymous, logged-in) users (see HelpOnSessions for details).'),
+    ('session_stateless_anonymous', False,
+     'If True, anonymous users only get a session (and cookie) if some code really needs to store something for them (e.g. during an OpenID login), but not for the page trail. Anonymous page views are then free of sessions and cookies, thus cacheable.'),
   )),
   # ==========================================================================
   'auth': ('Authentication / Authorization / Security settings', None, (
@@ -876,6 +923,8 @@ options_no_group_name = {
      },
      "Surge protection tries to deny clients causing too much load/traffic, see HelpOnConfiguration/SurgeProtection."),
     ('surge_lockout_time', 3600, "time [s] someone gets locked out when ignoring the warnings"),
+    ('surge_counters', 'shared',
+     "Where surge protection counts the requests: 'shared' = in a memory mapped file in the cache directory, shared by all processes of the wiki; 'memory' = in memory of each process (only for servers running a single process)."),
 
     ('textchas', None,
      "Spam protection setup using site-specific questions/answers, see HelpOnSpam."),
@@ -1105,6 +1154,9 @@ options_no_group_name = {
 
     ('userprefs_disabled', [],
      "Disable the listed user preferences plugins."),
+
+    ('user_storage', DefaultExpression('userstorage.FileUserStorage()'),
+     "The user profile storage, e.g. userstorage.SQLiteUserStorage() for many users (see MoinMoin.userstorage)."),
   )),
   # ==========================================================================
   'various': ('Various', None, (
@@ -1179,6 +1231,22 @@ options_no_group_name = {
     ('search_results_per_page', 25, "Number of hits shown per page in the search results"),
 
     ('siteid', 'default', None),
+    ('stream_pages', False,
+     "if True, the headers and the page header of page views are sent before rendering the page content, which is then sent while it is rendered (see MoinMoin.web.streaming)"),
+    ('stream_chunk_size', 16384,
+     "if stream_pages is True, the page content is sent in chunks of about that many bytes"),
+    ('http_conditional_get', True,
+     "if True, page views (of anonymous users), raw, rss_rc and sitemap send ETag and Last-Modified headers and answer with 304 Not Modified if the client already has the current version (see MoinMoin.web.conditional)"),
+    ('http_cache_max_age', 0,
+     "if http_conditional_get is True, clients may use a page view for that many seconds without asking the wiki again (0: they ask on every view and get a 304 if nothing changed)"),
+    ('response_cache', False,
+     "if True, complete page views of anonymous users without cookies are cached and served again without rendering them, until the wiki changes (see MoinMoin.web.responsecache)"),
+    ('response_cache_size', 500,
+     "if response_cache is True, each process keeps up to that many responses in memory"),
+    ('response_cache_disk', True,
+     "if response_cache is True, the responses are also kept in the cache dir, shared by all processes"),
+    ('preload_languages', [],
+     "languages (besides language_default and english) whose translations are loaded when a server process is preloaded before forking its workers (see MoinMoin.web.preload)"),
     ('xmlrpc_overwrite_user', True, "Overwrite authenticated user at start of xmlrpc code"),
   )),
 }
@@ -1230,6 +1298,20 @@ options = {
        "True to enable Xapian word stemmer usage for indexing / searching."),
       ('index_history', False,
        "True to enable indexing of non-current page revisions."),
+      ('tokenizer_cache_size', 10000,
+       "Maximum amount of words for which the Xapian tokenizer caches how they get split (e.g. CamelCase words) and stemmed (per language). 0 disables these caches."),
+      ('filter_processes', 2,
+       "Maximum amount of external text extraction filter commands (like pdftotext) running at the same time in a process."),
+      ('filter_timeout', 300,
+       "Seconds after which an external text extraction filter command gets killed."),
+      ('index_daemon', False,
+       "True if queued index updates are done by a separately running 'moin index daemon' process. The wiki then only puts index updates into the indexer queue and does not update the index while processing requests."),
+      ('index_daemon_batch_size', 100,
+       "Amount of indexer queue entries the indexer daemon processes at once (repeated updates of the same page within a batch are only indexed once)."),
+      ('index_daemon_concurrency', 1,
+       "Amount of threads the indexer daemon uses for running the attachment text filters of a batch."),
+      ('index_daemon_poll_interval', 2.0,
+       "Seconds the indexer daemon waits before checking the indexer queue again when it is idle."),
     )),
 
     'user': ('Users / User settings', None, (
@@ -1398,6 +1480,23 @@ options = {
        "Template for the user created notification mail intro text"),
     )),
 
+    'notification': ('Notification delivery settings',
+        'These settings control how mail and jabber notifications get delivered, see MoinMoin.events.notifyqueue.',
+    (
+      ('queue', None,
+       "None = deliver notifications while processing the request that caused them, 'thread' = queue them and deliver them from a background thread of the wiki process, 'daemon' = queue them for a separately running 'moin maint notify' process."),
+      ('queue_batch_size', 100,
+       "Amount of queued notifications delivered at once (mails of a batch get grouped by recipient)."),
+      ('queue_coalesce', True,
+       "If True, several notification mails for the same recipient within a batch are sent as one mail."),
+      ('queue_max_attempts', 6,
+       "Amount of failed delivery attempts after which a queued notification is dropped."),
+      ('queue_retry_delay', 60,
+       "Seconds to wait before retrying a failed delivery, doubled for each further attempt."),
+      ('queue_poll_interval', 2.0,
+       "Seconds the notification worker waits before checking the queue again when it is idle."),
+    )),
+
     'backup': ('Backup settings',
         'These settings control how the backup action works and who is allowed to use it.',
     (
@@ -83,6 +83,27 @@ class BaseGroupsBackend(object):
     def _retrieve_members(self, group_name):
         raise NotImplementedError()
 
+    def cache_token(self):
+        """
+        Return a value that changes when some group definition of this
+        backend changes, so that results depending on group membership
+        (like ACL checks) can be reused until then.
+
+        @return: some comparable value, None if changes can't be noticed
+        """
+        return None
+
+    def _groups_listing(self, member):
+        """
+        Return a set of the names of the groups of this backend listing
+        <member> directly (as a member or as a member group), None if this
+        can't be told without loading all groups of this backend.
+
+        CompositeGroups uses this to resolve nested groups of several
+        backends without loading them one by one.
+        """
+        return None
+
     def groups_with_member(self, member):
         """
         List all group names of groups containing <member>.
@@ -13,7 +13,8 @@ from py.test import raises
 import re, shutil
 
 from MoinMoin.datastruct.backends._tests import GroupsBackendTest
-from MoinMoin.datastruct import WikiGroups
+from MoinMoin.datastruct import CompositeGroups, ConfigGroups, WikiGroups
+from MoinMoin.datastruct.backends.wiki_groups import WikiGroupsIndex
 from MoinMoin import Page, security
 from MoinMoin.PageEditor import PageEditor
 from MoinMoin.user import User
@@ -215,5 +216,104 @@ class TestWikiGroupBackend(GroupsBackendTest):
         assert group_members == set(['FirstUser', 'SecondUser', 'LastUser'])
         nuke_page(request, group_name)
 
-coverage_modules = ['MoinMoin.datastruct.backends.wiki_groups']
+    def test_nested_groups_index(self):
+        """
+        Tests the reverse membership index with nested group pages.
+        """
+        request = self.request
+        become_trusted(request)
+
+        create_page(request, 'InnerGroup', " * InnerUser")
+        create_page(request, 'OuterGroup', " * OuterUser\n * InnerGroup")
+
+        inner_user_groups = set(request.groups.groups_with_member('InnerUser'))
+        in_outer = 'InnerUser' in request.groups['OuterGroup']
+
+        # remove the nested group, the index must follow
+        create_page(request, 'OuterGroup', " * OuterUser")
+        in_outer_after = 'InnerUser' in request.groups['OuterGroup']
+        outer_user_groups = set(request.groups.groups_with_member('OuterUser'))
+
+        nuke_page(request, 'InnerGroup')
+        nuke_page(request, 'OuterGroup')
+
+        assert set(['InnerGroup', 'OuterGroup']) <= inner_user_groups
+        assert in_outer
+        assert not in_outer_after
+        assert 'OuterGroup' in outer_user_groups
+        assert 'InnerGroup' not in outer_user_groups
+
+    def test_failed_index_build(self):
+        """
+        Tests that an index failing to build does not replace the current one.
+        """
+        request = self.request
+        become_trusted(request)
+        create_page(request, 'SomeGroup', " * SomeUser")
+
+        class FailingIndex(WikiGroupsIndex):
+            def update_page(self, request, pagename):
+                raise ValueError(pagename)
+
+        index = WikiGroupsIndex.get(request)
+        failing = FailingIndex()
+        failing.log_pos = 0
+        raises(ValueError, failing.build, request)
+        build_log_pos = failing.log_pos
+        raises(ValueError, FailingIndex.rebuild, request)
+        cached_index = request.cfg.cache.wiki_groups_index
+
+        nuke_page(request, 'SomeGroup')
+
+        assert build_log_pos == 0
+        assert cached_index is index
+
+
+class TestCompositeWikiGroups(object):
+
+    class Config(wikiconfig.Config):
+
+        config_groups = {'ConfigGroup': ['ConfigUser', 'InnerGroup'],
+                         # shadows the wiki group of that name
+                         'ShadowGroup': ['ShadowUser']}
+
+        def groups(self, request):
+            return CompositeGroups(request,
+                                   ConfigGroups(request, self.config_groups),
+                                   WikiGroups(request))
+
+    def test_nested_groups_index(self):
+        """
+        Tests nested wiki and config groups resolved via the wiki groups index.
+        """
+        request = self.request
+        become_trusted(request)
+
+        create_page(request, 'InnerGroup', " * InnerUser")
+        create_page(request, 'OuterGroup', " * OuterUser\n * ConfigGroup\n * ShadowGroup")
+        create_page(request, 'ShadowGroup', " * OtherUser")
+
+        groups = request.groups
+        inner_user_groups = set(groups.groups_with_member('InnerUser'))
+        answered_by_index = groups._groups_containing('InnerUser') is not None
+        in_outer = 'InnerUser' in groups['OuterGroup']
+        config_user_in_outer = 'ConfigUser' in groups['OuterGroup']
+        shadow_user_in_outer = 'ShadowUser' in groups['OuterGroup']
+        other_user_in_outer = 'OtherUser' in groups['OuterGroup']
+
+        nuke_page(request, 'InnerGroup')
+        nuke_page(request, 'OuterGroup')
+        nuke_page(request, 'ShadowGroup')
+
+        assert inner_user_groups == set(['InnerGroup', 'ConfigGroup', 'OuterGroup'])
+        assert answered_by_index
+        assert in_outer
+        assert config_user_in_outer
+        assert shadow_user_in_outer
+        assert not other_user_in_outer
+
+coverage_modules = ['MoinMoin.datastruct.backends.wiki_groups',
+                    'MoinMoin.datastruct.backends.composite_groups',
+                    'MoinMoin.util.editlogindex',
+                   ]
 
@@ -26,6 +26,18 @@ class CompositeGroups(BaseGroupsBackend):
         """
         super(CompositeGroups, self).__init__(request)
         self._backends = backends
+        self._containing = {}
+        self._containing_token = None
+
+    def _backend_of(self, group_name):
+        """
+        Return the backend defining the group called group_name (first match
+        counts), None if no backend defines it.
+        """
+        for backend in self._backends:
+            if group_name in backend:
+                return backend
+        return None
 
     def __getitem__(self, group_name):
         """
@@ -65,6 +77,71 @@ class CompositeGroups(BaseGroupsBackend):
                 return True
         return False
 
+    def cache_token(self):
+        tokens = tuple([backend.cache_token() for backend in self._backends])
+        if None in tokens:
+            return None
+        return tokens
+
+    def _groups_listing(self, member):
+        listing = set()
+        for backend in self._backends:
+            group_names = backend._groups_listing(member)
+            if group_names is None:
+                return None
+            # a group name means the group of the first backend defining it
+            listing.update([group_name for group_name in group_names
+                            if self._backend_of(group_name) is backend])
+        return listing
+
+    def _groups_containing(self, member):
+        """
+        Return a frozenset of the names of the groups containing <member>
+        directly or via nested groups, None if some backend can't tell which
+        of its groups list a member (see BaseGroupsBackend._groups_listing).
+
+        The results are remembered until some group definition changes.
+        """
+        token = self.cache_token()
+        if token is None or token != self._containing_token:
+            self._containing = {}
+            self._containing_token = token
+        containing = self._containing.get(member)
+        if containing is None:
+            found = set()
+            todo = [member]
+            while todo:
+                group_names = self._groups_listing(todo.pop())
+                if group_names is None:
+                    return None
+                for group_name in group_names - found:
+                    found.add(group_name)
+                    todo.append(group_name)
+            containing = frozenset(found)
+            if token is not None:
+                self._containing[member] = containing
+        return containing
+
+    def _has_member(self, group_name, member, backend):
+        """
+        Check if the group called <group_name> of <backend> contains <member>
+        directly or via nested groups, return None if that can't be answered
+        by _groups_containing.
+        """
+        if self._backend_of(group_name) is not backend:
+            # not the group we mean by that name
+            return None
+        containing = self._groups_containing(member)
+        if containing is None:
+            return None
+        return group_name in containing
+
+    def groups_with_member(self, member):
+        containing = self._groups_containing(member)
+        if containing is None:
+            return super(CompositeGroups, self).groups_with_member(member)
+        return iter(containing)
+
     def __repr__(self):
         return "<%s backends=%s>" % (self.__class__, self._backends)
 
@@ -36,6 +36,13 @@ class ConfigGroups(BaseGroupsBackend):
     def __getitem__(self, group_name):
         return ConfigGroup(request=self.request, name=group_name, backend=self)
 
+    def cache_token(self):
+        # the groups are only defined by the configuration
+        return 'static'
+
+    def _groups_listing(self, member):
+        return set([group_name for group_name, members in self._groups.items() if member in members])
+
     def _retrieve_members(self, group_name):
         try:
             return self._groups[group_name]
@@ -35,6 +35,10 @@ class ConfigLazyGroups(LazyGroupsBackend):
     def __getitem__(self, group_name):
         return ConfigLazyGroup(self.request, group_name, self)
 
+    def cache_token(self):
+        # the groups are only defined by the configuration
+        return 'static'
+
     def _iter_group_members(self, group_name):
         if group_name in self:
             return self._groups[group_name].__iter__()
@@ -19,57 +19,227 @@ page.
 @license: GPL, see COPYING for details
 """
 
+import itertools, threading
+
 from MoinMoin import caching, wikiutil
 from MoinMoin.Page import Page
 from MoinMoin.datastruct.backends import GreedyGroup, BaseGroupsBackend, GroupDoesNotExistError
+from MoinMoin.datastruct.backends.composite_groups import CompositeGroups
 from MoinMoin.formatter.groups import Formatter
+from MoinMoin.util.editlogindex import EditLogIndex
 
+_generations = itertools.count(1)
 
-class WikiGroup(GreedyGroup):
 
-    def _load_group(self):
-        request = self.request
-        group_name = self.name
+class WikiGroupsIndex(EditLogIndex):
+    """
+    Members of all wiki groups and the reverse, transitively closed
+    member -> groups index.
 
-        page = Page(request, group_name)
-        if page.exists():
-            arena = 'pagegroups'
-            key = wikiutil.quoteWikinameFS(group_name)
-            cache = caching.CacheEntry(request, arena, key, scope='wiki', use_pickle=True)
-            try:
-                cache_mtime = cache.mtime()
-                page_mtime = wikiutil.version2timestamp(page.mtime_usecs())
-                # TODO: fix up-to-date check mtime granularity problems.
-                #
-                # cache_mtime is float while page_mtime is integer
-                # The comparision needs to be done on the lowest type of both
-                if int(cache_mtime) > int(page_mtime):
-                    # cache is uptodate
-                    return cache.content()
-                else:
-                    raise caching.CacheError
-            except caching.CacheError:
-                # either cache does not exist, is erroneous or not uptodate: recreate it
-                members, member_groups = super(WikiGroup, self)._load_group()
-                cache.update((members, member_groups))
-                return members, member_groups
+    The index knows the direct members of each group page. For a member, the
+    groups containing it (directly or via nested groups) get computed on
+    first use and are remembered until a group page changes.
+    """
+
+    arena = 'pagegroups'
+    key = 'index' # not a valid group name, so no clash with the group caches
+    cache_attr = 'wiki_groups_index'
+    _lock = threading.RLock()
+
+    def __init__(self):
+        EditLogIndex.__init__(self)
+        self.generation = next(_generations) # changes with every group change
+        self.groups = {} # group name -> (members, member_groups)
+        self._direct = {} # member -> set of groups listing it
+        self._containing = {} # member -> frozenset of groups containing it
+
+    def _get_data(self):
+        return {'groups': self.groups, }
+
+    def _set_data(self, data):
+        for group_name, (members, member_groups) in data['groups'].items():
+            self._set_group(group_name, members, member_groups)
+
+    def _pagenames(self, request):
+        return iter(WikiGroups(request)._group_pages())
+
+    def _accepts(self, request, pagename):
+        return request.cfg.cache.page_group_regexact.search(pagename) is not None
+
+    def _set_group(self, group_name, members=None, member_groups=None):
+        old_members, old_member_groups = self.groups.pop(group_name, ((), ()))
+        for member in list(old_members) + list(old_member_groups):
+            listing = self._direct.get(member)
+            if listing is not None:
+                listing.discard(group_name)
+                if not listing:
+                    del self._direct[member]
+        if members is not None:
+            self.groups[group_name] = (members, member_groups)
+            for member in list(members) + list(member_groups):
+                self._direct.setdefault(member, set()).add(group_name)
+        self._containing = {}
+        self.generation = next(_generations)
+
+    def _page_data(self, request, pagename):
+        if not Page(request, pagename).exists():
+            return None
+        return WikiGroups(request)._read_group_page(pagename)
+
+    def _set_page_data(self, pagename, data):
+        if data is not None:
+            members, member_groups = data
+            self._set_group(pagename, members, member_groups)
         else:
+            self._set_group(pagename)
+
+    def group(self, group_name):
+        """ Return (members, member_groups) of group group_name """
+        try:
+            return self.groups[group_name]
+        except KeyError:
             raise GroupDoesNotExistError(group_name)
 
+    def groups_listing(self, member):
+        """ Return a set of the groups listing member directly """
+        self._lock.acquire()
+        try:
+            return set(self._direct.get(member, ()))
+        finally:
+            self._lock.release()
+
+    def group_names(self):
+        self._lock.acquire()
+        try:
+            return list(self.groups.keys())
+        finally:
+            self._lock.release()
+
+    def groups_containing(self, member):
+        """ Return a frozenset of the groups containing member (directly or via nested groups) """
+        self._lock.acquire()
+        try:
+            containing = self._containing.get(member)
+            if containing is None:
+                found = set()
+                todo = [member]
+                while todo:
+                    for group_name in self._direct.get(todo.pop(), ()):
+                        if group_name not in found:
+                            found.add(group_name)
+                            todo.append(group_name)
+                containing = self._containing[member] = frozenset(found)
+            return containing
+        finally:
+            self._lock.release()
+
+
+class WikiGroup(GreedyGroup):
+
+    def _load_group(self):
+        return self._backend._index().group(self.name)
+
+    def __contains__(self, member, processed_groups=None):
+        groups = self.request.groups
+        if groups is self._backend:
+            # all nested groups are wiki groups, the index knows the answer
+            return self._backend._has_member(self.name, member)
+        if isinstance(groups, CompositeGroups):
+            # the index knows the wiki groups listing some member, the other
+            # backends tell about their groups (if they can)
+            result = groups._has_member(self.name, member, self._backend)
+            if result is not None:
+                return result
+        return super(WikiGroup, self).__contains__(member, processed_groups)
+
 
 class WikiGroups(BaseGroupsBackend):
 
+    def __init__(self, request):
+        super(WikiGroups, self).__init__(request)
+        self._groups_index = None
+        self._memo = {}
+        self._memo_pos = None
+
+    def _index(self):
+        """
+        Return the groups index, it is brought up-to-date once per request
+        (changes done in this process are applied by the events/wiki_groups
+        handler).
+        """
+        index = getattr(self.request.cfg.cache, WikiGroupsIndex.cache_attr, None)
+        if self._groups_index is None or index is None:
+            index = WikiGroupsIndex.get(self.request)
+        # else: the index was possibly replaced (reloaded) by the event handler
+        self._groups_index = index
+        if index.log_pos != self._memo_pos:
+            self._memo = {}
+            self._memo_pos = index.log_pos
+        return index
+
+    def _has_member(self, group_name, member):
+        index = self._index()
+        key = (group_name, member)
+        try:
+            return self._memo[key]
+        except KeyError:
+            result = self._memo[key] = group_name in index.groups_containing(member)
+            return result
+
     def __contains__(self, group_name):
-        return self.is_group_name(group_name) and Page(self.request, group_name).exists()
+        return self.is_group_name(group_name) and group_name in self._index().groups
+
+    def cache_token(self):
+        return self._index().generation
+
+    def _groups_listing(self, member):
+        return self._index().groups_listing(member)
 
     def __iter__(self):
+        return iter(self._index().group_names())
+
+    def __getitem__(self, group_name):
+        return WikiGroup(request=self.request, name=group_name, backend=self)
+
+    def groups_with_member(self, member):
+        if self.request.groups is not self:
+            return super(WikiGroups, self).groups_with_member(member)
+        return iter(self._index().groups_containing(member))
+
+    def _group_pages(self):
         """
         To find group pages, request.cfg.cache.page_group_regexact pattern is used.
         """
-        return iter(self.request.rootpage.getPageList(user='', filter=self.page_group_regex.search))
+        return self.request.rootpage.getPageList(user='', filter=self.page_group_regex.search)
 
-    def __getitem__(self, group_name):
-        return WikiGroup(request=self.request, name=group_name, backend=self)
+    def _read_group_page(self, group_name):
+        """
+        Return (members, member_groups) as defined on the group page.
+        """
+        request = self.request
+        page = Page(request, group_name)
+        arena = 'pagegroups'
+        key = wikiutil.quoteWikinameFS(group_name)
+        cache = caching.CacheEntry(request, arena, key, scope='wiki', use_pickle=True)
+        try:
+            cache_mtime = cache.mtime()
+            page_mtime = wikiutil.version2timestamp(page.mtime_usecs())
+            # TODO: fix up-to-date check mtime granularity problems.
+            #
+            # cache_mtime is float while page_mtime is integer
+            # The comparision needs to be done on the lowest type of both
+            if int(cache_mtime) > int(page_mtime):
+                # cache is uptodate
+                return cache.content()
+            else:
+                raise caching.CacheError
+        except caching.CacheError:
+            # either cache does not exist, is erroneous or not uptodate: recreate it
+            members_retrieved = set(self._retrieve_members(group_name))
+            member_groups = set(member for member in members_retrieved if self.is_group_name(member))
+            members = members_retrieved - member_groups
+            cache.update((members, member_groups))
+            return members, member_groups
 
     def _retrieve_members(self, group_name):
         """
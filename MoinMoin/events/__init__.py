@@ -13,9 +13,8 @@ from MoinMoin import log
 logging = log.getLogger(__name__)
 
 from MoinMoin import wikiutil
-from MoinMoin.util import pysupport
+from MoinMoin.util import pysupport, pluginmanifest
 from MoinMoin.util.abuse import log_attempt
-from MoinMoin.wikiutil import PluginAttributeError
 
 # Create a list of extension actions from the package directory
 modules = pysupport.getPackageModules(__file__)
@@ -220,25 +219,38 @@ class Abort(EventResult):
         self.reason = reason
 
 
+class PluginHandler(object):
+    """The handle() function of an event plugin, imported on first use."""
+
+    def __init__(self, cfg, name):
+        self.cfg = cfg
+        self.name = name
+        self.handle = None
+
+    def __call__(self, event):
+        if self.handle is None:
+            self.handle = wikiutil.importPlugin(self.cfg, "events", self.name, "handle")
+        return self.handle(event)
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.name)
+
+
 def get_handlers(cfg):
     """Create a list of available event handlers.
 
     Each handler is a handle() function defined in a plugin,
-    pretty much like in case of actions.
-
-    TODO: maybe make it less dumb? ;-)
+    pretty much like in case of actions. The plugin manifest tells which
+    plugins have one, the plugins get imported when the first event is
+    sent to them.
     """
     event_handlers = []
-    names = wikiutil.getPlugins("events", cfg)
+    names = pluginmanifest.names(cfg, "events")
 
     for name in names:
-        try:
-            handler = wikiutil.importPlugin(cfg, "events", name, "handle")
-        except PluginAttributeError:
-            handler = None
-
-        if handler is not None:
-            event_handlers.append(handler)
+        # None: not known, the import will tell
+        if pluginmanifest.has_symbol(cfg, "events", name, "handle") is not False:
+            event_handlers.append(PluginHandler(cfg, name))
 
     return event_handlers
 
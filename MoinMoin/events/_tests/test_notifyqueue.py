@@ -0,0 +1,150 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.events.notifyqueue Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin.events import jabbernotify, notifyqueue
+from MoinMoin.events.notifyqueue import NotificationQueue, NotificationWorker, group_entries, MAIL, JABBER
+from MoinMoin.mail.smtpsink import SMTPSink
+
+
+def make_entry(recipients, subject, kind=MAIL, mail_from='wiki@example.org'):
+    return {'kind': kind, 'recipients': recipients, 'mail_from': mail_from,
+            'data': {'subject': subject, 'text': 'text of %s' % subject},
+            'queued': 0, 'attempts': 0, 'next_try': 0, }
+
+
+def test_group_entries():
+    entries = [
+        make_entry(['a@example.org', 'b@example.org'], 'FrontPage changed'),
+        make_entry(['c@example.org'], 'FrontPage changed'),
+        make_entry(['a@example.org'], 'HelpContents changed'),
+        make_entry(['joe@jabber.example.org'], 'FrontPage changed', kind=JABBER),
+    ]
+    deliveries = group_entries(entries, coalesce=False)
+    mails = [(data['subject'], recipients) for kind, mail_from, data, recipients, members in deliveries if kind == MAIL]
+    # same content for several recipients is sent once
+    assert mails == [('FrontPage changed', ['a@example.org', 'b@example.org', 'c@example.org']),
+                     ('HelpContents changed', ['a@example.org'])]
+
+    deliveries = group_entries(entries, coalesce=True)
+    mails = [(data['subject'], recipients, len(members)) for kind, mail_from, data, recipients, members in deliveries if kind == MAIL]
+    # a gets both changes in one mail
+    assert ('FrontPage changed (+1)', ['a@example.org'], 2) in mails
+    assert ('FrontPage changed', ['b@example.org', 'c@example.org'], 1) in mails
+    assert len(mails) == 2
+    # jabber notifications are never combined
+    assert [recipients for kind, mail_from, data, recipients, members in deliveries if kind == JABBER] == [['joe@jabber.example.org']]
+
+
+class TestNotificationQueue(object):
+    """ notifyqueue: queue and deliver notifications via a local SMTP sink """
+
+    def setup_method(self, method):
+        cfg = self.request.cfg
+        self.saved = (cfg.mail_smarthost, cfg.mail_sendmail, cfg.mail_login, cfg.notification_queue_retry_delay)
+        self.sink = SMTPSink()
+        self.sink.start()
+        cfg.mail_smarthost = self.sink.address
+        cfg.mail_sendmail = None
+        cfg.mail_login = None
+        self.queue = NotificationQueue(self.request)
+        self.queue.take(1000, now=1e20) # start with an empty queue
+
+    def teardown_method(self, method):
+        self.queue.take(1000, now=1e20)
+        self.sink.stop()
+        cfg = self.request.cfg
+        cfg.mail_smarthost, cfg.mail_sendmail, cfg.mail_login, cfg.notification_queue_retry_delay = self.saved
+
+    def test_take(self):
+        self.queue.put(MAIL, ['a@example.org'], {'subject': 'one', 'text': '1'})
+        self.queue.put(MAIL, ['b@example.org'], {'subject': 'two', 'text': '2'})
+        entry = self.queue.take(1)[0]
+        assert entry['data']['subject'] == 'one'
+        entry['next_try'] += 3600
+        self.queue.requeue([entry])
+        stats = self.queue.stats()
+        assert stats['depth'] == 2
+        assert stats['due'] == 1
+        assert [entry['data']['subject'] for entry in self.queue.take(10)] == ['two']
+        assert self.queue.take(10) == []
+
+    def test_deliver(self):
+        self.queue.put(MAIL, ['a@example.org', 'b@example.org'], {'subject': 'one', 'text': '1'})
+        self.queue.put(MAIL, ['a@example.org'], {'subject': 'two', 'text': '2'})
+        worker = NotificationWorker(self.request)
+        worker.run_once()
+        assert worker.sent == 2
+        assert worker.coalesced == 1
+        received = sorted([(rcpts, data) for mail_from, rcpts, data in self.sink.messages])
+        assert [rcpts for rcpts, data in received] == [['a@example.org'], ['b@example.org']]
+        # a got both texts in one mail
+        assert b'1\r\n\r\n---' in received[0][1] and received[0][1].endswith(b'\r\n2\r\n')
+        assert self.queue.stats()['depth'] == 0
+
+    def test_retry(self):
+        self.request.cfg.notification_queue_retry_delay = 0
+        self.sink.fail_count = 1
+        self.queue.put(MAIL, ['a@example.org'], {'subject': 'one', 'text': '1'})
+        worker = NotificationWorker(self.request)
+        worker.run_once()
+        assert worker.failed == 1
+        assert worker.sent == 1 # the retry was due immediately
+        assert len(self.sink.messages) == 1
+
+    def test_waiting(self):
+        self.request.cfg.notification_queue_retry_delay = 3600
+        self.sink.fail_count = 1
+        self.queue.put(MAIL, ['a@example.org'], {'subject': 'one', 'text': '1'})
+        worker = NotificationWorker(self.request)
+        worker.run_once()
+        assert worker.failed == 1
+        queue_uid, stats_uid = self.queue.uid(), worker._stats_cache().uid()
+        # nothing due, nothing changed: neither the queue nor the stats get rewritten
+        worker.run_once()
+        assert self.queue.uid() == queue_uid
+        assert worker._stats_cache().uid() == stats_uid
+        assert worker.load_stats()['depth'] == 1
+
+    def test_enqueue(self):
+        cfg = self.request.cfg
+        saved = cfg.notification_queue
+        try:
+            cfg.notification_queue = None
+            assert not notifyqueue.enqueue(self.request, MAIL, ['a@example.org'], {'subject': 'one', 'text': '1'})
+            cfg.notification_queue = 'daemon'
+            assert notifyqueue.enqueue(self.request, MAIL, ['a@example.org'], {'subject': 'one', 'text': '1'})
+        finally:
+            cfg.notification_queue = saved
+        assert self.queue.stats()['depth'] == 1
+
+    def test_jabber(self):
+        class NotificationServer(object):
+            def __init__(self):
+                self.sent = []
+            def send_notification(self, secret, jids, data):
+                self.sent.append((jids, data['subject']))
+
+        cfg = self.request.cfg
+        saved = cfg.notification_queue, cfg.notification_server
+        server = NotificationServer()
+        try:
+            cfg.notification_queue = 'daemon'
+            cfg.notification_server = server
+            data = {'subject': 'one', 'text': '1', 'url_list': []}
+            assert jabbernotify.send_notification(self.request, ['joe@jabber.example.org'], data)
+            assert server.sent == [] # queued, not sent yet
+            worker = NotificationWorker(self.request)
+            worker.run_once()
+        finally:
+            cfg.notification_queue, cfg.notification_server = saved
+        assert worker.sent == 1
+        assert server.sent == [(['joe@jabber.example.org'], 'one')]
+        assert self.queue.stats()['depth'] == 0
+
+coverage_modules = ['MoinMoin.events.notifyqueue', 'MoinMoin.events.jabbernotify', 'MoinMoin.mail.smtpsink']
+
@@ -17,6 +17,7 @@ from MoinMoin.action.AttachFile import getAttachUrl
 
 import MoinMoin.events as ev
 import MoinMoin.events.notification as notification
+import MoinMoin.events.notifyqueue as notifyqueue
 
 
 def prep_page_changed_mail(request, page, comment, email_lang, revisions,
@@ -73,13 +74,15 @@ def prep_page_changed_mail(request, page, comment, email_lang, revisions,
 
 
 def send_notification(request, from_address, emails, data):
-    """ Send notification email
+    """ Send notification email (or queue it, see notification_queue)
 
     @param emails: list of email addresses
     @return: sendmail result
     @rtype int
 
     """
+    if notifyqueue.enqueue(request, notifyqueue.MAIL, emails, data, mail_from=from_address):
+        return (1, "Mail queued")
     return sendmail.sendmail(request, emails, data['subject'], data['text'], mail_from=from_address)
 
 
@@ -19,6 +19,7 @@ from MoinMoin.action.AttachFile import getAttachUrl
 
 import MoinMoin.events.notification as notification
 import MoinMoin.events as ev
+import MoinMoin.events.notifyqueue as notifyqueue
 
 
 def handle(event):
@@ -181,23 +182,28 @@ def page_change(change_type, request, page, subscribers, **kwargs):
 
 
 def send_notification(request, jids, notification):
-    """ Send notifications for a single language.
+    """ Send notifications for a single language (or queue them, see notification_queue).
 
     @param jids: an iterable of Jabber IDs to send the message to
-    @param message: message text
-    @param subject: subject of the message, makes little sense for chats
-    @param url_list: a list of dicts containing URLs and their descriptions
-    @type url_list: list
+    @param notification: dict with the notification, its url_list is a list
+                         of dicts containing URLs and their descriptions
 
     """
-    server = request.cfg.notification_server
-
     if type(notification) != dict:
         raise ValueError("notification must be of type dict!")
 
     if type(notification['url_list']) != list:
         raise ValueError("url_list must be of type list!")
 
+    if notifyqueue.enqueue(request, notifyqueue.JABBER, list(jids), notification):
+        return True
+    return deliver_notification(request, jids, notification)
+
+
+def deliver_notification(request, jids, notification):
+    """ Send notifications to the notification bot now """
+    server = request.cfg.notification_server
+
     try:
         server.send_notification(request.cfg.secrets['jabberbot'], jids, notification)
         return True
@@ -205,4 +211,3 @@ def send_notification(request, jids, notification):
         logging.error("XML RPC error: %s" % str(err))
     except Exception as err:
         logging.error("Low-level communication error: %s" % str(err))
-
@@ -0,0 +1,21 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - link graph updates
+
+    Update the link graph (see MoinMoin.linkgraph) right when pages change.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import MoinMoin.events as ev
+
+
+def handle(event):
+    if isinstance(event, (ev.PageChangedEvent, ev.TrivialPageChangedEvent,
+                          ev.PageRenamedEvent, ev.PageDeletedEvent,
+                          ev.PageCopiedEvent, ev.PageRevertedEvent)):
+        from MoinMoin.linkgraph import get_linkgraph
+        # the graph catches up with the edit-log, where the change is already
+        # logged. if nobody used the graph yet, we don't build it now.
+        get_linkgraph(event.request, create=False)
@@ -0,0 +1,366 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - outbound notification queue
+
+    Sending notifications (mail via SMTP / sendmail, jabber via XML-RPC to
+    the notification bot) can be slow. If the notification_queue option is
+    set, the emailnotify and jabbernotify handlers still compose the
+    notifications while processing the request (they need the request's
+    context: editor, revisions, subscribers, languages), but only put them
+    into a persistent queue in the wiki cache directory.
+
+    A NotificationWorker drains the queue, either in a background thread of
+    the wiki process (notification_queue = 'thread') or in a separately
+    running process (notification_queue = 'daemon', see
+    "moin maint notify"). It delivers the due notifications in batches:
+
+    * mails with identical content for several recipients are sent as one
+      mail (all recipients in BCC), the same for jabber notifications
+    * several mails for the same recipient within a batch are combined into
+      one mail (see notification_queue_coalesce)
+    * if sending fails, the notification is retried later (with
+      exponentially growing delays) for the recipients it failed for, until
+      notification_queue_max_attempts is reached
+
+    The worker stores some metrics (queue depth, lag, sent, failed, ...) in
+    the wiki cache, see "moin maint notify --status".
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import time, threading
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+from MoinMoin.util.queueworker import QueueWorker
+
+MAIL = 'mail'
+JABBER = 'jabber'
+
+arena = 'notifications'
+
+
+class NotificationQueue(object):
+    """
+    A locked on-disk queue of composed notifications
+
+    Each entry is a dict:
+    kind: MAIL or JABBER
+    recipients: list of email addresses or jabber ids
+    data: dict with the notification (mail: subject, text; jabber: see
+          jabbernotify.send_notification)
+    mail_from: sender address (mail only)
+    queued: time when the notification was queued
+    attempts: how often delivery failed
+    next_try: time when it should be delivered (next)
+    """
+
+    def __init__(self, request, timeout=60.0):
+        self.request = request
+        self.timeout = timeout
+
+    def get_cache(self, locking):
+        return caching.CacheEntry(self.request, arena, 'queue', scope='wiki',
+                                  use_pickle=True, do_locking=locking)
+
+    def _queue(self, cache):
+        try:
+            queue = cache.content()
+        except caching.CacheError:
+            # likely nothing there yet
+            queue = []
+        return queue
+
+    def _modify(self, func):
+        cache = self.get_cache(locking=False) # we lock manually
+        cache.lock('w', self.timeout)
+        try:
+            queue = self._queue(cache)
+            result, queue = func(queue)
+            if queue is not None: # else unchanged
+                cache.update(queue)
+        finally:
+            cache.unlock()
+        return result
+
+    def put(self, kind, recipients, data, mail_from=None):
+        """ Queue a notification for delivery as soon as possible """
+        now = time.time()
+        entry = {
+            'kind': kind,
+            'recipients': list(recipients),
+            'data': data,
+            'mail_from': mail_from,
+            'queued': now,
+            'attempts': 0,
+            'next_try': now,
+        }
+        self.requeue([entry])
+
+    def requeue(self, entries):
+        """ Put (failed) entries into the queue (again) """
+        if entries:
+            self._modify(lambda queue: (None, queue + list(entries)))
+
+    def take(self, count, now=None):
+        """ Get (and remove) up to count due entries from the queue """
+        if now is None:
+            now = time.time()
+
+        def take(queue):
+            due, waiting = [], []
+            for entry in queue:
+                if len(due) < count and entry['next_try'] <= now:
+                    due.append(entry)
+                else:
+                    waiting.append(entry)
+            if not due:
+                # do not rewrite the queue if all entries wait for a retry
+                waiting = None
+            return due, waiting
+        return self._modify(take)
+
+    def stats(self):
+        """ Return a dict with depth, due and lag of the queue
+
+        depth: amount of queued notifications
+        due: amount of notifications not waiting for a retry
+        lag: seconds the oldest notification has been waiting
+        """
+        queue = self._queue(self.get_cache(locking=True))
+        now = time.time()
+        return {
+            'depth': len(queue),
+            'due': len([entry for entry in queue if entry['next_try'] <= now]),
+            'lag': queue and max(0, now - min([entry['queued'] for entry in queue])) or 0,
+        }
+
+    def uid(self):
+        """ Return a value that changes when the on-disk queue was changed """
+        return self.get_cache(locking=False).uid()
+
+
+def _coalesce_mails(mails):
+    """ Combine several mails into one (for the same recipient) """
+    if len(mails) == 1:
+        return mails[0]
+    subject = "%s (+%d)" % (mails[0]['subject'], len(mails) - 1)
+    separator = "\n\n%s\n\n" % ('-' * 70)
+    text = separator.join([mail['text'] for mail in mails])
+    return {'subject': subject, 'text': text}
+
+
+def group_entries(entries, coalesce=True):
+    """ Group the queued entries into deliveries
+
+    Recipients getting exactly the same notifications get one delivery.
+    With coalesce, a recipient gets all its mails of these entries in one
+    delivery, otherwise one delivery per distinct mail.
+
+    @return: list of (kind, mail_from, data, recipients, entries) tuples,
+             entries being the queue entries a delivery is made of
+    """
+    # which entries go to which recipient, keeping the queue order
+    contents = []
+    content_index = {}
+    wanted = {} # (kind, mail_from, recipient) -> list of content indexes
+    for entry in entries:
+        key = (entry['kind'], entry['mail_from'], repr(sorted(entry['data'].items())))
+        i = content_index.get(key)
+        if i is None:
+            i = content_index[key] = len(contents)
+            contents.append(entry)
+        for recipient in entry['recipients']:
+            indexes = wanted.setdefault((entry['kind'], entry['mail_from'], recipient), [])
+            if i not in indexes:
+                indexes.append(i)
+
+    deliveries = {}
+    order = []
+    for (kind, mail_from, recipient), indexes in wanted.items():
+        if kind == MAIL and coalesce:
+            groups = [tuple(indexes)]
+        else:
+            groups = [(i, ) for i in indexes]
+        for group in groups:
+            key = (kind, mail_from, group)
+            if key not in deliveries:
+                deliveries[key] = []
+                order.append(key)
+            deliveries[key].append(recipient)
+
+    result = []
+    for key in sorted(order, key=lambda key: key[2]):
+        kind, mail_from, group = key
+        members = [contents[i] for i in group]
+        if kind == MAIL:
+            data = _coalesce_mails([entry['data'] for entry in members])
+        else:
+            data = members[0]['data']
+        result.append((kind, mail_from, data, sorted(deliveries[key]), members))
+    return result
+
+
+class NotificationWorker(QueueWorker):
+    """ Delivers the queued notifications """
+
+    name = 'notification worker'
+    stats_key = 'worker-stats'
+
+    def __init__(self, request, batch_size=None, poll_interval=None):
+        """
+        @param request: request object
+        @param batch_size: amount of queued notifications to deliver at once
+                           (default: cfg.notification_queue_batch_size)
+        @param poll_interval: seconds to sleep when the queue is idle
+                              (default: cfg.notification_queue_poll_interval)
+        """
+        QueueWorker.__init__(self, request)
+        cfg = request.cfg
+        self.batch_size = batch_size or cfg.notification_queue_batch_size
+        self.poll_interval = poll_interval or cfg.notification_queue_poll_interval
+        self.queue = NotificationQueue(request)
+        self.sent = 0 # deliveries done
+        self.failed = 0 # deliveries failed (maybe retried later)
+        self.dropped = 0 # notifications given up after max. attempts
+        self.coalesced = 0 # notifications merged into another mail for the same recipient
+
+    def _stats_cache(self):
+        return caching.CacheEntry(self.request, arena, self.stats_key,
+                                  scope='wiki', use_pickle=True)
+
+    def queue_stats(self):
+        return self.queue.stats()
+
+    def counters(self):
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
+
+    def deliver(self, kind, mail_from, data, recipients):
+        """ Deliver a notification, return True if it was successful """
+        if kind == MAIL:
+            from MoinMoin.mail import sendmail
+            ok, msg = sendmail.sendmail(self.request, recipients, data['subject'], data['text'],
+                                        mail_from=mail_from)
+            if not ok:
+                logging.warning("queued mail notification failed: %s" % msg)
+            return bool(ok)
+        elif kind == JABBER:
+            from MoinMoin.events import jabbernotify
+            return bool(jabbernotify.deliver_notification(self.request, recipients, data))
+        logging.error("unknown notification kind %r dropped" % kind)
+        return True
+
+    def _retry(self, entries, recipients, now):
+        """ Return copies of entries for a retry of the failed recipients
+
+        All recipients of a failed delivery wanted all its entries (see
+        group_entries), so each entry gets retried for all of them.
+        """
+        cfg = self.request.cfg
+        retries = []
+        for entry in entries:
+            attempts = entry['attempts'] + 1
+            if attempts >= cfg.notification_queue_max_attempts:
+                logging.error("giving up notification %r for %r after %d attempts" % (
+                    entry['data'].get('subject'), sorted(recipients), attempts))
+                self.dropped += 1
+                continue
+            entry = dict(entry)
+            entry['recipients'] = list(recipients)
+            entry['attempts'] = attempts
+            entry['next_try'] = now + cfg.notification_queue_retry_delay * 2 ** (attempts - 1)
+            retries.append(entry)
+        return retries
+
+    def run_once(self):
+        """ Deliver all due notifications
+
+        @return: amount of deliveries done
+        """
+        cfg = self.request.cfg
+        start = time.time()
+        done_count = 0
+        while True:
+            entries = self.queue.take(self.batch_size)
+            if not entries:
+                break
+            now = time.time()
+            deliveries = group_entries(entries, coalesce=cfg.notification_queue_coalesce)
+            self.coalesced += sum([len(entry['recipients']) for entry in entries]) - \
+                              sum([len(recipients) for kind, mail_from, data, recipients, group in deliveries])
+            retries = []
+            for kind, mail_from, data, recipients, group in deliveries:
+                try:
+                    ok = self.deliver(kind, mail_from, data, recipients)
+                except Exception:
+                    logging.exception("delivering a queued notification crashed")
+                    ok = False
+                if ok:
+                    self.sent += 1
+                    done_count += 1
+                else:
+                    self.failed += 1
+                    retries.extend(self._retry(group, recipients, now))
+            self.queue.requeue(retries)
+        self.runs += 1
+        self.save_stats()
+        if done_count:
+            logging.info("notification worker did %d deliveries in %0.2f seconds." % (
+                done_count, time.time() - start))
+        return done_count
+
+
+# background worker threads (notification_queue = 'thread'), by siteid
+_threads = {}
+_threads_lock = threading.Lock()
+
+
+def _worker_thread(url):
+    from MoinMoin.web.contexts import ScriptContext
+    request = ScriptContext(url)
+    try:
+        NotificationWorker(request).run()
+    except Exception:
+        logging.exception("notification worker thread crashed")
+
+
+def start_worker_thread(request):
+    """ Start the background worker thread of this wiki (if not running) """
+    siteid = request.cfg.siteid
+    _threads_lock.acquire()
+    try:
+        thread = _threads.get(siteid)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_worker_thread, args=(request.url_root, ),
+                                      name="notification worker %s" % siteid)
+            thread.daemon = True
+            thread.start()
+            _threads[siteid] = thread
+    finally:
+        _threads_lock.release()
+
+
+def enqueue(request, kind, recipients, data, mail_from=None):
+    """ Queue a notification (if notification_queue is set)
+
+    @return: True if the notification was queued, False if the caller
+             has to deliver it itself
+    """
+    mode = request.cfg.notification_queue
+    if not mode:
+        return False
+    if not recipients:
+        return True # nothing to do
+    NotificationQueue(request).put(kind, recipients, data, mail_from=mail_from)
+    if mode == 'thread':
+        start_worker_thread(request)
+    return True
+
@@ -0,0 +1,22 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - wiki groups index updates
+
+    Update the wiki groups index (see MoinMoin.datastruct.backends.wiki_groups)
+    right when group pages change.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import MoinMoin.events as ev
+
+
+def handle(event):
+    if isinstance(event, (ev.PageChangedEvent, ev.TrivialPageChangedEvent,
+                          ev.PageRenamedEvent, ev.PageDeletedEvent,
+                          ev.PageCopiedEvent, ev.PageRevertedEvent)):
+        from MoinMoin.datastruct.backends.wiki_groups import WikiGroupsIndex
+        # the index catches up with the edit-log, where the change is already
+        # logged. if nobody used the index yet, we don't build it now.
+        WikiGroupsIndex.get(event.request, create=False)
@@ -17,6 +17,11 @@ def _get_index(request):
         pass
 
 
+def _index_now(request):
+    """ Should the index be updated now (or just queued for the indexer daemon)? """
+    return not request.cfg.xapian_index_daemon
+
+
 def handle_renamed(event):
     """Updates Xapian index when a page changes its name"""
 
@@ -26,7 +31,7 @@ def handle_renamed(event):
         index = _get_index(request)
         if index and index.exists():
             index.update_item(event.old_page.page_name, now=False)
-            index.update_item(event.page.page_name)
+            index.update_item(event.page.page_name, now=_index_now(request))
 
 
 def handle_copied(event):
@@ -37,7 +42,7 @@ def handle_copied(event):
     if request.cfg.xapian_search:
         index = _get_index(request)
         if index and index.exists():
-            index.update_item(event.page.page_name)
+            index.update_item(event.page.page_name, now=_index_now(request))
 
 
 def handle_changed(event):
@@ -48,7 +53,7 @@ def handle_changed(event):
     if request.cfg.xapian_search:
         index = _get_index(request)
         if index and index.exists():
-            index.update_item(event.page.page_name)
+            index.update_item(event.page.page_name, now=_index_now(request))
 
 
 def handle_deleted(event):
@@ -65,7 +70,7 @@ def handle_attachment_change(event):
     if request.cfg.xapian_search:
         index = _get_index(request)
         if index and index.exists():
-            index.update_item(event.pagename, event.filename)
+            index.update_item(event.pagename, event.filename, now=_index_now(request))
 
 
 def handle(event):
@@ -8,6 +8,7 @@
 
 import sys, os
 import time
+import threading
 
 from MoinMoin import log
 logging = log.getLogger(__name__)
@@ -21,6 +22,47 @@ standard_codings = ['utf-8', 'iso-8859-15', 'iso-8859-1', ]
 from MoinMoin.util.SubProcess import exec_cmd
 
 
+class FilterKilled(Exception):
+    """ an external filter command was killed (e.g. after the timeout),
+        data is its (partial) output, decoded like by execfilter.
+    """
+    def __init__(self, cmd, data):
+        Exception.__init__(self, cmd)
+        self.data = data
+
+
+class Limits(object):
+    """ how many external filter commands may run at the same time and
+        after how many seconds a filter command gets killed.
+    """
+    def __init__(self, processes, timeout):
+        self.timeout = timeout
+        self.process_slots = threading.BoundedSemaphore(processes)
+
+default_limits = Limits(2, 300)
+_limits_lock = threading.Lock()
+
+
+def get_limits(indexobj):
+    """ get the limits for the filter commands run for indexobj (a search
+        index, see MoinMoin.search.builtin.BaseIndex), configured by
+        xapian_filter_processes and xapian_filter_timeout. Without an
+        index, the default limits are used.
+    """
+    if indexobj is None:
+        return default_limits
+    cfg = indexobj.request.cfg
+    _limits_lock.acquire()
+    try:
+        limits = cfg.cache.filter_limits
+        if limits is None:
+            limits = cfg.cache.filter_limits = Limits(cfg.xapian_filter_processes,
+                                                      cfg.xapian_filter_timeout)
+        return limits
+    finally:
+        _limits_lock.release()
+
+
 def quote_filename(filename):
     """ quote a filename (could contain blanks or other special chars) in a
         way suitable for the platform we run on.
@@ -35,14 +77,10 @@ def quote_filename(filename):
     return filename
 
 
-def execfilter(cmd, filename, codings=standard_codings):
-    """ use cmd to get plaintext content of filename
-        to decode to unicode, we use the first coding of codings list that
+def decode(data, codings=standard_codings):
+    """ decode data to unicode, using the first coding of codings list that
         does not throw an exception or force ascii
     """
-    filter_cmd = cmd % quote_filename(filename)
-    data, errors, rc = exec_cmd(filter_cmd, timeout=300)
-    logging.debug("Command '%s', rc: %d, stdout: %d bytes, stderr: %s" % (filter_cmd, rc, len(data), errors))
     for c in codings:
         try:
             return data.decode(c)
@@ -50,3 +88,27 @@ def execfilter(cmd, filename, codings=standard_codings):
             pass
     return data.decode('ascii', 'replace')
 
+
+def execfilter(cmd, filename, codings=standard_codings, limits=None):
+    """ use cmd to get plaintext content of filename
+        to decode to unicode, we use the first coding of codings list that
+        does not throw an exception or force ascii
+
+        limits are the Limits to obey (see get_limits, default: default_limits).
+        If the command gets killed, FilterKilled is raised.
+    """
+    if limits is None:
+        limits = default_limits
+    filter_cmd = cmd % quote_filename(filename)
+    limits.process_slots.acquire()
+    try:
+        data, errors, rc = exec_cmd(filter_cmd, timeout=limits.timeout)
+    finally:
+        limits.process_slots.release()
+    logging.debug("Command '%s', rc: %d, stdout: %d bytes, stderr: %s" % (filter_cmd, rc, len(data), errors))
+    if rc < 0:
+        logging.warning("Command '%s' was killed by signal %d (timeout is %ds)" % (
+                        filter_cmd, -rc, limits.timeout))
+        raise FilterKilled(filter_cmd, decode(data, codings))
+    return decode(data, codings)
+
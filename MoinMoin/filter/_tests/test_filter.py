@@ -56,6 +56,17 @@ class TestFilters:
             fname = self.make_file(data)
             assert _filter(None, fname) == expected
 
+    def testExecFilterTimeout(self):
+        import os, time
+        if os.name != 'posix':
+            py.test.skip('needs a posix shell')
+        fname = self.make_file('test')
+        t = time.time()
+        err = py.test.raises(filter.FilterKilled, filter.execfilter,
+                             "cat %s; sleep 30", fname, limits=filter.Limits(1, 1))
+        assert time.time() - t < 10
+        assert err.value.data == u'test'
+
 coverage_modules = ['MoinMoin.filter.text',
                     'MoinMoin.filter.text_html',
                     'MoinMoin.filter.text_xml',
@@ -10,11 +10,11 @@
 
 import os
 
-from MoinMoin.filter import execfilter
+from MoinMoin.filter import execfilter, get_limits
 
 def execute(indexobj, filename):
     cmd = "antiword %s"
     if os.name == 'posix':
         cmd = "HOME=/tmp " + cmd  # no HOME makes antiword complain (on Linux)
-    return execfilter(cmd, filename)
+    return execfilter(cmd, filename, limits=get_limits(indexobj))
 
@@ -10,12 +10,12 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin.filter import execfilter
+from MoinMoin.filter import execfilter, get_limits
 
 def execute(indexobj, filename):
     # using -q switch to get quiet operation (no messages, no errors),
     # because poppler-utils pdftotext on Debian/Etch otherwise generates
     # lots of output on stderr (e.g. 10MB stderr output) and that causes
     # problems in current execfilter implementation.
-    return execfilter("pdftotext -q -enc UTF-8 %s -", filename)
+    return execfilter("pdftotext -q -enc UTF-8 %s -", filename, limits=get_limits(indexobj))
 
@@ -8,10 +8,10 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin.filter import execfilter
+from MoinMoin.filter import execfilter, get_limits
 
 def execute(indexobj, filename):
-    data = execfilter("xls2csv %s", filename)
+    data = execfilter("xls2csv %s", filename, limits=get_limits(indexobj))
     # xls2csv uses comma as field separator and "field content",
     # we strip both to not confuse the indexer
     data = data.replace(',', ' ').replace('"', ' ')
@@ -8,9 +8,9 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin.filter import execfilter
+from MoinMoin.filter import execfilter, get_limits
 
 def execute(indexobj, filename):
-    data = execfilter("catppt -dutf-8 %s", filename)
+    data = execfilter("catppt -dutf-8 %s", filename, limits=get_limits(indexobj))
     return data
 
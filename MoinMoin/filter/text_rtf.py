@@ -8,8 +8,8 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin.filter import execfilter
+from MoinMoin.filter import execfilter, get_limits
 
 def execute(indexobj, filename):
-    return execfilter("catdoc %s", filename)
+    return execfilter("catdoc %s", filename, limits=get_limits(indexobj))
 
@@ -27,6 +27,9 @@ class FormatterBase:
     """
 
     hardspace = ' '
+    # text(a) + text(b) == text(a + b) (when not highlighting), parsers
+    # may give adjacent text fragments to text at once
+    joinable_text = False
 
     def __init__(self, request, **kw):
         self.request = request
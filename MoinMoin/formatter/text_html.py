@@ -177,6 +177,7 @@ class Formatter(FormatterBase):
     """
 
     hardspace = '&nbsp;'
+    joinable_text = True
     indentspace = ' '
 
     def __init__(self, request, **kw):
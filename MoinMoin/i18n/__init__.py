@@ -16,6 +16,7 @@
         browserLanguages() -- return the browser accepted languages
         getDirection(lang) -- return the lang direction either 'ltr' or 'rtl'
         getText(str, request, lang,  **kw) -- return str translation into lang
+        saveFormattedTexts(request) -- save the texts formatted during the request
 
     TODO: as soon as we have some "farm / server plugin dir", extend this to
           load translations from there, too.
@@ -32,7 +33,7 @@ from MoinMoin import log
 logging = log.getLogger(__name__)
 
 from MoinMoin import caching
-from MoinMoin.i18n import strings
+from MoinMoin.i18n import strings, catalog
 
 # This is a global for a reason: in persistent environments all languages in
 # use will be cached; Note: you have to restart if you update language data.
@@ -152,6 +153,9 @@ class Translation(object):
     def __init__(self, language, domain='MoinMoin'):
         self.language = language
         self.domain = domain
+        self.formatted = {}
+        self.formatted_loaded = {} # siteid -> True, see loadFormatted
+        self.unsaved = {} # siteid -> set of (original, percent) formatted, but not saved yet
 
     def load_po(self, f):
         """ load the po file """
@@ -221,42 +225,141 @@ class Translation(object):
         return text
 
     def loadLanguage(self, request, trans_dir="i18n"):
+        """ Load the translations from the compiled catalog (see
+            MoinMoin.i18n.catalog), compile it first if needed.
+
+            The catalog only has the texts as in the po file, so it is
+            shared by all wikis of the farm. Texts with wiki markup get
+            formatted per wiki (see getText and loadFormatted).
+        """
         request.clock.start('loadLanguage')
-        # see comment about per-wiki scope above
-        cache = caching.CacheEntry(request, arena='i18n', key=self.language, scope='wiki', use_pickle=True)
+        cache = caching.CacheEntry(request, arena='i18n', key='%s.%s.catalog' % (self.language, self.domain),
+                                   scope='farm')
+        catalog_filename = os.path.join(cache.arena_dir, cache.key)
         langfilename = po_filename(request, self.language, self.domain, i18n_dir=trans_dir)
-        needsupdate = cache.needsUpdate(langfilename)
-        if not needsupdate:
+        self.langfilename = langfilename
+        unformatted = None
+        if not cache.needsUpdate(langfilename):
             try:
-                unformatted = cache.content()
-                logging.debug("pickle %s load success" % self.language)
-            except caching.CacheError:
-                logging.debug("pickle %s load failed" % self.language)
-                needsupdate = 1
+                unformatted = catalog.Catalog(catalog_filename)
+                logging.debug("catalog %s load success" % self.language)
+            except (catalog.CatalogError, IOError, OSError):
+                logging.debug("catalog %s load failed" % self.language)
 
-        if needsupdate:
+        if unformatted is None:
             logging.debug("langfilename %s needs update" % langfilename)
             f = file(langfilename)
             self.load_po(f)
             f.close()
-            trans = self.translation
-            unformatted = trans._catalog
-            self.has_wikimarkup = self.info.get('x-haswikimarkup', 'False') == 'True'
-            logging.debug("dumping lang %s" % self.language)
+            unformatted = self.translation._catalog
+            logging.debug("compiling catalog %s" % self.language)
             try:
-                cache.update(unformatted)
-            except caching.CacheError:
+                cache.update(catalog.dumps(unformatted))
+                unformatted = catalog.Catalog(catalog_filename)
+                # we do not need the texts in memory any more
+                self.translation = None
+            except (caching.CacheError, catalog.CatalogError, IOError, OSError):
                 pass
 
-        self.formatted = {}
+        self.has_wikimarkup = 'X-HasWikiMarkup: True' in unformatted.get('', '')
         self.raw = unformatted
         request.clock.stop('loadLanguage')
 
+    def _formatted_cache(self, request, do_locking=True):
+        # see comment about per-wiki scope above
+        return caching.CacheEntry(request, arena='i18n', key='%s.%s.formatted' % (self.language, self.domain),
+                                  scope='wiki', use_pickle=True, do_locking=do_locking)
+
+    def loadFormatted(self, request):
+        """ Load the texts other processes have formatted for the wiki of request """
+        siteid = request.cfg.siteid
+        self.formatted_loaded[siteid] = True
+        cache = self._formatted_cache(request)
+        if not cache.exists() or cache.needsUpdate(self.langfilename):
+            return
+        try:
+            formatted = cache.content()
+        except caching.CacheError:
+            return
+        for (original, percent), text in list(formatted.items()):
+            self.formatted.setdefault((original, siteid, percent), text)
+
+    def saveFormatted(self, request):
+        """ Save the texts newly formatted for the wiki of request, so other
+            processes need not format them again.
+
+            This is called once at the end of the request (see
+            saveFormattedTexts), the texts saved meanwhile by other processes
+            are kept.
+        """
+        siteid = request.cfg.siteid
+        unsaved = self.unsaved.pop(siteid, None)
+        if not unsaved:
+            return
+        cache = self._formatted_cache(request, do_locking=False)
+        try:
+            cache.lock('w')
+            try:
+                formatted = {}
+                if cache.exists() and not cache.needsUpdate(self.langfilename):
+                    try:
+                        formatted = cache.content()
+                    except caching.CacheError:
+                        pass
+                for original, percent in list(unsaved):
+                    text = self.formatted.get((original, siteid, percent))
+                    if text is not None:
+                        formatted[(original, percent)] = text
+                cache.update(formatted)
+            finally:
+                cache.unlock()
+        except caching.CacheError:
+            pass
+
+    def getFormatted(self, request, original, text, percent):
+        """ Return text (the translation of original) formatted for the
+            wiki of request, format it only once per wiki.
+        """
+        # it is important to include siteid and percent into the key because
+        # formatted output depends on the (farm) wiki in which the page is
+        # rendered (e.g. for link urls) and also on the percent param
+        key = (original, request.cfg.siteid, percent)
+        if key not in self.formatted and request.cfg.siteid not in self.formatted_loaded:
+            self.loadFormatted(request)
+        if key in self.formatted:
+            text = self.formatted[key]
+            if text is None:
+                logging.error("formatting a %r text that is already being formatted: %r" % (self.language, original))
+                text = original + '*' # get some error indication to the UI
+        else:
+            self.formatted[key] = None # we use this as "formatting in progress" indicator
+            text = self.formatMarkup(request, text, percent)
+            self.formatted[key] = text # remember it
+            # saved at the end of the request, see saveFormattedTexts
+            self.unsaved.setdefault(request.cfg.siteid, set()).add((original, percent))
+        return text
+
+
+def saveFormattedTexts(request):
+    """ Save the texts formatted for the wiki of request by all translations
+        (called at the end of the request).
+    """
+    for translation in list(translations.values()):
+        translation.saveFormatted(request)
 
 def getDirection(lang):
     """ Return the text direction for a language, either 'ltr' or 'rtl'. """
     return languages[lang]['x-direction']
 
+def getTranslation(request, lang):
+    """ Return the Translation of lang, load it if needed. """
+    global translations
+    if not lang in translations: # load translation if needed
+        t = Translation(lang)
+        t.loadLanguage(request)
+        translations[lang] = t
+    return translations[lang]
+
 def getText(original, request, lang, **kw):
     """ Return a translation of some original text.
 
@@ -278,31 +381,13 @@ def getText(original, request, lang, **kw):
     if original == "":
         return "" # we don't want to get *.po files metadata!
 
-    global translations
-    if not lang in translations: # load translation if needed
-        t = Translation(lang)
-        t.loadLanguage(request)
-        translations[lang] = t
-
     # get the matching entry in the mapping table
     translated = original
-    translation = translations[lang]
+    translation = getTranslation(request, lang)
     if original in translation.raw:
         translated = translation.raw[original]
         if formatted:
-            # it is important to include siteid and percent into the key because
-            # formatted output depends on the (farm) wiki in which the page is
-            # rendered (e.g. for link urls) and also on the percent param
-            key = (original, request.cfg.siteid, percent)
-            if key in translation.formatted:
-                translated = translation.formatted[key]
-                if translated is None:
-                    logging.error("formatting a %r text that is already being formatted: %r" % (lang, original))
-                    translated = original + '*' # get some error indication to the UI
-            else:
-                translation.formatted[key] = None # we use this as "formatting in progress" indicator
-                translated = translation.formatMarkup(request, translated, percent)
-                translation.formatted[key] = translated # remember it
+            translated = translation.getFormatted(request, original, translated, percent)
     else:
         try:
             if languages is None:
@@ -326,7 +411,7 @@ def getText(original, request, lang, **kw):
                 translated = getText(original, request, 'en', wiki=formatted, percent=percent)
             elif formatted: # and lang == 'en'
                 logging.debug("formatting for %r on the fly: %r" % (lang, original))
-                translated = translations[lang].formatMarkup(request, original, percent)
+                translated = translations[lang].getFormatted(request, original, original, percent)
     return translated
 
 
@@ -0,0 +1,89 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.i18n.catalog Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, tempfile
+
+import py
+
+from MoinMoin import i18n
+from MoinMoin.i18n import catalog
+
+
+class TestCatalog(object):
+    """ catalog: compiled translation catalogs """
+    texts = {
+        '': 'Content-Type: text/plain; charset=utf-8\nX-HasWikiMarkup: True\n',
+        'Edit': 'Editieren',
+        'Login': 'Anmelden',
+        "'''Email'''": "'''E-Mail'''",
+        'Delete \xe4\xf6\xfc': 'L\xf6schen \u20ac',
+    }
+
+    def setup_method(self, method):
+        fd, self.path = tempfile.mkstemp('.catalog')
+        os.close(fd)
+
+    def teardown_method(self, method):
+        os.unlink(self.path)
+
+    def write(self, texts):
+        f = open(self.path, 'wb')
+        f.write(catalog.dumps(texts))
+        f.close()
+        return catalog.Catalog(self.path)
+
+    def testLookup(self):
+        """ catalog: all texts are found """
+        c = self.write(self.texts)
+        assert len(c) == len(self.texts)
+        for key, value in self.texts.items():
+            assert key in c
+            assert c[key] == value
+            assert c.get(key) == value # remembered
+        assert 'Not translated' not in c
+        assert c.get('Not translated', 'default') == 'default'
+        py.test.raises(KeyError, c.__getitem__, 'Not translated')
+        assert sorted(c.items()) == sorted(self.texts.items())
+
+    def testMany(self):
+        """ catalog: many texts (hash collisions) """
+        texts = dict([('text %d' % i, 'translation %d' % i) for i in range(1000)])
+        c = self.write(texts)
+        for key, value in texts.items():
+            assert c[key] == value
+        assert 'text 1000' not in c
+
+    def testBroken(self):
+        """ catalog: broken files are detected """
+        py.test.raises(catalog.CatalogError, catalog.Catalog, self.path)
+        f = open(self.path, 'wb')
+        f.write(b'x' * 100)
+        f.close()
+        py.test.raises(catalog.CatalogError, catalog.Catalog, self.path)
+
+
+class TestFormatted(object):
+    """ i18n: texts formatted for a wiki """
+
+    def testSaveOnce(self):
+        """ i18n: formatted texts are saved once at the end of the request """
+        request = self.request
+        translation = i18n.getTranslation(request, 'en')
+        texts = ["''Formatted text %d''" % i for i in range(3)]
+        uid = translation._formatted_cache(request).uid()
+        for text in texts:
+            translation.getFormatted(request, text, text, False)
+        # nothing written yet
+        assert translation._formatted_cache(request).uid() == uid
+        i18n.saveFormattedTexts(request)
+        saved = translation._formatted_cache(request).content()
+        for text in texts:
+            assert saved[(text, False)] == translation.formatted[(text, request.cfg.siteid, False)]
+        assert not translation.unsaved.get(request.cfg.siteid)
+
+coverage_modules = ['MoinMoin.i18n', 'MoinMoin.i18n.catalog']
@@ -0,0 +1,135 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - compiled translation catalogs
+
+    A catalog file holds the translations (original -> translated text) of
+    one language and domain as a hash table, so it can be used via mmap:
+    instead of unpickling the whole catalog into each process, the
+    processes share the pages of the file (via the OS page cache) and only
+    the texts actually used get decoded (and remembered).
+
+    File format (all numbers are little endian uint32):
+
+    * header: MAGIC, amount of entries, amount of hash table slots
+    * hash table: slots * (hash, key offset, key length, value offset,
+      value length) - an empty slot has key offset 0, collisions are
+      resolved by linear probing
+    * the keys and values, utf-8 encoded
+
+    The hash is zlib.crc32 of the utf-8 encoded key, so it is the same for
+    all processes (and python versions).
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import mmap, struct, zlib
+
+MAGIC = b'MoinCat1'
+HEADER = struct.Struct('<8sII')
+SLOT = struct.Struct('<IIIII')
+
+
+class CatalogError(Exception):
+    """ raised if a catalog file is broken """
+
+
+def _hash(data):
+    return zlib.crc32(data) & 0xffffffff
+
+
+def dumps(catalog):
+    """ Return the compiled catalog file content (bytes) for a dict """
+    count = len(catalog)
+    slots = 8
+    while slots < 2 * count:
+        slots *= 2
+    table = [None] * slots
+    data = []
+    offset = HEADER.size + slots * SLOT.size
+    for key, value in catalog.items():
+        key, value = key.encode('utf-8'), value.encode('utf-8')
+        h = _hash(key)
+        entry = (h, offset, len(key), offset + len(key), len(value))
+        data.append(key)
+        data.append(value)
+        offset += len(key) + len(value)
+        i = h & (slots - 1)
+        while table[i] is not None:
+            i = (i + 1) & (slots - 1)
+        table[i] = entry
+    empty = (0, 0, 0, 0, 0)
+    result = [HEADER.pack(MAGIC, count, slots)]
+    result.extend([SLOT.pack(*(entry or empty)) for entry in table])
+    result.extend(data)
+    return b''.join(result)
+
+
+class Catalog(object):
+    """ A compiled catalog file, accessed like a (read-only) dict """
+
+    def __init__(self, path):
+        f = open(path, 'rb')
+        try:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError) as err: # e.g. empty file
+                raise CatalogError(str(err))
+        finally:
+            f.close()
+        if len(self.map) < HEADER.size:
+            raise CatalogError("%s is too short" % path)
+        magic, self.count, self.slots = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or len(self.map) < HEADER.size + self.slots * SLOT.size:
+            raise CatalogError("%s is not a catalog file" % path)
+        # the texts we were asked for (None: not in the catalog)
+        self._found = {}
+
+    def _lookup(self, key):
+        data = key.encode('utf-8')
+        h = _hash(data)
+        buf = self.map
+        mask = self.slots - 1
+        i = h & mask
+        while True:
+            entry_hash, key_offset, key_len, value_offset, value_len = SLOT.unpack_from(buf, HEADER.size + i * SLOT.size)
+            if not key_offset:
+                return None
+            if entry_hash == h and buf[key_offset:key_offset + key_len] == data:
+                return buf[value_offset:value_offset + value_len].decode('utf-8')
+            i = (i + 1) & mask
+
+    def get(self, key, default=None):
+        try:
+            value = self._found[key]
+        except KeyError:
+            value = self._found[key] = self._lookup(key)
+        if value is None:
+            return default
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        """ Return [(key, value), ...] of all entries """
+        buf = self.map
+        result = []
+        for i in range(self.slots):
+            entry_hash, key_offset, key_len, value_offset, value_len = SLOT.unpack_from(buf, HEADER.size + i * SLOT.size)
+            if key_offset:
+                result.append((buf[key_offset:key_offset + key_len].decode('utf-8'),
+                               buf[value_offset:value_offset + value_len].decode('utf-8')))
+        return result
+
+    def keys(self):
+        return [key for key, value in self.items()]
@@ -0,0 +1,228 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - wiki wide link graph
+
+    The link graph knows the links of all pages (forward links), the pages
+    linking to a page (backlinks) and which pages exist. Thus queries like
+    "orphaned pages", "wanted pages" or "what links here" can be answered
+    without opening the pagelinks cache of every page.
+
+    It also knows the categories of all pages (the links to category pages,
+    see Page.getCategories) and the members of all categories.
+
+    The graph is an EditLogIndex (see MoinMoin.util.editlogindex): it gets
+    built from the pagelinks of all pages on first use and is updated
+    incrementally for the pages mentioned in the edit-log since the last
+    update (saves, renames, deletes, ...). The events/linkgraph handler does
+    that update right when a page changes, so the next query does not need
+    to do it.
+
+    Usage:
+        graph = get_linkgraph(request)
+        graph.links_to(u'FrontPage')
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import threading
+
+from MoinMoin import wikiutil
+from MoinMoin.Page import Page
+from MoinMoin.util.editlogindex import EditLogIndex
+
+_lock = threading.RLock()
+
+
+class LinkGraph(EditLogIndex):
+    """ Forward links, backlinks and existence of the pages of a wiki """
+
+    arena = 'linkgraph'
+    key = 'graph'
+    cache_attr = 'linkgraph'
+    _lock = _lock
+
+    def __init__(self):
+        EditLogIndex.__init__(self)
+        self.links = {} # pagename -> list of link targets
+        self.backlinks = {} # pagename -> set of pages linking to it
+        self.existing = set() # names of existing pages
+        self.categories = {} # pagename -> list of categories
+        self.members = {} # category -> set of pages in this category
+
+    def _get_data(self):
+        # backlinks and members are derived data, no need to store them
+        return {'links': self.links, 'existing': self.existing, 'categories': self.categories, }
+
+    def _set_data(self, data):
+        self.existing = data['existing']
+        for pagename, links in data['links'].items():
+            self._set_links(pagename, links, data['categories'].get(pagename))
+
+    def _pagenames(self, request):
+        return request.rootpage.getPageList(user='', exists=1)
+
+    # queries ----------------------------------------------------------------
+
+    def links_from(self, pagename):
+        """ Return a list of the page names pagename links to """
+        _lock.acquire()
+        try:
+            return list(self.links.get(pagename, []))
+        finally:
+            _lock.release()
+
+    def links_to(self, pagename):
+        """ Return a set of the (existing) page names linking to pagename """
+        _lock.acquire()
+        try:
+            return set(self.backlinks.get(pagename, ()))
+        finally:
+            _lock.release()
+
+    def targets(self):
+        """ Return a list of all link targets (existing or not) """
+        _lock.acquire()
+        try:
+            return list(self.backlinks.keys())
+        finally:
+            _lock.release()
+
+    def categories_of(self, pagename):
+        """ Return a list of the categories pagename belongs to """
+        _lock.acquire()
+        try:
+            return list(self.categories.get(pagename, []))
+        finally:
+            _lock.release()
+
+    def category_members(self, category):
+        """ Return a set of the pages belonging to category """
+        _lock.acquire()
+        try:
+            return set(self.members.get(category, ()))
+        finally:
+            _lock.release()
+
+    def all_categories(self):
+        """ Return a list of all categories having members """
+        _lock.acquire()
+        try:
+            return list(self.members.keys())
+        finally:
+            _lock.release()
+
+    def exists(self, pagename):
+        """ Return True if pagename exists """
+        return pagename in self.existing
+
+    def pages(self):
+        """ Return a set of the names of all existing pages """
+        _lock.acquire()
+        try:
+            return set(self.existing)
+        finally:
+            _lock.release()
+
+    def orphaned(self, pagenames):
+        """ Return a set of the pages not linked from any page
+
+        @param pagenames: names of the pages to look at, only links from these
+                          pages count (usually the pages the user may read)
+        """
+        pagenames = set(pagenames)
+        _lock.acquire()
+        try:
+            return set([name for name in pagenames
+                        if not pagenames.intersection(self.backlinks.get(name, ()))])
+        finally:
+            _lock.release()
+
+    def wanted(self, pagenames):
+        """ Return a dict of not existing pages linked from pagenames
+
+        @param pagenames: names of the pages to look at, only links from these
+                          pages count
+        @return: dict wanted pagename -> set of pages linking to it
+        """
+        wanted = {}
+        _lock.acquire()
+        try:
+            for name, linking in self.backlinks.items():
+                if name in self.existing:
+                    continue
+                linking = linking.intersection(pagenames)
+                if linking:
+                    wanted[name] = linking
+        finally:
+            _lock.release()
+        return wanted
+
+    # updates ----------------------------------------------------------------
+
+    def _set_links(self, pagename, links, categories=None):
+        """ Set the links and categories (a subset of links) of pagename """
+        for link in self.links.get(pagename, ()):
+            linking = self.backlinks.get(link)
+            if linking is not None:
+                linking.discard(pagename)
+                if not linking:
+                    del self.backlinks[link]
+        if links:
+            self.links[pagename] = list(links)
+            for link in links:
+                self.backlinks.setdefault(link, set()).add(pagename)
+        else:
+            self.links.pop(pagename, None)
+
+        for category in self.categories.get(pagename, ()):
+            members = self.members.get(category)
+            if members is not None:
+                members.discard(pagename)
+                if not members:
+                    del self.members[category]
+        if categories:
+            self.categories[pagename] = list(categories)
+            for category in categories:
+                self.members.setdefault(category, set()).add(pagename)
+        else:
+            self.categories.pop(pagename, None)
+
+    def _page_data(self, request, pagename):
+        """ Return the links and categories of page pagename (None if it does not exist) """
+        page = Page(request, pagename)
+        if not page.exists():
+            return None
+        # this may render the page, so we do it without holding the lock
+        links = page.getPageLinks(request)
+        return links, wikiutil.filterCategoryPages(request, links)
+
+    def _set_page_data(self, pagename, data):
+        """ Set links and existence of page pagename """
+        if data is not None:
+            self.existing.add(pagename)
+            links, categories = data
+            self._set_links(pagename, links, categories)
+        else:
+            self.existing.discard(pagename)
+            self._set_links(pagename, [])
+
+
+def get_linkgraph(request, create=True):
+    """ Return the up-to-date link graph of the wiki
+
+    @param create: if False and there is no link graph yet, return None
+                   instead of building it
+    """
+    return LinkGraph.get(request, create)
+
+
+def rebuild(request):
+    """ Build the link graph from scratch and save it """
+    return LinkGraph.rebuild(request)
+
+
+def remove(request):
+    """ Remove the saved link graph (it gets rebuilt when needed) """
+    LinkGraph.remove(request)
+
@@ -6,6 +6,8 @@
     @license: GNU GPL, see COPYING for details.
 """
 
+from MoinMoin.linkgraph import get_linkgraph
+
 Dependencies = ["pages"]
 
 def macro_OrphanedPages(macro):
@@ -16,15 +18,9 @@ def macro_OrphanedPages(macro):
     if macro.request.isSpiderAgent: # reduce bot cpu usage
         return ''
 
-    # delete all linked pages from a dict of all pages
-    pages = macro.request.rootpage.getPageDict()
-    orphaned = {}
-    orphaned.update(pages)
-    for page in list(pages.values()):
-        links = page.getPageLinks(macro.request)
-        for link in links:
-            if link in orphaned:
-                del orphaned[link]
+    # pages not linked from any page the user may read
+    pages = macro.request.rootpage.getPageList()
+    orphaned = get_linkgraph(macro.request).orphaned(pages)
 
     result = []
     f = macro.formatter
@@ -34,7 +30,7 @@ def macro_OrphanedPages(macro):
         result.append(f.paragraph(0))
     else:
         # return a list of page links
-        orphanednames = list(orphaned.keys())
+        orphanednames = list(orphaned)
         orphanednames.sort()
         result.append(f.number_list(1))
         for name in orphanednames:
@@ -162,6 +162,10 @@ class SystemInfo:
             t_count = None
 
         row(_('Active threads'), t_count or _('N/A'))
+
+        if request.cfg.response_cache:
+            from MoinMoin.web.responsecache import get_cache
+            row('Response cache', str(get_cache(request.cfg)))
         buf.write('</dl>')
 
         return buf.getvalue()
@@ -7,6 +7,7 @@
 """
 
 from MoinMoin import wikiutil
+from MoinMoin.linkgraph import get_linkgraph
 
 Dependencies = ["pages"]
 
@@ -34,32 +35,28 @@ def macro_WantedPages(macro):
     # Get page dict readable by current user
     pages = request.rootpage.getPageDict()
 
-    # build a dict of wanted pages
+    # Skip system pages, because missing translations are not wanted pages,
+    # unless you are a translator and clicked "Include system pages"
+    if allpages:
+        linking = pages
+    else:
+        linking = [name for name in pages if not wikiutil.isSystemPage(request, name)]
+
+    # build a dict of wanted pages (not existing pages linked from linking)
     wanted = {}
-    deprecated_links = []
-    for name, page in list(pages.items()):
-        # Skip system pages, because missing translations are not wanted pages,
-        # unless you are a translator and clicked "Include system pages"
-        if not allpages and wikiutil.isSystemPage(request, name):
+    deprecated = {}
+    for link, where in get_linkgraph(request).wanted(linking).items():
+        if not request.user.may.read(link):
             continue
-
-        # Add links to pages which do not exist in pages dict
-        links = page.getPageLinks(request)
-        is_deprecated = page.parse_processing_instructions(
-                ).get('deprecated', False)
-
-        for link in links:
-            if not link in pages and request.user.may.read(link):
-                if is_deprecated:
-                    deprecated_links.append(link)
-                if link in wanted:
-                    wanted[link][name] = 1
-                else:
-                    wanted[link] = {name: 1}
-
-    for link in deprecated_links:
-        if len(wanted[link]) == 1:
-            del wanted[link]
+        if len(where) == 1:
+            # a link only from a deprecated page does not make a page wanted
+            name = list(where)[0]
+            if name not in deprecated:
+                deprecated[name] = pages[name].parse_processing_instructions(
+                        ).get('deprecated', False)
+            if deprecated[name]:
+                continue
+        wanted[link] = where
 
     # Check for the extreme case when there are no wanted pages
     if not wanted:
@@ -81,7 +78,7 @@ def macro_WantedPages(macro):
 
         # Add links to pages that want this page, highliting
         # the link in those pages.
-        where = list(wanted[name].keys())
+        where = list(wanted[name])
         where.sort()
         if macro.formatter.page.page_name in where:
             where.remove(macro.formatter.page.page_name)
@@ -14,7 +14,7 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin.util import pysupport
+from MoinMoin.util import pysupport, pluginmanifest
 modules = pysupport.getPackageModules(__file__)
 
 from MoinMoin import log
@@ -163,11 +163,8 @@ class Macro:
     def get_dependencies(self, macro_name):
         if macro_name in self.Dependencies:
             return self.Dependencies[macro_name]
-        try:
-            return wikiutil.importPlugin(self.request.cfg, 'macro',
-                                         macro_name, 'Dependencies')
-        except wikiutil.PluginError:
-            return self.defaultDependency
+        return pluginmanifest.value(self.request.cfg, 'macro', macro_name,
+                                    'Dependencies', self.defaultDependency)
 
     def macro_TitleSearch(self):
         from MoinMoin.macro.FullSearch import search_box
@@ -0,0 +1,132 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - local SMTP sink
+
+    A minimal SMTP server that accepts all mail and keeps it in memory,
+    e.g. for testing mail notifications without a real mail relay:
+
+        sink = SMTPSink()
+        sink.start()
+        request.cfg.mail_smarthost = sink.address
+        ... send mail ...
+        sink.messages # list of (mail_from, recipients, data)
+        sink.stop()
+
+    It can also simulate a failing mail relay (see fail_count).
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import socketserver, threading
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """ Speaks just enough SMTP for smtplib.SMTP.sendmail """
+
+    def reply(self, line):
+        self.wfile.write(('%s\r\n' % line).encode('ascii'))
+
+    def handle(self):
+        sink = self.server.sink
+        self.reply('220 localhost MoinMoin SMTP sink')
+        mail_from, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            line = line.decode('latin-1').rstrip('\r\n')
+            command = line[:4].upper()
+            if command in ('HELO', 'EHLO', ):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                if sink.should_fail():
+                    self.reply('451 temporary failure (simulated)')
+                    continue
+                mail_from, recipients = line[5:].split(':', 1)[1].strip().strip('<>'), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipients.append(line[5:].split(':', 1)[1].strip().strip('<>'))
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 end data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                    if line.startswith(b'..'):
+                        line = line[1:]
+                    data.append(line)
+                sink.add(mail_from, recipients, b''.join(data))
+                mail_from, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'RSET':
+                mail_from, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                break
+            else:
+                self.reply('502 command not implemented')
+
+
+class SMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink(object):
+    """ Accepts all mail on localhost and keeps it in memory """
+
+    def __init__(self, host='127.0.0.1', port=0, fail_count=0):
+        """
+        @param port: TCP port (0 = some free port, see address)
+        @param fail_count: reject that many mails (temporary failure) first
+        """
+        self.server = SMTPServer((host, port), SMTPHandler)
+        self.server.sink = self
+        self.fail_count = fail_count
+        self.messages = [] # list of (mail_from, recipients, data)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def address(self):
+        """ host:port, as used for cfg.mail_smarthost """
+        return '%s:%d' % self.server.server_address[:2]
+
+    def should_fail(self):
+        self._lock.acquire()
+        try:
+            if self.fail_count > 0:
+                self.fail_count -= 1
+                return True
+            return False
+        finally:
+            self._lock.release()
+
+    def add(self, mail_from, recipients, data):
+        self._lock.acquire()
+        try:
+            self.messages.append((mail_from, recipients, data))
+        finally:
+            self._lock.release()
+        logging.debug("SMTP sink got mail from %r to %r" % (mail_from, recipients))
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="SMTP sink")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
@@ -17,6 +17,7 @@ import py
 from MoinMoin.Page import Page
 from MoinMoin.parser.text_moin_wiki import Parser as WikiParser
 from MoinMoin.formatter.text_html import Formatter as HtmlFormatter
+from MoinMoin._tests import parsercorpus
 
 PAGENAME = 'ThisPageDoesNotExistsAndWillNeverBeReally'
 
@@ -575,5 +576,39 @@ class TestMacrosInOneLine(ParserTestCase):
             assert result == expected
 
 
+class TestBenchmarkCorpus(object):
+    """ parser.wiki: the fast paths must not change the rendering of the benchmark corpus """
+
+    def testReplaceType(self):
+        """ parser.wiki: the group closed last is the markup matched """
+        for pagename, body in parsercorpus.corpus(self.request):
+            for line in body.splitlines():
+                for match in WikiParser.scan_re.finditer(line + ' '):
+                    types = [type for type, hit in match.groupdict().items()
+                             if hit is not None and type not in WikiParser.no_repl_groups]
+                    assert match.lastgroup == types[0]
+
+    def testJoinedText(self):
+        """ parser.wiki: joining adjacent text gives the same html """
+        for pagename, body in parsercorpus.corpus(self.request, sizes=(20 * 1024, )):
+            joined = parsercorpus.render(self.request, pagename, body)
+            HtmlFormatter.joinable_text = False
+            try:
+                separate = parsercorpus.render(self.request, pagename, body)
+            finally:
+                HtmlFormatter.joinable_text = True
+            assert joined == separate
+
+    def testSyntheticPage(self):
+        """ parser.wiki: synthetic pages have the size wanted and all kinds of markup """
+        body = parsercorpus.synthetic_page(20 * 1024)
+        assert len(body) >= 20 * 1024
+        types = set()
+        for line in body.splitlines():
+            types.update([match.lastgroup for match in WikiParser.scan_re.finditer(line + ' ')])
+        for type in ('heading', 'emph', 'word', 'link', 'transclude', 'url', 'email', 'table',
+                     'parser', 'macro', 'sgml_entity', 'entity', 'li', 'ol', 'dl', 'smiley'):
+            assert type in types
+
 coverage_modules = ['MoinMoin.parser.text_moin_wiki']
 
@@ -242,7 +242,8 @@ class Parser:
     %s\}\}\}  # in parser/pre, we only look for the end of the parser/pre
 )
 """
-
+    # compiled parser_scan_rule by parser_unique (see _parser_scan_re)
+    _parser_scan_res = {}
 
     # the big, fat, less ugly one ;)
     # please be very careful: blanks and # must be escaped with \ !
@@ -393,6 +394,9 @@ class Parser:
     no_new_p_before = no_new_p_before.split()
     no_new_p_before = dict(list(zip(no_new_p_before, [1] * len(no_new_p_before))))
 
+    # the scan_re groups which are not a complete markup (handled by replace)
+    no_repl_groups = ("hmarker", )
+
     def __init__(self, raw, request, **kw):
         self.raw = raw
         self.request = request
@@ -434,6 +438,11 @@ class Parser:
         self.list_indents = []
         self.list_types = []
 
+        # _<type>_repl methods by type, filled by replace
+        self._repl_funcs = {}
+        # whether to give adjacent text fragments to formatter.text at once
+        self._join_text = False
+
     def _close_item(self, result):
         #result.append("<!-- close item begin -->\n")
         if self.in_table:
@@ -1331,6 +1340,18 @@ class Parser:
     _macro_name_repl = _macro_repl
     _macro_args_repl = _macro_repl
 
+    def _parser_scan_re(self):
+        """ Return the compiled parser_scan_rule for the current parser_unique """
+        key = (self.parser_scan_rule, self.parser_unique)
+        parser_scan_re = self._parser_scan_res.get(key)
+        if parser_scan_re is None:
+            if len(self._parser_scan_res) > 100:
+                # parser_unique comes from the markup, do not grow forever
+                self._parser_scan_res.clear()
+            parser_scan_re = re.compile(self.parser_scan_rule % re.escape(self.parser_unique), re.VERBOSE|re.UNICODE)
+            self._parser_scan_res[key] = parser_scan_re
+        return parser_scan_re
+
     def scan(self, line, inhibit_p=False):
         """ Scans one line
         Append text before match, invoke replace() with match, and add text after match.
@@ -1338,12 +1359,16 @@ class Parser:
         result = []
         lastpos = 0 # absolute position within line
         line_length = len(line)
+        formatter = self.formatter
+        # text not given to formatter.text yet (only used if self._join_text)
+        text = []
 
         ###result.append(u'<span class="info">[scan: <tt>"%s"</tt>]</span>' % line)
         while lastpos <= line_length: # it is <=, not <, because we need to process the empty line also
-            parser_scan_re = re.compile(self.parser_scan_rule % re.escape(self.parser_unique), re.VERBOSE|re.UNICODE)
-            scan_re = self.in_pre and parser_scan_re or self.scan_re
-            match = scan_re.search(line, lastpos)
+            if self.in_pre:
+                match = self._parser_scan_re().search(line, lastpos)
+            else:
+                match = self.scan_re.search(line, lastpos)
             if match:
                 start = match.start()
                 if lastpos < start:
@@ -1351,16 +1376,30 @@ class Parser:
                         self._parser_content(line[lastpos:start])
                     else:
                         ###result.append(u'<span class="info">[add text before match: <tt>"%s"</tt>]</span>' % line[lastpos:match.start()])
-                        if not (inhibit_p or self.inhibit_p or self.in_pre or self.formatter.in_p):
-                            result.append(self.formatter.paragraph(1, css_class="line862"))
+                        if not (inhibit_p or self.inhibit_p or self.in_pre or formatter.in_p):
+                            result.append(formatter.paragraph(1, css_class="line862"))
                         # add the simple text in between lastpos and beginning of current match
-                        result.append(self.formatter.text(line[lastpos:start]))
+                        if self._join_text:
+                            text.append(line[lastpos:start])
+                        else:
+                            result.append(formatter.text(line[lastpos:start]))
 
                 # Replace match with markup
-                if not (inhibit_p or self.inhibit_p or self.in_pre or self.formatter.in_p or
+                if not (inhibit_p or self.inhibit_p or self.in_pre or formatter.in_p or
                         self.in_table or self.in_list):
-                    result.append(self.formatter.paragraph(1, css_class="line867"))
-                result.append(self.replace(match, inhibit_p))
+                    if text:
+                        result.append(formatter.text(''.join(text)))
+                        text = []
+                    result.append(formatter.paragraph(1, css_class="line867"))
+                if (self._join_text and match.lastgroup == 'sgml_entity' and
+                    (inhibit_p or self.inhibit_p or formatter.in_p)):
+                    # that is just more text, see _sgml_entity_repl
+                    text.append(match.group())
+                else:
+                    if text:
+                        result.append(formatter.text(''.join(text)))
+                        text = []
+                    result.append(self.replace(match, inhibit_p))
                 end = match.end()
                 lastpos = end
                 if start == end:
@@ -1373,11 +1412,16 @@ class Parser:
                         self._parser_content(line[lastpos:])
                 elif line[lastpos:]:
                     ###result.append('<span class="info">[no match, add rest: <tt>"%s"<tt>]</span>' % line[lastpos:])
-                    if not (inhibit_p or self.inhibit_p or self.in_pre or self.formatter.in_p or
+                    if not (inhibit_p or self.inhibit_p or self.in_pre or formatter.in_p or
                             self.in_li or self.in_dd):
-                        result.append(self.formatter.paragraph(1, css_class="line874"))
+                        if text:
+                            result.append(formatter.text(''.join(text)))
+                            text = []
+                        result.append(formatter.paragraph(1, css_class="line874"))
                     # add the simple text (no markup) after last match
-                    result.append(self.formatter.text(line[lastpos:]))
+                    text.append(line[lastpos:])
+                if text:
+                    result.append(formatter.text(''.join(text)))
                 break # nothing left to do!
         return ''.join(result)
 
@@ -1392,30 +1436,36 @@ class Parser:
 
     def replace(self, match, inhibit_p=False):
         """ Replace match using type name """
-        result = []
-        for type, hit in list(match.groupdict().items()):
-            if hit is not None and not type in ["hmarker", ]:
-
-                ##result.append(u'<span class="info">[replace: %s: "%s"]</span>' % (type, hit))
-                # Open p for certain types
-                if not (inhibit_p or self.inhibit_p or self.formatter.in_p
-                        or self.in_pre or (type in self.no_new_p_before)):
-                    result.append(self.formatter.paragraph(1, css_class="line891"))
-
-                # Get replace method and replace hit
-                replace_func = getattr(self, '_%s_repl' % type)
-                result.append(replace_func(hit, match.groupdict()))
-                return ''.join(result)
-        else:
-            # We should never get here
-            import pprint
-            raise Exception("Can't handle match %r\n%s\n%s" % (
-                match,
-                pprint.pformat(match.groupdict()),
-                pprint.pformat(match.groups()),
-            ))
+        # every markup group of scan_rules encloses the other groups of its
+        # markup, so the group closed last is the markup we have matched
+        type = match.lastgroup
+        if type is None or type in self.no_repl_groups:
+            # not the case for some modified scan_rules, use the first group matching
+            for type, hit in match.groupdict().items():
+                if hit is not None and not type in self.no_repl_groups:
+                    break
+            else:
+                # We should never get here
+                import pprint
+                raise Exception("Can't handle match %r\n%s\n%s" % (
+                    match,
+                    pprint.pformat(match.groupdict()),
+                    pprint.pformat(match.groups()),
+                ))
 
-        return ""
+        result = []
+        ##result.append(u'<span class="info">[replace: %s: "%s"]</span>' % (type, match.group(type)))
+        # Open p for certain types
+        if not (inhibit_p or self.inhibit_p or self.formatter.in_p
+                or self.in_pre or (type in self.no_new_p_before)):
+            result.append(self.formatter.paragraph(1, css_class="line891"))
+
+        # Get replace method and replace hit
+        replace_func = self._repl_funcs.get(type)
+        if replace_func is None:
+            replace_func = self._repl_funcs[type] = getattr(self, '_%s_repl' % type)
+        result.append(replace_func(match.group(type), match.groupdict()))
+        return ''.join(result)
 
     def _line_anchordef(self):
         if self.line_anchors and not self.line_anchor_printed:
@@ -1430,6 +1480,9 @@ class Parser:
         """
         self.formatter = formatter
         self.hilite_re = self.formatter.page.hilite_re
+        # highlighting may find something in the joined text only
+        self._join_text = (getattr(formatter, 'joinable_text', False) and
+                           not getattr(formatter, '_highlight_re', None))
 
         # get text and replace TABs
         rawtext = self.raw.expandtabs()
@@ -11,7 +11,7 @@ MoinMoin - find inactive users (and disable / remove them)
 import sys, os
 
 from MoinMoin.script import MoinScript, log
-from MoinMoin.user import getUserList, User
+from MoinMoin.user import getUserList, get_users, User
 from MoinMoin.logfile import editlog
 
 class PluginScript(MoinScript):
@@ -120,8 +120,8 @@ General syntax: moin [options] account inactive [inactive-options]
             profile_uids = set(getUserList(request))
 
             inactive_uids = profile_uids - editlog_uids
-            for uid in inactive_uids:
-                u = User(request, uid)
+            for u in get_users(request, inactive_uids):
+                uid = u.id
                 if self.options.show:
                     print("%s\t%r\t%r\t%r" % (uid, u.name, u.email, u.disabled))
                 if self.options.disable:
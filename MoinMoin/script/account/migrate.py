@@ -0,0 +1,73 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - copy the user profiles into another user storage
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import sys
+
+from MoinMoin.script import MoinScript, log
+from MoinMoin import userstorage
+
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool copies all user profiles from the user profile files (one file per
+user in data/user) into another user storage, e.g. a sqlite database.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] account migrate [migrate-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[migrate-options] see below:
+    1. To copy the profiles into the user_storage configured for the wiki
+       (e.g. user_storage = userstorage.SQLiteUserStorage()):
+       moin ... account migrate
+
+    2. To copy the profiles into a sqlite database at some other place:
+       moin ... account migrate --sqlite=/path/to/users.sqlite
+
+    3. To copy the profiles from another directory:
+       moin ... account migrate --from-dir=/path/to/old/user
+
+    The profile files are not modified. Existing profiles with the same user
+    id in the target storage get replaced.
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--from-dir", metavar="DIR", dest="from_dir",
+            help="Read the profile files from DIR (default: the user_dir of the wiki)."
+        )
+        self.parser.add_option(
+            "--sqlite", metavar="PATH", dest="sqlite",
+            help="Copy the profiles into the sqlite database at PATH (default: the configured user_storage)."
+        )
+
+    def mainloop(self):
+        self.init_request()
+        request = self.request
+
+        source = userstorage.FileUserStorage(self.options.from_dir)
+        if self.options.sqlite:
+            target = userstorage.SQLiteUserStorage(self.options.sqlite)
+        else:
+            target = request.cfg.user_storage
+        if isinstance(target, userstorage.FileUserStorage):
+            print("The configured user_storage keeps profile files, use --sqlite=PATH or configure another user_storage.")
+            sys.exit(1)
+
+        uids = source.list_ids(request)
+        log("copying %d user profiles..." % len(uids))
+        profiles = ((uid, list(profile.items())) for uid, profile in source.load_many(request, uids))
+        count = target.save_many(request, profiles)
+        log("copied %d user profiles." % count)
+
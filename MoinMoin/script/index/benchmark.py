@@ -0,0 +1,87 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - xapian tokenizer benchmark
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import time
+
+from MoinMoin.script import MoinScript
+from MoinMoin.Page import Page
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool measures how fast the xapian indexer can tokenize (split and stem)
+the pages of your wiki, with and without the tokenizer caches.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] index benchmark [benchmark-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[benchmark-options] see below:
+    1. Tokenize all pages, once without caches, then twice with caches:
+       moin ... index benchmark
+
+    2. Only use the first 100 pages, repeat each run 3 times:
+       moin ... index benchmark --pages=100 --repeat=3
+
+    The index itself is not touched.
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--pages", metavar="COUNT", dest="pages", type="int", default=0,
+            help="only tokenize that many pages (default: all pages)"
+        )
+        self.parser.add_option(
+            "--repeat", metavar="COUNT", dest="repeat", type="int", default=1,
+            help="how often to tokenize the pages in each run"
+        )
+
+    def tokenize_documents(self, analyzer, documents):
+        """ tokenize documents like the indexer does, return (seconds, words) """
+        words = 0
+        start = time.time()
+        for i in range(self.options.repeat):
+            for title, content in documents:
+                for tokens in analyzer.tokenize_batch([title, content]):
+                    words += len(tokens)
+        return time.time() - start, words
+
+    def report(self, name, seconds, words, pages):
+        seconds = max(seconds, 0.000001)
+        print("%-20s %8.2fs %10.0f pages/s %12.0f words/s" % (
+            name, seconds, pages / seconds, words / seconds))
+
+    def mainloop(self):
+        self.init_request()
+        request = self.request
+        from MoinMoin.search.Xapian.tokenizer import WikiAnalyzer, clear_caches
+
+        pagenames = request.rootpage.getPageList(user='', exists=1)
+        pagenames.sort()
+        if self.options.pages:
+            pagenames = pagenames[:self.options.pages]
+        documents = [(pagename, Page(request, pagename).get_raw_body()) for pagename in pagenames]
+        pages = len(documents) * self.options.repeat
+        language = request.cfg.language_default
+
+        analyzer = WikiAnalyzer(request=request, language=language, cache_size=0)
+        seconds, words = self.tokenize_documents(analyzer, documents)
+        self.report("without caches", seconds, words, pages)
+
+        clear_caches()
+        analyzer = WikiAnalyzer(request=request, language=language)
+        seconds, words = self.tokenize_documents(analyzer, documents)
+        self.report("caches (cold)", seconds, words, pages)
+        seconds, words = self.tokenize_documents(analyzer, documents)
+        self.report("caches (warm)", seconds, words, pages)
+
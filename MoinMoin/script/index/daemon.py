@@ -0,0 +1,94 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - xapian indexer daemon
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import time
+
+from MoinMoin.script import MoinScript
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool runs a long running process that does the queued updates of
+xapian's index of Moin, so that wiki processes do not need to update the
+index while processing requests.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] index daemon [daemon-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[daemon-options] see below:
+    Please note:
+    * You must run this script as the owner of the wiki files,
+      usually this is the web server user.
+    * Set xapian_index_daemon = True in your wiki config, otherwise wiki
+      processes will still update the index themselves.
+
+    1. Run the daemon (until it gets killed):
+       moin ... index daemon
+
+    2. Process the queue once and exit (e.g. from cron):
+       moin ... index daemon --once
+
+    3. Show queue depth, lag and other metrics:
+       moin ... index daemon --status
+
+    --batch-size, --concurrency and --poll-interval override the
+    xapian_index_daemon_* settings of the wiki config.
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--batch-size", metavar="COUNT", dest="batch_size", type="int",
+            help="how many queue entries to process at once"
+        )
+        self.parser.add_option(
+            "--concurrency", metavar="THREADS", dest="concurrency", type="int",
+            help="how many threads to use for running attachment text filters"
+        )
+        self.parser.add_option(
+            "--poll-interval", metavar="SECONDS", dest="poll_interval", type="float",
+            help="how long to wait before looking at the queue again when idle"
+        )
+        self.parser.add_option(
+            "--once", action="store_true", dest="once",
+            help="process the queue until it is empty, then exit"
+        )
+        self.parser.add_option(
+            "--status", action="store_true", dest="status",
+            help="show queue depth, lag and indexer daemon metrics, then exit"
+        )
+
+    def mainloop(self):
+        self.init_request()
+        from MoinMoin.search.Xapian.daemon import IndexerDaemon
+        daemon = IndexerDaemon(self.request,
+                               batch_size=self.options.batch_size,
+                               concurrency=self.options.concurrency,
+                               poll_interval=self.options.poll_interval)
+        if self.options.status:
+            stats = daemon.load_stats()
+            print("queue depth: %d" % stats['depth'])
+            print("queue lag: %0.1fs" % stats['lag'])
+            if 'updated' in stats:
+                print("processed entries: %d (in %d runs)" % (stats['processed'], stats['runs']))
+                print("last run: %s" % time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['updated'])))
+            else:
+                print("indexer daemon has not run yet")
+        elif self.options.once:
+            daemon.run_once()
+        else:
+            try:
+                daemon.run()
+            except KeyboardInterrupt:
+                pass
+
@@ -0,0 +1,97 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - wiki parser benchmark
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin.script import MoinScript
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool measures how fast the moin wiki parser renders pages to html
+(like when a page is viewed and its rendering is not cached), using the
+benchmark corpus: the HelpOn* pages of your wiki plus synthetic pages.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] maint benchparser [benchparser-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[benchparser-options] see below:
+    1. Render each page of the corpus 3 times, show the best times:
+       moin ... maint benchparser
+
+    2. Only use synthetic pages of 200 KB and 1 MB, render them 10 times:
+       moin ... maint benchparser --no-help-pages --size=200 --size=1024 --repeat=10
+
+    3. View some existing pages via the WSGI application, with and without
+       stream_pages, showing the time to the first byte and the total time:
+       moin ... maint benchparser --view=HelpOnMoinWikiSyntax --view=HelpOnTables
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--repeat", metavar="COUNT", dest="repeat", type="int", default=3,
+            help="how often to render each page (default: 3)"
+        )
+        self.parser.add_option(
+            "--size", metavar="KB", dest="sizes", type="int", action="append",
+            help="size of a synthetic page to render (default: 20 and 200)"
+        )
+        self.parser.add_option(
+            "--no-help-pages", action="store_false", dest="help_pages", default=True,
+            help="do not render the HelpOn* pages"
+        )
+        self.parser.add_option(
+            "--view", metavar="PAGENAME", dest="views", action="append",
+            help="measure viewing this page via the WSGI application instead of rendering the corpus"
+        )
+
+    def views(self):
+        from MoinMoin._tests import parsercorpus
+        from MoinMoin.wsgiapp import Application
+        request = self.request
+        cfg = request.cfg
+        application = Application()
+        stream_pages = cfg.stream_pages
+        try:
+            for pagename in self.options.views:
+                for cfg.stream_pages in (False, True, ):
+                    timings = [parsercorpus.view(application, request.url_root, pagename)
+                               for i in range(self.options.repeat)]
+                    first_byte, total, size = min(timings)
+                    print("%-40s %-12s %8d bytes %8.1fms first byte %8.1fms total" % (
+                          pagename, cfg.stream_pages and "streamed" or "not streamed", size, 1000 * first_byte, 1000 * total))
+        finally:
+            cfg.stream_pages = stream_pages
+
+    def mainloop(self):
+        self.init_request()
+        if self.options.views:
+            self.views()
+            return
+        from MoinMoin._tests import parsercorpus
+        request = self.request
+        sizes = parsercorpus.SYNTHETIC_SIZES
+        if self.options.sizes:
+            sizes = [size * 1024 for size in self.options.sizes]
+        if self.options.help_pages:
+            pages = parsercorpus.corpus(request, sizes)
+        else:
+            pages = parsercorpus.synthetic_pages(sizes)
+
+        total_size = total_time = 0
+        for pagename, size, seconds in parsercorpus.benchmark(request, pages, self.options.repeat):
+            print("%-40s %8d bytes %8.1fms %8.0f KB/s" % (pagename, size, 1000 * seconds, size / 1024.0 / max(seconds, 1e-6)))
+            total_size += size
+            total_time += seconds
+        print("%-40s %8d bytes %8.1fms %8.0f KB/s" % ("total (%d pages)" % len(pages), total_size, 1000 * total_time,
+                                                     total_size / 1024.0 / max(total_time, 1e-6)))
+
@@ -0,0 +1,108 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - benchmark for preloading server processes before forking
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import os
+
+from MoinMoin.script import MoinScript
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool shows what preloading (see MoinMoin.web.preload) saves for the
+worker processes of a forking server: it forks workers without and with
+preloading the master and shows the time of their first requests and their
+memory usage after them.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] maint benchpreload [benchpreload-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[benchpreload-options] see below:
+    1. View FrontPage 3 times in each worker:
+       moin ... maint benchpreload
+
+    2. View some pages in each worker, freeze the preloaded objects:
+       moin ... maint benchpreload --view=FrontPage --view=RecentChanges --freeze
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--view", metavar="PAGENAME", dest="views", action="append",
+            help="page to view in each worker (default: FrontPage)"
+        )
+        self.parser.add_option(
+            "--repeat", metavar="COUNT", dest="repeat", type="int", default=3,
+            help="how often each worker views each page (default: 3)"
+        )
+        self.parser.add_option(
+            "--freeze", action="store_true", dest="freeze", default=False,
+            help="freeze the preloaded objects (gc.freeze)"
+        )
+
+    def worker(self, url):
+        """ fork a worker viewing the pages, return its timings and memory usage """
+        from MoinMoin._tests import parsercorpus
+        from MoinMoin.web.preload import memory_usage
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if not pid:
+            os.close(rfd)
+            try:
+                from MoinMoin.wsgiapp import Application
+                application = Application()
+                timings = []
+                for pagename in self.options.views:
+                    for i in range(self.options.repeat):
+                        first_byte, total, size = parsercorpus.view(application, url, pagename)
+                        timings.append((pagename, i, total))
+                result = repr((timings, memory_usage()))
+                os.write(wfd, result.encode('ascii'))
+            finally:
+                os._exit(0)
+        os.close(wfd)
+        data = []
+        while True:
+            chunk = os.read(rfd, 65536)
+            if not chunk:
+                break
+            data.append(chunk)
+        os.close(rfd)
+        os.waitpid(pid, 0)
+        if not data:
+            raise RuntimeError("worker failed, see the log")
+        import ast
+        return ast.literal_eval(b''.join(data).decode('ascii'))
+
+    def show(self, title, timings, memory):
+        rss, private = memory
+        for pagename, i, seconds in timings:
+            print("%-12s %-40s view %d %8.1fms" % (title, pagename, i + 1, 1000 * seconds))
+        print("%-12s rss %s KB, private %s KB" % (title, rss, private))
+
+    def mainloop(self):
+        if not hasattr(os, 'fork'):
+            print("this benchmark needs os.fork")
+            return
+        if not self.options.views:
+            self.options.views = ['FrontPage']
+        url = self.options.wiki_url or 'http://localhost:0/'
+        if '://' not in url:
+            url = 'http://' + url
+
+        # workers forked from a master that did nothing yet
+        self.show("cold", *self.worker(url))
+
+        from MoinMoin.web import preload
+        report = preload.preload(freeze=self.options.freeze)
+        print(str(report))
+        self.show("preloaded", *self.worker(url))
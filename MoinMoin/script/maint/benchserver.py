@@ -0,0 +1,189 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - load test for the standalone server with worker processes
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import os, signal, socket, time
+
+from MoinMoin.script import MoinScript
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool measures the throughput (requests per second) of the standalone
+server in prefork mode (see MoinMoin.web.prefork) with different amounts of
+worker processes, to show how it scales over the cpu cores.
+
+For each amount of workers, it starts a server on a free port of
+127.0.0.1, then client processes view a page via HTTP as often as they can.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] maint benchserver [benchserver-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[benchserver-options] see below:
+    1. View FrontPage with 1, 2, 4, ... workers (up to the amount of cpu cores):
+       moin ... maint benchserver
+
+    2. View RecentChanges with 1 and 8 workers, 16 clients, 30s each:
+       moin ... maint benchserver --view=RecentChanges --workers=1 --workers=8 --clients=16 --duration=30
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--view", metavar="PAGENAME", dest="view", default="FrontPage",
+            help="page to view (default: FrontPage)"
+        )
+        self.parser.add_option(
+            "--workers", metavar="COUNT", dest="workers", type="int", action="append",
+            help="amount of workers to measure (default: 1, 2, 4, ... up to the amount of cpu cores)"
+        )
+        self.parser.add_option(
+            "--clients", metavar="COUNT", dest="clients", type="int",
+            help="amount of client processes (default: 2 * the maximum amount of workers)"
+        )
+        self.parser.add_option(
+            "--duration", metavar="SECONDS", dest="duration", type="float", default=10.0,
+            help="how long to measure each amount of workers (default: 10)"
+        )
+        self.parser.add_option(
+            "--no-preload", action="store_false", dest="preload", default=True,
+            help="do not preload the wikis in the server"
+        )
+
+    def start_server(self, workers):
+        """ start a server in a child process, return its pid and port """
+        from MoinMoin.web.prefork import PreforkServer
+        from MoinMoin.web.serving import make_application, RequestHandler
+
+        class QuietRequestHandler(RequestHandler):
+            def log_request(self, code='-', size='-'):
+                pass
+
+        server = PreforkServer('127.0.0.1', 0, make_application(shared=False),
+                               workers=workers, preload=self.options.preload,
+                               request_handler=QuietRequestHandler)
+        server.bind()
+        pid = os.fork()
+        if not pid:
+            try:
+                server.run()
+            finally:
+                os._exit(0)
+        server.socket.close()
+        return pid, server.port
+
+    def stop_server(self, pid):
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+    def get(self, port, host, path):
+        """ GET path, return the status """
+        import http.client
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        try:
+            conn.request('GET', path, headers={'Host': host})
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def wait_for_server(self, port, host, path, timeout=120):
+        deadline = time.time() + timeout
+        while True:
+            try:
+                return self.get(port, host, path)
+            except (socket.error, EnvironmentError):
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def client(self, port, host, path, until):
+        """ fork a client viewing path until the time until, return a pipe
+        to read the amount of requests and errors from
+        """
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if not pid:
+            os.close(rfd)
+            requests = errors = 0
+            try:
+                while time.time() < until:
+                    try:
+                        status = self.get(port, host, path)
+                    except (socket.error, EnvironmentError):
+                        status = None
+                    if status == 200:
+                        requests += 1
+                    else:
+                        errors += 1
+                os.write(wfd, ('%d %d' % (requests, errors)).encode('ascii'))
+            finally:
+                os._exit(0)
+        os.close(wfd)
+        return pid, rfd
+
+    def measure(self, workers, clients, host, path):
+        """ return requests per second and errors with that many workers """
+        pid, port = self.start_server(workers)
+        try:
+            self.wait_for_server(port, host, path)
+            until = time.time() + self.options.duration
+            children = [self.client(port, host, path, until) for i in range(clients)]
+            requests = errors = 0
+            for child_pid, rfd in children:
+                data = b''
+                while True:
+                    chunk = os.read(rfd, 100)
+                    if not chunk:
+                        break
+                    data += chunk
+                os.close(rfd)
+                os.waitpid(child_pid, 0)
+                if data:
+                    r, e = data.split()
+                    requests += int(r)
+                    errors += int(e)
+            return requests / self.options.duration, errors
+        finally:
+            self.stop_server(pid)
+
+    def mainloop(self):
+        if not hasattr(os, 'fork'):
+            print("this benchmark needs os.fork")
+            return
+        from urllib.parse import urlsplit
+        from MoinMoin import wikiutil
+        url = self.options.wiki_url or 'http://localhost/'
+        if '://' not in url:
+            url = 'http://' + url
+        url = urlsplit(url)
+        host = url.netloc
+        path = '%s/%s' % (url.path.rstrip('/'), wikiutil.quoteWikinameURL(self.options.view))
+
+        workers = self.options.workers
+        if not workers:
+            cpus = os.cpu_count() or 1
+            workers = [1]
+            while workers[-1] * 2 <= cpus:
+                workers.append(workers[-1] * 2)
+            if workers[-1] != cpus:
+                workers.append(cpus)
+        clients = self.options.clients or 2 * max(workers)
+
+        print("%d cpus, %d clients, %s%s" % (os.cpu_count() or 1, clients, host, path))
+        base = None
+        for count in workers:
+            rate, errors = self.measure(count, clients, host, path)
+            if base is None:
+                base = rate or 1.0
+            print("%3d workers %8.1f requests/s %6.2fx %d errors" % (count, rate, rate / base, errors))
@@ -0,0 +1,139 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - session service benchmark
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import os, random, shutil, tempfile, time
+
+from MoinMoin.script import MoinScript
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool measures how the session services perform with many stored
+sessions: loading a session (get_session), storing a modified session (what
+finalize does at the end of a request) and removing expired sessions.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] maint benchsessions [benchsessions-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[benchsessions-options] see below:
+    1. Benchmark the sqlite session service with 1000000 sessions:
+       moin ... maint benchsessions
+
+    2. Compare with the file session service, using less sessions:
+       moin ... maint benchsessions --sessions=100000 --service=sqlite --service=file
+
+    The sessions are created in a temporary directory, your wiki's sessions
+    are not touched. Half of the sessions are created as expired ones.
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--sessions", metavar="COUNT", dest="sessions", type="int", default=1000000,
+            help="how many sessions to create (default: 1000000)"
+        )
+        self.parser.add_option(
+            "--samples", metavar="COUNT", dest="samples", type="int", default=10000,
+            help="how many sessions to load and save for measuring (default: 10000)"
+        )
+        self.parser.add_option(
+            "--service", metavar="NAME", dest="services", action="append",
+            help="session service to benchmark: sqlite or file (default: sqlite)"
+        )
+
+    def get_service(self, name):
+        from MoinMoin.web.session import FileSessionService, SQLiteSessionService
+        return {'sqlite': SQLiteSessionService, 'file': FileSessionService}[name]()
+
+    def populate(self, service, count, now):
+        """ create count sessions, return the sids of the unexpired ones """
+        store = service._store_get(self.request)
+        sids = []
+        batch = []
+        for i in range(count):
+            session = store.new()
+            session['user.id'] = '%d.%d' % (now, i % 1000)
+            session['user.auth_method'] = 'moin'
+            session['user.auth_attribs'] = ()
+            # every other session is expired
+            if i % 2:
+                session['expires'] = now - 3600
+            else:
+                session['expires'] = now + 3600
+                sids.append(session.sid)
+            batch.append(session)
+            if len(batch) >= 10000:
+                self.save_batch(store, batch)
+                batch = []
+        self.save_batch(store, batch)
+        return sids
+
+    def save_batch(self, store, sessions):
+        if hasattr(store, 'save_many'):
+            store.save_many(sessions)
+        else:
+            for session in sessions:
+                store.save(session)
+
+    def report(self, name, timings):
+        timings.sort()
+        count = len(timings)
+        print("  %-10s %8.3fms avg %8.3fms p50 %8.3fms p99" % (
+            name, 1000 * sum(timings) / count, 1000 * timings[count // 2], 1000 * timings[min(count - 1, count * 99 // 100)]))
+
+    def benchmark(self, name):
+        request = self.request
+        service = self.get_service(name)
+        now = int(time.time())
+        print("%s: creating %d sessions ..." % (name, self.options.sessions))
+        start = time.time()
+        sids = self.populate(service, self.options.sessions, now)
+        print("  created in %0.1fs" % (time.time() - start))
+
+        samples = random.sample(sids, min(self.options.samples, len(sids)))
+        get_timings, save_timings, new_timings = [], [], []
+        for sid in samples:
+            t = time.time()
+            session = service.get_session(request, sid)
+            get_timings.append(time.time() - t)
+            session['expires'] = now + 7200
+            t = time.time()
+            service._store_get(request).save(session)
+            save_timings.append(time.time() - t)
+        store = service._store_get(request)
+        for i in range(len(samples)):
+            # a cookie for an unknown session (e.g. an expired one)
+            t = time.time()
+            service.get_session(request, store.generate_key())
+            new_timings.append(time.time() - t)
+        self.report("get", get_timings)
+        self.report("save", save_timings)
+        self.report("unknown", new_timings)
+
+        start = time.time()
+        count = service.destroy_sessions(request, expired_before=now)
+        print("  removed %d expired sessions in %0.1fs" % (count, time.time() - start))
+
+    def mainloop(self):
+        self.init_request()
+        cfg = self.request.cfg
+        session_dir = cfg.session_dir
+        tmpdir = tempfile.mkdtemp(prefix='moin-sessions-')
+        try:
+            for name in self.options.services or ['sqlite']:
+                cfg.session_dir = os.path.join(tmpdir, name)
+                self.benchmark(name)
+        finally:
+            cfg.session_dir = session_dir
+            shutil.rmtree(tmpdir, True)
+
@@ -7,8 +7,9 @@ MoinMoin - cleancache script
 @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin import caching, i18n, user
+from MoinMoin import caching, i18n, linkgraph, user
 from MoinMoin.Page import Page
+from MoinMoin.search.filtercache import FilterCache
 from MoinMoin.script import MoinScript
 
 class PluginScript(MoinScript):
@@ -59,9 +60,10 @@ General syntax: moin [options] maint cleancache
         for arena, key in arena_key_list:
             caching.CacheEntry(request, arena, key, scope='wiki').remove()
 
-        # clean dict and groups related cache
+        # clean dict and groups related cache and cached responses
         arena_scope_list =  [('pagedicts', 'wiki'),
                              ('pagegroups', 'wiki'),
+                             ('responses', 'wiki'),
                              ('users', 'userdir'),
         ]
         for arena, scope in arena_scope_list:
@@ -73,6 +75,12 @@ General syntax: moin [options] maint cleancache
         for key in uids:
             caching.CacheEntry(request, 'drafts', key, scope='wiki').remove()
 
+        # clean the link graph
+        linkgraph.remove(request)
+
+        # clean cached output of the search indexing filters
+        FilterCache(request).clear()
+
         # clean language cache files
         caching.CacheEntry(request, 'i18n', 'meta', scope='wiki').remove()
         wiki_languages = list(i18n.wikiLanguages().keys())
@@ -3,11 +3,12 @@
 MoinMoin - cleansessions script
 
 @copyright: 2009 MoinMoin:ReimarBauer,
-            2010 MoinMoin:ThomasWaldmann
+            2010 MoinMoin:ThomasWaldmann,
+            2026 MoinMoin:MoinCoreTeam
 @license: GNU GPL, see COPYING for details.
 """
 
-import os, time
+import time
 
 from MoinMoin import user
 from MoinMoin.script import MoinScript
@@ -46,17 +47,12 @@ General syntax: moin [options] maint cleansessions [cleansessions-options]
     def mainloop(self):
         self.init_request()
         request = self.request
-        checks = []
+        expired_before = user_id = None
 
         if not self.options.all_sessions:
-            now = time.time()
-            def session_expired(session):
-                try:
-                    return session['expires'] < now
-                except KeyError:
-                    # this is likely a pre-1.9.1 session file without expiry
-                    return True # consider it expired
-            checks.append(session_expired)
+            # sessions without expiry (likely pre-1.9.1 session files) are
+            # considered expired
+            expired_before = time.time()
 
         if self.options.username:
             u = user.User(request, None, self.options.username)
@@ -64,22 +60,8 @@ General syntax: moin [options] maint cleansessions [cleansessions-options]
                 print('User "%s" does not exist!' % self.options.username)
                 return
             else:
-                def user_matches(session):
-                    try:
-                        return session['user.id'] == u.id
-                    except KeyError:
-                        return False
-                checks.append(user_matches)
+                user_id = u.id
 
+        # if ALL conditions are met, the session will be destroyed
         session_service = request.cfg.session_service
-        for sid in session_service.get_all_session_ids(request):
-            session = session_service.get_session(request, sid)
-
-            # if ALL conditions are met, the session will be destroyed
-            killit = True
-            for check in checks:
-                killit = killit and check(session)
-
-            if killit:
-                session_service.destroy_session(request, session)
-
+        session_service.destroy_sessions(request, expired_before=expired_before, user_id=user_id)
@@ -6,8 +6,9 @@ MoinMoin - makecache script
 @license: GNU GPL, see COPYING for details.
 """
 
-from MoinMoin import caching
+from MoinMoin import caching, linkgraph
 from MoinMoin.Page import Page
+from MoinMoin.datastruct.backends.wiki_groups import WikiGroupsIndex
 from MoinMoin.script import MoinScript
 from MoinMoin.stats import hitcounts
 
@@ -46,3 +47,7 @@ General syntax: moin [options] maint makecache
             request.page = page
             p = page.getPageLinks(request)
 
+        # build the link graph from the pagelinks
+        linkgraph.rebuild(request)
+        # and the wiki groups index from the group pages
+        WikiGroupsIndex.rebuild(request)
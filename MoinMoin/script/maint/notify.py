@@ -0,0 +1,91 @@
+# -*- coding: iso-8859-1 -*-
+"""
+MoinMoin - notification delivery worker
+
+@copyright: 2026 MoinMoin:MoinCoreTeam
+@license: GNU GPL, see COPYING for details.
+"""
+
+import time
+
+from MoinMoin.script import MoinScript
+
+class PluginScript(MoinScript):
+    """\
+Purpose:
+========
+This tool runs a long running process that delivers the queued mail and
+jabber notifications of the wiki, so that wiki processes do not need to
+talk to the mail relay or the notification bot while processing requests.
+
+Detailed Instructions:
+======================
+General syntax: moin [options] maint notify [notify-options]
+
+[options] usually should be:
+    --config-dir=/path/to/my/cfg/ --wiki-url=http://wiki.example.org/
+
+[notify-options] see below:
+    Please note:
+    * You must run this script as the owner of the wiki files,
+      usually this is the web server user.
+    * Set notification_queue = 'daemon' in your wiki config, otherwise wiki
+      processes will still deliver the notifications themselves.
+
+    1. Run the worker (until it gets killed):
+       moin ... maint notify
+
+    2. Deliver the due notifications once and exit (e.g. from cron):
+       moin ... maint notify --once
+
+    3. Show queue depth, lag and other metrics:
+       moin ... maint notify --status
+
+    --batch-size and --poll-interval override the notification_queue_*
+    settings of the wiki config.
+"""
+
+    def __init__(self, argv, def_values):
+        MoinScript.__init__(self, argv, def_values)
+        self.parser.add_option(
+            "--batch-size", metavar="COUNT", dest="batch_size", type="int",
+            help="how many queued notifications to deliver at once"
+        )
+        self.parser.add_option(
+            "--poll-interval", metavar="SECONDS", dest="poll_interval", type="float",
+            help="how long to wait before looking at the queue again when idle"
+        )
+        self.parser.add_option(
+            "--once", action="store_true", dest="once",
+            help="deliver the due notifications, then exit"
+        )
+        self.parser.add_option(
+            "--status", action="store_true", dest="status",
+            help="show queue depth, lag and notification worker metrics, then exit"
+        )
+
+    def mainloop(self):
+        self.init_request()
+        from MoinMoin.events.notifyqueue import NotificationWorker
+        worker = NotificationWorker(self.request,
+                                    batch_size=self.options.batch_size,
+                                    poll_interval=self.options.poll_interval)
+        if self.options.status:
+            stats = worker.load_stats()
+            print("queue depth: %d (%d due, %d waiting for retry)" % (
+                stats['depth'], stats['due'], stats['depth'] - stats['due']))
+            print("queue lag: %0.1fs" % stats['lag'])
+            if 'updated' in stats:
+                print("deliveries: %d sent, %d failed, %d notifications dropped, %d coalesced (in %d runs)" % (
+                    stats['sent'], stats['failed'], stats['dropped'], stats['coalesced'], stats['runs']))
+                print("last run: %s" % time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stats['updated'])))
+            else:
+                print("notification worker has not run yet")
+        elif self.options.once:
+            worker.run_once()
+        else:
+            try:
+                worker.run()
+            except KeyboardInterrupt:
+                pass
+
@@ -12,7 +12,7 @@ import signal
 
 from MoinMoin.script import MoinScript
 from MoinMoin.util.daemon import Daemon
-from MoinMoin.web.serving import run_server
+from MoinMoin.web.serving import run_server, uses_workers
 
 class PluginScript(MoinScript):
     """\
@@ -32,6 +32,13 @@ General syntax: moin [options] server standalone [standalone-options]
     * You must run this script as the owner of the wiki files.
     * You should not run this script as root. You should use --user and
       --group to run the server without superuser privileges.
+
+    1. Run with 4 worker processes, restart each after 1000 requests:
+       moin ... server standalone --workers=4 --max-requests=1000
+
+    2. Gracefully reload a server started with --start (e.g. after changing
+       the wiki config), only works if it was started with --workers:
+       moin ... server standalone --reload
 """
 
     def __init__(self, argv, def_values):
@@ -64,6 +71,22 @@ General syntax: moin [options] server standalone [standalone-options]
             "--stop", dest="stop", action="store_true",
             help="Stop server in background."
         )
+        self.parser.add_option(
+            "--reload", dest="reload", action="store_true",
+            help="Gracefully reload server in background (needs workers)."
+        )
+        self.parser.add_option(
+            "--workers", dest="workers", type="int",
+            help="Set the number of worker processes (0: no workers, use threads). Default: 0"
+        )
+        self.parser.add_option(
+            "--max-requests", dest="max_requests", type="int",
+            help="Restart a worker after it has handled that many requests (0: never). Default: 0"
+        )
+        self.parser.add_option(
+            "--no-preload", dest="preload", action="store_false",
+            help="Do not preload the wikis before starting the workers."
+        )
         self.parser.add_option(
             "--pidfile", dest="pidfile",
             help="Set file to store pid of moin daemon in. Default: moin.pid"
@@ -89,10 +112,23 @@ General syntax: moin [options] server standalone [standalone-options]
                 print("pid file not found (server not running?)")
             else:
                 try:
-                    os.kill(int(pids), signal.SIGTERM)
+                    os.kill(int(pids.split()[0]), signal.SIGTERM)
                 except OSError:
                     print("kill failed (server not running?)")
             os.remove(pidfile)
+        elif self.options.reload:
+            daemon = Daemon('moin', pidfile, run_server)
+            running, pid = daemon.status()
+            if not running:
+                print("server not running (no pid file or stale pid)")
+            elif daemon.readMode() != 'prefork':
+                # SIGHUP would terminate a server without workers
+                print("server was not started with workers, it can not reload, restart it instead")
+            else:
+                try:
+                    os.kill(pid, signal.SIGHUP)
+                except OSError:
+                    print("kill failed (server not running?)")
         else:
             try:
                 if self.options.config_dir:
@@ -113,7 +149,8 @@ General syntax: moin [options] server standalone [standalone-options]
                            'threaded', 'processes',
                            'debug', 'use_evalex',
                            'use_reloader', 'extra_files', 'reloader_interval',
-                           'docs', 'static_files', ):
+                           'docs', 'static_files',
+                           'workers', 'max_requests', 'preload', 'gc_freeze', ):
                 if hasattr(Config, option):
                     kwargs[option] = getattr(Config, option)
                 else:
@@ -135,9 +172,17 @@ General syntax: moin [options] server standalone [standalone-options]
                 kwargs['hostname'] = self.options.hostname
             if self.options.port:
                 kwargs['port'] = self.options.port
+            if self.options.workers is not None:
+                kwargs['workers'] = self.options.workers
+            if self.options.max_requests is not None:
+                kwargs['max_requests'] = self.options.max_requests
+            if self.options.preload is not None:
+                kwargs['preload'] = self.options.preload
 
             if self.options.start:
                 daemon = Daemon('moin', pidfile, run_server, **kwargs)
+                if uses_workers(kwargs['workers'], kwargs['debug']):
+                    daemon.mode = 'prefork' # can be reloaded
                 daemon.do_start()
             else:
                 run_server(**kwargs)
@@ -174,6 +219,20 @@ class DefaultConfig(object):
     threaded = True
     processes = 1
 
+    # prefork mode: a master process with that many worker processes, which
+    # share the listening socket (threaded and processes are not used then).
+    # This uses all cpu cores (a single process only uses one because of the
+    # python GIL). 0 means not using workers.
+    workers = 0
+    # restart a worker after it has handled that many requests (0: never)
+    max_requests = 0
+    # load wiki configs, plugins, translations and page lists in the master
+    # before starting the workers, so they do not each have to do it
+    preload = True
+    # freeze the preloaded objects (gc.freeze), so the workers share their
+    # memory with the master (and each other) instead of copying it
+    gc_freeze = True
+
     # automatic code reloader - needs testing!
     use_reloader = False
     extra_files = None
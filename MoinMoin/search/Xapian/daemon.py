@@ -0,0 +1,86 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - xapian indexer daemon
+
+    A long running process that processes the indexer queue, so the wiki
+    processes only need to put index updates into the queue (see the
+    xapian_index_daemon configuration option).
+
+    The daemon watches the on-disk indexer queue in the xapian main
+    directory and processes it in batches (see XapianIndex.do_queued_updates).
+    It stores some metrics (amount of processed entries, ...) into the
+    xapian main directory when they changed, so they can be looked at from
+    another process (moin ... index daemon --status, which also shows queue
+    depth and lag), see MoinMoin.util.queueworker.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import time
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+from MoinMoin.search.Xapian.indexing import XapianIndex
+from MoinMoin.util.queueworker import QueueWorker
+
+
+class IndexerDaemon(QueueWorker):
+    """ Processes the xapian indexer queue outside of request processing """
+
+    name = 'indexer daemon'
+    stats_key = 'indexer-daemon-stats'
+
+    def __init__(self, request, batch_size=None, concurrency=None, poll_interval=None, name='index'):
+        """
+        @param request: request object
+        @param batch_size: amount of queue entries to process at once
+                           (default: cfg.xapian_index_daemon_batch_size)
+        @param concurrency: amount of threads used for running content filters
+                            (default: cfg.xapian_index_daemon_concurrency)
+        @param poll_interval: seconds to sleep when the queue is idle
+                              (default: cfg.xapian_index_daemon_poll_interval)
+        @param name: name of the xapian index
+        """
+        QueueWorker.__init__(self, request)
+        cfg = request.cfg
+        self.batch_size = batch_size or cfg.xapian_index_daemon_batch_size
+        self.concurrency = concurrency or cfg.xapian_index_daemon_concurrency
+        self.poll_interval = poll_interval or cfg.xapian_index_daemon_poll_interval
+        self.index = XapianIndex(request, name=name)
+        self.queue = self.index.update_queue
+        self.processed = 0
+
+    def _stats_cache(self):
+        return caching.CacheEntry(self.request, self.index.main_dir, self.stats_key,
+                                  scope='dir', use_pickle=True)
+
+    def queue_stats(self):
+        depth, lag = self.queue.stats()
+        return {
+            'depth': depth, # amount of entries waiting in the queue
+            'lag': lag, # seconds the oldest queue entry is waiting
+        }
+
+    def counters(self):
+        return {
+            'processed': self.processed, # amount of entries processed (after coalescing)
+        }
+
+    def run_once(self):
+        """ Process the queue until it is empty
+
+        @return: amount of processed (coalesced) queue entries
+        """
+        start = time.time()
+        done_count = self.index.do_queued_updates(batch_size=self.batch_size,
+                                                  concurrency=self.concurrency)
+        self.processed += done_count
+        self.runs += 1
+        self.save_stats()
+        if done_count:
+            logging.info("indexer daemon processed %d queue entries in %0.2f seconds." % (
+                done_count, time.time() - start))
+        return done_count
@@ -9,13 +9,14 @@
 """
 
 import os, re
+import threading
 import xapian
 import xappy
 
 from MoinMoin import log
 logging = log.getLogger(__name__)
 
-from MoinMoin.search.builtin import BaseIndex
+from MoinMoin.search.builtin import BaseIndex, coalesce_entries
 from MoinMoin.search.Xapian.tokenizer import WikiAnalyzer
 from MoinMoin.util import filesys
 
@@ -111,9 +112,15 @@ class MoinIndexerConnection(xappy.IndexerConnection):
 
 class StemmedField(xappy.Field):
 
-    def __init__(self, name, value, request):
-        analyzer = WikiAnalyzer(request=request, language=request.cfg.language_default)
-        value = ' '.join(str('%s %s' % (word, stemmed)).strip() for word, stemmed in analyzer.tokenize(value))
+    def __init__(self, name, value, request, tokens=None):
+        """
+        @param tokens: (word, stemmed) tuples of value, if already tokenized
+                       (see WikiAnalyzer.tokenize_batch)
+        """
+        if tokens is None:
+            analyzer = WikiAnalyzer(request=request, language=request.cfg.language_default)
+            tokens = analyzer.tokenize(value)
+        value = ' '.join(str('%s %s' % (word, stemmed)).strip() for word, stemmed in tokens)
         super(StemmedField, self).__init__(name, value)
 
 
@@ -185,53 +192,120 @@ class XapianIndex(BaseIndex):
         self.request.cfg.xapian_searchers.append((searcher, timestamp))
         return hits
 
-    def do_queued_updates(self, amount=-1):
+    def do_queued_updates(self, amount=-1, batch_size=100, concurrency=1):
         """ Index <amount> entries from the indexer queue.
 
+            Entries are taken from the queue in batches of <batch_size> and
+            redundant entries within a batch are coalesced (see
+            coalesce_entries), so e.g. a page saved 10 times gets indexed once.
+            A batch is only removed from the queue after it was indexed, so
+            it gets indexed again later if indexing fails.
+
             @param amount: amount of queue entries to process (default: -1 == all)
+            @param batch_size: amount of queue entries to get from the queue at once
+            @param concurrency: amount of threads used for running the
+                                attachment text filters of a batch (default: 1)
+            @return: amount of processed (coalesced) entries
         """
         done_count = 0
         try:
             request = self._indexingRequest(self.request)
             connection = self.get_indexer_connection()
             self.touch()
-            total = amount
             try:
                 while amount:
-                    # trick: if amount starts from -1, it will never get 0
-                    amount -= 1
-                    try:
-                        pagename, attachmentname, revno = self.update_queue.get()
-                    except IndexError:
+                    if amount > 0:
+                        count = min(amount, batch_size)
+                    else:
+                        count = batch_size
+                    entries = self.update_queue.mpeek(count)
+                    if not entries:
                         # queue empty
                         break
-                    else:
-                        logging.info("got from indexer queue: %r %r %r [%d/%d]" % (
-                            pagename, attachmentname, revno,
-                            done_count, total))
-                        if pagename:
-                            if not attachmentname:
-                                if revno is None:
-                                    # generic "index this page completely, with attachments" request
-                                    self._index_page(request, connection, pagename, mode='update')
-                                else:
-                                    # "index this page revision" request
-                                    self._index_page_rev(request, connection, pagename, revno, mode='update')
-                            else:
-                                # "index this attachment" request
-                                self._index_attachment(request, connection, pagename, attachmentname, mode='update')
-                        else: # pagename == None
-                            # index an additional filesystem file (full path given in attachmentname)
-                            self._index_file(request, connection, attachmentname, mode='update')
+                    queued_count = len(entries)
+                    entries = coalesce_entries(entries)
+                    logging.info("got %d entries from indexer queue (%d done so far)" % (
+                        len(entries), done_count))
+                    if concurrency > 1:
+                        self._prefetch_filtered(request, entries, concurrency)
+                    for pagename, attachmentname, revno in entries:
+                        logging.debug("indexing queued entry: %r %r %r" % (
+                            pagename, attachmentname, revno))
+                        self._do_queued_update(request, connection, pagename, attachmentname, revno)
                         done_count += 1
+                    self.update_queue.mremove(queued_count)
+                    # trick: if amount starts from -1, it will never get 0
+                    amount -= queued_count
             finally:
                 logging.debug("updated xapian index with %d queued updates" % done_count)
+                self._prefetched = {}
                 connection.close()
         except XapianDatabaseLockError:
             # another indexer has locked the index, we can retry it later...
             logging.debug("can't lock xapian index, not doing queued updates now")
         return done_count
 
+    def _do_queued_update(self, request, connection, pagename, attachmentname, revno):
+        """ Process a single (pagename, attachmentname, revno) indexer queue entry """
+        if pagename:
+            if not attachmentname:
+                if revno is None:
+                    # generic "index this page completely, with attachments" request
+                    self._index_page(request, connection, pagename, mode='update')
+                else:
+                    # "index this page revision" request
+                    self._index_page_rev(request, connection, pagename, revno, mode='update')
+            else:
+                # "index this attachment" request
+                self._index_attachment(request, connection, pagename, attachmentname, mode='update')
+        else: # pagename == None
+            # index an additional filesystem file (full path given in attachmentname)
+            self._index_file(request, connection, attachmentname, mode='update')
+
+    def _prefetch_filtered(self, request, entries, concurrency):
+        """ Run the content filters for the attachments and files of a batch
+            of queue entries in <concurrency> threads.
+
+            The results are kept in self._prefetched (see contentfilter), so
+            the (serial) index writes do not need to wait for the filters.
+        """
+        from MoinMoin.action import AttachFile
+        filenames = []
+        for pagename, attachmentname, revno in entries:
+            if pagename and attachmentname:
+                filename = AttachFile.getFilename(request, pagename, attachmentname)
+            elif not pagename:
+                filename = attachmentname
+            else:
+                continue
+            if os.path.exists(filename):
+                filenames.append(filename)
+        if not filenames:
+            return
+
+        pending = list(filenames)
+        pending_lock = threading.Lock()
+
+        def worker():
+            while True:
+                pending_lock.acquire()
+                try:
+                    if not pending:
+                        return
+                    filename = pending.pop()
+                finally:
+                    pending_lock.release()
+                self._prefetched[filename] = self._contentfilter(filename)
+
+        threads = [threading.Thread(target=worker) for i in range(min(concurrency, len(filenames)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logging.debug("prefetched filter output for %d files using %d threads" % (
+            len(filenames), len(threads)))
+
     def _get_document(self, connection, doc_id, mtime, mode):
         do_index = False
 
@@ -264,10 +338,18 @@ class XapianIndex(BaseIndex):
         if multivalued_fields is None:
             multivalued_fields = {}
 
+        stem_fields = []
         for field, value in fields.items():
             document.fields.append(xappy.Field(field, value))
             if field in fields_to_stem:
-                document.fields.append(StemmedField(field, value, request))
+                stem_fields.append((field, value))
+
+        if stem_fields:
+            # tokenize all fields with the same analyzer (and its caches)
+            analyzer = WikiAnalyzer(request=request, language=request.cfg.language_default)
+            token_lists = analyzer.tokenize_batch([value for field, value in stem_fields])
+            for (field, value), tokens in zip(stem_fields, token_lists):
+                document.fields.append(StemmedField(field, value, request, tokens=tokens))
 
         for field, values in multivalued_fields.items():
             for value in values:
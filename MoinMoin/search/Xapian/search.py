@@ -64,11 +64,12 @@ class XapianSearch(BaseSearch):
                  for r in search_results]
         try:
             if not self.query.xapian_need_postproc():
-                # xapian handled the full query
+                # xapian handled the full query, so we only need to compute
+                # the matches of the hits we display
                 clock.start('_xapianProcess')
                 try:
                     _ = self.request.getText
-                    return self._getHits(pages), (search_results.estimate_is_exact and '' or _('about'), search_results.matches_estimated)
+                    return self._getHits(pages, lazy=True), (search_results.estimate_is_exact and '' or _('about'), search_results.matches_estimated)
                 finally:
                     clock.stop('_xapianProcess')
         finally:
@@ -2,6 +2,12 @@
 """
     MoinMoin - A text analyzer for wiki syntax
 
+    Wiki text is very repetitive, so the results of splitting words (e.g.
+    CamelCase words) and of stemming them are kept in bounded LRU caches
+    shared by all analyzers of a process using the same cache size (the
+    stemming results separately for each language), see
+    xapian_tokenizer_cache_size.
+
     @copyright: 2006-2008 MoinMoin:ThomasWaldmann,
                 2006 MoinMoin:FranzPletz
     @license: GNU GPL, see COPYING for details.
@@ -12,6 +18,30 @@ import xapian
 
 from MoinMoin.parser.text_moin_wiki import Parser as WikiParser
 from MoinMoin import config
+from MoinMoin.util.lru import LRUCache
+
+DEFAULT_CACHE_SIZE = 10000
+
+# The caches are kept by their size, so wikis configured with different
+# sizes in the same process don't change each other's limit.
+# cache_size -> LRUCache(word -> tuple of (word or part of it, offset)),
+# independent of the language
+_decompositions = {}
+# (language, cache_size) -> LRUCache(lower cased word -> stemmed word or '')
+_stems = {}
+
+
+def _cache(caches, key, cache_size):
+    cache = caches.get(key)
+    if cache is None:
+        cache = caches.setdefault(key, LRUCache(cache_size))
+    return cache
+
+
+def clear_caches():
+    """ Drop the cached word decompositions and stemming results """
+    for cache in list(_decompositions.values()) + list(_stems.values()):
+        cache.clear()
 
 
 class WikiAnalyzer(object):
@@ -40,39 +70,68 @@ class WikiAnalyzer(object):
     mail_re = re.compile(r"[-_/,.]|(@)")
     alpha_num_re = re.compile(r"\d+|\D+")
 
-    def __init__(self, request=None, language=None):
+    def __init__(self, request=None, language=None, cache_size=None):
         """
         @param request: current request
         @param language: if given, the language in which to stem words
+        @param cache_size: maximum amount of cached words (default:
+                           cfg.xapian_tokenizer_cache_size, 0 disables caching)
         """
+        if cache_size is None:
+            if request:
+                cache_size = request.cfg.xapian_tokenizer_cache_size
+            else:
+                cache_size = DEFAULT_CACHE_SIZE
+        if cache_size:
+            self.decompositions = _cache(_decompositions, cache_size, cache_size)
+        else:
+            self.decompositions = LRUCache(0)
+
         self.stemmer = None
+        self.stems = None
         if request and request.cfg.xapian_stemming and language:
             try:
                 stemmer = xapian.Stem(language)
                 # we need this wrapper because the stemmer returns a utf-8
                 # encoded string even when it gets fed with unicode objects:
                 self.stemmer = lambda word: stemmer(word).decode('utf-8')
+                if cache_size:
+                    self.stems = _cache(_stems, (language, cache_size), cache_size)
+                else:
+                    self.stems = LRUCache(0)
             except xapian.InvalidArgumentError:
                 # lang is not stemmable or not available
                 pass
 
-    def raw_tokenize_word(self, word, pos):
-        """ try to further tokenize some word starting at pos """
+    def decompose_word(self, word):
+        """ Return a tuple of (word, offset) for word and the parts of it """
+        parts = self.decompositions.get(word)
+        if parts is None:
+            parts = tuple(self._decompose_word(word, 0))
+            self.decompositions[word] = parts
+        return parts
+
+    def _decompose_word(self, word, pos):
         yield (word, pos)
         if self.wikiword_re.match(word):
             # if it is a CamelCaseWord, we additionally try to tokenize Camel, Case and Word
             for m in re.finditer(self.singleword_re, word):
                 mw, mp = m.group(), pos + m.start()
-                for w, p in self.raw_tokenize_word(mw, mp):
+                for w, p in self._decompose_word(mw, mp):
                     yield (w, p)
         else:
             # if we have Foo42, yield Foo and 42
             for m in re.finditer(self.alpha_num_re, word):
                 mw, mp = m.group(), pos + m.start()
                 if mw != word:
-                    for w, p in self.raw_tokenize_word(mw, mp):
+                    for w, p in self._decompose_word(mw, mp):
                         yield (w, p)
 
+    def raw_tokenize_word(self, word, pos):
+        """ try to further tokenize some word starting at pos """
+        for w, offset in self.decompose_word(word):
+            yield (w, pos + offset)
+
     def raw_tokenize(self, value):
         """ Yield a stream of words from a string.
 
@@ -99,6 +158,18 @@ class WikiAnalyzer(object):
                     for word, pos in self.raw_tokenize_word(m.group("word"), m.start()):
                         yield word, pos
 
+    def stem(self, word):
+        """ Return the stemmed lower cased word or '' if stemming does not change it """
+        if not self.stemmer:
+            return ''
+        stemmed = self.stems.get(word)
+        if stemmed is None:
+            stemmed = self.stemmer(word)
+            if stemmed == word:
+                stemmed = ''
+            self.stems[word] = stemmed
+        return stemmed
+
     def tokenize(self, value):
         """
         Yield a stream of raw lower cased and stemmed words from a string.
@@ -106,19 +177,18 @@ class WikiAnalyzer(object):
         @param value: string to split, must be an unicode object or a list of
                       unicode objects
         """
-        if self.stemmer:
-
-            def stemmer(value):
-                stemmed = self.stemmer(value)
-                if stemmed != value:
-                    return stemmed
-                else:
-                    return ''
-        else:
-            stemmer = lambda v: ''
-
+        stem = self.stem
         for word, pos in self.raw_tokenize(value):
             # Xapian stemmer expects lowercase input
             word = word.lower()
-            yield word, stemmer(word)
+            yield word, stem(word)
+
+    def tokenize_batch(self, values):
+        """
+        Tokenize several strings at once (e.g. all fields of a document).
+
+        @param values: list of strings (see tokenize)
+        @return: list with a list of (word, stemmed) tuples for each value
+        """
+        return [list(self.tokenize(value)) for value in values]
 
@@ -0,0 +1,70 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.search.queryparser.planner Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin.search.queryparser import QueryParser
+from MoinMoin.search.queryparser.expressions import LinkSearch
+from MoinMoin.search.queryparser.planner import QueryPlanner
+
+
+class TestQueryPlanner(object):
+    """ search: test the query planner """
+
+    pagenames = ['FrontPage', 'HelpOnLinking', 'HelpOnEditing', 'CategoryHomepage', 'SandBox', ]
+
+    def candidates(self, query):
+        plan = QueryPlanner(self.request).plan(QueryParser().parse_query(query))
+        return plan, plan.candidates(self.request, self.pagenames)
+
+    def test_title_and_text(self):
+        plan, candidates = self.candidates('title:HelpOn linking')
+        assert candidates == set(['HelpOnLinking', 'HelpOnEditing'])
+        explained = plan.explain()
+        assert 'title filter' in explained
+        assert 'scan candidates' in explained
+
+    def test_intersection(self):
+        plan, candidates = self.candidates('title:re:^Help title:Editing')
+        assert candidates == set(['HelpOnEditing'])
+
+    def test_union(self):
+        plan, candidates = self.candidates('title:Help or title:Sand')
+        assert candidates == set(['HelpOnLinking', 'HelpOnEditing', 'SandBox'])
+
+    def test_union_not_narrowing(self):
+        plan, candidates = self.candidates('title:Help or something')
+        assert candidates is None
+
+    def test_negated(self):
+        plan, candidates = self.candidates('-title:Help')
+        assert candidates == set(['FrontPage', 'CategoryHomepage', 'SandBox'])
+
+    def test_linkto(self):
+        plan, candidates = self.candidates('linkto:FrontPage title:Help')
+        assert 'link graph' in plan.explain()
+        assert candidates <= set(['HelpOnLinking', 'HelpOnEditing'])
+
+    def test_linkto_graph_once(self):
+        term = LinkSearch('FrontPage')
+        graph = term.linkgraph(self.request)
+        QueryPlanner(self.request).plan(term).candidates(self.request, self.pagenames)
+        # planner and matching use the graph looked up once for the search
+        assert term.linkgraph(self.request) is graph
+
+    def test_category(self):
+        plan, candidates = self.candidates('category:CategoryHomepage')
+        assert 'category index' in plan.explain()
+        plan, candidates = self.candidates(r'category:re:\bCategoryHomepage\b')
+        assert 'category index' not in plan.explain()
+        assert candidates is None
+
+    def test_text_only(self):
+        plan, candidates = self.candidates('some text')
+        assert candidates is None
+
+coverage_modules = ['MoinMoin.search.queryparser.planner']
+
@@ -16,7 +16,9 @@ import py
 
 from MoinMoin.search import QueryError, _get_searcher
 from MoinMoin.search.queryparser import QueryParser
-from MoinMoin.search.builtin import MoinSearch
+from MoinMoin.search.builtin import MoinSearch, IndexerQueue, coalesce_entries
+from MoinMoin.search.filtercache import FilterCache
+from MoinMoin.search.results import FoundPage, SearchResults, TextMatch, TitleMatch
 from MoinMoin._tests import nuke_xapian_index, wikiconfig, become_trusted, create_page, nuke_page, append_page
 from MoinMoin.wikiutil import Version
 from MoinMoin.action import AttachFile
@@ -542,6 +544,119 @@ class TestXapianSearchStemmed(TestXapianSearch):
         assert found_pages == expected_pages
 
 
+class TestLazyFoundPage(object):
+    """ search: test lazily computed matches of search hits """
+
+    def test_lazy_matches(self):
+        calls = []
+        def get_matches():
+            calls.append(1)
+            return [TextMatch(5, 8), TitleMatch(0, 3), TextMatch(5, 8)]
+        hit = FoundPage('SomePage', matches=get_matches)
+        assert hit.matches_pending()
+        assert not calls
+        assert len(hit.get_matches(unique=1)) == 2
+        assert len(hit.get_matches(unique=1, type=TextMatch)) == 1
+        assert len(hit.get_matches(unique=0)) == 3
+        assert calls == [1]
+        assert not hit.matches_pending()
+
+    def test_lazy_matches_none(self):
+        hit = FoundPage('SomePage', matches=lambda: None)
+        assert hit.get_matches() == []
+
+    def test_keep_index_ranking(self):
+        pages = ['PageB', 'PageC', 'PageA']
+        hits = [FoundPage(name, matches=lambda: [TextMatch(0, 1)]) for name in pages]
+        results = SearchResults(None, hits, 3, 0.0, 'weight', None)
+        assert [hit.page_name for hit in results.hits] == pages
+        assert [hit for hit in results.hits if not hit.matches_pending()] == []
+
+
+class TestIndexerQueue(object):
+    """ search: test the on-disk indexer queue """
+
+    def setup_method(self, method):
+        self.queue_dir = os.path.join(self.request.cfg.cache_dir, 'test_indexer_queue')
+        self.queue = IndexerQueue(self.request, self.queue_dir, 'indexer-queue')
+
+    def teardown_method(self, method):
+        import shutil
+        shutil.rmtree(self.queue_dir, ignore_errors=True)
+
+    def test_put_get(self):
+        self.queue.put('PageA')
+        self.queue.mput([('PageB', 'att.pdf', None), ('PageC', None, 3)])
+        assert self.queue.stats()[0] == 3
+        assert self.queue.get() == ('PageA', None, None)
+        assert self.queue.mget(10) == [('PageB', 'att.pdf', None), ('PageC', None, 3)]
+        assert self.queue.mget(10) == []
+        py.test.raises(IndexError, self.queue.get)
+
+    def test_peek_remove(self):
+        self.queue.mput([('PageA', None, None), ('PageB', None, 2)])
+        assert self.queue.mpeek(1) == [('PageA', None, None)]
+        self.queue.put('PageC')
+        assert self.queue.mpeek(10) == [('PageA', None, None), ('PageB', None, 2), ('PageC', None, None)]
+        self.queue.mremove(2)
+        assert self.queue.mpeek(10) == [('PageC', None, None)]
+        self.queue.mremove(5)
+        assert self.queue.mpeek(10) == []
+
+    def test_stats(self):
+        assert self.queue.stats() == (0, 0)
+        self.queue.put('PageA')
+        depth, lag = self.queue.stats()
+        assert depth == 1
+        assert lag >= 0
+
+    def test_coalesce_entries(self):
+        entries = [('PageA', None, 1), ('PageB', 'att.pdf', None), ('PageA', None, None),
+                   ('PageB', 'att.pdf', None), ('PageA', 'x.doc', None), ('PageA', None, None),
+                   (None, '/some/file', None), ('PageC', None, 2), ('PageC', None, 2)]
+        assert coalesce_entries(entries) == [('PageB', 'att.pdf', None), ('PageA', None, None),
+                                             (None, '/some/file', None), ('PageC', None, 2)]
+
+
+class TestFilterCache(object):
+    """ search: test the filter output cache """
+
+    def setup_method(self, method):
+        import tempfile
+        fd, self.fname = tempfile.mkstemp('.txt')
+        os.write(fd, b'some text')
+        os.close(fd)
+        self.cache = FilterCache(self.request)
+
+    def teardown_method(self, method):
+        os.remove(self.fname)
+        self.cache.clear()
+
+    def test_get_put(self):
+        assert self.cache.get(self.fname, 'text/plain') is None
+        self.cache.put(self.fname, 'text/plain', 'filtered text')
+        assert self.cache.get(self.fname, 'text/plain') == 'filtered text'
+        # cache entries are per mimetype, as the filter used depends on it
+        assert self.cache.get(self.fname, 'text/html') is None
+
+    def test_changed_file(self):
+        self.cache.put(self.fname, 'text/plain', 'filtered text')
+        f = open(self.fname, 'w')
+        f.write('some other text')
+        f.close()
+        assert self.cache.get(self.fname, 'text/plain') is None
+
+    def test_content_addressed(self):
+        import shutil
+        self.cache.put(self.fname, 'text/plain', 'filtered text')
+        copy = self.fname + '.copy'
+        shutil.copy(self.fname, copy)
+        try:
+            assert self.cache.get(copy, 'text/plain') == 'filtered text'
+        finally:
+            os.remove(copy)
+
+
 class TestGetSearcher(object):
 
     class Config(wikiconfig.Config):
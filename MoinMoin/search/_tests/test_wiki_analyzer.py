@@ -36,6 +36,27 @@ class TestWikiAnalyzer(object):
             assert token in words
             assert words[token] == stemmed
 
+    def test_tokenize_uncached(self):
+        analyzer = WikiAnalyzer(request=self.request, language=self.request.cfg.language_default, cache_size=0)
+        uncached = list(analyzer.tokenize(self.word))
+        # second run of the cached analyzer gets everything from the caches
+        cached = list(self.analyzer.tokenize(self.word))
+        assert cached == list(self.analyzer.tokenize(self.word))
+        assert cached == uncached
+
+    def test_cache_size(self):
+        small = WikiAnalyzer(request=self.request, language=self.request.cfg.language_default, cache_size=10)
+        large = WikiAnalyzer(request=self.request, language=self.request.cfg.language_default, cache_size=20)
+        # the last analyzer created does not set the limit for the others
+        assert small.decompositions.maxsize == 10
+        assert large.decompositions.maxsize == 20
+        assert self.analyzer.decompositions is not small.decompositions
+
+    def test_tokenize_batch(self):
+        token_lists = self.analyzer.tokenize_batch([self.word, 'FooBar'])
+        assert token_lists[0] == list(self.analyzer.tokenize(self.word))
+        assert token_lists[1] == list(self.analyzer.tokenize('FooBar'))
+
 
 class TestWikiAnalyzerStemmed(TestWikiAnalyzer):
 
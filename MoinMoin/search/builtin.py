@@ -16,8 +16,10 @@ from MoinMoin import log
 logging = log.getLogger(__name__)
 
 from MoinMoin import wikiutil, config, caching
+from MoinMoin.filter import FilterKilled
 from MoinMoin.Page import Page
 from MoinMoin.search.results import getSearchResults, Match, TextMatch, TitleMatch, getSearchResults
+from MoinMoin.search.filtercache import FilterCache
 
 ##############################################################################
 # Search Engine Abstraction
@@ -33,6 +35,9 @@ class IndexerQueue(object):
     ATTACHMENTNAME: attachment name (unicode) or None (for pages)
     REVNO: revision number (int) - meaning "look at that revision",
            or None - meaning "look at all revisions"
+
+    On disk, the time when a job was queued is stored additionally, so
+    we can tell how long the oldest job has been waiting (see stats()).
     """
 
     def __init__(self, request, xapian_dir, queuename, timeout=10.0):
@@ -59,6 +64,10 @@ class IndexerQueue(object):
             queue = []
         return queue
 
+    def _job(self, entry):
+        """ Strip the queue timestamp from an on-disk queue entry """
+        return tuple(entry[:3])
+
     def mput(self, entries):
         """ Put multiple entries into the queue (append at end)
 
@@ -67,11 +76,13 @@ class IndexerQueue(object):
                         attachmentname: attachment name [unicode or None]
                         revision number (int) or None (all revs)
         """
+        now = time.time()
         cache = self.get_cache(locking=False) # we lock manually
         cache.lock('w', 60.0)
         try:
             queue = self._queue(cache)
-            queue.extend(entries)
+            queue.extend([(pagename, attachmentname, revno, now)
+                          for pagename, attachmentname, revno in entries])
             cache.update(queue)
         finally:
             cache.unlock()
@@ -87,7 +98,7 @@ class IndexerQueue(object):
         cache.lock('w', 60.0)
         try:
             queue = self._queue(cache)
-            entry = (pagename, attachmentname, revno)
+            entry = (pagename, attachmentname, revno, time.time())
             queue.append(entry)
             cache.update(queue)
         finally:
@@ -96,7 +107,7 @@ class IndexerQueue(object):
     def mget(self, count):
         """ Get (and remove) first <count> entries from the queue
 
-        Raises IndexError if queue was empty when calling get().
+        Returns an empty list if the queue is empty.
         """
         cache = self.get_cache(locking=False) # we lock manually
         cache.lock('w', 60.0)
@@ -104,10 +115,34 @@ class IndexerQueue(object):
             queue = self._queue(cache)
             entries = queue[:count]
             queue = queue[count:]
-            cache.update(queue)
+            if entries:
+                cache.update(queue)
+        finally:
+            cache.unlock()
+        return [self._job(entry) for entry in entries]
+
+    def mpeek(self, count):
+        """ Get first <count> entries from the queue, without removing them
+
+        Use mremove(len(entries)) after processing them. As other users of
+        the queue only append to it, these are still the first entries then
+        if only one process takes entries from the queue at a time (the
+        indexer holding the index lock).
+        """
+        cache = self.get_cache(locking=True)
+        entries = self._queue(cache)[:count]
+        return [self._job(entry) for entry in entries]
+
+    def mremove(self, count):
+        """ Remove first <count> entries from the queue """
+        cache = self.get_cache(locking=False) # we lock manually
+        cache.lock('w', 60.0)
+        try:
+            queue = self._queue(cache)
+            if queue:
+                cache.update(queue[count:])
         finally:
             cache.unlock()
-        return entries
 
     def get(self):
         """ Get (and remove) first entry from the queue
@@ -122,7 +157,49 @@ class IndexerQueue(object):
             cache.update(queue)
         finally:
             cache.unlock()
-        return entry
+        return self._job(entry)
+
+    def stats(self):
+        """ Return (depth, lag) of the queue
+
+        depth is the number of queued entries, lag is the number of seconds
+        the oldest entry has been waiting (0 if the queue is empty or the
+        entry was queued by an old moin version without timestamps).
+        """
+        cache = self.get_cache(locking=True)
+        queue = self._queue(cache)
+        lag = 0
+        if queue and len(queue[0]) > 3:
+            lag = max(0, time.time() - queue[0][3])
+        return len(queue), lag
+
+    def uid(self):
+        """ Return a value that changes when the on-disk queue was changed """
+        return self.get_cache(locking=False).uid()
+
+
+def coalesce_entries(entries):
+    """ Remove redundant indexer queue entries, keeping the order
+
+    Identical entries are only kept once. A (pagename, None, None) entry
+    means "index the page completely, with all revisions and attachments",
+    so it subsumes all other entries for the same page.
+
+    @param entries: list of tuples (pagename, attachmentname, revno)
+    """
+    full_pages = set([pagename for pagename, attachmentname, revno in entries
+                      if pagename and attachmentname is None and revno is None])
+    seen = set()
+    result = []
+    for entry in entries:
+        pagename, attachmentname, revno = entry
+        if pagename in full_pages and (attachmentname, revno) != (None, None):
+            continue
+        if entry in seen:
+            continue
+        seen.add(entry)
+        result.append(entry)
+    return result
 
 
 class BaseIndex(object):
@@ -137,6 +214,8 @@ class BaseIndex(object):
         if not os.path.exists(self.main_dir):
             os.makedirs(self.main_dir)
         self.update_queue = IndexerQueue(request, self.main_dir, 'indexer-queue')
+        # filename -> (mimetype, content), see contentfilter
+        self._prefetched = {}
 
     def _main_dir(self):
         raise NotImplemented('...')
@@ -226,11 +305,12 @@ class BaseIndex(object):
         """
         raise NotImplemented('...')
 
-    def do_queued_updates(self, amount=-1):
+    def do_queued_updates(self, amount=-1, batch_size=100, concurrency=1):
         """ Perform updates in the queues
 
-        @param request: the current request
         @keyword amount: how many updates to perform at once (default: -1 == all)
+        @keyword batch_size: how many queue entries to get from the queue at once
+        @keyword concurrency: how many threads to use for running content filters
         """
         raise NotImplemented('...')
 
@@ -241,10 +321,30 @@ class BaseIndex(object):
     def contentfilter(self, filename):
         """ Get a filter for content of filename and return unicode content.
 
+        If the filter output was already computed in advance (e.g. by the
+        indexer daemon running filters in parallel), that output is used.
+
         @param filename: name of the file
         """
+        try:
+            return self._prefetched.pop(filename)
+        except KeyError:
+            return self._contentfilter(filename)
+
+    def _contentfilter(self, filename):
+        """ Run the filter for filename, see contentfilter
+
+        The filter output is cached (see MoinMoin.search.filtercache), so
+        unchanged files do not need to get filtered again.
+        """
         request = self.request
         mt = wikiutil.MimeType(filename=filename)
+        mimetype = mt.mime_type()
+        cache = FilterCache(request)
+        data = cache.get(filename, mimetype)
+        if data is not None:
+            logging.debug("Using cached filter output (%d characters) for file %s" % (len(data), filename))
+            return mimetype, data
         for modulename in mt.module_name():
             try:
                 execute = wikiutil.importPlugin(request.cfg, 'filter', modulename)
@@ -256,10 +356,17 @@ class BaseIndex(object):
         try:
             data = execute(self, filename)
             logging.debug("Filter %s returned %d characters for file %s" % (modulename, len(data), filename))
+        except FilterKilled as err:
+            # index what we got, but try again next time
+            data = err.data
+            logging.warning("Filter %s was killed for file %s, using partial output (%d characters)" % (
+                            modulename, filename, len(data)))
         except (OSError, IOError) as err:
             data = ''
             logging.exception("Filter %s threw error '%s' for file %s" % (modulename, str(err), filename))
-        return mt.mime_type(), data
+        else:
+            cache.put(filename, mimetype, data)
+        return mimetype, data
 
     def _indexingRequest(self, request):
         """ Return a new request that can be used for index building.
@@ -375,8 +482,19 @@ class BaseSearch(object):
         if page:
             return self.query.search(page)
 
-    def _getHits(self, pages):
-        """ Get the hit tuples in pages through _get_match """
+    def _lazy_match(self, page):
+        """ Return a callable computing the matches of page when called """
+        return lambda: self._get_match(page=page)
+
+    def _getHits(self, pages, lazy=False):
+        """ Get the hit tuples in pages through _get_match
+
+        @param pages: list of dicts describing the pages to look at
+        @param lazy: if True, the pages are already known to match the query
+                     (e.g. because the xapian index did the full query), so
+                     the matches are only computed when they are needed for
+                     displaying a hit, see FoundPage.
+        """
         logging.debug("_getHits searching in %d pages ..." % len(pages))
         hits = []
         revisionCache = {}
@@ -411,8 +529,11 @@ class BaseSearch(object):
                         matches = self._get_match(page=None, uid=uid)
                         hits.append((wikiname, page, attachment, matches, revision))
                 else:
-                    matches = self._get_match(page=page, uid=uid)
-                    logging.debug("self._get_match %r" % matches)
+                    if lazy:
+                        matches = self._lazy_match(page)
+                    else:
+                        matches = self._get_match(page=page, uid=uid)
+                        logging.debug("self._get_match %r" % matches)
                     if matches:
                         if not self.historysearch and pagename in revisionCache and revisionCache[pagename][0] < revision:
                             hits.remove(revisionCache[pagename][1])
@@ -456,16 +577,17 @@ class MoinSearch(BaseSearch):
     def _getPageList(self):
         """ Get list of pages to search in
 
-        If the query has a page filter, use it to filter pages before
-        searching. If not, get a unfiltered page list. The filtering
-        will happen later on the hits, which is faster with current
-        slow storage.
+        The query planner (see MoinMoin.search.queryparser.planner) is used
+        to narrow down the list of pages before searching, e.g. using a
+        title filter for title: terms. Filtering out deleted pages and pages
+        the user may not read will happen later on the hits, which is faster
+        with current slow storage.
         """
-        filter_ = self.query.pageFilter()
-        if filter_:
-            # There is no need to filter the results again.
-            self.filtered = True
-            return self.request.rootpage.getPageList(filter=filter_)
-        else:
-            return self.request.rootpage.getPageList(user='', exists=0)
-
+        from MoinMoin.search.queryparser.planner import QueryPlanner
+        pagenames = self.request.rootpage.getPageList(user='', exists=0)
+        plan = QueryPlanner(self.request).plan(self.query)
+        candidates = plan.candidates(self.request, pagenames)
+        logging.debug("search plan:\n%s" % plan.explain())
+        if candidates is None:
+            return pagenames
+        return [name for name in pagenames if name in candidates]
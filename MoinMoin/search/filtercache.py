@@ -0,0 +1,118 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - cache for the output of the text extraction filters
+
+    Running the filters (see MoinMoin.filter) is expensive, many of them start
+    external programs (like pdftotext or antiword). So we cache their output
+    in a content-addressed way:
+
+    * "filtered" cache entries are keyed by the SHA1 hash of the file content
+      (and the mimetype, as the filter used depends on it). Thus the same file
+      attached to multiple pages, the same attachment after a page rename or
+      a page revision reindexing all share the same cache entry.
+    * "filtered-stat" cache entries map a filename to (size, mtime, hash), so
+      we do not need to hash the file content if size and mtime of the file did
+      not change since we looked at it the last time.
+
+    Cache entries are written without locking: updates are atomic renames and
+    concurrent writers would write the same content anyway.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os
+import hashlib
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching, config
+
+CONTENT_ARENA = 'filtered'
+STAT_ARENA = 'filtered-stat'
+
+
+def _hexdigest(data):
+    if isinstance(data, str):
+        data = data.encode(config.charset)
+    return hashlib.sha1(data).hexdigest()
+
+
+def file_digest(filename, bufsize=65536):
+    """ Return the SHA1 hexdigest of the content of file <filename> """
+    digest = hashlib.sha1()
+    f = open(filename, 'rb')
+    try:
+        while True:
+            data = f.read(bufsize)
+            if not data:
+                break
+            digest.update(data)
+    finally:
+        f.close()
+    return digest.hexdigest()
+
+
+class FilterCache(object):
+    """ Content-addressed cache for filter output """
+
+    def __init__(self, request):
+        self.request = request
+
+    def _stat_entry(self, filename):
+        return caching.CacheEntry(self.request, STAT_ARENA, _hexdigest(filename),
+                                  scope='wiki', use_pickle=True, do_locking=False)
+
+    def _content_entry(self, digest, mimetype):
+        key = _hexdigest('%s:%s' % (digest, mimetype))
+        return caching.CacheEntry(self.request, CONTENT_ARENA, key,
+                                  scope='wiki', use_pickle=True, do_locking=False)
+
+    def digest(self, filename):
+        """ Return the content hash of file <filename>
+
+        The hash is only computed if size or mtime of the file changed since
+        the last time we computed it.
+        """
+        st = os.stat(filename)
+        stat_key = (st.st_size, st.st_mtime)
+        stat_entry = self._stat_entry(filename)
+        try:
+            size, mtime, digest = stat_entry.content()
+            if (size, mtime) == stat_key:
+                return digest
+        except (caching.CacheError, ValueError, TypeError):
+            pass
+        digest = file_digest(filename)
+        try:
+            stat_entry.update(stat_key + (digest, ))
+        except caching.CacheError as err:
+            logging.warning("could not update filter stat cache for %r: %s" % (filename, str(err)))
+        return digest
+
+    def get(self, filename, mimetype):
+        """ Return the cached filter output for filename or None """
+        try:
+            digest = self.digest(filename)
+        except (OSError, IOError):
+            return None
+        try:
+            return self._content_entry(digest, mimetype).content()
+        except caching.CacheError:
+            return None
+
+    def put(self, filename, mimetype, data):
+        """ Store the filter output <data> for filename """
+        try:
+            digest = self.digest(filename)
+            self._content_entry(digest, mimetype).update(data)
+        except (OSError, IOError, caching.CacheError) as err:
+            logging.warning("could not cache filter output for %r: %s" % (filename, str(err)))
+
+    def clear(self):
+        """ Remove all cached filter output """
+        for arena in [CONTENT_ARENA, STAT_ARENA, ]:
+            for key in caching.get_cache_list(self.request, arena, 'wiki'):
+                caching.CacheEntry(self.request, arena, key, scope='wiki', do_locking=False).remove()
+
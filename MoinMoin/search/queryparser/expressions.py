@@ -16,7 +16,7 @@ import re
 from MoinMoin import log
 logging = log.getLogger(__name__)
 
-from MoinMoin import config, wikiutil
+from MoinMoin import wikiutil
 from MoinMoin.search.results import Match, TitleMatch, TextMatch
 
 try:
@@ -62,7 +62,7 @@ class BaseExpression(object):
         self.pattern, self.search_re = self._build_re(self._pattern, use_re=use_re, case=case)
 
     def __str__(self):
-        return str(self).encode(config.charset, 'replace')
+        return self.__unicode__()
 
     def negate(self):
         """ Negate the result of this term """
@@ -461,6 +461,16 @@ class LinkSearch(BaseFieldSearch):
 
         self._textpattern = '(' + pattern.replace('/', '|') + ')' # used for search in text
         self.textsearch = TextSearch(self._textpattern, use_re=True, case=case)
+        self._linkgraph = None # (request, link graph), see linkgraph()
+
+    def linkgraph(self, request):
+        """ Return the link graph used for this search (looked up once per
+        request, not for every page searched)
+        """
+        if self._linkgraph is None or self._linkgraph[0] is not request:
+            from MoinMoin.linkgraph import get_linkgraph
+            self._linkgraph = request, get_linkgraph(request)
+        return self._linkgraph[1]
 
     def highlight_re(self):
         if not self.highlight:
@@ -474,7 +484,7 @@ class LinkSearch(BaseFieldSearch):
 
         # XXX in python 2.5 any() may be used.
         found = False
-        for link in page.getPageLinks(page.request):
+        for link in self.linkgraph(page.request).links_from(page.page_name):
             if self.search_re.match(link):
                 found = True
                 break
@@ -0,0 +1,254 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - search query planner
+
+    Before the builtin search loads any page body, the query planner tries to
+    narrow down the set of pages to look at, using cheap "candidate
+    generators" (e.g. matching the page names for title: terms or looking
+    up an index for other terms).
+
+    For each term of the query tree, the cheapest applicable candidate
+    generator is chosen. Candidate sets of AND terms get intersected (cheapest
+    first), candidate sets of OR terms get united. Terms without a candidate
+    generator (like a plain text search) do not narrow the set of pages, they
+    are evaluated later by scanning the candidate pages.
+
+    There is no text index generator: the text index of moin is xapian. If it
+    is used, XapianSearch does the text matching and hands MoinSearch only
+    the pages it found (MoinSearch pages), so the planner does not run.
+
+    Use plan.explain() to see what the planner decided (and, after
+    candidates() was called, how many pages each part of the plan produced).
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details
+"""
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin.search.queryparser.expressions import AndExpression, OrExpression, TitleSearch, LinkSearch, \
+    CategorySearch
+
+
+class CandidateGenerator(object):
+    """ Produces the names of the pages that may match a search term
+
+    A candidate generator must never drop a page that matches the term,
+    but it may return pages that do not match (they are checked later).
+    """
+    # name used in explain output
+    name = None
+    # estimated time to produce the candidates, relative to the costs of
+    # the other generators and the search terms (see BaseExpression.costs)
+    costs = 0
+
+    def applies(self, request, term):
+        """ Return True if this generator can produce candidates for term """
+        raise NotImplementedError
+
+    def candidates(self, request, term, pagenames):
+        """ Return the set of candidate page names for term
+
+        @param pagenames: list of all page names we search in
+        """
+        raise NotImplementedError
+
+
+class TitleFilter(CandidateGenerator):
+    """ Match page names for title: terms """
+    name = 'title filter'
+    costs = 10
+
+    def applies(self, request, term):
+        return isinstance(term, TitleSearch)
+
+    def candidates(self, request, term, pagenames):
+        # pageFilter takes care of negated terms
+        page_filter = term.pageFilter()
+        return set([name for name in pagenames if page_filter(name)])
+
+
+class BacklinkFilter(CandidateGenerator):
+    """ Look up the pages linking to the linkto: targets in the link graph """
+    name = 'link graph'
+    costs = 20
+
+    def applies(self, request, term):
+        return isinstance(term, LinkSearch)
+
+    def candidates(self, request, term, pagenames):
+        graph = term.linkgraph(request)
+        linking = set()
+        for target in graph.targets():
+            if term.search_re.match(target):
+                linking |= graph.links_to(target)
+        if term.negated:
+            return set([name for name in pagenames if name not in linking])
+        return linking.intersection(pagenames)
+
+
+class CategoryFilter(CandidateGenerator):
+    """ Look up the members of a category in the category index
+
+    Only used for category: terms naming a category page, the index knows
+    nothing about other words on the category line of a page.
+    """
+    name = 'category index'
+    costs = 20
+
+    def applies(self, request, term):
+        return (isinstance(term, CategorySearch) and not term.use_re and
+                request.cfg.cache.page_category_regexact.search(term._pattern) is not None)
+
+    def candidates(self, request, term, pagenames):
+        from MoinMoin.linkgraph import get_linkgraph
+        graph = get_linkgraph(request)
+        pattern = term._pattern
+        if term.case:
+            members = graph.category_members(pattern)
+        else:
+            members = set()
+            for category in graph.all_categories():
+                if category.lower() == pattern.lower():
+                    members |= graph.category_members(category)
+        if term.negated:
+            return set([name for name in pagenames if name not in members])
+        return members.intersection(pagenames)
+
+
+# candidate generators known to the planner, other modules may add more
+candidate_generators = [TitleFilter(), BacklinkFilter(), CategoryFilter(), ]
+
+
+class PlanNode(object):
+    """ A node of the query plan """
+
+    def __init__(self, term, generator=None, children=None, operator=None):
+        """
+        @param term: the query term of this node
+        @param generator: the candidate generator for a leaf term (or None)
+        @param children: list of PlanNodes for AND/OR terms
+        @param operator: 'AND' or 'OR' for nodes with children
+        """
+        self.term = term
+        self.generator = generator
+        self.children = children or []
+        self.operator = operator
+        self.count = None # amount of candidates produced, if evaluated
+
+    @property
+    def costs(self):
+        if self.operator == 'AND':
+            narrowing = [child.costs for child in self.children if child.narrows()]
+            return min(narrowing or [self.term.costs])
+        elif self.operator == 'OR':
+            return sum([child.costs for child in self.children])
+        elif self.generator:
+            return self.generator.costs
+        return self.term.costs
+
+    def narrows(self):
+        """ Return True if this node can narrow down the set of pages """
+        if self.operator == 'AND':
+            return bool([child for child in self.children if child.narrows()])
+        elif self.operator == 'OR':
+            return not [child for child in self.children if not child.narrows()]
+        return self.generator is not None
+
+    def candidates(self, request, pagenames):
+        """ Return the set of candidate page names or None (== all pages) """
+        if not self.narrows():
+            result = None
+        elif self.operator == 'AND':
+            result = None
+            children = [child for child in self.children if child.narrows()]
+            children.sort(key=lambda child: child.costs)
+            for child in children:
+                if result is not None:
+                    # the following generators only need to look at the
+                    # pages that are still candidates
+                    pagenames = [name for name in pagenames if name in result]
+                found = child.candidates(request, pagenames)
+                if result is None:
+                    result = found
+                else:
+                    result &= found
+                if not result:
+                    break
+        elif self.operator == 'OR':
+            result = set()
+            for child in self.children:
+                result |= child.candidates(request, pagenames)
+        else:
+            result = self.generator.candidates(request, self.term, pagenames)
+        if result is not None:
+            self.count = len(result)
+        return result
+
+    def explain(self, indent=0):
+        """ Return a human readable description of the plan (list of lines) """
+        if self.operator:
+            how = self.operator
+        elif self.generator:
+            how = '%s -> %s' % (str(self.term), self.generator.name)
+        else:
+            how = '%s -> scan candidates' % str(self.term)
+        line = '%s%s (costs %d' % ('  ' * indent, how, self.costs)
+        if self.count is not None:
+            line += ', %d candidates' % self.count
+        lines = [line + ')']
+        for child in self.children:
+            lines.extend(child.explain(indent + 1))
+        return lines
+
+
+class QueryPlan(object):
+    """ The plan for a query, see QueryPlanner """
+
+    def __init__(self, root):
+        self.root = root
+
+    def candidates(self, request, pagenames):
+        """ Return the set of candidate page names or None (== all pages)
+
+        @param pagenames: list of all page names we search in
+        """
+        return self.root.candidates(request, pagenames)
+
+    def explain(self):
+        return '\n'.join(self.root.explain())
+
+
+class QueryPlanner(object):
+    """ Chooses the cheapest candidate generators for a query tree """
+
+    def __init__(self, request, generators=None):
+        """
+        @param request: current request
+        @param generators: list of CandidateGenerators (default: candidate_generators)
+        """
+        self.request = request
+        if generators is None:
+            generators = candidate_generators
+        self.generators = generators
+
+    def plan(self, query):
+        """ Return a QueryPlan for the query tree """
+        return QueryPlan(self._plan(query))
+
+    def _plan(self, term):
+        if isinstance(term, AndExpression) and not term.negated:
+            children = [self._plan(subterm) for subterm in term.subterms()]
+            if isinstance(term, OrExpression):
+                operator = 'OR'
+            else:
+                operator = 'AND'
+            return PlanNode(term, children=children, operator=operator)
+        generators = [generator for generator in self.generators
+                      if generator.applies(self.request, term)]
+        if generators:
+            generators.sort(key=lambda generator: generator.costs)
+            return PlanNode(term, generator=generators[0])
+        return PlanNode(term)
+
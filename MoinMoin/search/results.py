@@ -94,7 +94,13 @@ class AttachmentMatch(Match):
 
 
 class FoundPage(object):
-    """ Represents a page in a search result """
+    """ Represents a page in a search result
+
+    The matches may be given as a list or as a callable returning the list
+    of matches. In the latter case, the matches are only computed when they
+    are needed (e.g. for showing the search context of a hit), so hits that
+    are not displayed never need to load the page body.
+    """
 
     def __init__(self, page_name, matches=None, page=None, rev=0):
         self.page_name = page_name
@@ -105,6 +111,21 @@ class FoundPage(object):
             matches = []
         self._matches = matches
 
+    def _get_matches_list(self):
+        if callable(self._match_source):
+            self._match_source = self._match_source() or []
+        return self._match_source
+
+    def _set_matches_list(self, matches):
+        self._match_source = matches
+        self._unique_cache = {}
+
+    _matches = property(_get_matches_list, _set_matches_list)
+
+    def matches_pending(self):
+        """ Return True if the matches were not computed yet """
+        return callable(self._match_source)
+
     def weight(self, unique=1):
         """ returns how important this page is for the terms searched for
 
@@ -126,6 +147,7 @@ class FoundPage(object):
     def add_matches(self, matches):
         """ Add found matches """
         self._matches.extend(matches)
+        self._unique_cache = {}
 
     def get_matches(self, unique=1, sort='start', type=Match):
         """ Return all matches of type sorted by sort
@@ -166,6 +188,14 @@ class FoundPage(object):
         @rtype: list
         @return: list of matches of type, sorted by match.start
         """
+        try:
+            return self._unique_cache[type]
+        except KeyError:
+            matches = self._unique_cache[type] = self._compute_unique_matches(type)
+            return matches
+
+    def _compute_unique_matches(self, type):
+        """ Compute the list of unique matches of type, see _unique_matches """
         # Filter by type and sort by match.start using fast schwartzian transform.
         tmp = [(match.start, match) for match in self._matches if isinstance(match, type)]
         tmp.sort()
@@ -255,7 +285,16 @@ class SearchResults(object):
         self.sort = sort
 
     def _sortByWeight(self):
-        """ Sorts found pages by the weight of the matches """
+        """ Sorts found pages by the weight of the matches
+
+        If the matches of the hits were not computed yet, the hits were
+        already ranked by the search index. Computing the weights would
+        need the matches (and thus the page bodies) of all hits, so we keep
+        the ranking of the index then.
+        """
+        for hit in self.hits:
+            if hit.matches_pending():
+                return
         tmp = [(hit.weight(), hit.page_name, hit.attachment, hit) for hit in self.hits]
         tmp.sort()
         tmp.reverse()
@@ -590,8 +629,8 @@ class SearchResults(object):
         """
         # Start by giving equal context on both sides of match
         contextlen = max(context - len(match), 0)
-        cstart = match.start - contextlen / 2
-        cend = match.end + contextlen / 2
+        cstart = match.start - contextlen // 2
+        cend = match.end + contextlen // 2
 
         # If context start before start, give more context on end
         if cstart < start:
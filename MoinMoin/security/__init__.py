@@ -15,7 +15,8 @@
                 2003-2008 MoinMoin:ThomasWaldmann,
                 2003 Gustavo Niemeyer,
                 2005 Oliver Graf,
-                2007 Alexander Schremmer
+                2007 Alexander Schremmer,
+                2026 MoinMoin:MoinCoreTeam
     @license: GNU GPL, see COPYING for details.
 """
 
@@ -28,6 +29,25 @@ from MoinMoin.Page import Page
 ### Basic Permissions Interface -- most features enabled by default
 #############################################################################
 
+def _page_acl(request, pagename):
+    """ Get the ACL of page <pagename>
+
+    The ACLs are remembered for the rest of the request (request.page_acls),
+    so e.g. the parent pages of many subpages (acl_hierarchic) are only
+    looked at once. PageEditor forgets them when it changes a page.
+    """
+    page_acls = request.page_acls
+    try:
+        return page_acls[pagename]
+    except KeyError:
+        if request.page is not None and pagename == request.page.page_name:
+            p = request.page # reuse is good
+        else:
+            p = Page(request, pagename)
+        acl = page_acls[pagename] = p.getACL(request) # this will be fast in a reused page obj
+        return acl
+
+
 def _check(request, pagename, username, right):
     """ Check <right> access permission for user <username> on page <pagename>
 
@@ -63,7 +83,7 @@ def _check(request, pagename, username, right):
             # starting at the leaf, going to the root
             name = '/'.join(pages[:i])
             # Get page acl and ask for permission
-            acl = Page(request, name).getACL(request)
+            acl = _page_acl(request, name)
             if acl.acl:
                 some_acl = True
                 allowed = acl.may(request, username, right)
@@ -78,11 +98,7 @@ def _check(request, pagename, username, right):
             if allowed is not None:
                 return allowed
     else:
-        if request.page is not None and pagename == request.page.page_name:
-            p = request.page # reuse is good
-        else:
-            p = Page(request, pagename)
-        acl = p.getACL(request) # this will be fast in a reused page obj
+        acl = _page_acl(request, pagename)
         allowed = acl.may(request, username, right)
         if allowed is not None:
             return allowed
@@ -306,7 +322,48 @@ class AccessControlList:
 
             Note: this check does NOT include the acl_rights_before / _after ACL,
                   but it WILL use acl_rights_default if there is no (page) ACL.
+
+            The answers are remembered in request.cfg.cache.acl_results.
         """
+        results = request.cfg.cache.acl_results.get(request)
+        if results is None: # groups backend can't tell about changes
+            return self._may(request, name, dowhat)
+        if self.acl is None:
+            fingerprint = None
+        else:
+            fingerprint = tuple(self.acl_lines)
+        try:
+            uses_known, uses_trusted = results.uses[fingerprint]
+        except KeyError:
+            uses_known, uses_trusted = results.uses[fingerprint] = (
+                self._uses_special(request, 'Known'), self._uses_special(request, 'Trusted'))
+        # same checks as _special_Known and _special_Trusted do:
+        known = uses_known and bool(user.getUserId(request, name))
+        trusted = uses_trusted and (request.user.name == name and
+                                    request.user.auth_method in request.cfg.auth_methods_trusted)
+        key = (fingerprint, name, dowhat, known, trusted)
+        try:
+            return results.results[key]
+        except KeyError:
+            allowed = results.results[key] = self._may(request, name, dowhat)
+            return allowed
+
+    def _uses_special(self, request, special):
+        """ Check if the answer of this ACL may depend on special user <special> """
+        if self.acl is None:
+            acl = request.cfg.cache.acl_rights_default.acl
+        else:
+            acl = self.acl
+        groups = request.groups
+        for entry, rightsdict in acl:
+            if entry == special:
+                return True
+            if entry in groups and special in groups[entry]:
+                return True
+        return False
+
+    def _may(self, request, name, dowhat):
+        """ May <name> <dowhat>? (uncached, see may) """
         if self.acl is None: # no #acl used on Page
             acl = request.cfg.cache.acl_rights_default.acl
         else: # we have a #acl on the page (self.acl can be [] if #acl is empty!)
@@ -373,6 +430,43 @@ class AccessControlList:
         return self.acl_lines != other.acl_lines
 
 
+class ACLResultCache(object):
+    """ Answers of AccessControlList.may, shared by all requests of a process
+
+    The answer of an ACL only depends on the ACL lines, the user name, the
+    right, the group definitions, whether the user is Known (has a profile)
+    and whether the user is Trusted (logged in using a trusted auth method)
+    - the latter two only if the ACL uses them. The groups backend tells
+    when the group definitions change (cache_token), then we forget all
+    answers.
+    """
+
+    # forget everything when there are more answers than that
+    max_size = 100000
+
+    class Results(object):
+        def __init__(self, token):
+            self.token = token
+            self.results = {} # (acl lines, name, right, known, trusted) -> answer
+            self.uses = {} # acl lines -> does the acl use (Known, Trusted)?
+
+    def __init__(self):
+        self.current = None
+
+    def get(self, request):
+        """ Return the Results valid for the current group definitions,
+            None if the groups backend does not support this.
+        """
+        token = request.groups.cache_token()
+        if token is None:
+            return None
+        current = self.current
+        if current is None or current.token != token or len(current.results) > self.max_size:
+            # requests still using the old results don't disturb the new ones
+            current = self.current = self.Results(token)
+        return current
+
+
 class ACLStringIterator:
     """ Iterator for acl string
 
@@ -391,4 +391,41 @@ class TestPageAcls(object):
             for right in mayNot:
                 yield _not_have_right, u, right, pagename, hierarchic
 
+
+class TestACLCaching(object):
+    """ security: remembered acl answers and page acls follow changes """
+    group_name = u'AclCacheTestGroup'
+    mainpage_name = u'AclCacheTestPage'
+    subpage_name = u'AclCacheTestPage/SubPage'
+
+    class Config(wikiconfig.Config):
+        acl_hierarchic = True
+
+    def setup_method(self, method):
+        become_trusted(self.request)
+        create_page(self.request, self.group_name, u" * JoeDoe\n")
+        create_page(self.request, self.mainpage_name, u"#acl AclCacheTestGroup:read,write All:read\n")
+        create_page(self.request, self.subpage_name, u"no acl here")
+
+    def teardown_method(self, method):
+        for pagename in (self.subpage_name, self.mainpage_name, self.group_name):
+            nuke_page(self.request, pagename)
+
+    def testGroupChange(self):
+        """ security: acl answers are forgotten when a group changes """
+        acl = AccessControlList(self.request.cfg, [u"AclCacheTestGroup:read,write All:read"])
+        assert acl.may(self.request, u'JoeDoe', 'write')
+        assert not acl.may(self.request, u'JaneDoe', 'write')
+        create_page(self.request, self.group_name, u" * JaneDoe\n")
+        assert acl.may(self.request, u'JaneDoe', 'write')
+        assert not acl.may(self.request, u'JoeDoe', 'write')
+
+    def testHierarchicPageChange(self):
+        """ security: page acls remembered in the request follow page changes """
+        u = User(self.request, auth_username=u'JoeDoe')
+        assert u.may.write(self.subpage_name)
+        create_page(self.request, self.mainpage_name, u"#acl All:read\n")
+        assert not u.may.write(self.subpage_name)
+        assert u.may.read(self.subpage_name)
+
 coverage_modules = ['MoinMoin.security']
@@ -0,0 +1,217 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - page subscription index
+
+    The page subscriptions of all users are kept in the pagesubscriptions
+    cache (uid -> name, email, subscribed_pages). To find the subscribers of
+    a page without trying every pattern of every user, the SubscriptionIndex
+    splits the patterns:
+
+    * literal patterns (no regex special characters) are looked up in a dict
+      pattern -> uids,
+    * regex patterns are compiled into a few combined regexes, where each
+      pattern is a named group mapping back to the users having it. A page
+      only needs to be checked against the single patterns of a combined
+      regex if the combined regex matches at all.
+
+    The index is kept in memory (request.cfg.cache.subscription_index) and
+    updated incrementally when a user profile gets saved (e.g. by
+    User.subscribe/unsubscribe, see User.updatePageSubCache). If another
+    process changed the subscriptions cache, the index gets rebuilt from it.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import re, threading
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+
+_lock = threading.RLock()
+
+# patterns without these characters only match the exact page name
+_regex_chars = re.compile(r'[.^$*+?{}\[\]\\|()]')
+# patterns with these (group references, inline flags, ...) can not be part
+# of a combined regex, they get compiled on their own
+_standalone_re = re.compile(r'\(\?|\\\d')
+
+
+def _cache_entry(request, **kw):
+    return caching.CacheEntry(request, 'users', 'pagesubscriptions', scope='userdir', use_pickle=True, **kw)
+
+
+class SubscriptionIndex(object):
+    """ Find the subscribers of pages in time proportional to the matches """
+
+    # amount of patterns per combined regex
+    chunk_size = 100
+
+    def __init__(self, page_sub=None):
+        """
+        @param page_sub: dict uid -> {'name':..., 'email':..., 'subscribed_pages':...}
+        """
+        self.uid = None # uid of the cache file we were built from
+        self.users = {}
+        self.literal = {} # pattern -> set of uids
+        self.regex = {} # pattern -> set of uids
+        self._compiled = None # list of (combined regex, [(pattern, regex), ...])
+        for uid, info in (page_sub or {}).items():
+            self.set_user(uid, info)
+
+    def set_user(self, uid, info=None):
+        """ Set the subscription info of user uid (None removes the user) """
+        _lock.acquire()
+        try:
+            old = self.users.pop(uid, None)
+            if old is not None:
+                for pattern in old['subscribed_pages']:
+                    for patterns in (self.literal, self.regex):
+                        uids = patterns.get(pattern)
+                        if uids is not None:
+                            uids.discard(uid)
+                            if not uids:
+                                del patterns[pattern]
+                                if patterns is self.regex:
+                                    self._compiled = None
+            if info is not None:
+                self.users[uid] = info
+                for pattern in info['subscribed_pages']:
+                    # a pattern always matches its literal text (like in
+                    # User.isSubscribedTo), even if it also is a regex
+                    self.literal.setdefault(pattern, set()).add(uid)
+                    if _regex_chars.search(pattern):
+                        if pattern not in self.regex:
+                            self._compiled = None
+                        self.regex.setdefault(pattern, set()).add(uid)
+        finally:
+            _lock.release()
+
+    def _compile(self):
+        """ Compile the regex patterns into combined regexes """
+        compiled = []
+        chunk = []
+        for pattern in self.regex:
+            # same as User.isSubscribedTo, skipping bad patterns
+            try:
+                regex = re.compile(r'^%s$' % pattern, re.M)
+            except re.error:
+                continue
+            if _standalone_re.search(pattern):
+                compiled.append((regex, [(pattern, regex)]))
+            else:
+                chunk.append((pattern, regex))
+            if len(chunk) >= self.chunk_size:
+                compiled.extend(self._combine(chunk))
+                chunk = []
+        if chunk:
+            compiled.extend(self._combine(chunk))
+        return compiled
+
+    def _combine(self, chunk):
+        """ Return [(combined regex, chunk)] for a chunk of (pattern, regex) """
+        if len(chunk) == 1:
+            return [(chunk[0][1], chunk)]
+        alternatives = ['(?P<p%d>^%s$)' % (i, pattern) for i, (pattern, regex) in enumerate(chunk)]
+        try:
+            return [(re.compile('|'.join(alternatives), re.M), chunk)]
+        except (re.error, AssertionError, OverflowError):
+            # should not happen, but matching each pattern is fine as well
+            return [(regex, [(pattern, regex)]) for pattern, regex in chunk]
+
+    def subscribers(self, pages):
+        """ Return the set of uids subscribed to any of pages
+
+        @param pages: list of page names (and interwiki page names)
+        """
+        _lock.acquire()
+        try:
+            found = set()
+            for pagename in pages:
+                found.update(self.literal.get(pagename, ()))
+            if self.regex:
+                if self._compiled is None:
+                    self._compiled = self._compile()
+                text = '\n'.join(pages)
+                for combined, chunk in self._compiled:
+                    match = combined.search(text)
+                    if match is None:
+                        continue
+                    if len(chunk) == 1:
+                        found.update(self.regex[chunk[0][0]])
+                        continue
+                    # the group tells which pattern matched, others of this
+                    # chunk may match (at other lines) as well
+                    matched = int(match.lastgroup[1:])
+                    for i, (pattern, regex) in enumerate(chunk):
+                        if i == matched or regex.search(text):
+                            found.update(self.regex[pattern])
+            return found
+        finally:
+            _lock.release()
+
+
+def build(request):
+    """ Build the pagesubscriptions cache from all user profiles """
+    from MoinMoin import user
+    cache = _cache_entry(request, do_locking=False)
+    # lock to stop anybody else interfering with the data while we're working
+    cache.lock('w')
+    try:
+        page_sub = {}
+        for subscriber in user.get_users(request):
+            # we don't care about storing entries for users without any page subscriptions
+            if subscriber.subscribed_pages:
+                page_sub[subscriber.id] = {
+                    'name': subscriber.name,
+                    'email': subscriber.email,
+                    'subscribed_pages': subscriber.subscribed_pages,
+                }
+        cache.update(page_sub)
+    finally:
+        cache.unlock()
+    return page_sub
+
+
+def get_index(request):
+    """ Return the up-to-date subscription index """
+    _lock.acquire()
+    try:
+        cache = _cache_entry(request)
+        index = getattr(request.cfg.cache, 'subscription_index', None)
+        uid = cache.uid()
+        if index is None or uid is None or index.uid != uid:
+            if cache.exists():
+                page_sub = cache.content()
+            else:
+                page_sub = build(request)
+            index = SubscriptionIndex(page_sub)
+            index.uid = cache.uid()
+            request.cfg.cache.subscription_index = index
+        return index
+    finally:
+        _lock.release()
+
+
+def update_user(request, uid, info, old_cache_uid, cache_uid):
+    """ Update the in-memory index after user uid was saved
+
+    @param info: subscription info of the user (None removes the user)
+    @param old_cache_uid: uid of the pagesubscriptions cache before the update
+    @param cache_uid: uid of the updated pagesubscriptions cache
+    """
+    _lock.acquire()
+    try:
+        index = getattr(request.cfg.cache, 'subscription_index', None)
+        if index is None:
+            return
+        if index.uid == old_cache_uid:
+            index.set_user(uid, info)
+            index.uid = cache_uid
+        else:
+            # we missed changes of another process, rebuild when needed
+            request.cfg.cache.subscription_index = None
+    finally:
+        _lock.release()
@@ -152,6 +152,11 @@ class ThemeBase:
 
     stylesheetsCharset = 'utf-8'
 
+    # Cache html fragments in the process, see fragment(). Themes changing
+    # the methods using it in a way that their html depends on other things
+    # should disable this.
+    fragment_cache = True
+
     def __init__(self, request):
         """
         Initialize the theme object.
@@ -164,6 +169,33 @@ class ThemeBase:
         self._status = []
         self._send_title_called = False
 
+    def fragment(self, kind, key, create, *args):
+        """ Return a html fragment, cached for all requests of this process
+
+        Many parts of the page chrome (navibar links, actions menu, editbar
+        links, ...) only depend on the theme, the user interface language
+        and few other things, like what the user may do on the current
+        page. Instead of creating them again for every request, we keep
+        them in request.cfg.cache.theme_fragments. That cache is cleared
+        whenever something changes in the wiki (see ItemCache.refresh),
+        so e.g. page existence need not be part of the key.
+
+        @param kind: what kind of fragment, e.g. 'actionsMenu'
+        @param key: tuple of everything else the fragment depends on
+        @param create: callable creating the fragment (called with args)
+        @return: the fragment
+        """
+        if not self.fragment_cache:
+            return create(*args)
+        request = self.request
+        cache = self.cfg.cache.theme_fragments
+        key = (self.__class__, request.lang, request.script_root) + key
+        data = cache.getItem(request, kind, key)
+        if data is None:
+            data = create(*args)
+            cache.putItem(request, kind, key, data)
+        return data
+
     def img_url(self, img):
         """ Generate an image href
 
@@ -337,18 +369,35 @@ class ThemeBase:
                 userlinks.append(d['page'].link_to(request, text=_('Logout'),
                                                    querystr={'action': 'logout', 'logout': 'logout'}, id='logout', rel='nofollow'))
         else:
-            query = {'action': 'login'}
-            # special direct-login link if the auth methods want no input
-            if request.cfg.auth_login_inputs == ['special_no_input']:
-                query['login'] = '1'
             if request.cfg.auth_have_login:
-                userlinks.append(d['page'].link_to(request, text=_("Login"),
-                                                   querystr=query, id='login', rel='nofollow'))
+                userlinks.append(self.loginLink(d['page']))
 
         userlinks = ['<li>%s</li>' % link for link in userlinks]
         html = '<ul id="username">%s</ul>' % ''.join(userlinks)
         return html
 
+    def loginLink(self, page):
+        """ Return the login link shown to anonymous users on page
+
+        @param page: current page, Page object
+        @rtype: unicode
+        @return: login link html
+        """
+        return self.fragment('loginLink', (page.page_name, ), self._loginLink, page)
+
+    def _loginLink(self, page):
+        _ = self.request.getText
+        query = {'action': 'login'}
+        # special direct-login link if the auth methods want no input
+        if self.request.cfg.auth_login_inputs == ['special_no_input']:
+            query['login'] = '1'
+        return page.link_to(self.request, text=_("Login"),
+                            querystr=query, id='login', rel='nofollow')
+
+    def cachedNavilink(self, text, localize=1):
+        """ Like splitNavilink, but cached (see fragment) """
+        return self.fragment('navilink', (text, localize, ), self.splitNavilink, text, localize)
+
     def splitNavilink(self, text, localize=1):
         """ Split navibar links into pagename, link to page
 
@@ -473,7 +522,7 @@ class ThemeBase:
         # Process config navi_bar
         if request.cfg.navi_bar:
             for text in request.cfg.navi_bar:
-                pagename, link = self.splitNavilink(text)
+                pagename, link = self.cachedNavilink(text)
                 if pagename == current:
                     cls = 'wikilink current'
                 else:
@@ -485,7 +534,7 @@ class ThemeBase:
         userlinks = request.user.getQuickLinks()
         for text in userlinks:
             # Split text without localization, user knows what he wants
-            pagename, link = self.splitNavilink(text, localize=0)
+            pagename, link = self.cachedNavilink(text, localize=0)
             if not pagename in found:
                 if pagename == current:
                     cls = 'userlink current'
@@ -714,12 +763,28 @@ class ThemeBase:
         # Check mode
         if d.get('print_mode'):
             media = d.get('media', 'print')
+        else:
+            media = None
+        html = self.fragment('stylesheets', (media, ), self._theme_stylesheets, media)
+
+        # Add user css url (assuming that user css uses same charset)
+        href = request.user.valid and request.user.css_url
+        if href and href.lower() != "none":
+            user_css = self._stylesheet_link(False, 'all', href)
+        else:
+            user_css = ''
+
+        return '\n'.join([html, user_css])
+
+    def _theme_stylesheets(self, media):
+        """ Return the theme and config stylesheet links for media (None: screen) """
+        if media:
             stylesheets = getattr(self, 'stylesheets_' + media)
         else:
             stylesheets = self.stylesheets
 
         theme_css = [self._stylesheet_link(True, *stylesheet) for stylesheet in stylesheets]
-        cfg_css = [self._stylesheet_link(False, *stylesheet) for stylesheet in request.cfg.stylesheets]
+        cfg_css = [self._stylesheet_link(False, *stylesheet) for stylesheet in self.request.cfg.stylesheets]
 
         msie_css = """
 <!-- css only for MS IE6/IE7 browsers -->
@@ -727,15 +792,7 @@ class ThemeBase:
    %s
 <![endif]-->
 """ % self._stylesheet_link(True, 'all', 'msie')
-
-        # Add user css url (assuming that user css uses same charset)
-        href = request.user.valid and request.user.css_url
-        if href and href.lower() != "none":
-            user_css = self._stylesheet_link(False, 'all', href)
-        else:
-            user_css = ''
-
-        return '\n'.join(theme_css + cfg_css + [msie_css, user_css])
+        return '\n'.join(theme_css + cfg_css + [msie_css])
 
     def shouldShowPageinfo(self, page):
         """ Should we show page info?
@@ -991,6 +1048,17 @@ var search_hint = "%(search_hint)s";
         @rtype: unicode
         @return: actions menu html fragment
         """
+        request = self.request
+        user = request.user
+        pagename = page.page_name
+        # what get_available_actions and the menu depend on (besides
+        # things like page existence, see fragment)
+        key = (pagename, request.rev, page.canUseCache(),
+               user.may.read(pagename), user.may.write(pagename), user.may.delete(pagename),
+               user.may.revert(pagename), user.may.admin(pagename), user.isSuperUser(), )
+        return self.fragment('actionsMenu', key, self._actionsMenu, page)
+
+    def _actionsMenu(self, page):
         request = self.request
         _ = request.getText
         rev = request.rev
@@ -1203,6 +1271,9 @@ actionsMenuInit('%(label)s');
 
         This is separate method to make it easy to customize the
         edtibar in sub classes.
+
+        The links of the user (subscribe, quicklink) are created for each
+        request, the others are cached (see fragment).
         """
         _ = self.request.getText
         editbar_actions = []
@@ -1217,15 +1288,17 @@ actionsMenuInit('%(label)s');
                 # keeps the browser away from jumping to the link target::
                 editbar_actions.append('<a href="#" class="nbcomment" onClick="toggleComments();return false;">%s</a>' % _('Comments'))
             elif editbar_item == 'Edit':
-                editbar_actions.append(self.editorLink(page))
+                key = (page.page_name, page.rev, self.request.user.may.write(page.page_name),
+                       self.showBothEditLinks(), )
+                editbar_actions.append(self.fragment('editorLink', key, self.editorLink, page))
             elif editbar_item == 'Info':
-                editbar_actions.append(self.infoLink(page))
+                editbar_actions.append(self.fragment('infoLink', (page.page_name, page.rev, ), self.infoLink, page))
             elif editbar_item == 'Subscribe':
                 editbar_actions.append(self.subscribeLink(page))
             elif editbar_item == 'Quicklink':
                 editbar_actions.append(self.quicklinkLink(page))
             elif editbar_item == 'Attachments':
-                editbar_actions.append(self.attachmentsLink(page))
+                editbar_actions.append(self.fragment('attachmentsLink', (page.page_name, page.rev, ), self.attachmentsLink, page))
             elif editbar_item == 'ActionsMenu':
                 editbar_actions.append(self.actionsMenu(page))
         return editbar_actions
@@ -0,0 +1,64 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.theme fragment cache Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin.theme import ThemeBase
+from MoinMoin.Page import Page
+from MoinMoin._tests import become_superuser, create_page, nuke_page
+
+
+class TestFragmentCache(object):
+    """ theme: html fragments cached for all requests """
+    pagename = 'ThemeFragmentTestPage'
+
+    def setup_method(self, method):
+        self.cache = self.request.cfg.cache.theme_fragments
+        self.theme = ThemeBase(self.request)
+
+    def teardown_method(self, method):
+        nuke_page(self.request, self.pagename)
+
+    def testCached(self):
+        """ theme: the actions menu is only created once """
+        page = Page(self.request, 'FrontPage')
+        html = self.theme.actionsMenu(page)
+        hits = self.cache.hits
+        assert ThemeBase(self.request).actionsMenu(page) == html
+        assert self.cache.hits == hits + 1
+
+    def testPermissions(self):
+        """ theme: users with other rights get other fragments """
+        page = Page(self.request, 'FrontPage')
+        html = self.theme.actionsMenu(page)
+        assert '<option value="show" disabled class="disabled">Remove Spam</option>' in html
+        user = self.request.user
+        saved = user.name, user.valid, user.auth_method, list(self.request.cfg.superuser)
+        try:
+            become_superuser(self.request)
+            html = self.theme.actionsMenu(page)
+        finally:
+            user.name, user.valid, user.auth_method, self.request.cfg.superuser[:] = saved
+            user.may.name = user.name
+        assert '<option value="Despam">Remove Spam</option>' in html
+
+    def testWikiChanged(self):
+        """ theme: fragments are created again when the wiki changes """
+        text = '[[%s|link]]' % self.pagename
+        pagename, link = self.theme.cachedNavilink(text)
+        assert pagename == self.pagename
+        assert 'nonexistent' in link
+        create_page(self.request, self.pagename, 'some text')
+        pagename, link = self.theme.cachedNavilink(text)
+        assert 'nonexistent' not in link
+
+    def testMaxItems(self):
+        """ theme: only a limited amount of fragments is kept """
+        for i in range(self.cache.max_items + 1):
+            self.theme.cachedNavilink('Page%d' % i, localize=0)
+        assert len(self.cache.cache['navilink']) <= self.cache.max_items
+
+coverage_modules = ['MoinMoin.theme']
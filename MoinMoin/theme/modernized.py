@@ -205,13 +205,8 @@ class Theme(ThemeBase):
                 userlinks.append(d['page'].link_to(request, text=_('Logout'),
                                                    querystr={'action': 'logout', 'logout': 'logout'}, id='logout', rel='nofollow'))
         else:
-            query = {'action': 'login'}
-            # special direct-login link if the auth methods want no input
-            if request.cfg.auth_login_inputs == ['special_no_input']:
-                query['login'] = '1'
             if request.cfg.auth_have_login:
-                userlinks.append(d['page'].link_to(request, text=_("Login"),
-                                                   querystr=query, id='login', rel='nofollow'))
+                userlinks.append(self.loginLink(d['page']))
 
         userlinks_html = '<span class="sep"> | </span>'.join(userlinks)
         html = '<div id="username">%s</div>' % userlinks_html
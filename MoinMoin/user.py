@@ -20,7 +20,7 @@
     @license: GNU GPL, see COPYING for details.
 """
 
-import os, time, codecs, base64
+import time, base64
 import hashlib
 import hmac
 from copy import deepcopy
@@ -34,7 +34,7 @@ except ImportError:
 from MoinMoin import log
 logging = log.getLogger(__name__)
 
-from MoinMoin import config, caching, wikiutil, i18n, events
+from MoinMoin import config, caching, wikiutil, i18n, events, subscriptions
 from werkzeug.security import safe_str_cmp as safe_str_equal
 from MoinMoin.util import timefuncs, random_string
 from MoinMoin.wikiutil import url_quote_plus
@@ -51,19 +51,34 @@ def getUserList(request):
     @rtype: list
     @return: all user IDs
     """
-    import re
-    user_re = re.compile(r'^\d+\.\d+(\.\d+)?$')
-    files = os.listdir(request.cfg.user_dir)
-    userlist = [f for f in files if user_re.match(f)]
-    return userlist
+    return request.cfg.user_storage.list_ids(request)
 
-def get_by_filter(request, filter_func):
+def get_users(request, uids=None, **criteria):
+    """ Yield the User objects of many users, loading their profiles in batches
+
+    @param uids: ids of the users to look at (default: all users)
+    @keyword criteria: only users matching these (see
+                       MoinMoin.userstorage.UserStorage.search_profiles),
+                       evaluated by the user storage (using its indexes, if
+                       it has some)
+    """
+    storage = request.cfg.user_storage
+    if criteria:
+        profiles = storage.search_profiles(request, uids, **criteria)
+    else:
+        if uids is None:
+            uids = storage.list_ids(request)
+        profiles = storage.load_many(request, uids)
+    for uid, profile in profiles:
+        yield User(request, uid, profile=profile)
+
+def get_by_filter(request, filter_func, **criteria):
     """ Searches for a user with a given filter function
 
     Be careful: SLOW for big wikis, rather use _getUserIdByKey & related.
+    If the criteria (see get_users) can narrow down the users, give them.
     """
-    for uid in getUserList(request):
-        theuser = User(request, uid)
+    for theuser in get_users(request, **criteria):
         if filter_func(theuser):
             return theuser
 
@@ -94,6 +109,10 @@ def _getUserIdByKey(request, key, search, case=True):
         raise ValueError("unsupported key, must be in CACHED_USER_ATTRS")
     if not search:
         return None
+    storage = request.cfg.user_storage
+    if storage.has_index:
+        # no need for the lookup caches
+        return storage.get_id_by_key(request, key, search, case)
     cfg_cache_attr = key + "2id"
     if not case:
         cfg_cache_attr += "_lower"
@@ -177,8 +196,8 @@ def rebuildLookupCaches(request):
     cache = {}
     for attrname in CACHED_USER_ATTRS:
         cache[attrname] = {}
-    for userid in getUserList(request):
-        u = User(request, id=userid)
+    for u in get_users(request):
+        userid = u.id
         if u.valid:
             for attrname in CACHED_USER_ATTRS:
                 if hasattr(u, attrname):
@@ -459,6 +478,8 @@ class User:
                                determined by auth method and should not be
                                changeable by preferences, default: ().
                                First tuple element was used for authentication.
+        @keyword profile: already loaded profile data of user id (see
+                          get_users), so it is not loaded again
         """
         self._cfg = request.cfg
         self.valid = 0
@@ -511,7 +532,7 @@ class User:
             if not password is None:
                 check_password = password
         if self.id:
-            self.load_from_id(check_password)
+            self.load_from_id(check_password, kw.get('profile'))
         elif self.name:
             self.id = getUserId(self._request, self.name)
             if self.id:
@@ -554,28 +575,20 @@ class User:
         if not self.valid and not self.disabled or changed: # do we need to save/update?
             self.save() # yes, create/update user profile
 
-    def __filename(self):
-        """ Get filename of the user's file on disk
-
-        @rtype: string
-        @return: full path and filename of user account file
-        """
-        return os.path.join(self._cfg.user_dir, self.id or "...NONE...")
-
     def exists(self):
         """ Do we have a user account for this user?
 
         @rtype: bool
         @return: true, if we have a user account
         """
-        return os.path.exists(self.__filename())
+        return bool(self.id) and self._cfg.user_storage.exists(self._request, self.id)
 
     def remove(self):
-        """ Remove user profile from disk """
-        os.remove(self.__filename())
+        """ Remove user profile from the user storage """
+        self._cfg.user_storage.remove(self._request, self.id)
 
-    def load_from_id(self, password=None):
-        """ Load user account data from disk.
+    def load_from_id(self, password=None, profile=None):
+        """ Load user account data from the user storage.
 
         Can only load user data if the id number is already known.
 
@@ -584,34 +597,17 @@ class User:
 
         @param password: If not None, then the given password must match the
                          password in the user account file.
+        @param profile: the already loaded profile data (optional)
         """
-        if not self.exists():
-            return
+        if profile is None:
+            profile = self._cfg.user_storage.load(self._request, self.id)
+            if profile is None:
+                return
 
-        data = codecs.open(self.__filename(), "r", config.charset).readlines()
         user_data = {'enc_password': ''}
-        for line in data:
-            if line[0] == '#':
-                continue
-
-            try:
-                key, val = line.strip().split('=', 1)
-                if key not in self._cfg.user_transient_fields and key[0] != '_':
-                    # Decode list values
-                    if key.endswith('[]'):
-                        key = key[:-2]
-                        val = decodeList(val)
-                    # Decode dict values
-                    elif key.endswith('{}'):
-                        key = key[:-2]
-                        val = decodeDict(val)
-                    # for compatibility reading old files, keep these explicit
-                    # we will store them with [] appended
-                    elif key in ['quicklinks', 'subscribed_pages', 'subscribed_events']:
-                        val = decodeList(val)
-                    user_data[key] = val
-            except ValueError:
-                pass
+        for key, val in profile.items():
+            if key not in self._cfg.user_transient_fields and key[0] != '_':
+                user_data[key] = val
 
         # Validate data from user file. In case we need to change some
         # values, we set 'changed' flag, and later save the user data.
@@ -761,7 +757,7 @@ class User:
                     if key not in self._cfg.user_transient_fields and key[0] != '_']
 
     def save(self):
-        """ Save user account data to user account file on disk.
+        """ Save user account data to the user storage.
 
         This saves all member variables, except "id" and "valid" and
         those starting with an underscore.
@@ -769,34 +765,9 @@ class User:
         if not self.id:
             return
 
-        user_dir = self._cfg.user_dir
-        if not os.path.exists(user_dir):
-            os.makedirs(user_dir)
-
         self.last_saved = str(time.time())
 
-        # !!! should write to a temp file here to avoid race conditions,
-        # or even better, use locking
-
-        data = codecs.open(self.__filename(), "w", config.charset)
-        data.write("# Data saved '%s' for id '%s'\n" % (
-            time.strftime(self._cfg.datetime_fmt, time.localtime(time.time())),
-            self.id))
-        attrs = self.persistent_items()
-        attrs.sort()
-        for key, value in attrs:
-            # Encode list values
-            if isinstance(value, list):
-                key += '[]'
-                value = encodeList(value)
-            # Encode dict values
-            elif isinstance(value, dict):
-                key += '{}'
-                value = encodeDict(value)
-            line = "%s=%s" % (key, str(value))
-            line = line.replace('\n', ' ').replace('\r', ' ') # no lineseps
-            data.write(line + '\n')
-        data.close()
+        self._cfg.user_storage.save(self._request, self.id, self.persistent_items())
 
         if not self.disabled:
             self.valid = 1
@@ -1005,19 +976,22 @@ class User:
             return  # if no cache file exists, just don't do anything
 
         cache.lock('w')
+        old_cache_uid = cache.uid()
         page_sub = cache.content()
 
         # we only store entries for valid users with some page subscriptions
+        info = None
         if self.valid and self.subscribed_pages:
-            page_sub[self.id] = {
+            info = page_sub[self.id] = {
                 'name': self.name,
                 'email': self.email,
-                'subscribed_pages': self.subscribed_pages,
+                'subscribed_pages': self.subscribed_pages[:],
             }
         elif page_sub.get(self.id):
             del page_sub[self.id]
 
         cache.update(page_sub)
+        subscriptions.update_user(self._request, self.id, info, old_cache_uid, cache.uid())
         cache.unlock()
 
     def updateLookupCaches(self):
@@ -1157,6 +1131,7 @@ class User:
 
     def _wantTrail(self):
         return (not self.valid and self._request.cfg.cookie_lifetime[0]  # anon sessions enabled
+                and not self._request.cfg.session_stateless_anonymous  # not just for the trail
                 or self.valid and (self.show_page_trail or self.remember_last_visit))  # logged-in session
 
     def addTrail(self, page):
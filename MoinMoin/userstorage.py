@@ -0,0 +1,499 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - user profile storage
+
+    A user profile storage keeps the profiles of all users (see
+    MoinMoin.user.User) and finds users by some of their attributes.
+    Configure it in your wiki config, e.g.:
+
+        from MoinMoin import userstorage
+        user_storage = userstorage.SQLiteUserStorage()
+
+    FileUserStorage (default) keeps one text file per user in data/user.
+    Lookups by name, email, ... use the pickled lookup caches of
+    MoinMoin.user, everything else has to read all profile files.
+
+    SQLiteUserStorage keeps all profiles in a single sqlite database with
+    indexes on name, email, jid, openids, disabled and last_login, so
+    lookups and searches don't need to load any profile.
+
+    Use "moin account migrate" to copy the profiles from one storage to
+    another.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, re, time, codecs, threading
+import sqlite3
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import config
+
+
+def parse_profile(lines):
+    """ Decode the key=value lines of a user profile
+
+    @param lines: iterable of unicode lines
+    @rtype: dict
+    @return: profile data (values are unicode, lists or dicts)
+    """
+    from MoinMoin.user import decodeList, decodeDict
+    data = {}
+    for line in lines:
+        if not line or line[0] == '#':
+            continue
+        try:
+            key, val = line.strip().split('=', 1)
+        except ValueError:
+            continue
+        # Decode list values
+        if key.endswith('[]'):
+            key = key[:-2]
+            val = decodeList(val)
+        # Decode dict values
+        elif key.endswith('{}'):
+            key = key[:-2]
+            val = decodeDict(val)
+        # for compatibility reading old files, keep these explicit
+        # we will store them with [] appended
+        elif key in ['quicklinks', 'subscribed_pages', 'subscribed_events']:
+            val = decodeList(val)
+        data[key] = val
+    return data
+
+
+def serialize_profile(items):
+    """ Encode user profile items as key=value lines
+
+    @param items: list of (key, value) tuples
+    @rtype: list of unicode
+    @return: lines (without line separators), sorted by key
+    """
+    from MoinMoin.user import encodeList, encodeDict
+    lines = []
+    for key, value in sorted(items):
+        # Encode list values
+        if isinstance(value, list):
+            key += '[]'
+            value = encodeList(value)
+        # Encode dict values
+        elif isinstance(value, dict):
+            key += '{}'
+            value = encodeDict(value)
+        line = "%s=%s" % (key, str(value))
+        lines.append(line.replace('\n', ' ').replace('\r', ' ')) # no lineseps
+    return lines
+
+
+def _disabled(data):
+    try:
+        return int(data.get('disabled') or 0)
+    except ValueError:
+        return 0
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class UserStorage(object):
+    """ Base class of the user profile storages
+
+    Profiles are dicts of attribute name -> value, like parse_profile
+    returns them. A storage instance is shared by all threads (and all wikis
+    using the same config), so it must not keep per-request state.
+    """
+
+    # True if the storage can find users by CACHED_USER_ATTRS itself (see
+    # get_id_by_key), without the lookup caches of MoinMoin.user
+    has_index = False
+
+    def list_ids(self, request):
+        """ Return a list of all user ids """
+        raise NotImplementedError
+
+    def exists(self, request, uid):
+        """ Return True if there is a profile for user uid """
+        raise NotImplementedError
+
+    def load(self, request, uid):
+        """ Return the profile of user uid (or None if there is none) """
+        raise NotImplementedError
+
+    def load_many(self, request, uids):
+        """ Yield (uid, profile) for all existing profiles of uids """
+        for uid in uids:
+            data = self.load(request, uid)
+            if data is not None:
+                yield uid, data
+
+    def save(self, request, uid, items):
+        """ Save the profile of user uid
+
+        @param items: list of (key, value) tuples
+        """
+        raise NotImplementedError
+
+    def save_many(self, request, profiles):
+        """ Save many profiles, profiles is an iterable of (uid, items) """
+        count = 0
+        for uid, items in profiles:
+            self.save(request, uid, items)
+            count += 1
+        return count
+
+    def remove(self, request, uid):
+        """ Remove the profile of user uid """
+        raise NotImplementedError
+
+    def record_login(self, request, u):
+        """ Remember u.last_login (set by the caller) for user u """
+        u.save()
+
+    def get_id_by_key(self, request, key, value, case=True):
+        """ Return the id of the enabled user with attribute key == value
+
+        Only available if has_index is True.
+        """
+        raise NotImplementedError
+
+    def search(self, request, **criteria):
+        """ Return a list of the ids of the users matching all given criteria
+        (see search_profiles)
+        """
+        return [uid for uid, data in self.search_profiles(request, **criteria)]
+
+    def search_profiles(self, request, uids=None, name=None, email=None, jid=None,
+                        openid=None, disabled=None, has_email=None,
+                        last_login_before=None, last_login_after=None):
+        """ Yield (uid, profile) for the users matching all given criteria
+
+        name and openid are compared case-sensitive, email and jid are not.
+        Users who never logged in (since we record it) match neither
+        last_login_before nor last_login_after.
+
+        This implementation loads all profiles, storages with indexes should
+        do better.
+
+        @param uids: ids of the users to look at (default: all users)
+        """
+        if uids is None:
+            uids = self.list_ids(request)
+        email = email and email.lower()
+        jid = jid and jid.lower()
+        for uid, data in self.load_many(request, uids):
+            if name is not None and data.get('name') != name:
+                continue
+            if email is not None and (data.get('email') or '').lower() != email:
+                continue
+            if jid is not None and (data.get('jid') or '').lower() != jid:
+                continue
+            if openid is not None and openid not in (data.get('openids') or []):
+                continue
+            if disabled is not None and bool(_disabled(data)) != bool(disabled):
+                continue
+            if has_email is not None and bool(data.get('email')) != bool(has_email):
+                continue
+            if last_login_before is not None or last_login_after is not None:
+                last_login = _float(data.get('last_login'))
+                if last_login is None:
+                    continue
+                if last_login_before is not None and last_login >= last_login_before:
+                    continue
+                if last_login_after is not None and last_login < last_login_after:
+                    continue
+            yield uid, data
+
+
+class FileUserStorage(UserStorage):
+    """ One key=value text file per user in the user_dir """
+
+    uid_re = re.compile(r'^\d+\.\d+(\.\d+)?$')
+
+    def __init__(self, user_dir=None):
+        """
+        @param user_dir: directory of the profile files (default: cfg.user_dir)
+        """
+        self.user_dir = user_dir
+
+    def _user_dir(self, request):
+        return self.user_dir or request.cfg.user_dir
+
+    def _filename(self, request, uid):
+        return os.path.join(self._user_dir(request), uid or "...NONE...")
+
+    def list_ids(self, request):
+        files = os.listdir(self._user_dir(request))
+        return [f for f in files if self.uid_re.match(f)]
+
+    def exists(self, request, uid):
+        return os.path.exists(self._filename(request, uid))
+
+    def load(self, request, uid):
+        try:
+            f = codecs.open(self._filename(request, uid), "r", config.charset)
+        except IOError:
+            return None
+        try:
+            return parse_profile(f.readlines())
+        finally:
+            f.close()
+
+    def save(self, request, uid, items):
+        user_dir = self._user_dir(request)
+        if not os.path.exists(user_dir):
+            os.makedirs(user_dir)
+
+        # !!! should write to a temp file here to avoid race conditions,
+        # or even better, use locking
+
+        data = codecs.open(self._filename(request, uid), "w", config.charset)
+        try:
+            data.write("# Data saved '%s' for id '%s'\n" % (
+                time.strftime(request.cfg.datetime_fmt, time.localtime(time.time())),
+                uid))
+            for line in serialize_profile(items):
+                data.write(line + '\n')
+        finally:
+            data.close()
+
+    def remove(self, request, uid):
+        os.remove(self._filename(request, uid))
+
+
+class SQLiteUserStorage(UserStorage):
+    """ All profiles in one sqlite database, indexed on the lookup attributes
+
+    The profile itself is stored in the same key=value format as used by
+    FileUserStorage, the indexed attributes are stored in extra columns.
+    last_login only lives in its column, so recording a login does not
+    rewrite the profile.
+    """
+
+    has_index = True
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            name_lower TEXT,
+            email_lower TEXT,
+            jid_lower TEXT,
+            disabled INTEGER NOT NULL DEFAULT 0,
+            last_login REAL,
+            profile TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS openids (
+            openid TEXT NOT NULL,
+            openid_lower TEXT NOT NULL,
+            uid TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS users_name ON users (name);
+        CREATE INDEX IF NOT EXISTS users_name_lower ON users (name_lower);
+        CREATE INDEX IF NOT EXISTS users_email ON users (email_lower);
+        CREATE INDEX IF NOT EXISTS users_jid ON users (jid_lower);
+        CREATE INDEX IF NOT EXISTS users_disabled ON users (disabled);
+        CREATE INDEX IF NOT EXISTS users_last_login ON users (last_login);
+        CREATE INDEX IF NOT EXISTS openids_openid ON openids (openid);
+        CREATE INDEX IF NOT EXISTS openids_openid_lower ON openids (openid_lower);
+        CREATE INDEX IF NOT EXISTS openids_uid ON openids (uid);
+    """
+
+    # key of MoinMoin.user.CACHED_USER_ATTRS -> (case-sensitive, case-insensitive) column
+    key_columns = {
+        'name': ('name', 'name_lower'),
+        'email': ('email_lower', 'email_lower'),
+        'jid': ('jid_lower', 'jid_lower'),
+    }
+
+    # sqlite limits the amount of parameters of a statement
+    chunk_size = 500
+
+    def __init__(self, path=None, timeout=30.0):
+        """
+        @param path: path of the database file (default: <user_dir>/users.sqlite)
+        @param timeout: seconds to wait for the database lock of other processes
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _path(self, request):
+        return self.path or os.path.join(request.cfg.user_dir, 'users.sqlite')
+
+    def _connection(self, request):
+        """ Return the connection of the current thread to our database """
+        path = self._path(request)
+        connections = getattr(self._local, 'connections', None)
+        pid = os.getpid()
+        if connections is None or self._local.pid != pid:
+            # sqlite connections must not be used in a forked child process
+            # (e.g. of the prefork server), it opens its own ones
+            connections = self._local.connections = {}
+            self._local.pid = pid
+        conn = connections.get(path)
+        if conn is None:
+            dirname = os.path.dirname(path)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname)
+            conn = sqlite3.connect(path, timeout=self.timeout)
+            conn.executescript(self.schema)
+            connections[path] = conn
+        return conn
+
+    def _profile(self, profile, last_login):
+        data = parse_profile(profile.split('\n'))
+        if last_login is not None:
+            data['last_login'] = str(last_login)
+        return data
+
+    def _rows(self, items):
+        """ Return (users row values, openids) for the profile items """
+        data = dict(items)
+        last_login = _float(data.pop('last_login', None))
+        name = data.get('name') or ''
+        openids = data.get('openids') or []
+        row = (name, name.lower(),
+               (data.get('email') or '').lower(), (data.get('jid') or '').lower(),
+               _disabled(data), last_login,
+               '\n'.join(serialize_profile(list(data.items()))))
+        return row, openids
+
+    def _save(self, conn, uid, items):
+        row, openids = self._rows(items)
+        conn.execute("INSERT OR REPLACE INTO users "
+                     "(id, name, name_lower, email_lower, jid_lower, disabled, last_login, profile) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (uid, ) + row)
+        conn.execute("DELETE FROM openids WHERE uid = ?", (uid, ))
+        conn.executemany("INSERT INTO openids (openid, openid_lower, uid) VALUES (?, ?, ?)",
+                         [(openid, openid.lower(), uid) for openid in openids])
+
+    def list_ids(self, request):
+        conn = self._connection(request)
+        return [row[0] for row in conn.execute("SELECT id FROM users")]
+
+    def exists(self, request, uid):
+        conn = self._connection(request)
+        return conn.execute("SELECT 1 FROM users WHERE id = ?", (uid, )).fetchone() is not None
+
+    def load(self, request, uid):
+        conn = self._connection(request)
+        row = conn.execute("SELECT profile, last_login FROM users WHERE id = ?", (uid, )).fetchone()
+        if row is None:
+            return None
+        return self._profile(*row)
+
+    def load_many(self, request, uids):
+        conn = self._connection(request)
+        uids = list(uids)
+        for start in range(0, len(uids), self.chunk_size):
+            chunk = uids[start:start + self.chunk_size]
+            sql = "SELECT id, profile, last_login FROM users WHERE id IN (%s)" % ', '.join(['?'] * len(chunk))
+            for uid, profile, last_login in conn.execute(sql, chunk).fetchall():
+                yield uid, self._profile(profile, last_login)
+
+    def save(self, request, uid, items):
+        conn = self._connection(request)
+        with conn:
+            self._save(conn, uid, items)
+
+    def save_many(self, request, profiles):
+        conn = self._connection(request)
+        count = 0
+        with conn: # one transaction for all
+            for uid, items in profiles:
+                self._save(conn, uid, items)
+                count += 1
+        return count
+
+    def remove(self, request, uid):
+        conn = self._connection(request)
+        with conn:
+            conn.execute("DELETE FROM users WHERE id = ?", (uid, ))
+            conn.execute("DELETE FROM openids WHERE uid = ?", (uid, ))
+
+    def record_login(self, request, u):
+        conn = self._connection(request)
+        with conn:
+            conn.execute("UPDATE users SET last_login = ? WHERE id = ?", (_float(u.last_login), u.id))
+
+    def get_id_by_key(self, request, key, value, case=True):
+        conn = self._connection(request)
+        if key == 'openids':
+            column = case and 'o.openid' or 'o.openid_lower'
+            sql = ("SELECT u.id FROM openids o JOIN users u ON u.id = o.uid "
+                   "WHERE %s = ? AND u.disabled = 0 LIMIT 1" % column)
+        else:
+            column = self.key_columns[key][not case]
+            sql = "SELECT id FROM users WHERE %s = ? AND disabled = 0 LIMIT 1" % column
+        if column.endswith('_lower'):
+            value = value.lower()
+        row = conn.execute(sql, (value, )).fetchone()
+        return row and row[0] or None
+
+    def _conditions(self, name=None, email=None, jid=None, openid=None,
+                    disabled=None, has_email=None,
+                    last_login_before=None, last_login_after=None):
+        """ Return the conditions and their parameters for search criteria """
+        conditions, params = [], []
+        if name is not None:
+            conditions.append("name = ?")
+            params.append(name)
+        if email is not None:
+            conditions.append("email_lower = ?")
+            params.append(email.lower())
+        if jid is not None:
+            conditions.append("jid_lower = ?")
+            params.append(jid.lower())
+        if openid is not None:
+            conditions.append("id IN (SELECT uid FROM openids WHERE openid = ?)")
+            params.append(openid)
+        if disabled is not None:
+            conditions.append(disabled and "disabled != 0" or "disabled = 0")
+        if has_email is not None:
+            conditions.append(has_email and "email_lower != ''" or "email_lower = ''")
+        if last_login_before is not None:
+            conditions.append("last_login < ?")
+            params.append(last_login_before)
+        if last_login_after is not None:
+            conditions.append("last_login >= ?")
+            params.append(last_login_after)
+        return conditions, params
+
+    def _select(self, request, columns, uids=None, **criteria):
+        """ Yield the rows with columns of the users matching all given criteria
+
+        The uids (if given) are looked up in chunks, see chunk_size.
+        """
+        conditions, params = self._conditions(**criteria)
+        conn = self._connection(request)
+        if uids is None:
+            chunks = [None]
+        else:
+            uids = list(uids)
+            chunks = [uids[start:start + self.chunk_size]
+                      for start in range(0, len(uids), self.chunk_size)]
+        for chunk in chunks:
+            chunk_conditions, chunk_params = conditions, params
+            if chunk is not None:
+                chunk_conditions = conditions + ["id IN (%s)" % ', '.join(['?'] * len(chunk))]
+                chunk_params = params + chunk
+            sql = "SELECT %s FROM users" % columns
+            if chunk_conditions:
+                sql += " WHERE " + " AND ".join(chunk_conditions)
+            for row in conn.execute(sql, chunk_params).fetchall():
+                yield row
+
+    def search(self, request, **criteria):
+        return [row[0] for row in self._select(request, "id", **criteria)]
+
+    def search_profiles(self, request, uids=None, **criteria):
+        for uid, profile, last_login in self._select(request, "id, profile, last_login", uids, **criteria):
+            yield uid, self._profile(profile, last_login)
+
@@ -0,0 +1,43 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.util.lru Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin.util.lru import LRUCache
+
+
+class TestLRUCache(object):
+
+    def testEviction(self):
+        """ util.lru: least recently used entry gets dropped """
+        cache = LRUCache(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        assert cache.get('a') == 1 # a is now more recently used than b
+        cache['c'] = 3
+        assert len(cache) == 2
+        assert 'b' not in cache
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+
+    def testStats(self):
+        """ util.lru: hits and misses get counted """
+        cache = LRUCache(10)
+        cache['a'] = 1
+        cache.get('a')
+        cache.get('b')
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.clear()
+        assert len(cache) == 0
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def testDisabled(self):
+        """ util.lru: maxsize 0 does not cache anything """
+        cache = LRUCache(0)
+        cache['a'] = 1
+        assert cache.get('a', 42) == 42
+
+coverage_modules = ['MoinMoin.util.lru']
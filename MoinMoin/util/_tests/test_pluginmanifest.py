@@ -0,0 +1,92 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.util.pluginmanifest Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os
+
+import py
+
+from MoinMoin import wikiutil
+from MoinMoin.util import pluginmanifest
+
+
+class TestPluginManifest(object):
+    """ pluginmanifest: what we know about the plugins without importing them """
+
+    def testBuiltin(self):
+        """ pluginmanifest: builtin plugins, their symbols and Dependencies """
+        cfg = self.request.cfg
+        assert 'Hits' in pluginmanifest.names(cfg, 'macro')
+        assert pluginmanifest.has_symbol(cfg, 'macro', 'Hits', 'execute')
+        assert not pluginmanifest.has_symbol(cfg, 'macro', 'Hits', 'NoSuchSymbol')
+        assert pluginmanifest.value(cfg, 'macro', 'Hits', 'Dependencies') == ['time']
+        assert pluginmanifest.value(cfg, 'macro', 'NoSuchMacro', 'Dependencies', 'default') == 'default'
+
+    def testSaved(self):
+        """ pluginmanifest: other processes load the saved manifest """
+        cfg = self.request.cfg
+        manifest = pluginmanifest.get(cfg, 'macro')
+        saved = pluginmanifest._cache_entry(cfg, 'macro').content()
+        assert saved.valid(cfg)
+        assert saved.plugins == manifest.plugins
+
+    def testChanged(self):
+        """ pluginmanifest: the manifest is invalid when a plugin changes """
+        cfg = self.request.cfg
+        manifest = pluginmanifest.get(cfg, 'macro', validate=True)
+        assert manifest.valid(cfg)
+        path, mtime = manifest.signature[-1]
+        manifest.signature[-1] = (path, mtime - 10)
+        try:
+            assert not manifest.valid(cfg)
+        finally:
+            manifest.signature[-1] = (path, mtime)
+
+
+class TestParserExtensions(object):
+    """ pluginmanifest: parsers for file name extensions """
+    plugin = 'AutoCreatedMoinMoinManifestTestParser'
+    extension = '.moinmanifesttest'
+
+    def setup_method(self, method):
+        self.pluginDirectory = os.path.join(self.request.cfg.data_dir, 'plugin', 'parser')
+        if not os.path.exists(os.path.join(self.pluginDirectory, '__init__.py')):
+            py.test.skip("Missing or wrong permissions: %s" % self.pluginDirectory)
+        self.pluginPath = os.path.join(self.pluginDirectory, self.plugin + '.py')
+        if os.path.exists(self.pluginPath):
+            py.test.skip("Won't overwrite existing plugin: %s" % self.plugin)
+
+    def teardown_method(self, method):
+        if os.path.exists(self.pluginPath):
+            os.unlink(self.pluginPath)
+        self.forget()
+
+    def forget(self):
+        cfg = self.request.cfg
+        cfg._site_plugin_lists = {}
+        for name in ('EXT_TO_PARSER', 'EXT_TO_PARSER_DEFAULT', ):
+            if hasattr(cfg.cache, name):
+                delattr(cfg.cache, name)
+
+    def testWikiParser(self):
+        """ pluginmanifest: new wiki parser plugins are found """
+        cfg = self.request.cfg
+        assert wikiutil.getParserForExtension(cfg, self.extension) is not None # the default parser
+        f = open(self.pluginPath, 'w')
+        f.write('''
+# If you find this file in your wiki plugin directory, you can safely
+# delete it.
+class Parser:
+    extensions = ['%s']
+''' % self.extension)
+        f.close()
+        self.forget()
+        assert self.plugin in wikiutil.wikiPlugins('parser', cfg)
+        Parser = wikiutil.getParserForExtension(cfg, self.extension)
+        assert Parser.extensions == [self.extension]
+
+coverage_modules = ['MoinMoin.util.pluginmanifest']
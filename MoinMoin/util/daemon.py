@@ -61,6 +61,8 @@ class Daemon:
     process can be started, stopped, restarted or killed.
     """
     commandPrefix = 'do_'
+    # written into the pid file after the pid, if set (see readMode)
+    mode = None
 
     def __init__(self, name, pidfile, function, *args, **kw):
         """ Create a daemon
@@ -171,15 +173,27 @@ class Daemon:
         """
         pid = None
         try:
-            pid = int(file(self.pidFile).read())
+            pid = int(open(self.pidFile).read().split()[0])
         except IOError as err:
             if err.errno != errno.ENOENT:
                 raise
-        except ValueError:
+        except (ValueError, IndexError):
             self.warn("removing corrupted pid file: %s" % self.pidFile)
             self.removePID()
         return pid
 
+    def readMode(self):
+        """ Return the mode from the pid file (None if there is none) """
+        try:
+            fields = open(self.pidFile).read().split()
+        except IOError as err:
+            if err.errno != errno.ENOENT:
+                raise
+            return None
+        if len(fields) > 1:
+            return fields[1]
+        return None
+
     def daemonize(self):
         """ Make the current process a daemon
 
@@ -202,7 +216,9 @@ class Daemon:
 
     def writePID(self):
         pid = str(os.getpid())
-        open(self.pidFile, 'wb').write(pid)
+        if self.mode:
+            pid = '%s %s' % (pid, self.mode)
+        open(self.pidFile, 'w').write(pid + '\n')
 
     def removePID(self):
         try:
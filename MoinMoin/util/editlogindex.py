@@ -0,0 +1,261 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - base class for persistent indexes following the edit-log
+
+    An EditLogIndex holds some data derived from wiki pages (like the link
+    graph or the wiki groups). It is kept in a pickled cache file in the wiki
+    cache dir and in memory of each process (as an attribute of
+    request.cfg.cache).
+
+    It gets built from all relevant pages on first use. After that, it is
+    updated incrementally for the pages mentioned in the edit-log since the
+    last update (saves, renames, deletes, ...), no matter which process did
+    the change. Updated indexes get saved (at most every save_interval
+    seconds), so other processes just load them instead of doing the same
+    updates again.
+
+    Subclasses define where the index is stored and how to get and set the
+    data of a single page.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import threading, time
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+
+# serializes building, refreshing, loading and saving the indexes by the
+# threads of this process. It is shared by all index classes, so processing
+# a page for one index may use another index without risking a deadlock.
+_update_lock = threading.RLock()
+
+# the indexes being built or refreshed, by (index class, id of the wiki
+# config): if processing some page needs the index (e.g. rendering a page
+# checks ACLs, which use the groups index), it gets the index as it is
+# instead of recursively building it again or applying the same edit-log
+# entries twice. A built index only gets into request.cfg.cache when it is
+# complete.
+_updating = {}
+
+
+class EditLogIndex(object):
+    """ Index over wiki pages, updated incrementally using the edit-log """
+
+    # wiki scope cache arena and key where the index gets saved
+    arena = None
+    key = None
+    # name of the request.cfg.cache attribute holding the in-memory index
+    cache_attr = None
+    # serializes the changes of (and the queries on) the in-memory data by
+    # the threads of this process. It is not held while reading pages.
+    _lock = threading.RLock()
+    # a refreshed index gets saved only if the last save is that many seconds
+    # ago, so a busy wiki does not rewrite the whole cache file for every
+    # single change. Other processes loading an older index apply the
+    # missing changes from the edit-log themselves.
+    save_interval = 30
+
+    def __init__(self):
+        self.log_pos = None # edit-log position the index is up-to-date with
+        self.uid = None # uid of the cache file we were loaded from / saved to
+        self.saved_at = 0 # when we were loaded from / saved to the cache file
+
+    def __getstate__(self):
+        state = self._get_data()
+        state['log_pos'] = self.log_pos
+        return state
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.log_pos = state['log_pos']
+        self._set_data(state)
+
+    # methods to implement in subclasses -------------------------------------
+
+    def _get_data(self):
+        """ Return a dict with the data to save """
+        raise NotImplementedError
+
+    def _set_data(self, data):
+        """ Restore the saved data (see _get_data) """
+        raise NotImplementedError
+
+    def _pagenames(self, request):
+        """ Return the names of all pages to build the index from """
+        raise NotImplementedError
+
+    def _accepts(self, request, pagename):
+        """ Return True if changes of page pagename are relevant for us """
+        return True
+
+    def _page_data(self, request, pagename):
+        """ Return the data of page pagename, None if it does not exist (any more)
+
+        This is called without holding the lock, it may e.g. render the page.
+        """
+        raise NotImplementedError
+
+    def _set_page_data(self, pagename, data):
+        """ Set the data of page pagename (see _page_data), called with the lock held """
+        raise NotImplementedError
+
+    # ------------------------------------------------------------------------
+
+    def update_page(self, request, pagename):
+        """ Update the data of page pagename (it may not exist any more) """
+        data = self._page_data(request, pagename)
+        self._lock.acquire()
+        try:
+            self._set_page_data(pagename, data)
+        finally:
+            self._lock.release()
+
+    def build(self, request):
+        """ Build the index from all pages
+
+        The data gets built in a new index and only taken over when it is
+        complete, so if building fails, this index is left unchanged.
+        """
+        from MoinMoin.logfile import editlog
+        _update_lock.acquire()
+        try:
+            index = self.__class__()
+            # changes happening while we build get processed by the next refresh
+            index.log_pos = editlog.EditLog(request).size()
+            key = (self.__class__, id(request.cfg))
+            _updating[key] = index
+            try:
+                for pagename in index._pagenames(request):
+                    index.update_page(request, pagename)
+            finally:
+                _updating.pop(key, None)
+            self._lock.acquire()
+            try:
+                self.__dict__.update(index.__dict__)
+            finally:
+                self._lock.release()
+        finally:
+            _update_lock.release()
+        logging.debug("%s built" % self.__class__.__name__)
+
+    def refresh(self, request):
+        """ Update the pages changed since we last looked at the edit-log
+
+        @return: True if the index was updated
+        """
+        from MoinMoin.logfile import editlog
+        elog = editlog.EditLog(request)
+        _update_lock.acquire()
+        try:
+            if self.log_pos is not None and self.log_pos > elog.size():
+                # the edit-log was replaced, we can not know what changed
+                self.build(request)
+                return True
+            new_pos, items = elog.news(self.log_pos)
+            pagenames = set([pagename for pagename in items
+                             if self._accepts(request, pagename)])
+            key = (self.__class__, id(request.cfg))
+            _updating[key] = self
+            try:
+                for pagename in pagenames:
+                    self.update_page(request, pagename)
+            finally:
+                _updating.pop(key, None)
+            if pagenames:
+                logging.debug("%s: updated %d pages" % (self.__class__.__name__, len(pagenames)))
+            changed = new_pos != self.log_pos
+            self.log_pos = new_pos
+            return changed
+        finally:
+            _update_lock.release()
+
+    # loading / saving -------------------------------------------------------
+
+    @classmethod
+    def _cache_entry(cls, request):
+        return caching.CacheEntry(request, cls.arena, cls.key, scope='wiki',
+                                  use_pickle=True, do_locking=False)
+
+    @classmethod
+    def _load(cls, request, cache):
+        try:
+            index = cache.content()
+        except (caching.CacheError, KeyError, TypeError, AttributeError) as err:
+            logging.debug("could not load %s: %s" % (cls.__name__, str(err)))
+            return None
+        if not isinstance(index, cls):
+            return None
+        index.uid = cache.uid()
+        index.saved_at = time.time()
+        return index
+
+    def _save(self, request, cache):
+        try:
+            cache.lock('w')
+            try:
+                cache.update(self)
+                self.uid = cache.uid()
+                self.saved_at = time.time()
+            finally:
+                cache.unlock()
+        except caching.CacheError as err:
+            # the in-memory index is still up-to-date, another process will
+            # bring the saved one up-to-date (again) when it needs it
+            logging.warning("could not save %s: %s" % (self.__class__.__name__, str(err)))
+
+    @classmethod
+    def get(cls, request, create=True):
+        """ Return the up-to-date index of the wiki
+
+        @param create: if False and there is no index yet, return None
+                       instead of building it
+        """
+        _update_lock.acquire()
+        try:
+            index = _updating.get((cls, id(request.cfg)))
+            if index is not None:
+                return index
+            cache = cls._cache_entry(request)
+            index = getattr(request.cfg.cache, cls.cache_attr, None)
+            if index is None or index.uid != cache.uid():
+                # not loaded yet or updated by another process
+                index = cls._load(request, cache)
+            if index is None:
+                if not create:
+                    return None
+                index = cls()
+                index.build(request)
+                index._save(request, cache)
+            elif index.refresh(request) and time.time() - index.saved_at >= cls.save_interval:
+                index._save(request, cache)
+            setattr(request.cfg.cache, cls.cache_attr, index)
+            return index
+        finally:
+            _update_lock.release()
+
+    @classmethod
+    def rebuild(cls, request):
+        """ Build the index from scratch and save it """
+        _update_lock.acquire()
+        try:
+            index = cls()
+            index.build(request)
+            index._save(request, cls._cache_entry(request))
+            setattr(request.cfg.cache, cls.cache_attr, index)
+            return index
+        finally:
+            _update_lock.release()
+
+    @classmethod
+    def remove(cls, request):
+        """ Remove the saved index (it gets rebuilt when needed) """
+        _update_lock.acquire()
+        try:
+            cls._cache_entry(request).remove()
+            setattr(request.cfg.cache, cls.cache_attr, None)
+        finally:
+            _update_lock.release()
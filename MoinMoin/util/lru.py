@@ -0,0 +1,71 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - bounded in-memory LRU cache
+
+    A dict-like cache holding at most maxsize entries. When it is full, the
+    least recently used entry gets dropped. Access is serialized by a lock,
+    so a cache can be shared by the threads of a process.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import threading
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """ Least recently used cache with a maximum amount of entries """
+
+    def __init__(self, maxsize=1000):
+        """
+        @param maxsize: maximum amount of entries (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """ Return the cached value for key (or default) """
+        self._lock.acquire()
+        try:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value # now most recently used
+            self.hits += 1
+            return value
+        finally:
+            self._lock.release()
+
+    def __setitem__(self, key, value):
+        if not self.maxsize:
+            return
+        self._lock.acquire()
+        try:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        finally:
+            self._lock.release()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._data.clear()
+            self.hits = self.misses = 0
+        finally:
+            self._lock.release()
+
@@ -0,0 +1,213 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - plugin manifest
+
+    To know which plugins of some kind (action, macro, parser, ...) exist,
+    moin lists the plugin directories (MoinMoin/<kind> and <kind> in the
+    wiki plugin directories). To know what the plugins offer (event handlers,
+    macro dependencies, file name extensions of the parsers, ...), it has to
+    import them. Doing that in every new process makes starting up slow,
+    especially for wiki farms.
+
+    The plugin manifest remembers per kind:
+
+    * the plugin names and the package they are in (wiki plugins and
+      builtin plugins)
+    * the public names each plugin module defines ("symbols", e.g. execute,
+      Parser, handle)
+    * the values of Dependencies (macros, parsers) and the extensions of
+      Parser classes
+
+    It is built (by importing all plugins of that kind) on first use and kept
+    in a pickled cache file in the wiki cache dir, so other processes just
+    load it. A saved manifest is used as long as the plugin directories and
+    plugin files have the same mtimes as when it was built - checking this
+    needs one stat per file, but no directory listing and no imports. The
+    plugins themselves are only imported when they are used.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, sys, threading
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+from MoinMoin.util import pysupport
+
+# increase when the manifest format changes
+VERSION = 1
+
+# building a manifest imports plugins, which may need manifests, too
+_lock = threading.RLock()
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _packages(cfg, kind):
+    """ Return [(package name, directory), ...] of the plugin packages of
+    kind, in lookup order (wiki plugin dirs first, builtin plugins last).
+    """
+    packages = []
+    for modname in cfg._plugin_modules:
+        module = sys.modules.get(modname)
+        if module is not None:
+            directory = os.path.join(os.path.dirname(module.__file__), kind)
+            packages.append(('%s.%s' % (modname, kind), directory))
+    packages.append(('MoinMoin.%s' % kind, os.path.join(cfg.moinmoin_dir, kind)))
+    return packages
+
+
+def _describe(kind, module):
+    """ Return what we want to know about a plugin module """
+    info = {
+        'symbols': frozenset([name for name in dir(module) if not name.startswith('_')]),
+    }
+    if hasattr(module, 'Dependencies'):
+        info['Dependencies'] = module.Dependencies
+    Parser = getattr(module, 'Parser', None)
+    if kind == 'parser' and hasattr(Parser, 'extensions'):
+        info['extensions'] = Parser.extensions
+    return info
+
+
+class Manifest(object):
+    """ The plugins of one kind """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.version = VERSION
+        self.directories = [] # plugin package directories
+        self.signature = [] # [(path, mtime), ...] of plugin dirs and files
+        self.plugins = {} # name -> (package name, info dict or None)
+        self.wiki_plugins = {} # name -> package name (only wiki plugins)
+
+    def build(self, cfg):
+        """ Find and import all plugins of our kind """
+        kind = self.kind
+        self.__init__(kind)
+        builtin_package = 'MoinMoin.%s' % kind
+        for package, directory in _packages(cfg, kind):
+            self.directories.append(directory)
+            self.signature.append((directory, _mtime(directory)))
+            try:
+                names = pysupport.getPluginModules(directory)
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(directory, name + '.py')
+                self.signature.append((path, _mtime(path)))
+                if name in self.plugins:
+                    continue # the plugin is overridden by a wiki plugin
+                if package != builtin_package:
+                    self.wiki_plugins[name] = package
+                try:
+                    module = pysupport.importName(package, name)
+                    info = _describe(kind, module)
+                except Exception as err:
+                    # we will see that again when the plugin gets used
+                    logging.warning("plugin manifest: could not import %s.%s: %s" % (package, name, str(err)))
+                    info = None
+                self.plugins[name] = (package, info)
+        logging.debug("plugin manifest: found %d %s plugins" % (len(self.plugins), kind))
+
+    def valid(self, cfg):
+        """ Are the plugin dirs and files still the same as when we were built? """
+        if self.version != VERSION:
+            return False
+        if [directory for package, directory in _packages(cfg, self.kind)] != self.directories:
+            # other plugin dirs configured
+            return False
+        for path, mtime in self.signature:
+            if _mtime(path) != mtime:
+                return False
+        return True
+
+    def info(self, name):
+        """ Return info dict of plugin name, None if unknown """
+        try:
+            return self.plugins[name][1]
+        except KeyError:
+            return None
+
+
+def _cache_entry(cfg, kind):
+    arena_dir = os.path.join(cfg.cache_dir, cfg.siteid, 'plugins')
+    return caching.CacheEntry(None, arena_dir, kind, scope='dir', use_pickle=True)
+
+
+def get(cfg, kind, validate=False):
+    """ Return the plugin manifest of kind
+
+    The manifest is loaded (or built) on first use in this process.
+
+    @param cfg: wiki config
+    @param kind: plugin kind, e.g. 'parser'
+    @param validate: check again whether the manifest we already have in
+                     memory is still valid
+    @rtype: Manifest
+    """
+    manifests = cfg.cache.plugin_manifests
+    manifest = manifests.get(kind)
+    if manifest is not None and not validate:
+        return manifest
+    _lock.acquire()
+    try:
+        manifest = manifests.get(kind)
+        if manifest is not None and (not validate or manifest.valid(cfg)):
+            return manifest
+        cache = _cache_entry(cfg, kind)
+        try:
+            manifest = cache.content()
+        except (caching.CacheError, AttributeError, ImportError, TypeError):
+            manifest = None
+        if not isinstance(manifest, Manifest) or not manifest.valid(cfg):
+            manifest = Manifest(kind)
+            manifest.build(cfg)
+            try:
+                cache.update(manifest)
+            except caching.CacheError as err:
+                logging.warning("could not save the %s plugin manifest: %s" % (kind, str(err)))
+        manifests[kind] = manifest
+        return manifest
+    finally:
+        _lock.release()
+
+
+def names(cfg, kind):
+    """ Return the sorted names of all plugins of kind """
+    names = list(get(cfg, kind).plugins.keys())
+    names.sort()
+    return names
+
+
+def has_symbol(cfg, kind, name, symbol):
+    """ Does plugin name define symbol? None if we do not know. """
+    info = get(cfg, kind).info(name)
+    if info is None:
+        return None
+    return symbol in info['symbols']
+
+
+def value(cfg, kind, name, attr, default=None):
+    """ Return the value of attr (see _describe) of plugin name, without
+    importing it (if possible), default if it has no such attribute.
+    """
+    info = get(cfg, kind).info(name)
+    if info is not None:
+        return info.get(attr, default)
+    # not in the manifest (or could not import it when building it)
+    from MoinMoin import wikiutil
+    try:
+        if attr == 'extensions':
+            return getattr(wikiutil.importPlugin(cfg, kind, name, 'Parser'), 'extensions', default)
+        return wikiutil.importPlugin(cfg, kind, name, attr)
+    except wikiutil.PluginError:
+        return default
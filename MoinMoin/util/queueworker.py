@@ -0,0 +1,115 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - base class of long running on-disk queue workers
+
+    A worker watches an on-disk queue (e.g. the xapian indexer queue, see
+    MoinMoin.search.Xapian.daemon, or the notification queue, see
+    MoinMoin.events.notifyqueue) and processes it whenever it changed.
+
+    It stores some metrics (its counters) in a cache entry, so they can be
+    looked at from another process (e.g. by a --status option of the
+    script running the worker). The metrics of the queue itself (depth,
+    lag, ...) are always computed from the current queue.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import time
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+
+
+class QueueWorker(object):
+    """ Processes an on-disk queue
+
+    Subclasses set self.queue (having a uid() method, see e.g.
+    MoinMoin.search.builtin.IndexerQueue) and self.poll_interval and
+    implement run_once, queue_stats, counters and _stats_cache.
+    """
+
+    name = 'queue worker' # for log messages
+
+    def __init__(self, request):
+        self.request = request
+        self.runs = 0
+        self.started = time.time()
+        self._saved_counters = None
+
+    def _stats_cache(self):
+        """ Return the cache entry keeping the saved metrics """
+        raise NotImplementedError
+
+    def queue_stats(self):
+        """ Return a dict with the metrics of the current queue (at least 'depth') """
+        raise NotImplementedError
+
+    def counters(self):
+        """ Return a dict with the counters of this worker """
+        raise NotImplementedError
+
+    def run_once(self):
+        """ Process the queue, return the amount of processed entries """
+        raise NotImplementedError
+
+    def stats(self):
+        """ Return a dict with the current metrics of this worker """
+        stats = self.queue_stats()
+        stats.update(self.counters())
+        stats.update({
+            'runs': self.runs, # amount of queue processing runs
+            'started': self.started,
+            'updated': time.time(),
+        })
+        return stats
+
+    def save_stats(self):
+        """ Save the metrics for load_stats, if the counters have changed
+        since they were saved last time.
+        """
+        counters = self.counters()
+        if counters == self._saved_counters:
+            return
+        try:
+            self._stats_cache().update(self.stats())
+            self._saved_counters = counters
+        except caching.CacheError as err:
+            logging.warning("could not save %s stats: %s" % (self.name, str(err)))
+
+    def load_stats(self):
+        """ Return the metrics saved by the (maybe running) worker process
+
+        The metrics of the queue are computed from the current queue.
+        """
+        try:
+            stats = self._stats_cache().content()
+        except caching.CacheError:
+            stats = {}
+        stats.update(self.queue_stats())
+        return stats
+
+    def run(self, max_runs=None, stop=None):
+        """ Watch the queue and process it whenever it changed
+
+        @param max_runs: stop after that many runs (default: None == never stop)
+        @param stop: threading.Event to stop the worker (optional)
+        """
+        logging.info("%s started" % self.name)
+        last_uid = None
+        while max_runs is None or self.runs < max_runs:
+            if stop is not None and stop.is_set():
+                break
+            uid = self.queue.uid()
+            if uid is not None and uid != last_uid:
+                self.run_once()
+                # the queue file gets rewritten when we take entries from it,
+                # so remember how it looked after our own processing:
+                last_uid = self.queue.uid()
+                if self.queue_stats()['depth']:
+                    # not done (e.g. waiting for retries or someone else
+                    # locked the index), look again after the next sleep
+                    last_uid = None
+            time.sleep(self.poll_interval)
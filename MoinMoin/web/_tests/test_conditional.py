@@ -0,0 +1,122 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.conditional Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import py
+
+from MoinMoin.Page import Page
+from MoinMoin.web import conditional
+from MoinMoin.web.request import TestRequest, MoinMoinFinish
+from MoinMoin.wsgiapp import init, run
+from MoinMoin._tests import become_trusted, create_page, nuke_page, wikiconfig
+
+
+class TestConditional(object):
+    """ conditional: ETag, Last-Modified and 304 Not Modified """
+
+    pagename = 'AutoCreatedMoinMoinTemporaryTestPageConditional'
+
+    def teardown_method(self, method):
+        become_trusted(self.request)
+        nuke_page(self.request, self.pagename)
+
+    def make_request(self, **headers):
+        """ a request of an anonymous user with the given HTTP headers """
+        environ = dict([('HTTP_' + name.upper(), value) for name, value in headers.items()])
+        request = TestRequest(path='/%s' % self.pagename, environ_overrides=environ)
+        request.given_config = self.request.cfg.__class__
+        return init(request)
+
+    def testETag(self):
+        """ conditional: the ETag depends on the parts, the URL and the user """
+        request = self.make_request()
+        etag = conditional.make_etag(request, ('show', 1))
+        assert etag == conditional.make_etag(request, ('show', 1))
+        assert etag != conditional.make_etag(request, ('show', 2))
+        other = TestRequest(path='/OtherPage')
+        other.given_config = self.request.cfg.__class__
+        assert etag != conditional.make_etag(init(other), ('show', 1))
+
+    def testValidators(self):
+        """ conditional: a response gets an ETag, Last-Modified and Cache-Control """
+        request = self.make_request()
+        conditional.check(request, ('raw', 1), last_modified=1000000000)
+        etag, weak = request.get_etag()
+        assert etag == conditional.make_etag(request, ('raw', 1))
+        assert request.request.last_modified is not None
+        assert request.headers['Cache-Control'].startswith('public, ')
+        assert request.status_code == 200
+
+    def testIfNoneMatch(self):
+        """ conditional: 304 Not Modified if the client has the same ETag """
+        etag = conditional.make_etag(self.make_request(), ('raw', 1))
+        request = self.make_request(if_none_match='"%s"' % etag)
+        py.test.raises(MoinMoinFinish, conditional.check, request, ('raw', 1))
+        assert request.status_code == 304
+        request = self.make_request(if_none_match='"%s"' % etag)
+        conditional.check(request, ('raw', 2))
+        assert request.status_code == 200
+
+    def testIfModifiedSince(self):
+        """ conditional: 304 Not Modified if the response did not change since the client got it """
+        last_modified = max(1000000000, self.request.cfg.cfg_mtime)
+        request = self.make_request(if_modified_since='Sun, 06 Nov 2050 08:49:37 GMT')
+        py.test.raises(MoinMoinFinish, conditional.check, request, ('raw', 1), last_modified)
+        request = self.make_request(if_modified_since='Sun, 06 Nov 1994 08:49:37 GMT')
+        conditional.check(request, ('raw', 1), last_modified)
+        assert request.status_code == 200
+
+    def testVolatile(self):
+        """ conditional: pages depending on time get no validators """
+        become_trusted(self.request)
+        create_page(self.request, self.pagename, "Some text.")
+        assert not conditional.is_volatile(Page(self.request, self.pagename))
+        create_page(self.request, self.pagename, "<<RandomPage>>")
+        assert conditional.is_volatile(Page(self.request, self.pagename))
+
+    def testPageChanges(self):
+        """ conditional: the ETag of a page view changes when the wiki changes """
+        become_trusted(self.request)
+        create_page(self.request, self.pagename, "Some text.")
+        request = self.make_request()
+        conditional.check_page(request, Page(request, self.pagename))
+        etag = request.get_etag()[0]
+        assert etag
+        create_page(self.request, self.pagename, "Some other text.")
+        request = self.make_request(if_none_match='"%s"' % etag)
+        conditional.check_page(request, Page(request, self.pagename))
+        assert request.status_code == 200
+        assert request.get_etag()[0] != etag
+
+
+class TestAnonymousSessions(object):
+    """ conditional: responses setting a session cookie are not public """
+
+    class Config(wikiconfig.Config):
+        cookie_lifetime = (1, 12) # anonymous sessions
+        session_stateless_anonymous = False
+
+    pagename = 'AutoCreatedMoinMoinTemporaryTestPageConditionalSession'
+
+    def teardown_method(self, method):
+        become_trusted(self.request)
+        nuke_page(self.request, self.pagename)
+
+    def testSessionCookie(self):
+        """ conditional: a shared cache must not store a session cookie """
+        become_trusted(self.request)
+        create_page(self.request, self.pagename, "Some text.")
+        request = TestRequest(path='/%s' % self.pagename)
+        request.given_config = self.Config
+        context = init(request)
+        run(context)
+        headers = request.headers
+        assert 'Set-Cookie' in headers # the trail is kept in the session
+        assert 'public' not in headers.get('Cache-Control', '')
+        assert 'private' in headers['Cache-Control']
+
+coverage_modules = ['MoinMoin.web.conditional']
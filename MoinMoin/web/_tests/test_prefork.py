@@ -0,0 +1,118 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.prefork Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, signal, socket, tempfile, time
+
+import py
+
+from MoinMoin.util.daemon import Daemon
+from MoinMoin.web.prefork import PreforkServer
+from MoinMoin.web.serving import uses_workers
+
+
+def application(environ, start_response):
+    """ answers with the pid of the worker """
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode('ascii')]
+
+
+class TestPreforkServer(object):
+    """ prefork: workers sharing the listening socket """
+
+    def setup_method(self, method):
+        if not hasattr(os, 'fork'):
+            py.test.skip("needs os.fork")
+        self.pid = None
+
+    def teardown_method(self, method):
+        if self.pid:
+            os.kill(self.pid, signal.SIGTERM)
+            os.waitpid(self.pid, 0)
+
+    def start(self, **kw):
+        server = PreforkServer('127.0.0.1', 0, application, preload=False, poll_interval=0.1, **kw)
+        server.bind()
+        self.pid = os.fork()
+        if not self.pid:
+            try:
+                server.run()
+            finally:
+                os._exit(0)
+        server.socket.close()
+        self.port = server.port
+
+    def get(self):
+        """ return the pid of the worker that handled the request """
+        deadline = time.time() + 10
+        while True:
+            try:
+                conn = socket.create_connection(('127.0.0.1', self.port), timeout=10)
+                break
+            except socket.error:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.1)
+        try:
+            conn.sendall(b'GET / HTTP/1.0\r\nHost: localhost\r\n\r\n')
+            data = b''
+            while True:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            conn.close()
+        assert data.startswith(b'HTTP/1.0 200')
+        return int(data.split(b'\r\n\r\n', 1)[1])
+
+    def testWorkers(self):
+        """ prefork: the workers are forked from the master """
+        self.start(workers=2)
+        pids = set([self.get() for i in range(10)])
+        assert self.pid not in pids
+        assert 1 <= len(pids) <= 2
+
+    def testMaxRequests(self):
+        """ prefork: workers are replaced after max_requests requests """
+        self.start(workers=1, max_requests=2)
+        pids = [self.get() for i in range(6)]
+        assert pids[0] == pids[1]
+        assert len(set(pids)) == 3
+
+    def testReload(self):
+        """ prefork: reloading replaces the workers """
+        self.start(workers=1)
+        pid = self.get()
+        os.kill(self.pid, signal.SIGHUP)
+        deadline = time.time() + 10
+        while self.get() == pid:
+            assert time.time() < deadline
+            time.sleep(0.1)
+
+def test_pid_mode():
+    """ prefork: the pid file tells whether the server can be reloaded """
+    if not hasattr(os, 'fork'):
+        py.test.skip("needs os.fork")
+    assert uses_workers(4)
+    assert not uses_workers(0)
+    assert not uses_workers(4, debug='web')
+    fd, pidfile = tempfile.mkstemp('.pid')
+    os.close(fd)
+    try:
+        daemon = Daemon('moin', pidfile, None)
+        daemon.writePID()
+        assert daemon.readPID() == os.getpid()
+        assert daemon.readMode() is None
+        daemon.mode = 'prefork'
+        daemon.writePID()
+        assert daemon.readPID() == os.getpid()
+        assert daemon.readMode() == 'prefork'
+    finally:
+        daemon.removePID()
+
+coverage_modules = ['MoinMoin.web.prefork']
@@ -0,0 +1,49 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.preload Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import sys
+
+from MoinMoin import i18n
+from MoinMoin.web import preload
+
+
+class TestPreload(object):
+    """ preload: warming up a process before forking workers """
+
+    def testPreloadWiki(self):
+        """ preload: plugins, translations and page lists are loaded """
+        request = self.request
+        cfg = request.cfg
+        report = preload.preload_wiki(cfg)
+        assert 'MoinMoin.macro.Hits' in sys.modules
+        assert 'MoinMoin.action.AttachFile' in sys.modules
+        assert cfg.language_default in i18n.translations
+        assert 'en' in i18n.translations
+        assert cfg.cache.pagelists.getItem(request, 'all', None) is not None
+        descriptions = [description for description, seconds in report.steps]
+        assert '%s: page lists' % cfg.siteid in descriptions
+        assert report.total() >= 0
+
+    def testContext(self):
+        """ preload: contexts for a given wiki config """
+        context = preload.make_context(self.request.cfg)
+        assert context.cfg is self.request.cfg
+        assert context.lang
+
+    def testReport(self):
+        """ preload: the report shows the steps and the memory usage """
+        report = preload.Report()
+        report.add('some step', 0.5)
+        report.finish()
+        text = str(report)
+        assert 'some step' in text
+        assert '500.0ms' in text
+        rss, private = preload.memory_usage()
+        assert rss is None or rss > 0
+
+coverage_modules = ['MoinMoin.web.preload']
@@ -0,0 +1,106 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.responsecache Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+from MoinMoin import caching, wsgiapp
+from MoinMoin.auth import GivenAuth, MoinAuth
+from MoinMoin.web import responsecache
+from MoinMoin.web.contexts import AllContext
+from MoinMoin.web.request import TestRequest
+from MoinMoin._tests import become_trusted, create_page, nuke_page, wikiconfig
+
+
+class TestResponseCache(object):
+    """ responsecache: page views of anonymous users """
+
+    class Config(wikiconfig.Config):
+        response_cache = True
+
+    pagename = 'AutoCreatedMoinMoinTemporaryTestPageResponseCache'
+
+    def setup_method(self, method):
+        become_trusted(self.request)
+        create_page(self.request, self.pagename, "Some cached text.")
+
+    def teardown_method(self, method):
+        become_trusted(self.request)
+        nuke_page(self.request, self.pagename)
+
+    def make_context(self, **params):
+        params.setdefault('path', '/%s' % self.pagename)
+        request = TestRequest(**params)
+        request.given_config = self.Config
+        return AllContext(request)
+
+    def view(self, **params):
+        """ view the page like the application does, return the lookup result """
+        context = self.make_context(**params)
+        response = responsecache.lookup(context)
+        if response is None:
+            context = wsgiapp.init(context)
+            responsecache.store(context, wsgiapp.run(context))
+        return response
+
+    def testCached(self):
+        """ responsecache: the second view comes from the cache """
+        assert self.view() is None
+        response = self.view()
+        assert response is not None
+        assert response.status_code == 200
+        assert b'Some cached text.' in response.get_data()
+
+    def testChanged(self):
+        """ responsecache: any change of the wiki invalidates the cache """
+        self.view()
+        create_page(self.request, self.pagename, "Some other text.")
+        assert self.view() is None
+
+    def testNotCached(self):
+        """ responsecache: only anonymous page views without cookies are cached """
+        self.view()
+        assert responsecache.lookup(self.make_context(query_string='action=info')) is None
+        context = self.make_context(environ_overrides={'HTTP_COOKIE': 'MOIN_SESSION=123'})
+        assert responsecache.lookup(context) is None
+        context = self.make_context(method='POST')
+        assert responsecache.lookup(context) is None
+
+    def testPrune(self):
+        """ responsecache: responses of older wiki states are removed from the cache dir """
+        self.view()
+        keys = caching.get_cache_list(self.request, responsecache.arena, 'wiki')
+        assert [key for key in keys if key != '__lock__']
+        create_page(self.request, self.pagename, "Some other text.")
+        self.view()
+        for key in caching.get_cache_list(self.request, responsecache.arena, 'wiki'):
+            assert key == '__lock__' or key not in keys
+
+    def testHitRatio(self):
+        """ responsecache: the hit ratio """
+        cache = responsecache.ResponseCache(10)
+        assert cache.hit_ratio() == 0.0
+        cache.lookups, cache.memory_hits, cache.disk_hits = 4, 2, 1
+        assert cache.hit_ratio() == 0.75
+        assert '75.0% hits' in str(cache)
+
+class TestGivenAuth(object):
+    """ responsecache: users authenticated by the request are not anonymous """
+
+    class Config(wikiconfig.Config):
+        response_cache = True
+        auth = [GivenAuth(env_var='HTTP_X_MOIN_USER'), MoinAuth()]
+
+    def testAuthenticated(self):
+        """ responsecache: no cached responses for requests identifying a user """
+        request = TestRequest(path='/FrontPage', environ_overrides={'HTTP_X_MOIN_USER': 'SomeUser'})
+        request.given_config = self.Config
+        assert responsecache.lookup(AllContext(request)) is None
+        assert responsecache.environ_key not in request.environ
+        request = TestRequest(path='/FrontPage')
+        request.given_config = self.Config
+        assert responsecache.anonymous_request(AllContext(request).cfg, request)
+
+coverage_modules = ['MoinMoin.web.responsecache']
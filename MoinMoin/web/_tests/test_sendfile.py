@@ -0,0 +1,91 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.sendfile Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, shutil, tempfile
+
+from MoinMoin.web import sendfile
+from MoinMoin.web.request import TestRequest
+
+
+class TestSendFile(object):
+    """ sendfile: files, ranges and validators """
+
+    data = bytes(range(256)) * 40
+
+    def setup_method(self, method):
+        self.tempdir = tempfile.mkdtemp('', 'moin-sendfile-')
+        self.filename = os.path.join(self.tempdir, 'file.bin')
+        f = open(self.filename, 'wb')
+        f.write(self.data)
+        f.close()
+        self.etag = sendfile.file_etag(self.filename)
+        self.mtime = os.path.getmtime(self.filename)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tempdir)
+
+    def send(self, **headers):
+        """ return the request and the body sent """
+        environ = dict([('HTTP_' + name.upper(), value) for name, value in headers.items()])
+        request = TestRequest(environ_overrides=environ)
+        request.headers['Content-Type'] = 'application/octet-stream'
+        body = sendfile.prepare(request, open(self.filename, 'rb'), 100, self.etag, self.mtime)
+        return request, b''.join(body)
+
+    def testComplete(self):
+        """ sendfile: the complete file """
+        request, body = self.send()
+        assert request.status_code == 200
+        assert body == self.data
+        assert request.headers['Content-Length'] == str(len(self.data))
+        assert request.headers['Accept-Ranges'] == 'bytes'
+        assert request.get_etag() == (self.etag, False)
+
+    def testRange(self):
+        """ sendfile: a single range """
+        request, body = self.send(range='bytes=100-199')
+        assert request.status_code == 206
+        assert body == self.data[100:200]
+        assert request.headers['Content-Range'] == 'bytes 100-199/%d' % len(self.data)
+        request, body = self.send(range='bytes=-10')
+        assert body == self.data[-10:]
+
+    def testRanges(self):
+        """ sendfile: multiple ranges """
+        request, body = self.send(range='bytes=0-4,10-14')
+        assert request.status_code == 206
+        assert request.headers['Content-Type'].startswith('multipart/byteranges; boundary=')
+        assert request.headers['Content-Length'] == str(len(body))
+        assert 'Content-Range: bytes 10-14/%d' % len(self.data) in body.decode('latin-1')
+
+    def testUnsatisfiable(self):
+        """ sendfile: ranges beyond the end of the file """
+        request, body = self.send(range='bytes=%d-' % len(self.data))
+        assert request.status_code == 416
+        assert request.headers['Content-Range'] == 'bytes */%d' % len(self.data)
+
+    def testIfRange(self):
+        """ sendfile: ranges of a changed file get the complete file """
+        request, body = self.send(range='bytes=0-9', if_range='"%s"' % self.etag)
+        assert request.status_code == 206
+        request, body = self.send(range='bytes=0-9', if_range='"changed"')
+        assert request.status_code == 200
+        assert body == self.data
+
+    def testNotModified(self):
+        """ sendfile: 304 Not Modified for a matching ETag """
+        request, body = self.send(if_none_match='"%s"' % self.etag)
+        assert request.status_code == 304
+        assert body == b''
+
+    def testSatisfiableRanges(self):
+        """ sendfile: normalizing ranges """
+        assert sendfile.satisfiable_ranges([(0, 10), (-5, None), (90, None), (200, None)], 100) == [
+            (0, 10), (95, 100), (90, 100)]
+
+coverage_modules = ['MoinMoin.web.sendfile']
@@ -0,0 +1,125 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.session Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, shutil, tempfile, time
+
+from MoinMoin.web.session import SQLiteSessionService
+
+
+class TestSQLiteSessionService(object):
+    """ session: test the sqlite session service """
+
+    def setup_method(self, method):
+        self.tmpdir = tempfile.mkdtemp()
+        self.service = SQLiteSessionService(path=os.path.join(self.tmpdir, 'sessions.sqlite'))
+        self.store = self.service._store_get(self.request)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmpdir, True)
+
+    def make_session(self, user_id=None, expires=None):
+        session = self.store.new()
+        if user_id is not None:
+            session['user.id'] = user_id
+        if expires is not None:
+            session['expires'] = expires
+        self.store.save(session)
+        return session.sid
+
+    def test_get_session(self):
+        expires = int(time.time()) + 3600
+        sid = self.make_session('1000.1', expires)
+        session = self.service.get_session(self.request, sid)
+        assert not session.new
+        assert session['user.id'] == '1000.1'
+        assert session['expires'] == expires
+        # unknown session ids give empty sessions, invalid ones new sessions
+        unknown = self.service.get_session(self.request, self.store.generate_key())
+        assert not unknown.new and not unknown
+        assert self.service.get_session(self.request, '../invalid').new
+        assert self.service.get_all_session_ids(self.request) == [sid]
+
+    def test_get_expired_session(self):
+        sid = self.make_session('1000.1', time.time() - 10)
+        session = self.service.get_session(self.request, sid)
+        assert session.new
+        assert 'user.id' not in session
+        assert self.service.get_all_session_ids(self.request) == []
+
+    def test_destroy_sessions(self):
+        now = time.time()
+        expired = self.make_session('1000.1', now - 10)
+        no_expiry = self.make_session('1000.2')
+        valid1 = self.make_session('1000.1', now + 3600)
+        valid2 = self.make_session('1000.2', now + 3600)
+        assert sorted(self.service.get_all_session_ids(self.request)) == sorted([expired, no_expiry, valid1, valid2])
+        assert self.service.destroy_sessions(self.request, expired_before=now) == 2
+        sids = self.service.get_all_session_ids(self.request)
+        assert expired not in sids and no_expiry not in sids
+        assert sorted(sids) == sorted([valid1, valid2])
+        assert self.service.destroy_sessions(self.request, user_id='1000.2') == 1
+        assert self.service.get_all_session_ids(self.request) == [valid1]
+        assert self.service.destroy_sessions(self.request) == 1
+        assert self.service.get_all_session_ids(self.request) == []
+
+
+class TestFinalize(object):
+    """ session: test that finalize only stores sessions with something in them """
+
+    def setup_method(self, method):
+        self.tmpdir = tempfile.mkdtemp()
+        self.service = SQLiteSessionService(path=os.path.join(self.tmpdir, 'sessions.sqlite'))
+        self.store = self.service._store_get(self.request)
+        cfg = self.request.cfg
+        self.saved = cfg.cookie_lifetime, cfg.session_stateless_anonymous
+        cfg.cookie_lifetime = (1, 12) # anon sessions enabled
+        self.cookies = []
+        self.request.set_cookie = lambda name, value, **kw: self.cookies.append((name, value))
+        self.request.delete_cookie = lambda name, **kw: self.cookies.append((name, None))
+
+    def teardown_method(self, method):
+        del self.request.set_cookie
+        del self.request.delete_cookie
+        cfg = self.request.cfg
+        cfg.cookie_lifetime, cfg.session_stateless_anonymous = self.saved
+        shutil.rmtree(self.tmpdir, True)
+
+    def test_unmodified_new_session(self):
+        assert not self.request.user.valid
+        session = self.store.new()
+        self.service.finalize(self.request, session)
+        assert self.cookies == []
+        assert self.service.get_all_session_ids(self.request) == []
+
+    def test_modified_new_session(self):
+        session = self.store.new()
+        session['openid.id'] = 'http://joe.example.org/'
+        assert session.dirty
+        self.service.finalize(self.request, session)
+        assert [value for name, value in self.cookies] == [session.sid]
+        # stored when the cookie comes back (not for clients ignoring cookies)
+        assert self.service.get_all_session_ids(self.request) == []
+        session = self.service.get_session(self.request, session.sid)
+        session['openid.id'] = 'http://joe.example.org/'
+        self.service.finalize(self.request, session)
+        assert self.service.get_all_session_ids(self.request) == [session.sid]
+
+    def test_stateless_anonymous(self):
+        self.request.cfg.session_stateless_anonymous = True
+        session = self.store.new()
+        session['openid.id'] = 'http://joe.example.org/'
+        self.store.save(session)
+        # an existing, unmodified anonymous session is neither refreshed nor stored
+        session = self.service.get_session(self.request, session.sid)
+        assert not session.dirty
+        self.service.finalize(self.request, session)
+        assert self.cookies == []
+        assert 'expires' not in self.service.get_session(self.request, session.sid)
+        assert not self.request.user._wantTrail()
+
+coverage_modules = ['MoinMoin.web.session']
@@ -0,0 +1,153 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.streaming Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import threading
+
+import py
+
+from MoinMoin import wsgiapp
+from MoinMoin.web import streaming
+from MoinMoin.web.request import TestRequest
+from MoinMoin.web.session import FileSessionService
+from MoinMoin._tests import become_trusted, create_page, nuke_page, wikiconfig
+
+
+class FakeSessionService(object):
+    def finalize(self, context, session):
+        context.finalized += 1
+
+
+class FakeRequest(object):
+    method = 'GET'
+    status_code = 200
+    url = 'http://localhost/StreamedPage'
+
+    def __init__(self):
+        self.response = []
+
+
+class FakeContext(object):
+    """ just what streaming needs of a context """
+
+    def __init__(self):
+        self.request = FakeRequest()
+        self.cfg = type('FakeConfig', (object, ), {'session_service': FakeSessionService()})()
+        self.session = None
+        self.finalized = 0
+        self.writestack = []
+
+    def write(self, *data):
+        self.request.response.extend(data)
+
+    def flush(self):
+        self.output_stream.start()
+
+
+class TestStreaming(object):
+    """ streaming: send the page while it is rendered """
+
+    def test_not_streamed(self):
+        """ streaming: without flush, the response is returned after processing """
+        context = FakeContext()
+
+        def process(context):
+            context.write('<html>', '</html>')
+            return 'response'
+        assert streaming.run(context, process, 10) == 'response'
+        assert context.request.response == ['<html>', '</html>']
+        assert context.finalized == 0
+
+    def test_error(self):
+        """ streaming: errors before flush are raised like without streaming """
+        def process(context):
+            raise ValueError('broken')
+        py.test.raises(ValueError, streaming.run, FakeContext(), process, 10)
+
+    def test_streamed(self):
+        """ streaming: the header is sent before the content is rendered """
+        context = FakeContext()
+        rendered = threading.Event()
+        chunks = 100
+
+        def process(context):
+            context.write('<head>')
+            context.flush()
+            for i in range(chunks):
+                context.write('x' * 100)
+            rendered.set()
+            return 'response'
+
+        request = streaming.run(context, process, 1000)
+        assert request is context.request
+        assert context.finalized == 1
+        stream = request.response
+        body = iter(stream)
+        assert next(body) == b'<head>'
+        # the producer waits for us, as only few chunks fit into the queue
+        assert not rendered.wait(0.5)
+        assert stream.queue.qsize() == streaming.QUEUE_SIZE
+        rest = b''.join(body)
+        assert rest == b'x' * 100 * chunks
+        assert rendered.is_set()
+
+    def test_closed(self):
+        """ streaming: rendering stops when the client goes away """
+        context = FakeContext()
+        stopped = threading.Event()
+
+        def process(context):
+            context.flush()
+            try:
+                while True:
+                    context.write('x' * 100)
+            finally:
+                stopped.set()
+
+        stream = streaming.run(context, process, 100).response
+        body = iter(stream)
+        next(body)
+        stream.close()
+        assert stopped.wait(5)
+
+class CountingSessionService(FileSessionService):
+    finalized = 0
+
+    def finalize(self, request, session):
+        self.finalized += 1
+        return FileSessionService.finalize(self, request, session)
+
+
+class TestStreamedPage(object):
+    """ streaming: a page view streamed by the application """
+
+    class Config(wikiconfig.Config):
+        stream_pages = True
+        stream_chunk_size = 100
+        session_service = CountingSessionService()
+
+    pagename = 'AutoCreatedMoinMoinTemporaryTestPageStreaming'
+
+    def teardown_method(self, method):
+        become_trusted(self.request)
+        nuke_page(self.request, self.pagename)
+
+    def test_finalized_once(self):
+        """ streaming: the session is finalized once, when streaming starts """
+        become_trusted(self.request)
+        create_page(self.request, self.pagename, "Some streamed text.\n" * 50)
+        request = TestRequest(path='/%s' % self.pagename)
+        request.given_config = self.Config
+        context = wsgiapp.init(request)
+        service = context.cfg.session_service
+        finalized = service.finalized
+        response = streaming.run(context, wsgiapp.run, context.cfg.stream_chunk_size)
+        assert b'Some streamed text.' in b''.join(response.response)
+        assert service.finalized == finalized + 1
+
+coverage_modules = ['MoinMoin.web.streaming']
+
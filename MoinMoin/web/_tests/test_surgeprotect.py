@@ -0,0 +1,107 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - MoinMoin.web.surgeprotect Tests
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, shutil, tempfile, threading
+
+import py
+
+from MoinMoin.web import surgeprotect
+from MoinMoin.web.surgeprotect import SurgeCounters, SharedSurgeCounters
+
+NOW = 1000000000
+
+
+def test_hit():
+    state = [0] * 7
+    # 10 requests in 60s are ok, the 12th is too much
+    for i in range(11):
+        assert not surgeprotect.hit(state, NOW + i, 10, 60, 3600)
+    assert surgeprotect.hit(state, NOW + 11, 10, 60, 3600)
+    # 90s later, half of the previous window is still in the sliding window
+    assert not surgeprotect.hit(state, NOW + 90, 10, 60, 3600)
+    # nothing happened for 2 windows
+    assert not surgeprotect.hit(state, NOW + 300, 10, 60, 3600)
+    assert state[surgeprotect.CURRENT] == 1
+    assert state[surgeprotect.PREVIOUS] == 0
+
+
+def test_lockout():
+    state = [0] * 7
+    for i in range(5):
+        surgeprotect.hit(state, NOW, 2, 60, 3600)
+    # 2 warnings (requests while over the limit) lock the client out
+    assert state[surgeprotect.LOCKED_UNTIL] == NOW + 3600
+    assert surgeprotect.hit(state, NOW + 1800, 2, 60, 3600)
+    assert not surgeprotect.hit(state, NOW + 3601, 2, 60, 3600)
+
+    state = [0] * 7
+    assert surgeprotect.hit(state, NOW, 2, 60, 3600, kick=True)
+    assert surgeprotect.hit(state, NOW + 100, 2, 60, 3600)
+
+
+class TestSurgeCounters(object):
+    """ surgeprotect: simulate many concurrent clients """
+
+    def setup_method(self, method):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.tmpdir, True)
+
+    def simulate(self, counters, clients=50, requests=20, maxnum=30):
+        """ clients do requests concurrently, return the clients detected as surging """
+        surging = set()
+        # every 5th client does 3 times more requests than allowed
+        todo = [('192.168.0.%d' % i, i % 5 and requests or 3 * maxnum) for i in range(clients)]
+
+        def client(client_id, count):
+            for i in range(count):
+                if counters.hit((client_id, 'show'), NOW, maxnum, 60, 3600):
+                    surging.add(client_id)
+
+        threads = [threading.Thread(target=client, args=item) for item in todo]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return surging
+
+    def test_memory(self):
+        surging = self.simulate(SurgeCounters())
+        assert surging == set(['192.168.0.%d' % i for i in range(0, 50, 5)])
+
+    def test_shared(self):
+        counters = SharedSurgeCounters(os.path.join(self.tmpdir, 'surge-counters'), slots=1024)
+        surging = self.simulate(counters)
+        assert surging == set(['192.168.0.%d' % i for i in range(0, 50, 5)])
+
+    def test_shared_processes(self):
+        if not hasattr(os, 'fork'):
+            py.test.skip("needs os.fork")
+        path = os.path.join(self.tmpdir, 'surge-counters')
+        key = ('192.168.0.1', 'show')
+        SharedSurgeCounters(path, slots=1024) # create the file before forking
+        pids = []
+        for i in range(4):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    counters = SharedSurgeCounters(path)
+                    for j in range(50):
+                        counters.hit(key, NOW, 1000, 3600, 3600)
+                finally:
+                    os._exit(0)
+            pids.append(pid)
+        for pid in pids:
+            os.waitpid(pid, 0)
+        # all processes counted into the same counter
+        counters = SharedSurgeCounters(path)
+        assert not counters.hit(key, NOW, 200, 3600, 3600)
+        assert counters.hit(key, NOW, 200, 3600, 3600)
+
+coverage_modules = ['MoinMoin.web.surgeprotect']
@@ -0,0 +1,161 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - HTTP conditional GET (ETag, Last-Modified, 304 Not Modified)
+
+    Some actions (show, raw, rss_rc, sitemap) know what their output depends
+    on before they create it: the page revision, the state of the wiki (the
+    position of the edit-log: any change of a page, e.g. a new page, can
+    change how links to it get rendered), the theme, the language, the user
+    and the URL. They call check() with these parts before rendering
+    anything. It sends an ETag made from them (and a Last-Modified header)
+    and, if the client (or a caching proxy) already has this version of the
+    response, answers with 304 Not Modified instead of rendering it again.
+
+    Page views are only validated for anonymous users (pages of logged-in
+    users show personal data like the quicklinks, which is not in the
+    edit-log) and only if the page does not use macros or parsers which
+    depend on "time" (e.g. RandomPage or Hits, see the Dependencies of the
+    macros).
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import calendar, hashlib, re
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import version, wikiutil
+from MoinMoin.logfile import editlog, LogMissing
+from MoinMoin.util import pluginmanifest
+from MoinMoin.web.request import MoinMoinFinish
+
+# macros and parser sections used on a page (this finds more than the
+# parser does, e.g. in code blocks, which is fine - we only lose a 304)
+macro_re = re.compile(r'<<(\w+)')
+parser_re = re.compile(r'\{\{\{\s*#!\s*([\w/-]+)')
+
+
+def wiki_state(request, pagename=None):
+    """ Return the position of the edit-log and its mtime [s] (0 if there
+    is no edit-log yet).
+
+    @param pagename: use the edit-log of this page instead of the global one
+    """
+    kw = {}
+    if pagename is not None:
+        kw['rootpagename'] = pagename
+    log = editlog.EditLog(request, **kw)
+    try:
+        mtime = wikiutil.version2timestamp(log.date())
+    except LogMissing:
+        mtime = 0
+    return log.size(), mtime
+
+
+def user_class(request):
+    """ Anonymous users all get the same responses, other users get their own """
+    if request.user.valid:
+        return request.user.id
+    return 'anonymous'
+
+
+def make_etag(request, parts):
+    """ Return the (strong) ETag for a response depending on parts
+
+    The ETag also depends on the URL (including the query string), the user
+    class, the wiki config and the moin version.
+    """
+    cfg = request.cfg
+    parts = (cfg.siteid, cfg.cfg_mtime, version.release, version.revision,
+             request.url, user_class(request)) + tuple(parts)
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def not_modified(request, etag, last_modified=None):
+    """ Does the client already have the response? """
+    if request.if_none_match:
+        # if we have an If-None-Match header, it decides (RFC 7232, 3.3)
+        return request.if_none_match.contains_weak(etag)
+    if_modified_since = request.if_modified_since
+    if last_modified and if_modified_since:
+        return int(last_modified) <= calendar.timegm(if_modified_since.utctimetuple())
+    return False
+
+
+def check(request, parts, last_modified=None, max_age=None):
+    """ Send validators for a response depending on parts, finish the request
+    with 304 Not Modified if the client already has that response.
+
+    @param request: the request object
+    @param parts: tuple of the things (besides the URL and the user) the
+                  response depends on, must have a stable repr()
+    @param last_modified: timestamp [s] of the last change of the response, if known
+    @param max_age: how long [s] the client may use the response without
+                    asking us again (default: cfg.http_cache_max_age)
+    """
+    cfg = request.cfg
+    if not cfg.http_conditional_get or request.method not in ('GET', 'HEAD', ):
+        return
+    if max_age is None:
+        max_age = cfg.http_cache_max_age
+    etag = make_etag(request, parts)
+    request.set_etag(etag)
+    if last_modified:
+        # a changed config can change the response, too
+        last_modified = max(last_modified, cfg.cfg_mtime)
+        request.request.last_modified = last_modified # not proxied by the context
+    if request.user.valid or request.cookies:
+        # do not let shared caches give this to others (see also Vary)
+        scope = 'private'
+    else:
+        scope = 'public'
+    request.headers['Cache-Control'] = '%s, max-age=%d, must-revalidate' % (scope, max_age)
+    if not_modified(request, etag, last_modified):
+        logging.debug("304 Not Modified: %s" % request.url)
+        request.status_code = 304
+        raise MoinMoinFinish
+
+
+def _dependencies(cfg, kind, name):
+    """ Return the Dependencies of a macro or parser (see formatter.text_python) """
+    if kind == 'macro':
+        from MoinMoin.macro import Macro
+        if name in Macro.Dependencies:
+            return Macro.Dependencies[name]
+        return pluginmanifest.value(cfg, 'macro', name, 'Dependencies', Macro.defaultDependency)
+    try:
+        return wikiutil.searchAndImportPlugin(cfg, 'parser', name, 'Dependencies')
+    except (wikiutil.PluginMissingError, wikiutil.PluginAttributeError):
+        return ['time']
+
+
+def is_volatile(page):
+    """ Does the rendered page depend on "time" (change with every view)? """
+    cfg = page.request.cfg
+    body = page.data
+    for name in set(macro_re.findall(body)):
+        if 'time' in _dependencies(cfg, 'macro', name):
+            return True
+    for name in set(parser_re.findall(body)) | set([page.pi['format']]):
+        if 'time' in _dependencies(cfg, 'parser', name):
+            return True
+    return False
+
+
+def check_page(request, page):
+    """ Validate a view of the current revision of page (see check) """
+    if (not request.cfg.http_conditional_get or
+        request.user.valid or
+        page.rev or
+        not page.exists() or
+        'redirect' in page.pi or
+        is_volatile(page)):
+        return
+    position, mtime = wiki_state(request)
+    # anonymous users with a session see their trail
+    trail = tuple(request.user.getTrail())
+    check(request, ('show', page.page_name, page.get_real_rev(), position,
+                    request.lang, request.user.theme_name, request.cfg.theme_default, trail),
+          last_modified=mtime)
@@ -198,6 +198,7 @@ class HTTPContext(BaseContext):
     _auth_redirected = EnvironProxy('old._auth_redirected', 0)
     cacheable = EnvironProxy('old.cacheable', 0)
     writestack = EnvironProxy('old.writestack', lambda o: list())
+    output_stream = EnvironProxy('moin.output_stream', None)
 
     # proxy some descriptors of the underlying WSGI request, since
     # setting on those does not work over __(g|s)etattr__-proxies
@@ -291,6 +292,13 @@ class HTTPContext(BaseContext):
         """ Write to output stream. """
         self.request.out_stream.writelines(data)
 
+    def flush(self):
+        """ The headers are final, send them and the output written so far
+        (only if the response is streamed, see MoinMoin.web.streaming).
+        """
+        if self.output_stream is not None and not self.writestack:
+            self.output_stream.start()
+
     def redirectedOutput(self, function, *args, **kw):
         """ Redirect output during function, return redirected output """
         buf = io.StringIO()
@@ -311,18 +319,21 @@ class HTTPContext(BaseContext):
         else:
             self.write = self.writestack.pop()
 
-    def send_file(self, fileobj, bufsize=8192, do_flush=None):
+    def send_file(self, fileobj, bufsize=8192, do_flush=None, etag=None, last_modified=None):
         """ Send a file to the output stream.
 
+        Real files are sent via wsgi.file_wrapper and support Range requests,
+        see MoinMoin.web.sendfile.
+
         @param fileobj: a file-like object (supporting read, close)
         @param bufsize: size of chunks to read/write
         @param do_flush: call flush after writing?
+        @param etag: strong ETag of the file (see sendfile.file_etag)
+        @param last_modified: timestamp [s] of the last change of the file
         """
-        def simple_wrapper(fileobj, bufsize):
-            return iter(lambda: fileobj.read(bufsize), '')
-        file_wrapper = self.environ.get('wsgi.file_wrapper', simple_wrapper)
+        from MoinMoin.web import sendfile
         self.request.direct_passthrough = True
-        self.request.response = file_wrapper(fileobj, bufsize)
+        self.request.response = sendfile.prepare(self.request, fileobj, bufsize, etag, last_modified)
         raise MoinMoinFinish('sent file')
 
     # fully deprecated functions, with warnings
@@ -377,6 +388,7 @@ class AuxilaryMixin(object):
     _login_multistage_name = EnvironProxy('_login_multistage_name', None)
     _setuid_real_user = EnvironProxy('_setuid_real_user', None)
     pages = EnvironProxy('pages', lambda o: {})
+    page_acls = EnvironProxy('page_acls', lambda o: {})
 
     def uid_generator(self):
         pagename = None
@@ -0,0 +1,266 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - prefork mode of the standalone server
+
+    The master process creates the listening socket, preloads the wikis
+    (see MoinMoin.web.preload) and forks the worker processes. Each worker
+    accepts connections from the shared listening socket and handles one
+    request at a time (so N workers use up to N cpu cores).
+
+    The master restarts workers that exit, e.g. because they have handled
+    max_requests requests (this limits the effect of memory leaks). Signals
+    to the master:
+
+    * SIGHUP: graceful reload - the wiki configs are imported again (and the
+      wikis preloaded again), new workers are started and the old workers
+      finish the requests they are handling before they exit. Changed moin
+      code (or plugins) needs a restart, because the new workers are forked
+      from the master.
+    * SIGTERM, SIGINT: graceful stop - the workers finish their requests,
+      the master exits when they are gone (or kills them after
+      graceful_timeout seconds).
+
+    Only works on systems having os.fork.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import errno, gc, os, signal, socket, time
+
+from werkzeug.serving import BaseWSGIServer
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+
+class WorkerServer(BaseWSGIServer):
+    """ The server of a worker, accepting connections from the (non-blocking)
+    listening socket shared by all workers.
+    """
+
+    def __init__(self, *args, **kw):
+        BaseWSGIServer.__init__(self, *args, **kw)
+        # not a class attribute: werkzeug would switch to keep-alive
+        # connections then, which would block a worker for other clients
+        self.multiprocess = True
+        self.handled = 0 # amount of connections handled
+
+    def get_request(self):
+        conn, addr = BaseWSGIServer.get_request(self)
+        # on some systems, the accepted socket inherits non-blocking mode
+        conn.setblocking(True)
+        return conn, addr
+
+    def process_request(self, request, client_address):
+        self.handled += 1
+        BaseWSGIServer.process_request(self, request, client_address)
+
+
+class PreforkServer(object):
+    """ A master process managing worker processes """
+
+    def __init__(self, hostname, port, application, workers=2, max_requests=0,
+                 preload=True, gc_freeze=True, request_handler=None,
+                 passthrough_errors=False, graceful_timeout=30, poll_interval=0.5):
+        """
+        @param hostname: ip/hostname to listen on
+        @param port: port to listen on (0: some free port, see bind)
+        @param application: the WSGI application
+        @param workers: amount of worker processes
+        @param max_requests: restart a worker after it has handled that many
+                             requests (0: never)
+        @param preload: preload the wikis before forking the workers
+        @param gc_freeze: use gc.freeze after preloading
+        @param request_handler: werkzeug request handler class
+        @param passthrough_errors: see werkzeug.serving
+        @param graceful_timeout: how long to wait for workers to finish [s]
+        @param poll_interval: how often the master / workers check their state [s]
+        """
+        self.hostname = hostname
+        self.port = port
+        self.application = application
+        self.workers = workers
+        self.max_requests = max_requests
+        self.preload = preload
+        self.gc_freeze = gc_freeze
+        self.request_handler = request_handler
+        self.passthrough_errors = passthrough_errors
+        self.graceful_timeout = graceful_timeout
+        self.poll_interval = poll_interval
+        self.socket = None
+        self.pid = None # of the master
+        self.children = {} # pid -> generation
+        self.generation = 0 # increased by each reload
+        self.running = False
+        self.reload_requested = False
+
+    # master ----------------------------------------------------------------
+
+    def bind(self):
+        """ Create the listening socket shared by the workers
+
+        Call this before run() if you need to know the port (e.g. port 0).
+        """
+        if self.socket is not None:
+            return
+        family = socket.AF_INET
+        if ':' in self.hostname:
+            family = socket.AF_INET6
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.hostname, self.port))
+            sock.listen(128)
+        except socket.error:
+            sock.close()
+            raise
+        # workers waiting for connections all get woken up when one arrives,
+        # all but one then fail accepting it and wait again
+        sock.setblocking(False)
+        self.socket = sock
+        self.port = sock.getsockname()[1]
+
+    def do_preload(self):
+        if not self.preload:
+            return
+        from MoinMoin.web import preload
+        if self.gc_freeze and hasattr(gc, 'unfreeze'):
+            gc.unfreeze() # the old objects may be garbage after a reload
+        try:
+            preload.preload(freeze=self.gc_freeze)
+        except Exception:
+            # e.g. a broken farmconfig, the workers will show the error
+            logging.exception("preloading failed, the workers will load the wikis themselves")
+
+    def run(self):
+        """ Run the master process until it gets stopped """
+        self.bind()
+        self.pid = os.getpid()
+        self.running = True
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        logging.info("prefork server listening on %s:%d with %d workers" % (self.hostname, self.port, self.workers))
+        try:
+            self.do_preload()
+            while self.running:
+                if self.reload_requested:
+                    self.reload()
+                self.reap_workers()
+                self.spawn_workers()
+                time.sleep(self.poll_interval)
+        finally:
+            if os.getpid() == self.pid:
+                self.stop_workers()
+                self.socket.close()
+                logging.info("prefork server stopped")
+
+    def handle_stop(self, signum, frame):
+        self.running = False
+
+    def handle_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def reload(self):
+        """ Gracefully replace all workers by new ones using new wiki configs """
+        self.reload_requested = False
+        logging.info("prefork server reloading")
+        from MoinMoin.config import multiconfig
+        multiconfig.clearConfigCache()
+        self.generation += 1
+        self.do_preload()
+        old = [pid for pid, generation in self.children.items() if generation < self.generation]
+        self.spawn_workers()
+        for pid in old:
+            self.kill_worker(pid, signal.SIGTERM)
+
+    def spawn_workers(self):
+        """ Start workers until we have enough of the current generation """
+        current = [pid for pid, generation in self.children.items() if generation == self.generation]
+        for i in range(self.workers - len(current)):
+            pid = os.fork()
+            if not pid:
+                status = 1
+                try:
+                    status = self.run_worker()
+                except Exception:
+                    logging.exception("worker %d failed" % os.getpid())
+                finally:
+                    os._exit(status)
+            self.children[pid] = self.generation
+            logging.debug("started worker %d" % pid)
+
+    def reap_workers(self):
+        """ Forget about workers that have exited """
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError as err:
+                if err.errno == errno.ECHILD:
+                    self.children.clear()
+                    break
+                raise
+            if not pid:
+                break
+            generation = self.children.pop(pid, None)
+            if status and generation is not None:
+                logging.warning("worker %d exited with status %d" % (pid, status))
+
+    def kill_worker(self, pid, sig):
+        try:
+            os.kill(pid, sig)
+        except OSError as err:
+            if err.errno != errno.ESRCH:
+                raise
+
+    def stop_workers(self):
+        """ Gracefully stop all workers, kill them if they take too long """
+        for pid in list(self.children.keys()):
+            self.kill_worker(pid, signal.SIGTERM)
+        deadline = time.time() + self.graceful_timeout
+        while self.children and time.time() < deadline:
+            self.reap_workers()
+            if self.children:
+                time.sleep(0.1)
+        for pid in list(self.children.keys()):
+            logging.warning("killing worker %d" % pid)
+            self.kill_worker(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        self.children.clear()
+
+    # worker ----------------------------------------------------------------
+
+    def run_worker(self):
+        """ Handle requests until we are stopped, have handled max_requests
+        requests or the master is gone.
+
+        @return: exit status
+        """
+        alive = [True]
+
+        def handle_stop(signum, frame):
+            alive[0] = False
+        signal.signal(signal.SIGTERM, handle_stop)
+        # the master handles these, e.g. ctrl-c in a terminal sends SIGINT to all of us
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        server = WorkerServer(self.hostname, self.port, self.application,
+                              self.request_handler, self.passthrough_errors,
+                              fd=self.socket.fileno())
+        server.timeout = self.poll_interval
+        from MoinMoin.web.preload import memory_usage
+        logging.debug("worker %d: rss %s KB, private %s KB after start" % ((os.getpid(), ) + memory_usage()))
+        try:
+            while alive[0] and os.getppid() == self.pid:
+                server.handle_request()
+                if self.max_requests and server.handled >= self.max_requests:
+                    break
+        finally:
+            server.server_close()
+        logging.debug("worker %d: rss %s KB, private %s KB after %d requests" % ((os.getpid(), ) + memory_usage() + (server.handled, )))
+        return 0
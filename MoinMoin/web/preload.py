@@ -0,0 +1,215 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - preloading a server process before it forks its workers
+
+    A new worker process is slow for its first requests: it has to build
+    the wiki configs, import the plugins, load translations and list the
+    pages of the wiki. If a server (e.g. "moin server standalone" with
+    workers) calls preload() before forking, all that is done once in the
+    master process and the workers start with it - the memory pages are
+    shared with the master as long as nobody writes to them.
+
+    Writing also means changing reference counts and the garbage collector
+    marking objects, so preload(freeze=True) moves all objects existing at
+    that time into the permanent generation of the garbage collector
+    (gc.freeze, python >= 3.7), which is then never touched by collections
+    in the workers.
+
+    Usage (in the master, before forking):
+
+        from MoinMoin.web import preload
+        report = preload.preload(freeze=True)
+        logging.info(str(report))
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import gc, time
+
+from werkzeug.test import create_environ
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import i18n
+from MoinMoin.config import multiconfig
+from MoinMoin.util import pluginmanifest, pysupport
+from MoinMoin.web.contexts import AllContext
+from MoinMoin.web.request import Request
+
+# the plugin kinds we import (the subdirectories of data/plugin)
+PLUGIN_KINDS = ['action', 'converter', 'events', 'filter', 'formatter', 'macro',
+                'parser', 'theme', 'userprefs', 'xmlrpc', ]
+
+
+def memory_usage():
+    """ Return the memory usage of this process
+
+    The private memory is the part not shared with other processes (e.g.
+    the pages a forked worker has written to since it was forked).
+
+    @rtype: tuple
+    @return: resident set size, private memory (in KB, None if unknown)
+    """
+    rss = private = None
+    try:
+        f = open('/proc/self/smaps_rollup')
+        try:
+            for line in f:
+                fields = line.split()
+                if fields[0] == 'Rss:':
+                    rss = int(fields[1])
+                elif fields[0] in ('Private_Clean:', 'Private_Dirty:', ):
+                    private = (private or 0) + int(fields[1])
+        finally:
+            f.close()
+    except (IOError, OSError, IndexError, ValueError):
+        pass
+    if rss is None:
+        try:
+            import resource
+        except ImportError: # not on posix
+            pass
+        else:
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # peak, not current value
+    return rss, private
+
+
+class Report(object):
+    """ What preload did and how long it took """
+
+    def __init__(self):
+        self.steps = [] # [(description, seconds), ...]
+        self.rss_before, self.private_before = memory_usage()
+        self.rss_after = self.private_after = None
+        self.frozen = 0 # objects moved to the permanent gc generation
+
+    def add(self, description, seconds):
+        self.steps.append((description, seconds))
+
+    def finish(self):
+        self.rss_after, self.private_after = memory_usage()
+
+    def total(self):
+        """ total time [s] (this is the time each worker saves on its cold start) """
+        return sum([seconds for description, seconds in self.steps])
+
+    def __str__(self):
+        lines = ["preload: %-50s %8.1fms" % (description, 1000 * seconds)
+                 for description, seconds in self.steps]
+        lines.append("preload: %-50s %8.1fms" % ("total", 1000 * self.total()))
+        lines.append("preload: rss %s KB -> %s KB, private %s KB -> %s KB, %d objects frozen" % (
+                     self.rss_before, self.rss_after, self.private_before, self.private_after, self.frozen))
+        return '\n'.join(lines)
+
+
+def _timed(report, description, function, *args):
+    t = time.time()
+    result = function(*args)
+    report.add(description, time.time() - t)
+    return result
+
+
+def make_context(cfg, url='http://localhost:0/'):
+    """ Return a context for wiki cfg (not matching the url against the
+    farmconfig, so this works for every wiki of the farm).
+    """
+    from MoinMoin import wsgiapp
+    environ = create_environ(base_url=url)
+    environ['HTTP_USER_AGENT'] = 'CLI/Script'
+    context = AllContext(Request(environ))
+    context.cfg = cfg
+    wsgiapp.init(context)
+    return context
+
+
+def import_plugins(cfg):
+    """ Import all plugins of wiki cfg
+
+    @return: amount of plugin modules imported
+    """
+    count = 0
+    for kind in PLUGIN_KINDS:
+        manifest = pluginmanifest.get(cfg, kind, validate=True)
+        for name, (package, info) in list(manifest.plugins.items()):
+            if info is None:
+                continue # could not be imported when building the manifest
+            try:
+                pysupport.importName(package, name)
+            except Exception as err:
+                logging.warning("preload: could not import %s.%s: %s" % (package, name, str(err)))
+            else:
+                count += 1
+    return count
+
+
+def load_languages(context, languages):
+    """ Load the translations of languages (and the texts formatted for
+    the wiki of context)
+    """
+    for lang in languages:
+        if lang != 'en' and lang not in (i18n.languages or {}):
+            logging.warning("preload: no translation for language %r" % lang)
+            continue
+        translation = i18n.getTranslation(context, lang)
+        if context.cfg.siteid not in translation.formatted_loaded:
+            translation.loadFormatted(context)
+
+
+def load_pagelists(context):
+    """ Fill the page list and page metadata caches of the wiki of context
+
+    @return: amount of existing pages
+    """
+    return len(context.rootpage.getPageList(user='', exists=1))
+
+
+def preload_wiki(cfg, report=None):
+    """ Preload everything of wiki cfg that does not depend on the request
+
+    @param cfg: wiki config
+    @param report: Report to add the timings to (default: a new one)
+    @rtype: Report
+    """
+    if report is None:
+        report = Report()
+    name = cfg.siteid
+    context = _timed(report, "%s: i18n, session, user" % name, make_context, cfg)
+    count = _timed(report, "%s: plugins" % name, import_plugins, cfg)
+    logging.debug("preload: %s: imported %d plugins" % (name, count))
+    languages = [cfg.language_default]
+    for lang in ['en'] + cfg.preload_languages:
+        if lang not in languages:
+            languages.append(lang)
+    _timed(report, "%s: languages %s" % (name, ' '.join(languages)), load_languages, context, languages)
+    count = _timed(report, "%s: page lists" % name, load_pagelists, context)
+    logging.debug("preload: %s: %d pages" % (name, count))
+    return report
+
+
+def preload(names=None, freeze=False):
+    """ Preload the wikis of the farm, before forking worker processes
+
+    @param names: config module names of the wikis (default: all wikis)
+    @param freeze: move all objects into the permanent gc generation
+    @rtype: Report
+    @return: timings and memory usage
+    """
+    report = Report()
+    if names is None:
+        names = _timed(report, "farm config", multiconfig.getConfigNames)
+    for name in names:
+        cfg = _timed(report, "%s: config" % name, multiconfig.getConfigByName, name)
+        try:
+            preload_wiki(cfg, report)
+        except Exception:
+            # a broken wiki will show its error to its users, not stop the server
+            logging.exception("preload: could not preload wiki %s" % name)
+    if freeze and hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
+        report.frozen = gc.get_freeze_count()
+    report.finish()
+    logging.info(str(report))
+    return report
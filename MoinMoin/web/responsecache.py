@@ -0,0 +1,255 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - full-response cache for page views of anonymous users
+
+    Most requests to a public wiki are page views of anonymous users, who
+    all get the same html. If cfg.response_cache is True, the application
+    keeps these responses (and a gzip compressed copy of them) in memory (per
+    process, at most cfg.response_cache_size of them) and in the cache dir
+    (shared by all processes, if cfg.response_cache_disk is True) and serves
+    them again without setting up the user, the session and the theme and
+    without rendering the page.
+
+    Only GET and HEAD requests of the show action without cookies, without
+    authentication and without query arguments (besides action=show) are
+    served from the cache, and only if no auth method of cfg.auth may
+    identify a user by such a request (see BaseAuth.may_be_anonymous). Responses are only stored if they are a complete
+    (not streamed) 200 html response for the current revision of a page not
+    depending on "time" (see MoinMoin.web.conditional), to a user who did not
+    log in and without setting a cookie.
+
+    The key is made from the URL, the language, whether the client is a
+    spider and the wiki config. A response is valid as long as the edit-log
+    has not changed: like the theme fragments, a page view can change with
+    any change of the wiki (e.g. links to a new page), so the cache needs no
+    further invalidation. The names of the files in the cache dir start
+    with the edit-log position, when a process sees the edit-log change it
+    removes the files of other positions.
+
+    Cache hits skip the surge protection and are not counted as page views
+    (hit counters, event log). The hit ratio is logged every log_interval
+    lookups and shown by the SystemInfo macro.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import gzip, hashlib
+
+from werkzeug.wrappers import Response
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching, i18n, version
+from MoinMoin.logfile import editlog
+from MoinMoin.util.lru import LRUCache
+from MoinMoin.web.utils import check_forbidden
+
+arena = 'responses' # of the disk cache (wiki scope)
+log_interval = 1000 # log the hit ratio every that many lookups
+environ_key = 'moin.response_cache' # key and edit-log position of a miss
+
+# response headers we do not keep (the ETag is kept separately)
+skip_headers = set(['content-length', 'date', 'etag', 'set-cookie', ])
+
+
+class ResponseCache(object):
+    """ The response cache of a wiki in this process """
+
+    def __init__(self, size):
+        """
+        @param size: maximum amount of responses kept in memory
+        """
+        self.memory = LRUCache(size)
+        self.log_pos = None
+        self.lookups = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stored = 0
+
+    def hit_ratio(self):
+        """ Return the part of the lookups answered from the cache (0.0 .. 1.0) """
+        if not self.lookups:
+            return 0.0
+        return float(self.memory_hits + self.disk_hits) / self.lookups
+
+    def __str__(self):
+        return "%.1f%% hits (%d from memory, %d from disk, %d misses, %d stored)" % (
+            self.hit_ratio() * 100, self.memory_hits, self.disk_hits,
+            self.lookups - self.memory_hits - self.disk_hits, self.stored)
+
+    def position(self, request):
+        """ Return the current position of the edit-log, forget the responses
+        stored for another position if it has changed.
+        """
+        position = editlog.EditLog(request).size()
+        if position != self.log_pos:
+            self.memory.clear()
+            self.log_pos = position
+            if request.cfg.response_cache_disk:
+                self.prune(request, position)
+        return position
+
+    def prune(self, request, position):
+        """ Remove the files of other edit-log positions from the cache dir """
+        prefix = '%d-' % position
+        removed = 0
+        for key in caching.get_cache_list(request, arena, 'wiki'):
+            # keep the lock dir and the temporary files of running updates
+            if key.startswith(prefix) or key == '__lock__' or key.endswith('.tmp'):
+                continue
+            self.disk_entry(request, key).remove()
+            removed += 1
+        if removed:
+            logging.debug("response cache: removed %d outdated responses" % removed)
+
+    def key(self, request, position):
+        """ Return the cache key for the request at the edit-log position """
+        cfg = request.cfg
+        parts = (cfg.siteid, cfg.cfg_mtime, version.release, version.revision,
+                 request.url, request.lang, request.isSpiderAgent)
+        return '%d-%s' % (position, hashlib.sha1(repr(parts).encode('utf-8')).hexdigest())
+
+    def disk_entry(self, request, key):
+        return caching.CacheEntry(request, arena, key, scope='wiki', use_pickle=True)
+
+    def get(self, request, key, position):
+        """ Return the entry stored for key at the edit-log position (or None) """
+        entry = self.memory.get(key)
+        if entry is not None and entry['position'] == position:
+            self.memory_hits += 1
+            return entry
+        if request.cfg.response_cache_disk:
+            cache = self.disk_entry(request, key)
+            if cache.exists():
+                try:
+                    entry = cache.content()
+                except caching.CacheError:
+                    entry = None
+                if entry is not None and entry['position'] == position:
+                    self.memory[key] = entry
+                    self.disk_hits += 1
+                    return entry
+        return None
+
+    def put(self, request, key, entry):
+        self.memory[key] = entry
+        if request.cfg.response_cache_disk:
+            self.disk_entry(request, key).update(entry)
+        self.stored += 1
+
+
+def get_cache(cfg):
+    """ Return the response cache of the wiki with config cfg """
+    cache = cfg.cache.responses
+    if cache is None:
+        cache = cfg.cache.responses = ResponseCache(cfg.response_cache_size)
+    return cache
+
+
+def cacheable_request(request):
+    """ May the response to this request come from the cache?
+
+    @param request: the request (not the context)
+    """
+    if request.method not in ('GET', 'HEAD', ) or request.cookies:
+        return False
+    environ = request.environ
+    if 'HTTP_AUTHORIZATION' in environ or environ.get('REMOTE_USER'):
+        return False
+    args = list(request.args.items(multi=True))
+    return not args or args == [('action', 'show')]
+
+
+def anonymous_request(cfg, request):
+    """ Is the request of an anonymous user for all auth methods of cfg?
+
+    @param request: the request (not the context)
+    """
+    for auth in cfg.auth:
+        if not auth.may_be_anonymous(request):
+            return False
+    return True
+
+
+def lookup(context):
+    """ Return the cached response for the request of context (or None)
+
+    Call this with a fresh context, before initializing it (see
+    wsgiapp.init). On a miss, the key is remembered for store() (and
+    wsgiapp.run knows that check_forbidden was already called).
+    """
+    cfg = context.cfg
+    request = context.request
+    if (not cfg.response_cache or not cacheable_request(request) or
+        not anonymous_request(cfg, request)):
+        return None
+    check_forbidden(context)
+    # anonymous users get the language of the browser (see wsgiapp.setup_i18n_preauth)
+    if i18n.languages is None:
+        i18n.i18n_init(context)
+    context.lang = i18n.requestLanguage(context)
+
+    cache = get_cache(cfg)
+    position = cache.position(context)
+    key = cache.key(context, position)
+    cache.lookups += 1
+    entry = cache.get(context, key, position)
+    if cache.lookups % log_interval == 0:
+        logging.info("response cache of %s: %s" % (cfg.siteid, cache))
+    if entry is None:
+        request.environ[environ_key] = key, position
+        return None
+    logging.debug("response cache hit: %s" % request.url)
+    return make_response(request, entry)
+
+
+def make_response(request, entry):
+    """ Create the response for a cache entry, compressed if the client
+    accepts it and 304 Not Modified if the client already has it.
+    """
+    body, etag = entry['body'], entry['etag']
+    headers = list(entry['headers'])
+    if entry['gzipped'] is not None and request.accept_encodings['gzip']:
+        body = entry['gzipped']
+        headers.append(('Content-Encoding', 'gzip'))
+        if etag:
+            etag += '-gz' # another representation needs another strong ETag
+    response = Response(body, headers=headers)
+    response.vary.add('Accept-Encoding')
+    if etag:
+        response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def store(context, response):
+    """ Put the response into the cache, if the request came from a miss of
+    lookup() and the response may be served to other anonymous users.
+    """
+    request = context.request
+    try:
+        key, position = request.environ[environ_key]
+    except KeyError:
+        return
+    if (response is not request or
+        request.method != 'GET' or
+        context.action != 'show' or
+        not context.cacheable or
+        context.user.valid or
+        request.status_code != 200 or
+        request.mimetype != 'text/html' or
+        'Set-Cookie' in request.headers or
+        not request.is_sequence):
+        return
+    from MoinMoin.web.conditional import is_volatile
+    page = context.page
+    if page is None or is_volatile(page):
+        return
+    body = b''.join(request.iter_encoded())
+    headers = [(name, value) for name, value in request.headers
+               if name.lower() not in skip_headers]
+    etag = request.get_etag()[0]
+    gzipped = body and gzip.compress(body) or None
+    entry = dict(position=position, headers=headers, etag=etag, body=body, gzipped=gzipped)
+    get_cache(context.cfg).put(context, key, entry)
@@ -0,0 +1,224 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - sending files (attachments, objects of the cache action)
+
+    Files are given to the wsgi.file_wrapper of the server, which may send
+    them without copying them through python (os.sendfile). The standalone
+    server provides such a wrapper (FileWrapper, see MoinMoin.web.serving).
+
+    Range requests (RFC 7233) get answered with 206 Partial Content, with a
+    multipart/byteranges body for several ranges, or with 416 if no range
+    can be satisfied. If-Range is honored, the ETag (if given) is used for
+    If-None-Match and If-Range.
+
+    Servers sending a file given to their wsgi.file_wrapper with sendfile
+    must not send more than the Content-Length of the response (as e.g.
+    gunicorn and mod_wsgi do) - we seek the file to the start of the range.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import calendar, hashlib, os
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin.util import filesys
+from MoinMoin.web.conditional import not_modified
+
+# more ranges than that in one request get the complete file instead
+max_ranges = 50
+
+
+def uid_etag(uid):
+    """ Return a strong ETag for a file with uid (see filesys.fuid) or None """
+    if uid is None:
+        return None
+    return hashlib.sha1(repr(uid).encode('ascii')).hexdigest()
+
+
+def file_etag(filename):
+    """ Return a strong ETag for the current content of file filename (or None) """
+    return uid_etag(filesys.fuid(filename))
+
+
+def file_size(fileobj):
+    """ Return the size of an open file (None if it is not a real file) """
+    try:
+        return os.fstat(fileobj.fileno()).st_size
+    except (AttributeError, EnvironmentError, ValueError):
+        # e.g. io.UnsupportedOperation for a member of a zip file
+        return None
+
+
+class FileRange(object):
+    """ A part of an open file: reading returns at most length bytes, starting at start """
+
+    def __init__(self, fileobj, start, length):
+        self.fileobj = fileobj
+        self.start = start
+        self.length = length
+        self.remaining = length
+        fileobj.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        if not size:
+            return b''
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.fileobj.fileno()
+
+    def seek(self, offset):
+        """ seek to the absolute offset (in the underlying file) """
+        self.fileobj.seek(offset)
+        self.remaining = max(0, self.start + self.length - offset)
+
+    def tell(self):
+        return self.start + self.length - self.remaining
+
+    def close(self):
+        self.fileobj.close()
+
+
+class FileWrapper(object):
+    """ wsgi.file_wrapper sending the file with socket.sendfile (os.sendfile,
+    if the platform has it) if it knows the socket, reading it in chunks of
+    blksize bytes otherwise.
+    """
+
+    def __init__(self, filelike, blksize=8192, sock=None):
+        self.filelike = filelike
+        self.blksize = blksize
+        self.sock = sock
+
+    def __iter__(self):
+        filelike = self.filelike
+        if self.sock is not None and file_size(filelike) is not None:
+            return self.sendfile()
+        return iter(lambda: filelike.read(self.blksize), b'')
+
+    def sendfile(self):
+        filelike = self.filelike
+        # the server sends the headers before it writes the first data
+        yield b''
+        offset = filelike.tell()
+        count = getattr(filelike, 'remaining', None)
+        if count is None:
+            count = file_size(filelike) - offset
+        if count > 0:
+            self.sock.sendfile(filelike, offset, count)
+
+    def close(self):
+        self.filelike.close()
+
+
+def satisfiable_ranges(ranges, size):
+    """ Return the ranges (a list of (start, stop) with stop being None for
+    open ranges and start < 0 for suffix ranges, see werkzeug.datastructures.Range)
+    as (start, stop) of a file of size bytes, without the ranges beyond the end.
+    """
+    result = []
+    for start, stop in ranges:
+        if start < 0:
+            start, stop = max(0, size + start), size
+        elif stop is None or stop > size:
+            stop = size
+        if start < stop:
+            result.append((start, stop))
+    return result
+
+
+def if_range_matches(request, etag, last_modified):
+    """ Does the If-Range header (if any) match the current file? """
+    value = request.environ.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if_range = request.if_range
+    if if_range.date is not None:
+        return bool(last_modified) and int(last_modified) == calendar.timegm(if_range.date.utctimetuple())
+    # weak ETags do not match (RFC 7233, 3.2)
+    return etag is not None and not value.startswith('W/') and if_range.etag == etag
+
+
+def multipart_parts(ranges, size, content_type, boundary):
+    """ Return the headers (bytes) of the parts of a multipart/byteranges
+    body and its closing delimiter.
+    """
+    heads = []
+    for start, stop in ranges:
+        head = '--%s\r\nContent-Type: %s\r\nContent-Range: bytes %d-%d/%d\r\n\r\n' % (
+               boundary, content_type, start, stop - 1, size)
+        heads.append(head.encode('ascii'))
+    return heads, ('--%s--\r\n' % boundary).encode('ascii')
+
+
+def multipart_iter(fileobj, ranges, heads, tail, bufsize):
+    """ Generate a multipart/byteranges body """
+    try:
+        for (start, stop), head in zip(ranges, heads):
+            yield head
+            part = FileRange(fileobj, start, stop - start)
+            for data in iter(lambda: part.read(bufsize), b''):
+                yield data
+            yield b'\r\n'
+        yield tail
+    finally:
+        fileobj.close()
+
+
+def prepare(request, fileobj, bufsize=8192, etag=None, last_modified=None):
+    """ Prepare the response for sending the file, return the response iterable
+
+    Sets the status and the headers (Content-Length, Content-Range, ETag,
+    Accept-Ranges) for the request. The Content-Type must already be set.
+
+    @param request: the request (not the context)
+    @param fileobj: the open file (a real file if ranges shall be supported)
+    @param bufsize: size of chunks to read, if the file is read
+    @param etag: strong ETag of the file (see file_etag)
+    @param last_modified: timestamp [s] of the last change of the file
+    @return: the response iterable
+    """
+    file_wrapper = request.environ.get('wsgi.file_wrapper', FileWrapper)
+    size = file_size(fileobj)
+    if etag:
+        request.set_etag(etag)
+    if not_modified(request, etag, last_modified):
+        fileobj.close()
+        request.status_code = 304
+        return []
+    if size is None:
+        return file_wrapper(fileobj, bufsize)
+
+    request.headers['Accept-Ranges'] = 'bytes'
+    rng = request.range # None if missing or invalid, which means we ignore it
+    if (rng is not None and rng.units == 'bytes' and len(rng.ranges) <= max_ranges and
+        request.method in ('GET', 'HEAD', ) and if_range_matches(request, etag, last_modified)):
+        ranges = satisfiable_ranges(rng.ranges, size)
+        if not ranges:
+            fileobj.close()
+            request.status_code = 416
+            request.headers['Content-Range'] = 'bytes */%d' % size
+            request.headers['Content-Length'] = '0'
+            return []
+        request.status_code = 206
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            request.headers['Content-Range'] = 'bytes %d-%d/%d' % (start, stop - 1, size)
+            request.headers['Content-Length'] = str(stop - start)
+            return file_wrapper(FileRange(fileobj, start, stop - start), bufsize)
+        boundary = hashlib.sha1(repr((etag, size, ranges)).encode('ascii')).hexdigest()
+        heads, tail = multipart_parts(ranges, size, request.headers.get('Content-Type'), boundary)
+        length = sum([len(head) + stop - start + 2 for (start, stop), head in zip(ranges, heads)]) + len(tail)
+        request.headers['Content-Type'] = 'multipart/byteranges; boundary=%s' % boundary
+        request.headers['Content-Length'] = str(length)
+        return multipart_iter(fileobj, ranges, heads, tail, bufsize)
+
+    request.headers['Content-Length'] = str(size)
+    return file_wrapper(FileRange(fileobj, 0, size), bufsize)
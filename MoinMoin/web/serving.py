@@ -8,7 +8,7 @@
     @copyright: 2008-2008 MoinMoin:FlorianKrupicka
     @license: GNU GPL, see COPYING for details.
 """
-import os
+import functools, os
 from MoinMoin import config
 
 from MoinMoin import version, log
@@ -20,6 +20,8 @@ werkzeug._internal._logger = log.getLogger('werkzeug')
 
 from werkzeug.serving import run_simple, BaseRequestHandler
 
+from MoinMoin.web.sendfile import FileWrapper
+
 class RequestHandler(BaseRequestHandler):
     """
     A request-handler for WSGI, that overrides the default logging
@@ -28,6 +30,12 @@ class RequestHandler(BaseRequestHandler):
     server_version = "MoinMoin %s %s" % (version.release,
                                          version.revision)
 
+    def make_environ(self):
+        environ = BaseRequestHandler.make_environ(self)
+        # send files directly to our socket (os.sendfile), see MoinMoin.web.sendfile
+        environ['wsgi.file_wrapper'] = functools.partial(FileWrapper, sock=self.connection)
+        return environ
+
     # override the logging functions
     def log_request(self, code='-', size='-'):
         self.log_message('"%s" %s %s',
@@ -127,11 +135,32 @@ def switch_user(uid, gid=None):
         raise RuntimeError("can't change uid/gid to %s/%s" % (uid, gid))
     logging.info("Running as uid/gid %d/%d" % (uid, gid))
 
+def uses_workers(workers, debug='off'):
+    """ Does run_server run a prefork server with these settings? """
+    return bool(workers) and debug == 'off' and hasattr(os, 'fork')
+
+def run_prefork_server(application, hostname, port,
+                       workers=2, max_requests=0, preload=True, gc_freeze=True,
+                       static_files=None, use_reloader=False):
+    """ Run the standalone server with worker processes (see MoinMoin.web.prefork). """
+    from MoinMoin.web.prefork import PreforkServer
+    if static_files:
+        from werkzeug.middleware.shared_data import SharedDataMiddleware
+        application = SharedDataMiddleware(application, static_files)
+    if use_reloader:
+        logging.warning("use_reloader does not work with workers, send SIGHUP to the server to reload it")
+    server = PreforkServer(hostname, port, application,
+                           workers=workers, max_requests=max_requests,
+                           preload=preload, gc_freeze=gc_freeze,
+                           request_handler=RequestHandler)
+    server.run()
+
 def run_server(hostname='localhost', port=8080,
                docs=True,
                debug='off',
                user=None, group=None,
                threaded=True,
+               workers=0, max_requests=0, preload=True, gc_freeze=True,
                **kw):
     """ Run a standalone server on specified host/port. """
     application = make_application(shared=docs)
@@ -149,6 +178,19 @@ def run_server(hostname='localhost', port=8080,
         # thread then will just terminate when an exception happens
         threaded = False
 
+    if workers:
+        if debug != 'off':
+            logging.warning("debugging needs a single process, not using workers")
+        elif not uses_workers(workers, debug):
+            logging.warning("workers need os.fork, not using workers")
+        else:
+            run_prefork_server(application, hostname, port,
+                               workers=workers, max_requests=max_requests,
+                               preload=preload, gc_freeze=gc_freeze,
+                               static_files=kw.get('static_files'),
+                               use_reloader=kw.get('use_reloader'))
+            return
+
     run_simple(hostname=hostname, port=port,
                application=application,
                threaded=threaded,
@@ -8,12 +8,13 @@
     to the documentation of `SessionService` in this module.
 
     @copyright: 2008 MoinMoin:FlorianKrupicka,
-                2009 MoinMoin:ThomasWaldmann
+                2009 MoinMoin:ThomasWaldmann,
+                2026 MoinMoin:MoinCoreTeam
     @license: GNU GPL, see COPYING for details.
 """
-import time
+import os, time, pickle, sqlite3, threading
 
-from secure_cookie.session import Session, FilesystemSessionStore
+from secure_cookie.session import Session, SessionStore, FilesystemSessionStore
 
 from MoinMoin import config
 from MoinMoin.util import filesys
@@ -26,12 +27,20 @@ class MoinSession(Session):
     """ Compatibility interface to Werkzeug-sessions for old Moin-code.
 
         is_new is DEPRECATED and will go away soon.
+
+        dirty tells whether something was put into (or removed from) the
+        session while processing the request. If you modify a mutable
+        value in the session in place, set session.modified = True.
     """
     def _get_is_new(self):
         logging.warning("Deprecated use of MoinSession.is_new, please use .new")
         return self.new
     is_new = property(_get_is_new)
 
+    def _get_dirty(self):
+        return self.modified
+    dirty = property(_get_dirty)
+
 
 class SessionService(object):
     """
@@ -60,6 +69,26 @@ class SessionService(object):
         """
         raise NotImplementedError
 
+    def destroy_sessions(self, request, expired_before=None, user_id=None):
+        """
+        Destroy all sessions matching ALL the given conditions, return the
+        amount of destroyed sessions.
+
+        @param expired_before: only sessions expiring before this time
+                               (or not having an expiry time)
+        @param user_id: only sessions of the user with this id
+        """
+        count = 0
+        for sid in self.get_all_session_ids(request):
+            session = self.get_session(request, sid)
+            if expired_before is not None and session.get('expires', 0) >= expired_before:
+                continue
+            if user_id is not None and session.get('user.id') != user_id:
+                continue
+            self.destroy_session(request, session)
+            count += 1
+        return count
+
 
 def _get_session_lifetime(request, userobj):
     """ Get session lifetime for the user object userobj
@@ -202,6 +231,14 @@ class FileSessionService(SessionService):
         kill_session = not userobj.valid and 'user.id' in session
         if kill_session:
             logging.debug("logout detected, will kill session")
+        elif (cookie_lifetime and not userobj.valid and not session.dirty and
+              (session.new or cfg.session_stateless_anonymous)):
+            # nothing was put into the session of this anonymous request, so
+            # we neither store the session nor set a cookie (keeping the
+            # response cacheable). With session_stateless_anonymous, we do
+            # not even refresh existing anonymous sessions.
+            logging.debug("unmodified anonymous session, not storing it")
+            return
         if cookie_lifetime and not kill_session:
             logging.debug("setting session cookie: %r" % (session.sid, ))
             request.set_cookie(cookie_name, session.sid,
@@ -213,6 +250,15 @@ class FileSessionService(SessionService):
             logging.debug("deleting session cookie!")
             request.delete_cookie(cookie_name, path=cookie_path, domain=cfg.cookie_domain)
 
+        if 'Set-Cookie' in request.headers:
+            # the response may have been made cacheable by a shared cache
+            # before we knew it sets a cookie (see MoinMoin.web.conditional),
+            # a shared cache must not give this cookie to other users
+            cache_control = request.headers.get('Cache-Control')
+            if cache_control:
+                cache_control = cache_control.replace('public', 'private')
+            request.headers['Cache-Control'] = cache_control or 'private'
+
         def update_session(key, val):
             """ put key/val into session, avoid writing if it is unchanged """
             try:
@@ -265,3 +311,146 @@ class FileSessionService(SessionService):
             logging.debug("destroying session: %r" % session)
             self.destroy_session(request, session)
 
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    A werkzeug session store keeping all sessions in one sqlite table,
+    indexed on expiry time and user id (so expired sessions or sessions of
+    some user can be found and deleted without loading every session).
+
+    The database connection is only made when a session actually gets
+    loaded or saved, so requests without a session cookie never touch it.
+    """
+    schema = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            sid TEXT PRIMARY KEY,
+            expires INTEGER,
+            user_id TEXT,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires);
+        CREATE INDEX IF NOT EXISTS sessions_user_id ON sessions (user_id);
+    """
+
+    def __init__(self, connect, session_class=MoinSession):
+        """
+        @param connect: function returning the sqlite connection to use
+        """
+        SessionStore.__init__(self, session_class)
+        self._connect = connect
+
+    def _row(self, session):
+        return (session.sid, session.get('expires'), session.get('user.id'),
+                sqlite3.Binary(pickle.dumps(dict(session), pickle.HIGHEST_PROTOCOL)))
+
+    def save(self, session):
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO sessions (sid, expires, user_id, data) VALUES (?, ?, ?, ?)",
+                     self._row(session))
+        conn.commit()
+
+    def save_many(self, sessions):
+        """ Save many sessions in one transaction """
+        conn = self._connect()
+        conn.executemany("INSERT OR REPLACE INTO sessions (sid, expires, user_id, data) VALUES (?, ?, ?, ?)",
+                         (self._row(session) for session in sessions))
+        conn.commit()
+
+    def delete(self, session):
+        conn = self._connect()
+        conn.execute("DELETE FROM sessions WHERE sid = ?", (session.sid, ))
+        conn.commit()
+
+    def get(self, sid):
+        if not self.is_valid_key(sid):
+            return self.new()
+        row = self._connect().execute("SELECT data FROM sessions WHERE sid = ?", (sid, )).fetchone()
+        data = {}
+        if row is not None:
+            try:
+                data = pickle.loads(bytes(row[0]))
+            except Exception:
+                logging.exception("could not load session %r" % sid)
+        # like FilesystemSessionStore: a session for a cookie we sent is not
+        # new, even if it was not stored yet
+        return self.session_class(data, sid, False)
+
+    def list(self):
+        return [row[0] for row in self._connect().execute("SELECT sid FROM sessions")]
+
+    def delete_many(self, expired_before=None, user_id=None):
+        """ Delete all sessions matching all given conditions, return their amount
+
+        Sessions without expiry time count as expired.
+        """
+        conditions, args = [], []
+        if expired_before is not None:
+            conditions.append("(expires IS NULL OR expires < ?)")
+            args.append(expired_before)
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            args.append(user_id)
+        sql = "DELETE FROM sessions"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        conn = self._connect()
+        count = conn.execute(sql, args).rowcount
+        conn.commit()
+        return count
+
+
+class SQLiteSessionService(FileSessionService):
+    """
+    Like FileSessionService, but stores all sessions in one sqlite database
+    (by default `session_dir`/sessions.sqlite) instead of one file per
+    session. This scales to millions of sessions and expired sessions are
+    deleted with a single indexed query (see destroy_sessions).
+
+    Use it by putting this into your wiki config:
+        from MoinMoin.web.session import SQLiteSessionService
+        session_service = SQLiteSessionService()
+    """
+    def __init__(self, cookie_usage='SESSION', path=None, timeout=30.0):
+        """
+        @param path: path of the database file (default: <session_dir>/sessions.sqlite)
+        @param timeout: seconds to wait for the database lock of other processes
+        """
+        FileSessionService.__init__(self, cookie_usage)
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _path(self, request):
+        return self.path or os.path.join(request.cfg.session_dir, 'sessions.sqlite')
+
+    def _connection(self, path):
+        """ Return the connection of the current thread to the database at path """
+        connections = getattr(self._local, 'connections', None)
+        pid = os.getpid()
+        if connections is None or self._local.pid != pid:
+            # sqlite connections must not be used in a forked child process
+            # (e.g. of the prefork server), it opens its own ones
+            connections = self._local.connections = {}
+            self._local.pid = pid
+        conn = connections.get(path)
+        if conn is None:
+            dirname = os.path.dirname(path)
+            try:
+                filesys.mkdir(dirname)
+            except OSError:
+                pass
+            conn = sqlite3.connect(path, timeout=self.timeout)
+            # readers do not block the writer (and vice versa)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SQLiteSessionStore.schema)
+            connections[path] = conn
+        return conn
+
+    def _store_get(self, request):
+        path = self._path(request)
+        return SQLiteSessionStore(lambda: self._connection(path), session_class=MoinSession)
+
+    def destroy_sessions(self, request, expired_before=None, user_id=None):
+        return self._store_get(request).delete_many(expired_before, user_id)
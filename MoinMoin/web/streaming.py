@@ -0,0 +1,170 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - streamed responses
+
+    Normally, moin renders the complete response into request.response (a
+    list of strings) and only then the WSGI server gets the status, the
+    headers and the body. For big pages, this means no bytes on the wire
+    until everything is rendered and the whole html in memory.
+
+    If stream_pages is enabled, the request is processed by a producer
+    thread instead (see run). When the page header is complete, the page
+    calls request.flush() - at that point:
+
+    * the session is finalized (setting cookies), the status and the
+      headers are final and get sent to the client together with what was
+      written so far
+    * after that, request.write puts everything into a small, bounded
+      queue (in chunks of about stream_chunk_size bytes), which is emptied
+      by the WSGI iterator - the producer waits if the client is slower, so
+      memory use does not depend on the size of the page
+
+    If the request does not call flush (other actions, errors, redirects,
+    ...), the response is sent as usual after processing it.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import threading, queue
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import config
+from MoinMoin.web.request import MoinMoinFinish
+
+# max. amount of chunks waiting to be sent
+QUEUE_SIZE = 8
+
+# give up if the client does not take a chunk for that long [s]
+SEND_TIMEOUT = 300.0
+
+
+class OutputStream(object):
+    """ Response body written by the producer thread, read by the WSGI server """
+
+    def __init__(self, context, chunk_size):
+        self.context = context
+        self.chunk_size = chunk_size
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.buffer = []
+        self.buffered = 0
+        self.started = False # status and headers are final
+        self.closed = False # the WSGI server does not want more chunks
+        self.done = threading.Event() # headers final or request processed
+        self.iterating = threading.Event() # the WSGI server has the headers
+        self.response = None # the response, if not streamed
+        self.error = None # the exception, if not streamed
+
+    def start(self):
+        """ Start streaming, called by request.flush """
+        context = self.context
+        request = context.request
+        if (self.started or request.method != 'GET' or
+            request.status_code in (204, 304, ) or not isinstance(request.response, list)):
+            # nothing to stream (or already streaming)
+            return
+        context.cfg.session_service.finalize(context, context.session)
+        self.buffer = list(request.response)
+        self.buffered = sum([len(data) for data in self.buffer])
+        self.started = True
+        request.response = self
+        context.write = self.write
+        self.done.set()
+        # the main thread now creates the WSGI headers from the request,
+        # do not continue before it is done with that
+        if not self.iterating.wait(SEND_TIMEOUT):
+            self.close()
+        self._send()
+
+    def write(self, *data):
+        """ Write to the stream (used as request.write after start) """
+        for item in data:
+            self.buffer.append(item)
+            self.buffered += len(item)
+        if self.buffered >= self.chunk_size:
+            self._send()
+
+    def _send(self):
+        """ Put the buffered data into the queue """
+        if not self.buffer:
+            return
+        chunk = b''.join([isinstance(data, bytes) and data or data.encode(config.charset)
+                          for data in self.buffer])
+        self.buffer = []
+        self.buffered = 0
+        self._put(chunk)
+
+    def _put(self, chunk):
+        waited = 0.0
+        while not self.closed:
+            try:
+                self.queue.put(chunk, timeout=1.0)
+                return
+            except queue.Full:
+                waited += 1.0
+                if waited >= SEND_TIMEOUT:
+                    logging.warning("client did not read the streamed response for %ds, giving up" % waited)
+                    self.close()
+        # stop rendering, see wsgiapp.run
+        raise MoinMoinFinish('client closed the connection')
+
+    def finish(self):
+        """ Send the rest, called by the producer at the end """
+        try:
+            self._send()
+            self._put(None)
+        except MoinMoinFinish:
+            pass
+
+    # the WSGI iterator
+    def __iter__(self):
+        self.iterating.set()
+        while True:
+            try:
+                chunk = self.queue.get(timeout=SEND_TIMEOUT)
+            except queue.Empty:
+                logging.warning("producing the streamed response stalled, giving up")
+                break
+            if chunk is None:
+                break
+            yield chunk
+
+    def close(self):
+        """ The WSGI server is done with us, called via the response """
+        self.closed = True
+        self.iterating.set()
+
+
+def run(context, process, chunk_size):
+    """ Run a context through the application (see wsgiapp.run) in a
+    producer thread, return the response as soon as the headers are final.
+    """
+    stream = OutputStream(context, chunk_size)
+    context.output_stream = stream
+
+    def produce():
+        try:
+            response = process(context)
+        except BaseException as err:
+            if not stream.started:
+                stream.error = err
+            elif not isinstance(err, MoinMoinFinish):
+                logging.exception("An exception has occurred while streaming [%s]." % context.request.url)
+        else:
+            stream.response = response
+        if stream.started:
+            stream.finish()
+        stream.done.set()
+
+    thread = threading.Thread(target=produce, name='moin-stream')
+    thread.daemon = True
+    thread.start()
+    stream.done.wait()
+    if stream.error is not None:
+        raise stream.error
+    if stream.started:
+        return context.request
+    return stream.response
+
@@ -0,0 +1,226 @@
+# -*- coding: iso-8859-1 -*-
+"""
+    MoinMoin - surge protection counters
+
+    check_surge_protect (see MoinMoin.web.utils) needs to know how many
+    requests some client did in the last dt seconds (per action and in
+    total). Instead of logging every request, we keep a sliding window
+    counter per (client id, action):
+
+    * requests are counted in fixed windows of dt seconds, the current and
+      the previous window count is kept
+    * the amount of requests in the last dt seconds is estimated as the
+      current count plus the part of the previous count which is still in
+      the sliding window, e.g. 30s into a 60s window: current + previous / 2
+    * requests done while over the limit are counted as warnings - after
+      <limit> warnings (or when kicked), the client gets locked out for
+      surge_lockout_time seconds
+
+    So each request costs O(1), independent of the traffic.
+
+    SurgeCounters keeps the counters in memory. This is only useful for
+    servers running a single (multi-threaded) process. SharedSurgeCounters
+    keeps them in a fixed size hash table in a memory mapped file (in the
+    wiki's cache directory), so all processes of a wiki (and even CGI)
+    share the counters. Which is used is configured by surge_counters.
+
+    @copyright: 2026 MoinMoin:MoinCoreTeam
+    @license: GNU GPL, see COPYING for details.
+"""
+
+import os, mmap, struct, hashlib, threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from MoinMoin import log
+logging = log.getLogger(__name__)
+
+from MoinMoin import caching
+from MoinMoin.util import lock
+
+# counter state fields:
+WINDOW_START, CURRENT, PREVIOUS, WARNINGS, WARNED, LOCKED_UNTIL, EXPIRES = range(7)
+
+
+def hit(state, now, maxnum, dt, lockout_time, kick=False):
+    """ Count a request, return whether the client is over the limit
+
+    @param state: list of counter state (see field names above), gets updated
+    @param now: current time [s] (int)
+    @param maxnum: max. amount of requests in dt seconds
+    @param dt: length of the sliding window [s]
+    @param lockout_time: time [s] someone gets locked out
+    @param kick: lock out the client now
+    """
+    dt = max(1, dt)
+    window_start = state[WINDOW_START]
+    elapsed = now - window_start
+    if not window_start or elapsed >= 2 * dt or elapsed < 0:
+        # new counter (or nothing happened in the previous window)
+        state[WINDOW_START], state[CURRENT], state[PREVIOUS] = now, 0, 0
+    elif elapsed >= dt:
+        state[WINDOW_START] = now - elapsed % dt
+        state[PREVIOUS], state[CURRENT] = state[CURRENT], 0
+    elapsed = now - state[WINDOW_START]
+    estimate = state[CURRENT] + state[PREVIOUS] * (dt - elapsed) / dt
+
+    if kick:
+        state[LOCKED_UNTIL] = now + lockout_time
+    locked_out = now < state[LOCKED_UNTIL]
+    surge_detected = locked_out or estimate > maxnum
+    state[CURRENT] += 1
+    if surge_detected and not locked_out:
+        # continue like that and get locked out
+        if now - state[WARNED] > lockout_time:
+            state[WARNINGS] = 0
+        state[WARNINGS] += 1
+        state[WARNED] = now
+        if state[WARNINGS] >= maxnum:
+            state[LOCKED_UNTIL] = max(state[LOCKED_UNTIL], now + lockout_time)
+    # after that time, the counter does not have any effect any more:
+    state[EXPIRES] = max(state[WINDOW_START] + 2 * dt, state[LOCKED_UNTIL], state[WARNED] + lockout_time)
+    return surge_detected
+
+
+class SurgeCounters(object):
+    """ Surge protection counters of this process, kept in memory """
+
+    # remove expired counters every that many requests
+    purge_interval = 1000
+
+    def __init__(self):
+        self.counters = {}
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def hit(self, key, now, maxnum, dt, lockout_time, kick=False):
+        """ Count a request of key (client id, action), return whether it is over the limit """
+        self._lock.acquire()
+        try:
+            state = self.counters.get(key)
+            if state is None:
+                state = self.counters[key] = [0] * 7
+            surge_detected = hit(state, now, maxnum, dt, lockout_time, kick)
+            self.hits += 1
+            if self.hits % self.purge_interval == 0:
+                self.purge(now)
+            return surge_detected
+        finally:
+            self._lock.release()
+
+    def purge(self, now):
+        for key, state in list(self.counters.items()):
+            if state[EXPIRES] < now:
+                del self.counters[key]
+
+
+class SharedSurgeCounters(SurgeCounters):
+    """ Surge protection counters shared by all processes via a mmap'ed file
+
+    The file is a hash table of fixed size slots (a key digest and the
+    counter state). A key may use one of <probe> slots after the one its
+    digest points to. If all of them are in use by other keys, the counter
+    expiring first gets replaced - so with many more active clients than
+    slots, some clients may be forgotten early.
+    """
+
+    slot_format = struct.Struct('<8s7I')
+    probe = 8
+
+    def __init__(self, path, slots=65536):
+        """
+        @param path: path of the counter file
+        @param slots: amount of counters (only used when creating the file)
+        """
+        SurgeCounters.__init__(self)
+        self.path = path
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        self._file_lock(True)
+        try:
+            size = os.fstat(self.fd).st_size
+            if size < self.slot_format.size * self.probe:
+                size = self.slot_format.size * max(slots, self.probe)
+                os.ftruncate(self.fd, size)
+        finally:
+            self._file_lock(False)
+        self.slots = size // self.slot_format.size
+        self.map = mmap.mmap(self.fd, self.slots * self.slot_format.size)
+
+    def _file_lock(self, locked):
+        """ lock / unlock the file for the other processes """
+        if fcntl is not None:
+            fcntl.lockf(self.fd, locked and fcntl.LOCK_EX or fcntl.LOCK_UN)
+        elif locked:
+            self._dir_lock = lock.ExclusiveLock(self.path + '.lock', timeout=10.0)
+            self._dir_lock.acquire(10.0)
+        else:
+            self._dir_lock.release()
+
+    def hit(self, key, now, maxnum, dt, lockout_time, kick=False):
+        """ Count a request of key (client id, action), return whether it is over the limit """
+        digest = hashlib.md5(('%s\t%s' % key).encode('utf-8')).digest()[:8]
+        start = struct.unpack('<I', digest[:4])[0] % (self.slots - self.probe + 1)
+        fmt = self.slot_format
+        self._lock.acquire() # threads of this process
+        try:
+            self._file_lock(True) # other processes
+            try:
+                found = free = oldest = None
+                oldest_expires = None
+                for slot in range(start, start + self.probe):
+                    values = fmt.unpack_from(self.map, slot * fmt.size)
+                    if values[0] == digest:
+                        found = slot
+                        state = list(values[1:])
+                        break
+                    expires = values[1 + EXPIRES]
+                    if free is None and expires < now:
+                        free = slot
+                    if oldest_expires is None or expires < oldest_expires:
+                        oldest, oldest_expires = slot, expires
+                if found is None:
+                    found = free if free is not None else oldest
+                    state = [0] * 7
+                surge_detected = hit(state, now, maxnum, dt, lockout_time, kick)
+                fmt.pack_into(self.map, found * fmt.size, digest, *state)
+                return surge_detected
+            finally:
+                self._file_lock(False)
+        finally:
+            self._lock.release()
+
+
+# counters by file path (shared) or siteid (in memory)
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def get_counters(request):
+    """ Return the surge protection counters of this wiki (see surge_counters) """
+    cfg = request.cfg
+    shared = cfg.surge_counters != 'memory'
+    if shared:
+        key = os.path.join(caching.get_arena_dir(request, 'surgeprotect', 'wiki'), 'surge-counters')
+    else:
+        key = cfg.siteid
+    counters = _counters.get(key)
+    if counters is None:
+        _counters_lock.acquire()
+        try:
+            counters = _counters.get(key)
+            if counters is None:
+                if shared:
+                    counters = SharedSurgeCounters(key)
+                else:
+                    counters = SurgeCounters()
+                _counters[key] = counters
+        finally:
+            _counters_lock.release()
+    return counters
+
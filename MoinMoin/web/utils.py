@@ -13,10 +13,10 @@ from werkzeug.exceptions import abort
 from werkzeug.http import cookie_date
 from werkzeug.wrappers import Response
 
-from MoinMoin import caching
 from MoinMoin import log
 from MoinMoin import wikiutil
 from MoinMoin.Page import Page
+from MoinMoin.web import surgeprotect
 from MoinMoin.web.exceptions import Forbidden, SurgeProtection
 
 logging = log.getLogger(__name__)
@@ -86,66 +86,23 @@ def check_surge_protect(request, kick=False, action=None, username=None):
         current_id = validuser and request.user.name or remote_addr
 
     default_limit = limits.get('default', (30, 60))
+    lockout_time = request.cfg.surge_lockout_time
 
     now = int(time.time())
-    surgedict = {}
     surge_detected = False
 
     try:
-        # if we have common farm users, we could also use scope='farm':
-        cache = caching.CacheEntry(request, 'surgeprotect', 'surge-log', scope='wiki', use_encode=True)
-        if cache.exists():
-            data = cache.content()
-            data = data.split("\n")
-            for line in data:
-                try:
-                    id, t, action, surge_indicator = line.split("\t")
-                    t = int(t)
-                    maxnum, dt = limits.get(action, default_limit)
-                    if t >= now - dt:
-                        events = surgedict.setdefault(id, {})
-                        timestamps = events.setdefault(action, [])
-                        timestamps.append((t, surge_indicator))
-                except Exception:
-                    pass
-
+        counters = surgeprotect.get_counters(request)
         maxnum, dt = limits.get(current_action, default_limit)
-        events = surgedict.setdefault(current_id, {})
-        timestamps = events.setdefault(current_action, [])
-        surge_detected = len(timestamps) > maxnum
-
-        surge_indicator = surge_detected and "!" or ""
-        timestamps.append((now, surge_indicator))
-        if surge_detected:
-            if len(timestamps) < maxnum * 2:
-                timestamps.append((now + request.cfg.surge_lockout_time, surge_indicator)) # continue like that and get locked out
+        surge_detected = counters.hit((current_id, current_action), now, maxnum, dt, lockout_time)
 
         if current_action not in ('cache', 'AttachFile', ): # don't add cache/AttachFile accesses to all or picture galleries will trigger SP
             action = 'all' # put a total limit on user's requests
             maxnum, dt = limits.get(action, default_limit)
-            events = surgedict.setdefault(current_id, {})
-            timestamps = events.setdefault(action, [])
-
-            if kick: # ban this guy, NOW
-                timestamps.extend([(now + request.cfg.surge_lockout_time, "!")] * (2 * maxnum))
-
-            surge_detected = surge_detected or len(timestamps) > maxnum
-
-            surge_indicator = surge_detected and "!" or ""
-            timestamps.append((now, surge_indicator))
-            if surge_detected:
-                if len(timestamps) < maxnum * 2:
-                    timestamps.append((now + request.cfg.surge_lockout_time, surge_indicator)) # continue like that and get locked out
-
-        data = []
-        for id, events in list(surgedict.items()):
-            for action, timestamps in list(events.items()):
-                for t, surge_indicator in timestamps:
-                    data.append("%s\t%d\t%s\t%s" % (id, t, action, surge_indicator))
-        data = "\n".join(data)
-        cache.update(data)
+            # kick: ban this guy, NOW
+            surge_detected = counters.hit((current_id, action), now, maxnum, dt, lockout_time, kick=kick) or surge_detected
     except Exception:
-        pass
+        logging.exception("surge protection counters failed")
 
     if surge_detected and validuser and request.user.auth_method in request.cfg.auth_methods_trusted:
         logging.info("Trusted user %s would have triggered surge protection if not trusted.", request.user.name)
@@ -27,7 +27,7 @@ from inspect import getfullargspec, isfunction, isclass, ismethod
 from MoinMoin import web # needed so that next lines work:
 import werkzeug
 from werkzeug.security import safe_str_cmp as safe_str_equal
-from MoinMoin.util import pysupport, lock
+from MoinMoin.util import pysupport, lock, pluginmanifest
 
 # Exceptions
 class InvalidFileNameError(Exception):
@@ -1151,17 +1151,9 @@ def wikiPlugins(kind, cfg):
     if kind in cache:
         result = cache[kind]
     else:
-        result = {}
-        for modname in cfg._plugin_modules:
-            try:
-                module = pysupport.importName(modname, kind)
-                packagepath = os.path.dirname(module.__file__)
-                plugins = pysupport.getPluginModules(packagepath)
-                for p in plugins:
-                    if not p in result:
-                        result[p] = '%s.%s' % (modname, kind)
-            except AttributeError:
-                pass
+        # check whether the plugin manifest is still valid (new plugins may
+        # have been installed since it was loaded)
+        result = pluginmanifest.get(cfg, kind, validate=True).wiki_plugins
         cache[kind] = result
     return result
 
@@ -1190,6 +1182,13 @@ def searchAndImportPlugin(cfg, type, name, what=None):
     }
     if what is None:
         what = type2classname[type]
+    # remember what we found, so we do not try all the module names again
+    found = cfg.cache.plugin_search
+    key = (type, name, what)
+    try:
+        return found[key]
+    except KeyError:
+        pass
     mt = MimeType(name)
     plugin = None
     for module_name in mt.module_name():
@@ -1200,6 +1199,7 @@ def searchAndImportPlugin(cfg, type, name, what=None):
             pass
     else:
         raise PluginMissingError("Plugin not found! (%r %r %r)" % (type, name, what))
+    found[key] = plugin
     return plugin
 
 
@@ -1213,7 +1213,9 @@ def getParserForExtension(cfg, extension):
     with the given extension. The extension should be in the same
     format as os.path.splitext returns it (i.e. with the dot).
     Returns None if no parser willing to handle is found.
-    The dict of extensions is cached in the config object.
+    The dict of extensions (to parser names) is cached in the config
+    object, it is made from the plugin manifest, so only the parser we
+    return gets imported.
 
     @param cfg: the Config instance for the wiki in question
     @param extension: the filename extension including the dot
@@ -1222,28 +1224,30 @@ def getParserForExtension(cfg, extension):
     """
     if not hasattr(cfg.cache, 'EXT_TO_PARSER'):
         etp, etd = {}, None
-        parser_plugins = getPlugins('parser', cfg)
+        parser_plugins = pluginmanifest.names(cfg, 'parser')
         # force the 'highlight' parser to be the first entry in the list
         # this makes it possible to overwrite some mapping entries later, so that
         # moin will use some "better" parser for some filename extensions
-        parser_plugins.remove('highlight')
-        parser_plugins = ['highlight'] + parser_plugins
+        if 'highlight' in parser_plugins:
+            parser_plugins.remove('highlight')
+            parser_plugins = ['highlight'] + parser_plugins
         for pname in parser_plugins:
-            try:
-                Parser = importPlugin(cfg, 'parser', pname, 'Parser')
-            except PluginMissingError:
-                continue
-            if hasattr(Parser, 'extensions'):
-                exts = Parser.extensions
-                if isinstance(exts, list):
-                    for ext in exts:
-                        etp[ext] = Parser
-                elif str(exts) == '*':
-                    etd = Parser
+            exts = pluginmanifest.value(cfg, 'parser', pname, 'extensions')
+            if isinstance(exts, list):
+                for ext in exts:
+                    etp[ext] = pname
+            elif str(exts) == '*':
+                etd = pname
         cfg.cache.EXT_TO_PARSER = etp
         cfg.cache.EXT_TO_PARSER_DEFAULT = etd
 
-    return cfg.cache.EXT_TO_PARSER.get(extension, cfg.cache.EXT_TO_PARSER_DEFAULT)
+    pname = cfg.cache.EXT_TO_PARSER.get(extension, cfg.cache.EXT_TO_PARSER_DEFAULT)
+    if pname is None:
+        return None
+    try:
+        return importPlugin(cfg, 'parser', pname, 'Parser')
+    except PluginMissingError:
+        return None
 
 
 #############################################################################
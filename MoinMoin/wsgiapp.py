@@ -14,6 +14,7 @@ logging = log.getLogger(__name__)
 from MoinMoin.web.contexts import AllContext, Context, XMLRPCContext
 from MoinMoin.web.exceptions import HTTPException
 from MoinMoin.web.request import Request, MoinMoinFinish, HeaderSet
+from MoinMoin.web import responsecache, streaming
 from MoinMoin.web.utils import check_forbidden, check_surge_protect, fatal_response, \
     redirect_last_visited
 from MoinMoin.Page import Page
@@ -58,7 +59,8 @@ def init(request):
     context.lang = setup_i18n_postauth(context)
 
     def finish():
-        pass
+        # save the translated texts formatted during this request at once
+        i18n.saveFormattedTexts(context)
 
     context.finish = finish
 
@@ -75,7 +77,9 @@ def run(context):
     # preliminary access checks (forbidden, bots, surge protection)
     try:
         try:
-            check_forbidden(context)
+            if responsecache.environ_key not in request.environ:
+                # else already checked by a miss of the response cache
+                check_forbidden(context)
             check_surge_protect(context)
 
             action_name = context.action
@@ -87,7 +91,10 @@ def run(context):
                 response = xmlrpc.xmlrpc2(XMLRPCContext(request))
             else:
                 response = dispatch(request, context, action_name)
-            context.cfg.session_service.finalize(context, context.session)
+            stream = context.output_stream
+            if stream is None or not stream.started:
+                # else already finalized when streaming started
+                context.cfg.session_service.finalize(context, context.session)
             return response
         except MoinMoinFinish:
             return request
@@ -259,9 +266,17 @@ class Application(object):
         try:
             request = None
             request = self.Request(environ)
-            context = init(request)
+            context = AllContext(request)
+            response = responsecache.lookup(context)
+            if response is not None:
+                return response(environ, start_response)
+            context = init(context)
             try:
-                response = run(context)
+                if context.cfg.stream_pages and request.method == 'GET':
+                    response = streaming.run(context, run, context.cfg.stream_chunk_size)
+                else:
+                    response = run(context)
+                responsecache.store(context, response)
             finally:
                 context.clock.stop('total')
                 if context.cfg.log_timing:
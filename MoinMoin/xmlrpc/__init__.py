@@ -33,6 +33,7 @@ logging = log.getLogger(__name__)
 
 from MoinMoin import auth, config, user, wikiutil
 from MoinMoin.Page import Page
+from MoinMoin.linkgraph import get_linkgraph
 from MoinMoin.PageEditor import PageEditor
 from MoinMoin.logfile import editlog
 from MoinMoin.action import AttachFile
@@ -576,7 +577,7 @@ class XmlRpcBase:
             return self.noSuchPageFault()
 
         links_out = []
-        for link in page.getPageLinks(self.request):
+        for link in get_linkgraph(self.request).links_from(pagename):
             links_out.append({'name': self._outstr(link), 'type': 0 })
         return links_out
 
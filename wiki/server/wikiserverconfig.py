@@ -49,6 +49,14 @@ class LocalConfig(DefaultConfig):
     #threaded = True
     #processes = 1
 
+    # prefork mode (uses all cpu cores): a master process with that many
+    # worker processes, optionally restarting them after max_requests requests
+    # ("moin server standalone --reload" or SIGHUP reloads the server)
+    #workers = 4
+    #max_requests = 1000
+    #preload = True
+    #gc_freeze = True
+
     # automatic code reloader - needs testing!
     #use_reloader = False
     #extra_files = None